@@ -2,9 +2,17 @@
 Dialogue API 엔드포인트
 /api/v1/dialogue/turn
 """
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Body
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Body, Depends, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict
+from datetime import datetime
+import asyncio
+import base64
+import binascii
+import json
 import logging
+import threading
 import time
 import uuid
 
@@ -12,32 +20,401 @@ from app.models.schemas import (
     DialogueTurnRequest, DialogueTurnResponse, ErrorResponse,
     DialogueSession, Stage, STTResult, TurnResult, SafetyCheckResult
 )
-from app.core.orchestrator import StageOrchestrator
-from app.core.agent import DialogueAgent
-from app.services.stt_service import STTService
-from app.services.tts_service import get_tts_service
-from app.tools.context_manager import get_context_manager
-from app.services.redis_service import get_redis_service
+from app.core.config import settings
+from app.core.container import (
+    get_agent, get_context_manager, get_orchestrator, get_redis_service, get_stt_service, get_tts_service
+)
+from app.core.deadline import current_degradations, deadline_seconds, has_time_for, turn_deadline
+from app.core.metrics import (
+    FALLBACK_RESPONSES, FEEDBACK_STREAM_FIRST_CONTENT, SAFETY_FLAGS, STAGE_RETRIES, STAGE_TRANSITIONS, record_cache,
+    record_turn
+)
+from app.core.tracing import mark_span_error, set_span_attributes, start_server_span, traced
+from app.core.token_budget import add_turn_usage, session_token_total, track_session_tokens
+from app.core.turn_capture import capture_turn
+from app.services.feedback_jobs import (
+    JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, build_feedback_input, build_feedback_input_from_history,
+    enqueue_session_feedback, feedback_input_hash, generate_and_store, get_feedback_queue
+)
+from app.services.conversation_summary import schedule_summary_update
+from app.services.stt_stream import StreamingTranscriber
+from app.services.session_channel import PinnedSession
+from app.services.turn_recorder import get_turn_recorder
 from app.utils.name_utils import extract_first_name, format_name_with_vocative
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# 싱글톤 인스턴스
-orchestrator = StageOrchestrator()
-agent = DialogueAgent()
-stt_service = STTService()
-tts_service = get_tts_service()
-context_manager = get_context_manager()
-redis_service = get_redis_service()
+# 싱글톤 인스턴스는 app.core.container에서 지연 생성 (라우트는 Depends로 주입)
+
+
+# ========================================
+# 턴 처리 공통 파이프라인 (/turn, /test_turn, WebSocket 채널)
+# ========================================
+
+@traced("dialogue.turn_pipeline")
+def _run_turn_pipeline(session: DialogueSession, stt_result: STTResult) -> tuple:
+    """
+    Agent 실행 → 전환 판단 → 세션 상태 업데이트 → Fallback 응답 (동기)
+    
+    LLM 호출이 포함되므로 async 엔드포인트에서는 asyncio.to_thread로 실행한다.
+    턴 기록이 켜져 있으면 턴 전 세션 스냅샷과 외부 호출 내역을 함께 기록한다.
+    턴의 LLM 토큰 수는 호출부별로 session.token_usage에 누적하고, 대화 요약 갱신은 백그라운드로 넘긴다.
+    
+    Returns:
+        (turn_result, 업데이트된 session, should_transition, old_stage)
+    """
+    recorder = get_turn_recorder()
+    if not recorder.should_record():
+        with track_session_tokens() as turn_usage:
+            turn_result, session, should_transition, old_stage = _execute_turn(session, stt_result)
+        add_turn_usage(session, turn_usage)
+        schedule_summary_update(session)
+        _precompute_feedback(session)
+        return turn_result, session, should_transition, old_stage
+    
+    session_before = session.model_copy(deep=True)
+    started = time.perf_counter()
+    with capture_turn() as capture, track_session_tokens() as turn_usage:
+        turn_result, session, should_transition, old_stage = _execute_turn(session, stt_result)
+    add_turn_usage(session, turn_usage)
+    recorder.record(
+        session_before=session_before,
+        child_text=stt_result.text,
+        turn_result=turn_result,
+        session_after=session,
+        should_transition=should_transition,
+        capture=capture,
+        duration_seconds=time.perf_counter() - started
+    )
+    schedule_summary_update(session)
+    _precompute_feedback(session)
+    return turn_result, session, should_transition, old_stage
+
+
+def _precompute_feedback(session: DialogueSession):
+    """
+    S6 진입 후(S6 턴 포함) 부모 피드백 생성 작업 등록 (FEEDBACK_QUEUE_ENABLED)
+    S6 턴마다 대화가 늘어나므로 대화 해시가 바뀔 때만 새 작업이 등록된다.
+    """
+    if not settings.FEEDBACK_QUEUE_ENABLED or session.current_stage != Stage.S6_ACTION_CARD:
+        return
+    try:
+        enqueue_session_feedback(session)
+    except Exception as e:
+        # 등록 실패 시 /feedback 요청 때 다시 등록
+        logger.warning(f"⚠️ 피드백 작업 등록 실패: {session.session_id}, {e}")
 
 
-@router.post("/turn", response_model=DialogueTurnResponse)
+def _execute_turn(session: DialogueSession, stt_result: STTResult) -> tuple:
+    """턴 처리 본체 (_run_turn_pipeline, 재실행 도구에서 공용)"""
+    agent = get_agent()
+    orchestrator = get_orchestrator()
+    set_span_attributes(
+        session_id=session.session_id,
+        stage=session.current_stage,
+        retry_count=session.retry_count,
+        child_text_length=len(stt_result.text or "")
+    )
+    
+    # 3. Request 객체 구성 (세션의 current_stage 사용)
+    request = DialogueTurnRequest(
+        session_id=session.session_id,
+        stage=session.current_stage,  # 세션의 current_stage 사용
+        story_name=session.story_name,
+        # story_theme=session.story_theme,
+        child_name=session.child_name,
+        # child_age=session.child_age,
+        audio_file=None,
+        previous_turns=[]  # 필요시 DB에서 조회
+    )
+    
+    # 4. Agent 실행 (Tool 사용, AI 응답 생성)
+    logger.info(f"🔧 Agent 실행 시작: Stage={session.current_stage.value}")
+    turn_result = agent.execute_stage_turn(
+        request, session, stt_result
+    )
+    logger.info(f"🔧 Agent 실행 완료: turn_result.keys()={list(turn_result.keys())}")
+    
+    # turn_result의 stt_result 확인
+    if "stt_result" in turn_result:
+        stt_in_result = turn_result["stt_result"]
+        if isinstance(stt_in_result, dict):
+            stt_text = stt_in_result.get("text", "")
+            logger.info(f"📝 turn_result.stt_result.text: '{stt_text}' (길이: {len(stt_text)})")
+        else:
+            logger.warning(f"⚠️ turn_result.stt_result가 dict가 아님: {type(stt_in_result)}")
+    else:
+        logger.error(f"❌ turn_result에 'stt_result' 키가 없음")
+    
+    # 5. Orchestrator 평가 (Stage 전환 판단)
+    agent_evaluation = agent.evaluate_turn_success(
+        session.current_stage, turn_result, stt_result.text
+    )
+    
+    if(session.current_stage != Stage.S6_ACTION_CARD):
+        logger.info(f"🔍 Stage 전환 판단 시작: Stage={session.current_stage.value}")
+        should_transition = orchestrator.should_transition_to_next_stage(
+            session, turn_result, agent_evaluation
+        )
+        logger.info(f"🔍 Stage 전환 결정: {session.current_stage.value} → {'✅ 전환' if should_transition else '❌ 유지'}")
+    else:
+        # S6는 다음 스테이지가 없으므로 전환하지 않음
+        should_transition = False
+        logger.info(f"🔍 S6는 다음 스테이지가 없으므로 전환하지 않음")
+            
+    # 6. 세션 상태 업데이트
+    old_stage = session.current_stage
+    old_retry_count = session.retry_count
+    ## 여기서 Orchestrator가 S3->S4 전환 시 session.context에 's3_answer_type'을 저장함
+    session = orchestrator.update_session_state(
+        session, should_transition, turn_result
+    )
+    new_stage = session.current_stage
+    new_retry_count = session.retry_count
+    logger.info(f"🔍 세션 상태 업데이트: {old_stage.value} → {new_stage.value}, retry_count={old_retry_count} → {new_retry_count}")
+
+    set_span_attributes(transition=should_transition, next_stage=new_stage, new_retry_count=new_retry_count)
+    if should_transition and new_stage != old_stage:
+        STAGE_TRANSITIONS.labels(old_stage.value, new_stage.value).inc()
+    if new_retry_count > old_retry_count:
+        STAGE_RETRIES.labels(new_stage.value).inc()
+
+    safety_check = turn_result.get("safety_check")
+    if isinstance(safety_check, dict):
+        for category in safety_check.get("flagged_categories") or []:
+            SAFETY_FLAGS.labels(category).inc()
+
+    # 7. Stage 전환 실패 시 fallback 응답 재생성
+    ## (전환되지 않고 retry 카운트만 늘어난 경우)
+    if not should_transition and new_retry_count > old_retry_count:
+        logger.info(f"🔄 Fallback 응답 재생성: Stage={new_stage.value}, retry_count={new_retry_count}")
+        fallback_response = agent.generate_fallback_response(
+            session, new_stage, new_retry_count
+        )
+        # turn_result의 ai_response를 fallback 응답으로 교체
+        turn_result["ai_response"] = fallback_response.dict()
+        FALLBACK_RESPONSES.labels(new_stage.value).inc()
+        logger.info(f"🔄 Fallback 응답 적용: {fallback_response.text}")
+    
+    return turn_result, session, should_transition, old_stage
+
+
+async def _request_turn_deadline(x_turn_deadline_ms: Optional[int] = Header(None)):
+    """턴 마감 시간 (X-Turn-Deadline-Ms 헤더, 없으면 TURN_DEADLINE_SECONDS) - 응답까지 유지"""
+    with turn_deadline(deadline_seconds(x_turn_deadline_ms)) as deadline:
+        yield deadline
+
+
+async def _attach_tts(turn_result: Dict, tts_format: Optional[str] = None):
+    """8. AI 응답을 TTS로 변환하여 turn_result["ai_response"]에 추가"""
+    tts_service = get_tts_service()
+    ai_response_dict = turn_result.get("ai_response", {})
+    ai_text = ai_response_dict.get("text", "")
+    
+    # 턴 마감이 임박하면 TTS 없이 텍스트만 응답
+    if ai_text and not has_time_for("supertone"):
+        ai_response_dict["tts_audio_base64"] = None
+        ai_response_dict["tts_url"] = None
+        ai_response_dict["duration_ms"] = None
+        ai_response_dict["tts_audio_format"] = None
+    elif ai_text:
+        try:
+            logger.info(f"🎙️ TTS 변환 시작: '{ai_text[:50]}...'")
+            tts_result = await tts_service.text_to_speech_async(
+                ai_text, output_format=tts_format
+            )
+            
+            # ai_response에 TTS 정보 추가 (Base64 인코딩된 오디오)
+            ai_response_dict["tts_audio_base64"] = tts_result["audio_base64"]
+            ai_response_dict["tts_url"] = tts_result["file_url"]  # 백업용
+            ai_response_dict["duration_ms"] = tts_result["duration_ms"]
+            ai_response_dict["tts_audio_format"] = tts_result["audio_format"]
+            turn_result["ai_response"] = ai_response_dict
+            
+            logger.info(f"🎙️ TTS 변환 완료: {tts_result['file_path']}, duration={tts_result['duration_ms']}ms, Base64 길이={len(tts_result['audio_base64'])}")
+        except Exception as e:
+            logger.error(f"❌ TTS 변환 실패: {e}")
+            # TTS 실패해도 텍스트 응답은 제공
+            ai_response_dict["tts_audio_base64"] = None
+            ai_response_dict["tts_url"] = None
+            ai_response_dict["duration_ms"] = None
+            ai_response_dict["tts_audio_format"] = None
+
+
+def _build_turn_response(
+    session: DialogueSession,
+    turn_result: Dict,
+    should_transition: bool,
+    old_stage: Stage,
+    start_time: float
+) -> DialogueTurnResponse:
+    """9. 다음 Stage 결정 및 DialogueTurnResponse 구성"""
+    orchestrator = get_orchestrator()
+    new_stage = session.current_stage
+    
+    if should_transition:
+        # Stage 전환 성공: session.current_stage가 다음 스테이지
+        next_stage_value = new_stage
+        # S6로 전환된 경우, 아직 S6 대화를 시작하지 않았으므로 next_stage는 S6
+        logger.info(f"✅ Stage 전환 완료: {old_stage.value} → 다음 Stage = {next_stage_value.value}")
+    elif old_stage.value == Stage.S6_ACTION_CARD and not should_transition:
+        # S6는 다음 스테이지가 없음
+        next_stage_value = None
+        logger.info("🏁 S6 완료: next_stage = null")
+    else:
+        # Stage 유지: 다음에도 같은 Stage
+        next_stage_value = new_stage
+        logger.info(f"🔄 Stage 유지: 현재 Stage = {new_stage.value}, 재시도 {session.retry_count}/{orchestrator.get_stage_config(session.current_stage).max_retry}")
+    
+    # 8. 응답 구성
+    elapsed = time.time() - start_time
+    processing_time = int(elapsed * 1000)
+    record_turn(old_stage.value, elapsed)
+    
+    # turn_result에서 필요한 데이터 추출 및 변환
+    stt_result_raw = turn_result.get("stt_result")
+    safety_check_raw = turn_result.get("safety_check", {})
+    ai_response_raw = turn_result.get("ai_response", {})
+    
+    # stt_result 처리 (None일 수 있음)
+    if stt_result_raw is None:
+        stt_result_dict = {
+            "text": "",
+            "confidence": 0.0,
+            "language": "ko"
+        }
+    elif isinstance(stt_result_raw, dict):
+        stt_result_dict = stt_result_raw
+    else:
+        # STTResult 객체인 경우
+        if hasattr(stt_result_raw, 'model_dump'):
+            stt_result_dict = stt_result_raw.model_dump()
+        elif hasattr(stt_result_raw, 'dict'):
+            stt_result_dict = stt_result_raw.dict()
+        else:
+            stt_result_dict = {
+                "text": getattr(stt_result_raw, "text", ""),
+                "confidence": getattr(stt_result_raw, "confidence", 0.0),
+                "language": getattr(stt_result_raw, "language", "ko")
+            }
+    
+    # safety_check 처리
+    if isinstance(safety_check_raw, dict):
+        safety_check_dict = safety_check_raw
+        # message 필드가 없으면 None으로 설정
+        if "message" not in safety_check_dict:
+            safety_check_dict["message"] = None
+    else:
+        # SafetyCheckResult 객체인 경우
+        if hasattr(safety_check_raw, 'model_dump'):
+            safety_check_dict = safety_check_raw.model_dump()
+        elif hasattr(safety_check_raw, 'dict'):
+            safety_check_dict = safety_check_raw.dict()
+        else:
+            safety_check_dict = {
+                "is_safe": getattr(safety_check_raw, "is_safe", True),
+                "flagged_categories": getattr(safety_check_raw, "flagged_categories", []),
+                "message": getattr(safety_check_raw, "message", None)
+            }
+    
+    # ai_response 변환 (Base64 오디오 포함)
+    if isinstance(ai_response_raw, dict):
+        ai_response_formatted = {
+            "text": ai_response_raw.get("text", ""),
+            "tts_audio_base64": ai_response_raw.get("tts_audio_base64"),  # Base64 인코딩된 오디오
+            "tts_audio": ai_response_raw.get("tts_url") if "tts_url" in ai_response_raw else None,  # 백업용 URL
+            "duration_ms": ai_response_raw.get("duration_ms") if "duration_ms" in ai_response_raw else None,
+            "tts_audio_format": ai_response_raw.get("tts_audio_format")
+        }
+    else:
+        # AISpeech 객체인 경우
+        if hasattr(ai_response_raw, 'model_dump'):
+            ai_response_dict = ai_response_raw.model_dump()
+            ai_response_formatted = {
+                "text": ai_response_dict.get("text", ""),
+                "tts_audio_base64": ai_response_dict.get("tts_audio_base64"),
+                "tts_audio": ai_response_dict.get("tts_url"),
+                "duration_ms": ai_response_dict.get("duration_ms")
+            }
+        elif hasattr(ai_response_raw, 'dict'):
+            ai_response_dict = ai_response_raw.dict()
+            ai_response_formatted = {
+                "text": ai_response_dict.get("text", ""),
+                "tts_audio_base64": ai_response_dict.get("tts_audio_base64"),
+                "tts_audio": ai_response_dict.get("tts_url"),
+                "duration_ms": ai_response_dict.get("duration_ms")
+            }
+        else:
+            ai_response_formatted = {
+                "text": getattr(ai_response_raw, "text", ""),
+                "tts_audio_base64": getattr(ai_response_raw, "tts_audio_base64", None),
+                "tts_audio": getattr(ai_response_raw, "tts_url", None),
+                "duration_ms": getattr(ai_response_raw, "duration_ms", None)
+            }
+    
+    # 모든 필드가 있는지 확인 (None이라도 필드가 있어야 함)
+    if "tts_audio_base64" not in ai_response_formatted:
+        ai_response_formatted["tts_audio_base64"] = None
+    if "tts_audio" not in ai_response_formatted:
+        ai_response_formatted["tts_audio"] = None
+    if "duration_ms" not in ai_response_formatted:
+        ai_response_formatted["duration_ms"] = None
+    if "tts_audio_format" not in ai_response_formatted:
+        ai_response_formatted["tts_audio_format"] = None
+    
+    # TurnResult 생성
+    turn_result_formatted = TurnResult(
+        stt_result=STTResult(**stt_result_dict),
+        safety_check=SafetyCheckResult(**safety_check_dict),
+        ai_response=ai_response_formatted
+    )
+    
+    # S1에서 감정 정보 추출
+    detected_emotion = None
+    if old_stage == Stage.S1_EMOTION_LABELING and "emotion_detected" in turn_result:
+        emotion_data = turn_result.get("emotion_detected")
+        if emotion_data:
+            detected_emotion = emotion_data
+            logger.info(f"💚 S1 감정 정보 포함: {detected_emotion}")
+    if old_stage == Stage.S4_REAL_WORLD_EMOTION and "emotion_detected" in turn_result:
+        emotion_data_s4 = turn_result.get("emotion_detected")
+        if emotion_data_s4:
+            detected_emotion = emotion_data_s4
+            logger.info(f"💚 S4 감정 정보 포함: {detected_emotion}")
+    
+    response = DialogueTurnResponse(
+        success=True,
+        session_id=session.session_id,
+        stage=old_stage,  # Stage enum을 문자열로 변환
+        result=turn_result_formatted,
+        detected_emotion=detected_emotion,  # S1에서만 값이 있음
+        next_stage=next_stage_value.value if next_stage_value else None,  # S5 완료 시 None
+        fallback_triggered=session.retry_count > 0,
+        retry_count=session.retry_count,
+        processing_time_ms=processing_time,
+        degradations=current_degradations()
+    )
+    
+    logger.info(
+        f"✅ 대화 턴 처리 완료: {processing_time}ms, "
+        f"현재 Stage={old_stage.value}, "
+        f"다음 Stage={next_stage_value.value if next_stage_value else 'null'}, "
+        f"재시도={session.retry_count}"
+    )
+    
+    return response
+
+
+@router.post("/turn", response_model=DialogueTurnResponse, dependencies=[Depends(_request_turn_deadline)])
 async def process_dialogue_turn_with_audio(
     session_id: str = Form(...),
     stage: Stage = Form(...),
     audio_file: Optional[UploadFile] = File(None),
-    child_text: Optional[str] = Form(None)
+    child_text: Optional[str] = Form(None),
+    tts_format: Optional[str] = Form(None),
+    context_manager=Depends(get_context_manager),
+    stt_service=Depends(get_stt_service)
 ):
     """
     대화 턴 처리
@@ -49,6 +426,9 @@ async def process_dialogue_turn_with_audio(
         stage: 현재 Stage (S1~S5)
         audio_file: 오디오 파일 (.wav) - 우선순위 1
         child_text: 아동 발화 텍스트 (STT 변환된 텍스트) - 우선순위 2 (테스트용)
+        tts_format: TTS 출력 포맷 (wav | opus | aac, 기본값: 서버 설정)
+        X-Turn-Deadline-Ms (헤더): 응답 마감 시간 (밀리초, 기본값: 서버 설정)
+            남은 시간이 부족한 단계는 저하 모드로 처리 (응답의 degradations)
     
     Returns:
         DialogueTurnResponse: 처리 결과 (S1의 경우 detected_emotion 필드 포함)
@@ -135,242 +515,19 @@ async def process_dialogue_turn_with_audio(
         
         logger.info(f"아동 발화: '{stt_result.text}' (길이: {len(stt_result.text)})")
         
-        # 3. Request 객체 구성 (세션의 current_stage 사용)
-        request = DialogueTurnRequest(
-            session_id=session_id,
-            stage=session.current_stage,  # 세션의 current_stage 사용
-            story_name=session.story_name,
-            # story_theme=session.story_theme,
-            child_name=session.child_name,
-            # child_age=session.child_age,
-            audio_file=None,
-            previous_turns=[]  # 필요시 DB에서 조회
-        )
-        
-        # 4. Agent 실행 (Tool 사용, AI 응답 생성)
-        logger.info(f"🔧 Agent 실행 시작: Stage={session.current_stage.value}")
-        turn_result = agent.execute_stage_turn(
-            request, session, stt_result
-        )
-        logger.info(f"🔧 Agent 실행 완료: turn_result.keys()={list(turn_result.keys())}")
-        
-        # turn_result의 stt_result 확인
-        if "stt_result" in turn_result:
-            stt_in_result = turn_result["stt_result"]
-            if isinstance(stt_in_result, dict):
-                stt_text = stt_in_result.get("text", "")
-                logger.info(f"📝 turn_result.stt_result.text: '{stt_text}' (길이: {len(stt_text)})")
-            else:
-                logger.warning(f"⚠️ turn_result.stt_result가 dict가 아님: {type(stt_in_result)}")
-        else:
-            logger.error(f"❌ turn_result에 'stt_result' 키가 없음")
-        
-        # 5. Orchestrator 평가 (Stage 전환 판단)
-        agent_evaluation = agent.evaluate_turn_success(
-            session.current_stage, turn_result, stt_result.text
+        # 3~7. Agent 실행 / 전환 판단 / 세션 상태 업데이트 (이벤트 루프 밖에서 실행)
+        turn_result, session, should_transition, old_stage = await asyncio.to_thread(
+            _run_turn_pipeline, session, stt_result
         )
         
-        if(session.current_stage != Stage.S6_ACTION_CARD):
-            logger.info(f"🔍 Stage 전환 판단 시작: Stage={session.current_stage.value}")
-            should_transition = orchestrator.should_transition_to_next_stage(
-                session, turn_result, agent_evaluation
-            )
-            logger.info(f"🔍 Stage 전환 결정: {session.current_stage.value} → {'✅ 전환' if should_transition else '❌ 유지'}")
-        else:
-            # S6는 다음 스테이지가 없으므로 전환하지 않음
-            should_transition = False
-            logger.info(f"🔍 S6는 다음 스테이지가 없으므로 전환하지 않음")
-                
-        # 6. 세션 상태 업데이트
-        old_stage = session.current_stage
-        old_retry_count = session.retry_count
-        ## 여기서 Orchestrator가 S3->S4 전환 시 session.context에 's3_answer_type'을 저장함
-        session = orchestrator.update_session_state(
-            session, should_transition, turn_result
-        )
-        new_stage = session.current_stage
-        new_retry_count = session.retry_count
-        logger.info(f"🔍 세션 상태 업데이트: {old_stage.value} → {new_stage.value}, retry_count={old_retry_count} → {new_retry_count}")
-
-        # 7. Stage 전환 실패 시 fallback 응답 재생성
-        ## (전환되지 않고 retry 카운트만 늘어난 경우)
-        if not should_transition and new_retry_count > old_retry_count:
-            logger.info(f"🔄 Fallback 응답 재생성: Stage={new_stage.value}, retry_count={new_retry_count}")
-            fallback_response = agent.generate_fallback_response(
-                session, new_stage, new_retry_count
-            )
-            # turn_result의 ai_response를 fallback 응답으로 교체
-            turn_result["ai_response"] = fallback_response.dict()
-            logger.info(f"🔄 Fallback 응답 적용: {fallback_response.text}")
-        
         # 8. AI 응답을 TTS로 변환
-        ai_response_dict = turn_result.get("ai_response", {})
-        ai_text = ai_response_dict.get("text", "")
-        
-        if ai_text:
-            try:
-                logger.info(f"🎙️ TTS 변환 시작: '{ai_text[:50]}...'")
-                tts_result = tts_service.text_to_speech(ai_text)
-                
-                # ai_response에 TTS 정보 추가 (Base64 인코딩된 오디오)
-                ai_response_dict["tts_audio_base64"] = tts_result["audio_base64"]
-                ai_response_dict["tts_url"] = tts_result["file_url"]  # 백업용
-                ai_response_dict["duration_ms"] = tts_result["duration_ms"]
-                turn_result["ai_response"] = ai_response_dict
-                
-                logger.info(f"🎙️ TTS 변환 완료: {tts_result['file_path']}, duration={tts_result['duration_ms']}ms, Base64 길이={len(tts_result['audio_base64'])}")
-            except Exception as e:
-                logger.error(f"❌ TTS 변환 실패: {e}")
-                # TTS 실패해도 텍스트 응답은 제공
-                ai_response_dict["tts_audio_base64"] = None
-                ai_response_dict["tts_url"] = None
-                ai_response_dict["duration_ms"] = None
+        await _attach_tts(turn_result, tts_format)
 
         context_manager.save_session(session)
         
-        # 9. 다음 Stage 결정
-        if should_transition:
-            # Stage 전환 성공: session.current_stage가 다음 스테이지
-            next_stage_value = new_stage
-            # S6로 전환된 경우, 아직 S6 대화를 시작하지 않았으므로 next_stage는 S6
-            logger.info(f"✅ Stage 전환 완료: {old_stage.value} → 다음 Stage = {next_stage_value.value}")
-        elif old_stage.value == Stage.S6_ACTION_CARD and not should_transition:
-            # S6는 다음 스테이지가 없음
-            next_stage_value = None
-            logger.info("🏁 S6 완료: next_stage = null")
-        else:
-            # Stage 유지: 다음에도 같은 Stage
-            next_stage_value = new_stage
-            logger.info(f"🔄 Stage 유지: 현재 Stage = {new_stage.value}, 재시도 {session.retry_count}/{orchestrator.get_stage_config(session.current_stage).max_retry}")
-        
-        # 8. 응답 구성
-        processing_time = int((time.time() - start_time) * 1000)
-        
-        # turn_result에서 필요한 데이터 추출 및 변환
-        stt_result_raw = turn_result.get("stt_result")
-        safety_check_raw = turn_result.get("safety_check", {})
-        ai_response_raw = turn_result.get("ai_response", {})
-        
-        # stt_result 처리 (None일 수 있음)
-        if stt_result_raw is None:
-            stt_result_dict = {
-                "text": "",
-                "confidence": 0.0,
-                "language": "ko"
-            }
-        elif isinstance(stt_result_raw, dict):
-            stt_result_dict = stt_result_raw
-        else:
-            # STTResult 객체인 경우
-            if hasattr(stt_result_raw, 'model_dump'):
-                stt_result_dict = stt_result_raw.model_dump()
-            elif hasattr(stt_result_raw, 'dict'):
-                stt_result_dict = stt_result_raw.dict()
-            else:
-                stt_result_dict = {
-                    "text": getattr(stt_result_raw, "text", ""),
-                    "confidence": getattr(stt_result_raw, "confidence", 0.0),
-                    "language": getattr(stt_result_raw, "language", "ko")
-                }
-        
-        # safety_check 처리
-        if isinstance(safety_check_raw, dict):
-            safety_check_dict = safety_check_raw
-            # message 필드가 없으면 None으로 설정
-            if "message" not in safety_check_dict:
-                safety_check_dict["message"] = None
-        else:
-            # SafetyCheckResult 객체인 경우
-            if hasattr(safety_check_raw, 'model_dump'):
-                safety_check_dict = safety_check_raw.model_dump()
-            elif hasattr(safety_check_raw, 'dict'):
-                safety_check_dict = safety_check_raw.dict()
-            else:
-                safety_check_dict = {
-                    "is_safe": getattr(safety_check_raw, "is_safe", True),
-                    "flagged_categories": getattr(safety_check_raw, "flagged_categories", []),
-                    "message": getattr(safety_check_raw, "message", None)
-                }
-        
-        # ai_response 변환 (Base64 오디오 포함)
-        if isinstance(ai_response_raw, dict):
-            ai_response_formatted = {
-                "text": ai_response_raw.get("text", ""),
-                "tts_audio_base64": ai_response_raw.get("tts_audio_base64"),  # Base64 인코딩된 오디오
-                "tts_audio": ai_response_raw.get("tts_url") if "tts_url" in ai_response_raw else None,  # 백업용 URL
-                "duration_ms": ai_response_raw.get("duration_ms") if "duration_ms" in ai_response_raw else None
-            }
-        else:
-            # AISpeech 객체인 경우
-            if hasattr(ai_response_raw, 'model_dump'):
-                ai_response_dict = ai_response_raw.model_dump()
-                ai_response_formatted = {
-                    "text": ai_response_dict.get("text", ""),
-                    "tts_audio_base64": ai_response_dict.get("tts_audio_base64"),
-                    "tts_audio": ai_response_dict.get("tts_url"),
-                    "duration_ms": ai_response_dict.get("duration_ms")
-                }
-            elif hasattr(ai_response_raw, 'dict'):
-                ai_response_dict = ai_response_raw.dict()
-                ai_response_formatted = {
-                    "text": ai_response_dict.get("text", ""),
-                    "tts_audio_base64": ai_response_dict.get("tts_audio_base64"),
-                    "tts_audio": ai_response_dict.get("tts_url"),
-                    "duration_ms": ai_response_dict.get("duration_ms")
-                }
-            else:
-                ai_response_formatted = {
-                    "text": getattr(ai_response_raw, "text", ""),
-                    "tts_audio_base64": getattr(ai_response_raw, "tts_audio_base64", None),
-                    "tts_audio": getattr(ai_response_raw, "tts_url", None),
-                    "duration_ms": getattr(ai_response_raw, "duration_ms", None)
-                }
-        
-        # 모든 필드가 있는지 확인 (None이라도 필드가 있어야 함)
-        if "tts_audio_base64" not in ai_response_formatted:
-            ai_response_formatted["tts_audio_base64"] = None
-        if "tts_audio" not in ai_response_formatted:
-            ai_response_formatted["tts_audio"] = None
-        if "duration_ms" not in ai_response_formatted:
-            ai_response_formatted["duration_ms"] = None
-        
-        # TurnResult 생성
-        turn_result_formatted = TurnResult(
-            stt_result=STTResult(**stt_result_dict),
-            safety_check=SafetyCheckResult(**safety_check_dict),
-            ai_response=ai_response_formatted
-        )
-        
-        # S1에서 감정 정보 추출
-        detected_emotion = None
-        if old_stage == Stage.S1_EMOTION_LABELING and "emotion_detected" in turn_result:
-            emotion_data = turn_result.get("emotion_detected")
-            if emotion_data:
-                detected_emotion = emotion_data
-                logger.info(f"💚 S1 감정 정보 포함: {detected_emotion}")
-        if old_stage == Stage.S4_REAL_WORLD_EMOTION and "emotion_detected" in turn_result:
-            emotion_data_s4 = turn_result.get("emotion_detected")
-            if emotion_data_s4:
-                detected_emotion = emotion_data_s4
-                logger.info(f"💚 S4 감정 정보 포함: {detected_emotion}")
-        
-        response = DialogueTurnResponse(
-            success=True,
-            session_id=session_id,
-            stage=old_stage,  # Stage enum을 문자열로 변환
-            result=turn_result_formatted,
-            detected_emotion=detected_emotion,  # S1에서만 값이 있음
-            next_stage=next_stage_value.value if next_stage_value else None,  # S5 완료 시 None
-            fallback_triggered=session.retry_count > 0,
-            retry_count=session.retry_count,
-            processing_time_ms=processing_time
-        )
-        
-        logger.info(
-            f"✅ 대화 턴 처리 완료: {processing_time}ms, "
-            f"현재 Stage={old_stage.value}, "
-            f"다음 Stage={next_stage_value.value if next_stage_value else 'null'}, "
-            f"재시도={session.retry_count}"
+        # 9. 다음 Stage 결정 및 응답 구성
+        response = _build_turn_response(
+            session, turn_result, should_transition, old_stage, start_time
         )
         
         return response
@@ -378,7 +535,10 @@ async def process_dialogue_turn_with_audio(
     except Exception as e:
         logger.error(f"대화 턴 처리 실패: {e}", exc_info=True)
         
-        processing_time = int((time.time() - start_time) * 1000)
+        elapsed = time.time() - start_time
+        processing_time = int(elapsed * 1000)
+        record_turn(stage.value, elapsed, status="error")
+        mark_span_error(e)
         
         raise HTTPException(
             status_code=500,
@@ -400,7 +560,10 @@ async def start_session(
     story_name: str = Form(...),
     child_name: str = Form(...),
     child_age: Optional[int] = Form(None),
-    intro: str = Form(...)
+    intro: str = Form(...),
+    tts_format: Optional[str] = Form(None),
+    context_manager=Depends(get_context_manager),
+    tts_service=Depends(get_tts_service)
 ):
     """
     새 대화 세션 시작
@@ -442,12 +605,16 @@ async def start_session(
         # AI 인트로를 TTS로 변환
         ai_intro_audio_base64 = None
         ai_intro_audio = None
+        ai_intro_audio_format = None
         intro_duration_ms = None
         try:
             logger.info(f"🎙️ 인트로 TTS 변환 시작: '{ai_intro[:50]}...'")
-            tts_result = tts_service.text_to_speech(ai_intro)
+            tts_result = await tts_service.text_to_speech_async(
+                ai_intro, output_format=tts_format
+            )
             ai_intro_audio_base64 = tts_result["audio_base64"]
             ai_intro_audio = tts_result["file_url"]  # 백업용
+            ai_intro_audio_format = tts_result["audio_format"]
             intro_duration_ms = tts_result["duration_ms"]
             logger.info(f"🎙️ 인트로 TTS 변환 완료: {tts_result['file_path']}, Base64 길이={len(tts_result['audio_base64'])}")
         except Exception as e:
@@ -463,6 +630,7 @@ async def start_session(
             "ai_intro": ai_intro,
             "ai_intro_audio_base64": ai_intro_audio_base64,
             "ai_intro_audio": ai_intro_audio,
+            "ai_intro_audio_format": ai_intro_audio_format,
             "intro_duration_ms": intro_duration_ms,
             "stage": Stage.S1_EMOTION_LABELING.value
         }
@@ -471,11 +639,12 @@ async def start_session(
         logger.error(f"세션 시작 실패: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/test_turn", response_model=DialogueTurnResponse)
+@router.post("/test_turn", response_model=DialogueTurnResponse, dependencies=[Depends(_request_turn_deadline)])
 async def process_test_dialogue_turn(
     session_id: str = Form(...),
     stage: Stage = Form(...),
-    child_text: Optional[str] = Form(None)
+    child_text: Optional[str] = Form(None),
+    context_manager=Depends(get_context_manager)
 ):
     """
     대화 턴 처리 (테스트용 - 텍스트만)
@@ -550,221 +719,16 @@ async def process_test_dialogue_turn(
         
         logger.info(f"아동 발화: '{stt_result.text}' (길이: {len(stt_result.text)})")
         
-        # 3. Request 객체 구성 (세션의 current_stage 사용)
-        request = DialogueTurnRequest(
-            session_id=session_id,
-            stage=session.current_stage,  # 세션의 current_stage 사용
-            story_name=session.story_name,
-            # story_theme=session.story_theme,
-            child_name=session.child_name,
-            # child_age=session.child_age,
-            audio_file=None,
-            previous_turns=[]  # 필요시 DB에서 조회
-        )
-        
-        # 4. Agent 실행 (Tool 사용, AI 응답 생성)
-        logger.info(f"🔧 Agent 실행 시작: Stage={session.current_stage.value}")
-        turn_result = agent.execute_stage_turn(
-            request, session, stt_result
+        # 3~7. Agent 실행 / 전환 판단 / 세션 상태 업데이트 (이벤트 루프 밖에서 실행)
+        turn_result, session, should_transition, old_stage = await asyncio.to_thread(
+            _run_turn_pipeline, session, stt_result
         )
-        logger.info(f"🔧 Agent 실행 완료: turn_result.keys()={list(turn_result.keys())}")
-        
-        # turn_result의 stt_result 확인
-        if "stt_result" in turn_result:
-            stt_in_result = turn_result["stt_result"]
-            if isinstance(stt_in_result, dict):
-                stt_text = stt_in_result.get("text", "")
-                logger.info(f"📝 turn_result.stt_result.text: '{stt_text}' (길이: {len(stt_text)})")
-            else:
-                logger.warning(f"⚠️ turn_result.stt_result가 dict가 아님: {type(stt_in_result)}")
-        else:
-            logger.error(f"❌ turn_result에 'stt_result' 키가 없음")
-        
-        # 5. Orchestrator 평가 (Stage 전환 판단)
-        agent_evaluation = agent.evaluate_turn_success(
-            session.current_stage, turn_result, stt_result.text
-        )
-        
-        if(session.current_stage != Stage.S6_ACTION_CARD):
-            logger.info(f"🔍 Stage 전환 판단 시작: Stage={session.current_stage.value}")
-            should_transition = orchestrator.should_transition_to_next_stage(
-                session, turn_result, agent_evaluation
-            )
-            logger.info(f"🔍 Stage 전환 결정: {session.current_stage.value} → {'✅ 전환' if should_transition else '❌ 유지'}")
-        else:
-            # S6는 다음 스테이지가 없으므로 전환하지 않음
-            should_transition = False
-            logger.info(f"🔍 S6는 다음 스테이지가 없으므로 전환하지 않음")
-        
-        # 6. 세션 상태 업데이트
-        old_stage = session.current_stage
-        old_retry_count = session.retry_count
-        session = orchestrator.update_session_state(
-            session, should_transition, turn_result
-        )
-        new_stage = session.current_stage        
-        new_retry_count = session.retry_count
-        logger.info(f"🔍 세션 상태 업데이트: {old_stage.value} → {new_stage.value}, retry_count={old_retry_count} → {new_retry_count}")
-
-        # 7. Stage 전환 실패 시 fallback 응답 재생성
-        if not should_transition and new_retry_count > old_retry_count:
-            logger.info(f"🔄 Fallback 응답 재생성: Stage={new_stage.value}, retry_count={new_retry_count}")
-            fallback_response = agent.generate_fallback_response(
-                session, new_stage, new_retry_count
-            )
-            # turn_result의 ai_response를 fallback 응답으로 교체
-            turn_result["ai_response"] = fallback_response.dict()
-            logger.info(f"🔄 Fallback 응답 적용: {fallback_response.text}")
-        
-        # 8. AI 응답을 TTS로 변환
-        ai_response_dict = turn_result.get("ai_response", {})
-        ai_text = ai_response_dict.get("text", "")
 
         context_manager.save_session(session)
         
-        # 7. 다음 Stage 결정
-        if should_transition:
-            # Stage 전환 성공: session.current_stage가 다음 스테이지
-            next_stage_value = new_stage
-            # S5로 전환된 경우, 아직 S5 대화를 시작하지 않았으므로 next_stage는 S5
-            logger.info(f"✅ Stage 전환 완료: {old_stage.value} → 다음 Stage = {next_stage_value.value}")
-        elif old_stage.value == Stage.S6_ACTION_CARD and not should_transition:
-            # S6는 다음 스테이지가 없음
-            next_stage_value = None
-            logger.info("🏁 S6 완료: next_stage = null")
-        else:
-            # Stage 유지: 다음에도 같은 Stage
-            next_stage_value = new_stage
-            logger.info(f"🔄 Stage 유지: 현재 Stage = {new_stage.value}, 재시도 {session.retry_count}/{orchestrator.get_stage_config(session.current_stage).max_retry}")
-        
-        # 8. 응답 구성
-        processing_time = int((time.time() - start_time) * 1000)
-        
-        # turn_result에서 필요한 데이터 추출 및 변환
-        stt_result_raw = turn_result.get("stt_result")
-        safety_check_raw = turn_result.get("safety_check", {})
-        ai_response_raw = turn_result.get("ai_response", {})
-        
-        # stt_result 처리 (None일 수 있음)
-        if stt_result_raw is None:
-            stt_result_dict = {
-                "text": "",
-                "confidence": 0.0,
-                "language": "ko"
-            }
-        elif isinstance(stt_result_raw, dict):
-            stt_result_dict = stt_result_raw
-        else:
-            # STTResult 객체인 경우
-            if hasattr(stt_result_raw, 'model_dump'):
-                stt_result_dict = stt_result_raw.model_dump()
-            elif hasattr(stt_result_raw, 'dict'):
-                stt_result_dict = stt_result_raw.dict()
-            else:
-                stt_result_dict = {
-                    "text": getattr(stt_result_raw, "text", ""),
-                    "confidence": getattr(stt_result_raw, "confidence", 0.0),
-                    "language": getattr(stt_result_raw, "language", "ko")
-                }
-        
-        # safety_check 처리
-        if isinstance(safety_check_raw, dict):
-            safety_check_dict = safety_check_raw
-            # message 필드가 없으면 None으로 설정
-            if "message" not in safety_check_dict:
-                safety_check_dict["message"] = None
-        else:
-            # SafetyCheckResult 객체인 경우
-            if hasattr(safety_check_raw, 'model_dump'):
-                safety_check_dict = safety_check_raw.model_dump()
-            elif hasattr(safety_check_raw, 'dict'):
-                safety_check_dict = safety_check_raw.dict()
-            else:
-                safety_check_dict = {
-                    "is_safe": getattr(safety_check_raw, "is_safe", True),
-                    "flagged_categories": getattr(safety_check_raw, "flagged_categories", []),
-                    "message": getattr(safety_check_raw, "message", None)
-                }
-        
-        # ai_response 변환 (Base64 오디오 포함)
-        if isinstance(ai_response_raw, dict):
-            ai_response_formatted = {
-                "text": ai_response_raw.get("text", ""),
-                "tts_audio_base64": ai_response_raw.get("tts_audio_base64"),  # Base64 인코딩된 오디오
-                "tts_audio": ai_response_raw.get("tts_url") if "tts_url" in ai_response_raw else None,  # 백업용 URL
-                "duration_ms": ai_response_raw.get("duration_ms") if "duration_ms" in ai_response_raw else None
-            }
-        else:
-            # AISpeech 객체인 경우
-            if hasattr(ai_response_raw, 'model_dump'):
-                ai_response_dict = ai_response_raw.model_dump()
-                ai_response_formatted = {
-                    "text": ai_response_dict.get("text", ""),
-                    "tts_audio_base64": ai_response_dict.get("tts_audio_base64"),
-                    "tts_audio": ai_response_dict.get("tts_url"),
-                    "duration_ms": ai_response_dict.get("duration_ms")
-                }
-            elif hasattr(ai_response_raw, 'dict'):
-                ai_response_dict = ai_response_raw.dict()
-                ai_response_formatted = {
-                    "text": ai_response_dict.get("text", ""),
-                    "tts_audio_base64": ai_response_dict.get("tts_audio_base64"),
-                    "tts_audio": ai_response_dict.get("tts_url"),
-                    "duration_ms": ai_response_dict.get("duration_ms")
-                }
-            else:
-                ai_response_formatted = {
-                    "text": getattr(ai_response_raw, "text", ""),
-                    "tts_audio_base64": getattr(ai_response_raw, "tts_audio_base64", None),
-                    "tts_audio": getattr(ai_response_raw, "tts_url", None),
-                    "duration_ms": getattr(ai_response_raw, "duration_ms", None)
-                }
-        
-        # 모든 필드가 있는지 확인 (None이라도 필드가 있어야 함)
-        if "tts_audio_base64" not in ai_response_formatted:
-            ai_response_formatted["tts_audio_base64"] = None
-        if "tts_audio" not in ai_response_formatted:
-            ai_response_formatted["tts_audio"] = None
-        if "duration_ms" not in ai_response_formatted:
-            ai_response_formatted["duration_ms"] = None
-        
-        # TurnResult 생성
-        turn_result_formatted = TurnResult(
-            stt_result=STTResult(**stt_result_dict),
-            safety_check=SafetyCheckResult(**safety_check_dict),
-            ai_response=ai_response_formatted
-        )
-        
-        # S1에서 감정 정보 추출
-        detected_emotion = None
-        if old_stage == Stage.S1_EMOTION_LABELING and "emotion_detected" in turn_result:
-            emotion_data = turn_result.get("emotion_detected")
-            if emotion_data:
-                detected_emotion = emotion_data
-                logger.info(f"💚 S1 감정 정보 포함: {detected_emotion}")
-        if old_stage == Stage.S4_REAL_WORLD_EMOTION and "emotion_detected" in turn_result:
-            emotion_data_s4 = turn_result.get("emotion_detected")
-            if emotion_data_s4:
-                detected_emotion = emotion_data_s4
-                logger.info(f"💚 S4 감정 정보 포함: {detected_emotion}")
-        
-        response = DialogueTurnResponse(
-            success=True,
-            session_id=session_id,
-            stage=old_stage,  # Stage enum을 문자열로 변환
-            result=turn_result_formatted,
-            detected_emotion=detected_emotion,  # S1에서만 값이 있음
-            next_stage=next_stage_value.value if next_stage_value else None,  # S5 완료 시 None
-            fallback_triggered=session.retry_count > 0,
-            retry_count=session.retry_count,
-            processing_time_ms=processing_time
-        )
-        
-        logger.info(
-            f"✅ 대화 턴 처리 완료: {processing_time}ms, "
-            f"현재 Stage={old_stage.value}, "
-            f"다음 Stage={next_stage_value.value if next_stage_value else 'null'}, "
-            f"재시도={session.retry_count}"
+        # 9. 다음 Stage 결정 및 응답 구성 (TTS 없음)
+        response = _build_turn_response(
+            session, turn_result, should_transition, old_stage, start_time
         )
         
         return response
@@ -772,7 +736,10 @@ async def process_test_dialogue_turn(
     except Exception as e:
         logger.error(f"대화 턴 처리 실패: {e}", exc_info=True)
         
-        processing_time = int((time.time() - start_time) * 1000)
+        elapsed = time.time() - start_time
+        processing_time = int(elapsed * 1000)
+        record_turn(stage.value, elapsed, status="error")
+        mark_span_error(e)
         
         raise HTTPException(
             status_code=500,
@@ -793,7 +760,8 @@ async def start_test_session(
     story_name: str = Form(...),
     child_name: str = Form(...),
     child_age: Optional[int] = Form(None),
-    intro: str = Form(...)
+    intro: str = Form(...),
+    context_manager=Depends(get_context_manager)
 ):
     """
     새 대화 세션 시작
@@ -853,9 +821,9 @@ async def start_test_session(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/session/{session_id}")
-async def get_session(session_id: str):
+async def get_session(session_id: str, context_manager=Depends(get_context_manager)):
     """
-    세션 정보 조회
+    세션 정보 조회 (session.token_usage: 호출부별 LLM 토큰 누적, token_total: 합계)
     """
     session = context_manager.get_session(session_id)
     if not session:
@@ -863,7 +831,8 @@ async def get_session(session_id: str):
     
     return {
         "success": True,
-        "session": session.dict()
+        "session": session.dict(),
+        "token_total": session_token_total(session.token_usage)
     }
 
 
@@ -890,7 +859,11 @@ async def list_stories():
 
 
 @router.get("/session/{session_id}/history")
-async def get_conversation_history(session_id: str):
+async def get_conversation_history(
+    session_id: str,
+    context_manager=Depends(get_context_manager),
+    redis_service=Depends(get_redis_service)
+):
     """
     세션의 대화 히스토리 조회
     
@@ -935,7 +908,11 @@ async def get_conversation_history(session_id: str):
 
 
 @router.get("/session/{session_id}/emotions")
-async def get_emotion_history(session_id: str):
+async def get_emotion_history(
+    session_id: str,
+    context_manager=Depends(get_context_manager),
+    redis_service=Depends(get_redis_service)
+):
     """
     세션의 감정 히스토리 조회
     
@@ -979,20 +956,39 @@ async def get_emotion_history(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _wait_for_feedback_job(queue, session_id: str, content_hash: str, job: Dict) -> Optional[Dict]:
+    """워커 작업이 끝날 때까지 FEEDBACK_WAIT_TIMEOUT 동안 대기 (마지막으로 확인한 상태 반환)"""
+    deadline = time.monotonic() + settings.FEEDBACK_WAIT_TIMEOUT
+    while job is not None and job.get("status") in (JOB_QUEUED, JOB_RUNNING) and time.monotonic() < deadline:
+        await asyncio.sleep(settings.FEEDBACK_WAIT_INTERVAL)
+        try:
+            job = await asyncio.to_thread(queue.get, session_id, content_hash)
+        except Exception as e:
+            logger.warning(f"피드백 작업 조회 실패, 직접 생성: {e}")
+            return None
+    if job is not None and job.get("status") in (JOB_QUEUED, JOB_RUNNING):
+        logger.warning(f"⚠️ 피드백 워커 대기 시간 초과, 직접 생성: {session_id} ({job.get('status')})")
+    return job
+
+
 @router.post("/feedback")
-async def generate_feedback(session_id: str = Form(...)):
+async def generate_feedback(
+    session_id: str = Form(...),
+    context_manager=Depends(get_context_manager)
+):
     """
     세션의 전체 대화를 분석하여 부모 피드백 생성
     
+    같은 대화로 생성한 결과가 있으면 바로 반환한다. 워커가 생성 중이면 FEEDBACK_WAIT_TIMEOUT까지
+    결과를 기다리고, 그래도 끝나지 않으면(워커 중단 등) 직접 생성한다. 항상 피드백 본문을 반환 (BE 호환)
+    (FEEDBACK_QUEUE_ENABLED=false면 진행 중 상태를 무시하고 직접 생성 후 결과 저장)
+    
     Args:
         session_id: 세션 ID
     
     Returns:
         아동 대화 분석 피드백 + 부모 행동 지침
     """
-    from app.tools.feedback import FeedbackGeneratorTool
-    from datetime import datetime
-    
     try:
         # 세션 조회
         session = context_manager.get_session(session_id)
@@ -1006,70 +1002,12 @@ async def generate_feedback(session_id: str = Form(...)):
         logger.info(f"세션 key_moments 개수: {len(session.key_moments)}")
         logger.info(f"세션 emotion_history 개수: {len(session.emotion_history)}")
         
-        # 전체 대화 내용 구성 - Redis 우선, 실패 시 세션 메모리
-        conversation_history = []
-        emotion_history = []
-        
-        try:
-            full_data = redis_service.get_full_conversation(session_id)
-            if full_data:
-                conversation_history = full_data.get("conversation_history", [])
-                emotion_history = full_data.get("emotion_history", [])
-                logger.info(f"Redis에서 대화 조회: conversation={len(conversation_history)}, emotions={len(emotion_history)}")
-        except Exception as e:
-            logger.warning(f"Redis 조회 실패, 세션 메모리 사용: {e}")
-        
-        # Redis 실패 시 세션에서 직접 가져오기
-        if not conversation_history:
-            conversation_history = session.key_moments
-            logger.info(f"세션 메모리에서 대화 조회: {len(conversation_history)}개")
-        
-        if not emotion_history:
-            emotion_history = [e.value for e in session.emotion_history]
-            logger.info(f"세션 메모리에서 감정 조회: {len(emotion_history)}개")
-        
-        # 아동 발화 수집 (모든 항목이 아동의 대사)
-        child_responses = []
-        child_response_count = 0
-        extracted_emotions = []
-        inappropriate_words_count = 0
-        inappropriate_words_details = []
-        
-        for i, moment in enumerate(conversation_history):
-            logger.debug(f"moment[{i}]: {moment}")
-            
-            # key_moments 구조: {'stage': 'S2', 'turn': 2, 'content': '...', 'emotion': '슬픔', 'safety_check': {...}}
-            content = moment.get("content", "")
-            if not content:
-                continue
-            
-            # 금칙어 사용 확인
-            safety_check = moment.get("safety_check")
-            if safety_check and not safety_check.get("is_safe", True):
-                inappropriate_words_count += 1
-                flagged_categories = safety_check.get("flagged_categories", [])
-                inappropriate_words_details.append({
-                    "stage": moment.get("stage", ""),
-                    "turn": moment.get("turn", ""),
-                    "content": content,
-                    "categories": flagged_categories
-                })
-                logger.info(f"🚨 금칙어 감지: stage={moment.get('stage')}, content={content[:20]}...")
-            
-            emotion = moment.get("emotion", "")
-            child_response_count += 1
-            
-            # 감정 정보가 있으면 수집
-            if emotion:
-                extracted_emotions.append(emotion)
-                child_responses.append(f"[감정: {emotion}] {content}")
-            else:
-                child_responses.append(content)
-        
-        logger.info(f"수집된 아동 발화: {child_response_count}개")
+        # 프롬프트 구성 (아동 발화 + 감정 + S1 감정 비교 + 금칙어 내역)
+        story_context = context_manager.get_story_context(session.story_name)
+        input_text = build_feedback_input(session, story_context)
         
         # 아동의 발화가 있는지 확인
-        if child_response_count == 0:
+        if input_text is None:
             # 디버깅을 위한 상세 정보
             error_detail = {
                 "message": "아동의 응답이 없습니다. 아동이 최소 1회 이상 응답해야 피드백을 생성할 수 있습니다.",
@@ -1088,105 +1026,54 @@ async def generate_feedback(session_id: str = Form(...)):
                 detail=error_detail
             )
         
-        # 감정 정보 (conversation_history에서 추출한 것 우선, 없으면 emotion_history 사용)
-        logger.info(f"🔍 extracted_emotions: {extracted_emotions}")
-        logger.info(f"🔍 emotion_history: {emotion_history}")
-        logger.info(f"🔍 session.emotion_history: {[e.value for e in session.emotion_history] if session.emotion_history else []}")
-        
-        if extracted_emotions:
-            emotions = ", ".join(extracted_emotions)
-            logger.info(f"감정 정보 (대화에서 추출): {emotions}")
-        elif emotion_history:
-            emotions = ", ".join(emotion_history)
-            logger.info(f"감정 정보 (emotion_history): {emotions}")
-        else:
-            # emotion_history가 비어있어도 session.emotion_history에는 있을 수 있음
-            if session.emotion_history:
-                emotions = ", ".join([e.value for e in session.emotion_history])
-                logger.info(f"감정 정보 (session에서 직접): {emotions}")
-            else:
-                emotions = "감정 정보 없음"
-                logger.info("감정 정보 없음")
-        
-        # S1 감정 정답과 아동 답변 비교
-        emotion_comparison = ""
-        try:
-            # 동화 데이터에서 정답 감정 가져오기
-            story_context = context_manager.get_story_context(session.story_name)
-            correct_emotion = story_context.get("emotion_ans", None)
-            
-            # 아동의 첫 감정 찾기 (여러 소스 확인)
-            child_first_emotion = None
-            
-            # 1. session.emotion_history에서
-            if session.emotion_history:
-                child_first_emotion = session.emotion_history[0].value
-                logger.info(f"🔍 감정 출처: session.emotion_history - {child_first_emotion}")
-            # 2. conversation_history에서 S1 stage의 emotion 찾기
-            elif conversation_history:
-                for moment in conversation_history:
-                    if moment.get("stage", "").startswith("S1") and moment.get("emotion"):
-                        child_first_emotion = moment.get("emotion")
-                        logger.info(f"🔍 감정 출처: conversation_history S1 - {child_first_emotion}")
-                        break
-            # 3. extracted_emotions에서 첫 번째
-            elif extracted_emotions:
-                child_first_emotion = extracted_emotions[0]
-                logger.info(f"🔍 감정 출처: extracted_emotions - {child_first_emotion}")
-            
-            logger.info(f"🔍 정답 감정: {correct_emotion}, 아동 감정: {child_first_emotion}")
-            
-            if correct_emotion:
-                if child_first_emotion:
-                    if child_first_emotion != correct_emotion:
-                        emotion_comparison = f"\n\n[S1 감정 답변 비교]\n정답 감정: {correct_emotion}\n아동이 선택한 감정: {child_first_emotion}\n→ 아동이 정답과 다른 감정을 선택했습니다."
-                        logger.info(f"✅ S1 감정 불일치: 정답={correct_emotion}, 아동={child_first_emotion}")
-                    else:
-                        emotion_comparison = f"\n\n[S1 감정 답변 비교]\n정답 감정: {correct_emotion}\n아동이 선택한 감정: {child_first_emotion}\n→ 아동이 정답 감정을 정확히 선택했습니다."
-                        logger.info(f"✅ S1 감정 일치: {correct_emotion}")
-                else:
-                    # 아동 감정을 찾지 못했지만 정답은 알려줌
-                    emotion_comparison = f"\n\n[S1 감정 답변 참고]\n동화 속 캐릭터가 느낀 정답 감정: {correct_emotion}"
-                    logger.info(f"✅ S1 정답 감정만 표시: {correct_emotion}")
-        except Exception as e:
-            logger.warning(f"❌ S1 감정 비교 실패: {e}", exc_info=True)
-        
-        # 금칙어 사용 내역 텍스트 구성
-        inappropriate_words_text = ""
-        if inappropriate_words_count > 0:
-            inappropriate_words_text = f"\n\n[금칙어 사용 내역]\n아동이 대화 중 부적절한 표현을 {inappropriate_words_count}회 사용했습니다."
-            for idx, detail in enumerate(inappropriate_words_details, 1):
-                categories_str = ", ".join(detail["categories"])
-                inappropriate_words_text += f"\n{idx}. {detail['stage']} - \"{detail['content']}\" (유형: {categories_str})"
-            logger.info(f"📝 금칙어 내역: {inappropriate_words_text}")
-        
-        # 프롬프트 구성 (아동 발화만)
-        feedback_tool = FeedbackGeneratorTool()
-        
-        child_dialogue = "\n".join(child_responses)
-        input_text = f"""[아동 발화]
-        {child_dialogue}
-
-        [아동 감정]
-        {emotions}{emotion_comparison}{inappropriate_words_text}
-        """
-        
-        logger.info(f"📝 emotion_comparison: {emotion_comparison}")
+        content_hash = feedback_input_hash(input_text)
         logger.info(f"📝 전체 input_text:\n{input_text}")
-        logger.info(f"프롬프트 길이: {len(input_text)} 문자")
-        logger.info(f"피드백 생성 시작: session_id={session_id}")
+        logger.info(f"프롬프트 길이: {len(input_text)} 문자, 대화 해시: {content_hash[:8]}")
+        
+        # 같은 대화로 생성한 결과 / 진행 중인 작업 확인
+        queue = get_feedback_queue()
+        if not queue.available:
+            queue = None
+        job = None
+        if queue is not None:
+            try:
+                job = await asyncio.to_thread(queue.get, session_id, content_hash)
+                if settings.FEEDBACK_QUEUE_ENABLED and (job is None or job.get("status") == JOB_FAILED):
+                    # 워커에 생성 요청 (S6 진입 때 등록되지 않았거나 대화가 바뀐 경우)
+                    job = await asyncio.to_thread(queue.enqueue, session_id, content_hash, input_text)
+            except Exception as e:
+                logger.warning(f"피드백 작업 조회 실패, 직접 생성: {e}")
+                queue = job = None
+        record_cache("feedback", job is not None and job.get("status") == JOB_DONE)
         
-        # 피드백 생성
-        result = feedback_tool.generate_feedback(input_text)
+        if settings.FEEDBACK_QUEUE_ENABLED and job is not None and job.get("status") in (JOB_QUEUED, JOB_RUNNING):
+            logger.info(f"피드백 생성 대기 중: {session_id} ({job.get('status')})")
+            job = await _wait_for_feedback_job(queue, session_id, content_hash, job)
         
-        logger.info(f"피드백 생성 완료: {result.get('child_analysis_feedback', '')[:50]}...")
+        if job is not None and job.get("status") == JOB_DONE:
+            result = job["result"]
+        else:
+            # 큐 비활성 / Redis 미연결 / 워커 대기 시간 초과: 직접 생성 (Redis가 있으면 결과 저장)
+            logger.info(f"피드백 생성 시작: session_id={session_id}")
+            try:
+                result = await asyncio.to_thread(generate_and_store, queue, session_id, content_hash, input_text)
+            except Exception:
+                # 오류 안내는 저장하지 않음 (다음 요청에서 다시 생성)
+                result = {
+                    "child_analysis_feedback": "피드백 생성 중 오류가 발생했습니다.",
+                    "parent_action_guide": "잠시 후 다시 시도해주세요.",
+                    "generated_at": datetime.now().isoformat()
+                }
+        
+        logger.info(f"피드백 반환: {result.get('child_analysis_feedback', '')[:50]}...")
         
         return {
             "success": True,
             "session_id": session_id,
+            "status": JOB_DONE,
             "child_analysis_feedback": result.get("child_analysis_feedback", ""),
             "parent_action_guide": result.get("parent_action_guide", ""),
-            "generated_at": datetime.now().isoformat()
+            "generated_at": result.get("generated_at")
         }
     
     except HTTPException:
@@ -1197,7 +1084,11 @@ async def generate_feedback(session_id: str = Form(...)):
 
 
 @router.get("/session/{session_id}/full")
-async def get_full_conversation(session_id: str):
+async def get_full_conversation(
+    session_id: str,
+    context_manager=Depends(get_context_manager),
+    redis_service=Depends(get_redis_service)
+):
     """
     세션의 전체 대화 정보 조회 (대화 내용 + 감정 + 세션 정보)
     
@@ -1251,12 +1142,61 @@ async def get_full_conversation(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _feedback_input_from_data(
+    conversation_history: List[Dict],
+    emotion_history: List[str],
+    child_name: Optional[str],
+    story_name: Optional[str],
+    context_manager
+) -> str:
+    """직접 받은 대화 내역으로 피드백 입력 구성 (아동 발화가 없으면 400)"""
+    logger.info(f"피드백 생성 요청 - 대화 {len(conversation_history)}개, 감정 {len(emotion_history)}개")
+    
+    # 아동의 발화가 있는지 확인
+    if not conversation_history:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "아동의 응답이 없습니다. 대화 내역을 최소 1개 이상 제공해주세요.",
+                "example": {
+                    "conversation_history": [
+                        {"stage": "S1", "turn": 1, "content": "엄마가 화났어"}
+                    ],
+                    "emotion_history": ["슬픔"]
+                }
+            }
+        )
+    
+    # S1 감정 정답 비교는 story_name이 있는 경우에만
+    story_context = context_manager.get_story_context(story_name) if story_name else None
+    input_text = build_feedback_input_from_history(conversation_history, emotion_history, child_name, story_context)
+    
+    if input_text is None:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "아동의 응답이 없습니다. 최소 1개 이상의 아동 발화가 필요합니다.",
+                "hint": "conversation_history는 아동의 발화만 포함해야 합니다. 'content' 필드는 필수입니다.",
+                "example": {
+                    "conversation_history": [
+                        {"stage": "S1", "turn": 1, "content": "엄마가 화났어", "emotion": "슬픔"},
+                        {"stage": "S1", "turn": 2, "content": "응"}
+                    ]
+                }
+            }
+        )
+    
+    logger.info(f"프롬프트 길이: {len(input_text)} 문자")
+    return input_text
+
+
 @router.post("/feedback/generate")
 async def generate_feedback_from_data(
     conversation_history: List[Dict] = Body(..., description="대화 내역 리스트. 각 항목은 {'stage': 'S1', 'turn': 1, 'content': '...'} 형식"),
     emotion_history: List[str] = Body(default=[], description="감정 히스토리 리스트 ['행복', '슬픔', ...]"),
     child_name: Optional[str] = Body(default=None, description="아동 이름 (선택사항)"),
-    story_name: Optional[str] = Body(default=None, description="동화 이름 (S1 감정 비교용)")
+    story_name: Optional[str] = Body(default=None, description="동화 이름 (S1 감정 비교용)"),
+    context_manager=Depends(get_context_manager)
 ):
     """
     세션이 만료되어도 대화 내용을 직접 받아서 부모 피드백 생성
@@ -1288,165 +1228,18 @@ async def generate_feedback_from_data(
         Note: 
         - conversation_history는 아동의 발화만 포함합니다 (AI 응답 제외)
         - emotion 필드는 선택사항입니다. S1(감정 라벨링)과 S4(같은 경험)에서만 포함됩니다.
+        - 생성 중 본문을 바로 보여주려면 /feedback/generate/stream 사용
     """
-    from app.tools.feedback import FeedbackGeneratorTool
-    from datetime import datetime
+    from app.tools.feedback import get_feedback_generator
     
     try:
-        logger.info(f"피드백 생성 요청 - 대화 {len(conversation_history)}개, 감정 {len(emotion_history)}개")
-        
-        # 아동의 발화가 있는지 확인
-        if not conversation_history:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "message": "아동의 응답이 없습니다. 대화 내역을 최소 1개 이상 제공해주세요.",
-                    "example": {
-                        "conversation_history": [
-                            {"stage": "S1", "turn": 1, "content": "엄마가 화났어"}
-                        ],
-                        "emotion_history": ["슬픔"]
-                    }
-                }
-            )
-        
-        # 아동 발화 수집 (모든 항목이 아동의 대사)
-        child_responses = []
-        child_response_count = 0
-        extracted_emotions = []
-        inappropriate_words_count = 0
-        inappropriate_words_details = []
-        
-        for i, moment in enumerate(conversation_history):
-            logger.debug(f"moment[{i}]: {moment}")
-            
-            content = moment.get("content", "")
-            if not content:
-                continue
-            
-            # 금칙어 사용 확인
-            safety_check = moment.get("safety_check")
-            if safety_check and not safety_check.get("is_safe", True):
-                inappropriate_words_count += 1
-                flagged_categories = safety_check.get("flagged_categories", [])
-                inappropriate_words_details.append({
-                    "stage": moment.get("stage", ""),
-                    "turn": moment.get("turn", ""),
-                    "content": content,
-                    "categories": flagged_categories
-                })
-                logger.info(f"🚨 금칙어 감지: stage={moment.get('stage')}, content={content[:20]}...")
-            
-            emotion = moment.get("emotion", "")
-            child_response_count += 1
-            
-            # 감정 정보가 있으면 수집
-            if emotion:
-                extracted_emotions.append(emotion)
-                child_responses.append(f"[감정: {emotion}] {content}")
-            else:
-                child_responses.append(content)
-        
-        logger.info(f"수집된 아동 발화: {child_response_count}개")
-        
-        if child_response_count == 0:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "message": "아동의 응답이 없습니다. 최소 1개 이상의 아동 발화가 필요합니다.",
-                    "hint": "conversation_history는 아동의 발화만 포함해야 합니다. 'content' 필드는 필수입니다.",
-                    "example": {
-                        "conversation_history": [
-                            {"stage": "S1", "turn": 1, "content": "엄마가 화났어", "emotion": "슬픔"},
-                            {"stage": "S1", "turn": 2, "content": "응"}
-                        ]
-                    }
-                }
-            )
-        
-        # 감정 정보 (conversation_history에서 추출한 것 우선, 없으면 emotion_history 사용)
-        if extracted_emotions:
-            emotions = ", ".join(extracted_emotions)
-            logger.info(f"감정 정보 (대화에서 추출): {emotions}")
-        elif emotion_history:
-            emotions = ", ".join(emotion_history)
-            logger.info(f"감정 정보 (emotion_history): {emotions}")
-        else:
-            emotions = "감정 정보 없음"
-            logger.info("감정 정보 없음")
-        
-        # S1 감정 정답과 아동 답변 비교 (story_name이 있는 경우에만)
-        emotion_comparison = ""
-        if story_name:
-            try:
-                # 동화 데이터에서 정답 감정 가져오기
-                story_context = context_manager.get_story_context(story_name)
-                correct_emotion = story_context.get("emotion_ans", None)
-                
-                # 아동의 첫 감정 찾기
-                child_first_emotion = None
-                
-                # 1. conversation_history에서 S1 stage의 emotion 찾기
-                for moment in conversation_history:
-                    if moment.get("stage", "").startswith("S1") and moment.get("emotion"):
-                        child_first_emotion = moment.get("emotion")
-                        logger.info(f"🔍 감정 출처: conversation_history S1 - {child_first_emotion}")
-                        break
-                
-                # 2. extracted_emotions에서 첫 번째
-                if not child_first_emotion and extracted_emotions:
-                    child_first_emotion = extracted_emotions[0]
-                    logger.info(f"🔍 감정 출처: extracted_emotions - {child_first_emotion}")
-                
-                # 3. emotion_history에서 첫 번째
-                if not child_first_emotion and emotion_history:
-                    child_first_emotion = emotion_history[0]
-                    logger.info(f"🔍 감정 출처: emotion_history - {child_first_emotion}")
-                
-                logger.info(f"🔍 정답 감정: {correct_emotion}, 아동 감정: {child_first_emotion}")
-                
-                if correct_emotion:
-                    if child_first_emotion:
-                        if child_first_emotion != correct_emotion:
-                            emotion_comparison = f"\n\n[S1 감정 답변 비교]\n정답 감정: {correct_emotion}\n아동이 선택한 감정: {child_first_emotion}\n→ 아동이 정답과 다른 감정을 선택했습니다."
-                            logger.info(f"✅ S1 감정 불일치: 정답={correct_emotion}, 아동={child_first_emotion}")
-                        else:
-                            emotion_comparison = f"\n\n[S1 감정 답변 비교]\n정답 감정: {correct_emotion}\n아동이 선택한 감정: {child_first_emotion}\n→ 아동이 정답 감정을 정확히 선택했습니다."
-                            logger.info(f"✅ S1 감정 일치: {correct_emotion}")
-                    else:
-                        # 아동 감정을 찾지 못했지만 정답은 알려줌
-                        emotion_comparison = f"\n\n[S1 감정 답변 참고]\n동화 속 캐릭터가 느낀 정답 감정: {correct_emotion}"
-                        logger.info(f"✅ S1 정답 감정만 표시: {correct_emotion}")
-            except Exception as e:
-                logger.warning(f"❌ S1 감정 비교 실패: {e}", exc_info=True)
-        
-        # 금칙어 사용 내역 텍스트 구성
-        inappropriate_words_text = ""
-        if inappropriate_words_count > 0:
-            inappropriate_words_text = f"\n\n[금칙어 사용 내역]\n아동이 대화 중 부적절한 표현을 {inappropriate_words_count}회 사용했습니다."
-            for idx, detail in enumerate(inappropriate_words_details, 1):
-                categories_str = ", ".join(detail["categories"])
-                inappropriate_words_text += f"\n{idx}. {detail['stage']} - \"{detail['content']}\" (유형: {categories_str})"
-            logger.info(f"📝 금칙어 내역: {inappropriate_words_text}")
-        
-        # 프롬프트 구성 (아동 발화만)
-        feedback_tool = FeedbackGeneratorTool()
-        
-        child_dialogue = "\n".join(child_responses)
-        child_info = f"\n아동 이름: {child_name}" if child_name else ""
-        
-        input_text = f"""[아동 발화]
-        {child_dialogue}{child_info}
-
-        [아동 감정]
-        {emotions}{emotion_comparison}{inappropriate_words_text}
-        """
-        
-        logger.info(f"프롬프트 길이: {len(input_text)} 문자")
+        input_text = _feedback_input_from_data(
+            conversation_history, emotion_history, child_name, story_name, context_manager
+        )
         logger.info("피드백 생성 시작 (직접 데이터)")
         
-        # 피드백 생성
-        result = feedback_tool.generate_feedback(input_text)
+        # 피드백 생성 (LLM 호출은 스레드에서)
+        result = await asyncio.to_thread(get_feedback_generator().generate_feedback, input_text)
         
         logger.info(f"피드백 생성 완료: {result.get('child_analysis_feedback', '')[:50]}...")
         
@@ -1466,3 +1259,431 @@ async def generate_feedback_from_data(
         logger.error(f"피드백 생성 실패 (직접 데이터): {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def _sse(event: str, data: Dict) -> str:
+    """Server-Sent Events 메시지 1개"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _iterate_in_thread(make_iterator):
+    """
+    동기 이터레이터(LLM 스트림 / 일괄 생성)를 스레드 하나에서 실행하며 항목을 이벤트 루프로 전달
+    소비 측이 멈추면(클라이언트 연결 끊김) 다음 항목에서 이터레이터를 닫는다.
+    """
+    loop = asyncio.get_running_loop()
+    items: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    finished = object()
+    
+    def produce():
+        iterator = None
+        try:
+            # 이터레이터 생성 실패도 finished를 보내 소비 측이 예외를 받도록 try 안에서 생성
+            iterator = make_iterator()
+            for item in iterator:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(items.put_nowait, item)
+        finally:
+            if iterator is not None:
+                iterator.close()
+            loop.call_soon_threadsafe(items.put_nowait, finished)
+    
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+    try:
+        while True:
+            item = await items.get()
+            if item is finished:
+                # 이터레이터에서 발생한 예외 전달
+                await producer
+                break
+            yield item
+    finally:
+        stop.set()
+
+
+async def _stream_feedback_events(input_text: str):
+    """FeedbackGeneratorTool.stream_feedback 이벤트를 SSE로 전달"""
+    from app.tools.feedback import get_feedback_generator
+    
+    started = time.perf_counter()
+    first_content = True
+    async for event in _iterate_in_thread(lambda: get_feedback_generator().stream_feedback(input_text)):
+        name = event.pop("event")
+        if name == "delta" and first_content:
+            first_content = False
+            FEEDBACK_STREAM_FIRST_CONTENT.observe(time.perf_counter() - started)
+        if name == "done":
+            event["generated_at"] = datetime.now().isoformat()
+        yield _sse(name, event)
+
+
+@router.post("/feedback/generate/stream")
+async def stream_feedback_from_data(
+    conversation_history: List[Dict] = Body(..., description="대화 내역 리스트. 각 항목은 {'stage': 'S1', 'turn': 1, 'content': '...'} 형식"),
+    emotion_history: List[str] = Body(default=[], description="감정 히스토리 리스트 ['행복', '슬픔', ...]"),
+    child_name: Optional[str] = Body(default=None, description="아동 이름 (선택사항)"),
+    story_name: Optional[str] = Body(default=None, description="동화 이름 (S1 감정 비교용)"),
+    context_manager=Depends(get_context_manager)
+):
+    """
+    /feedback/generate의 스트리밍 버전 (text/event-stream)
+    
+    생성되는 대로 섹션별 본문 조각을 보내므로 부모 행동 지침이 생성되는 동안 분석 피드백을 먼저 보여줄 수 있다.
+    
+    Events:
+        section: {"section": "child_analysis_feedback" | "parent_action_guide"}   섹션 시작
+        delta:   {"section": ..., "text": "..."}                                  섹션 본문 조각
+        done:    {"child_analysis_feedback", "parent_action_guide", "generated_at"}  최종 결과 (/feedback/generate와 같은 파싱)
+        error:   {"message": "..."}                                               생성 실패
+    """
+    input_text = _feedback_input_from_data(
+        conversation_history, emotion_history, child_name, story_name, context_manager
+    )
+    logger.info("피드백 스트리밍 생성 시작 (직접 데이터)")
+    return StreamingResponse(
+        _stream_feedback_events(input_text),
+        media_type="text/event-stream",
+        # 프록시(nginx 등) 버퍼링 없이 바로 전달
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/feedback/batch")
+async def generate_feedback_batch(
+    items: List[Dict] = Body(default=[], description="대화 목록. 각 항목은 /feedback/generate 본문 형식 + 'id' (또는 {'session_id': ...})"),
+    session_ids: List[str] = Body(default=[], description="세션 ID 목록 (items와 함께 사용 가능)"),
+    batch_id: Optional[str] = Body(default=None, description="체크포인트 ID (같은 값으로 다시 요청하면 완료된 대화는 건너뜀)"),
+    concurrency: Optional[int] = Body(default=None, description="동시 생성 수 (기본 / 최대: FEEDBACK_BATCH_CONCURRENCY)"),
+    context_manager=Depends(get_context_manager),
+    redis_service=Depends(get_redis_service)
+):
+    """
+    부모 피드백 일괄 생성 (기관별 야간 리포트)
+    
+    완료되는 순서대로 한 줄에 결과 1개씩 NDJSON으로 보내고, 마지막 줄에 요약을 보낸다.
+    같은 대화는 한 번만 생성하며, 생성은 대화형 요청과 분리된 동시 호출 한도("feedback_batch") 안에서 실행한다.
+    
+    Returns:
+        application/x-ndjson
+        {"type": "result", "id", "session_id"?, "status": "done" | "failed" | "invalid", "child_analysis_feedback", ...}
+        {"type": "summary", "total", "done", "failed", "invalid", "generated", "resumed", "deduplicated", "seconds"}
+    """
+    from app.services.feedback_batch import RedisCheckpoint, prepare_items, run_feedback_batch
+    
+    all_items = list(items) + [{"session_id": session_id} for session_id in session_ids]
+    if not all_items:
+        raise HTTPException(status_code=400, detail="items 또는 session_ids가 필요합니다.")
+    if len(all_items) > settings.FEEDBACK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.FEEDBACK_BATCH_MAX_ITEMS}개까지 요청할 수 있습니다. (요청: {len(all_items)}개)"
+        )
+    
+    checkpoint = None
+    if batch_id:
+        if not redis_service.is_connected():
+            raise HTTPException(status_code=503, detail="Redis 미연결로 batch_id 체크포인트를 사용할 수 없습니다.")
+        checkpoint = RedisCheckpoint(redis_service.client, batch_id)
+    
+    # 세션 조회(Redis)가 포함되므로 입력 구성도 스레드에서
+    prepared = await asyncio.to_thread(prepare_items, all_items, context_manager)
+    # API 요청은 설정값보다 많이 띄울 수 없음 (스레드 / LLM 호출 수 보호, 더 낮추는 것만 허용)
+    concurrency = min(max(1, concurrency or settings.FEEDBACK_BATCH_CONCURRENCY), settings.FEEDBACK_BATCH_CONCURRENCY)
+    logger.info(f"피드백 일괄 생성 요청: {len(prepared)}개 (batch_id={batch_id}, 동시 {concurrency})")
+    
+    async def ndjson():
+        async for record in _iterate_in_thread(lambda: run_feedback_batch(prepared, concurrency, checkpoint)):
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(
+        ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/stt/stream")
+async def stream_speech_to_text(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    context_manager=Depends(get_context_manager),
+    stt_service=Depends(get_stt_service),
+    agent=Depends(get_agent)
+):
+    """
+    스트리밍 음성 인식 (WebSocket)
+    
+    아이가 말하는 동안 오디오를 받아 서버에서 발화 구간을 나누고,
+    구간별 인식 결과(partial)를 바로 보내며, 말을 멈추면 최종 결과(final)를 보낸다.
+    최종 결과가 나오면 안전성 검사/감정 분류를 미리 시작해 두므로,
+    이후 같은 텍스트로 /turn을 호출하면 해당 결과를 재사용한다 (Redis로 공유하므로 다른 워커에서 처리돼도 재사용).
+    (부분 결과마다 선행 실행하면 곧 버려질 텍스트로 Moderation / LLM을 호출하게 되므로 하지 않음)
+    
+    Query:
+        session_id: 세션 ID (선택, S1/S4에서 감정 분류 선행 실행에 사용)
+    
+    Client → Server:
+        binary: 16kHz mono 16bit little-endian PCM 조각
+        text: {"type": "end"} (말하기 종료 → 즉시 최종 결과 요청)
+    
+    Server → Client:
+        {"type": "ready"}
+        {"type": "partial", "text": 누적 텍스트, "segment": 구간 번호}
+        {"type": "final", "text": 최종 텍스트, "stt_result": STTResult}
+        {"type": "error", "message": 오류 메시지}
+    """
+    await websocket.accept()
+    
+    prefetch_emotion = False
+    if session_id:
+        session = await asyncio.to_thread(context_manager.get_session, session_id)
+        if session:
+            prefetch_emotion = session.current_stage in (
+                Stage.S1_EMOTION_LABELING, Stage.S4_REAL_WORLD_EMOTION
+            )
+    
+    loop = asyncio.get_running_loop()
+    prefetches = set()
+    
+    def prefetch(func, text: str):
+        # 결과는 각 Tool의 캐시 + Redis(워커 간 공유)에 남아 /turn에서 재사용됨
+        future = loop.run_in_executor(None, func, text)
+        prefetches.add(future)
+        future.add_done_callback(prefetches.discard)
+    
+    async def on_partial(text: str, segment: int):
+        await websocket.send_json({"type": "partial", "text": text, "segment": segment})
+    
+    transcriber = StreamingTranscriber(stt_service, on_partial=on_partial)
+    logger.info(f"🔌 스트리밍 STT 연결: session={session_id}")
+    await websocket.send_json({"type": "ready"})
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            finished = False
+            if message.get("bytes") is not None:
+                finished = transcriber.feed(message["bytes"])
+            elif message.get("text") is not None:
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    await websocket.send_json({"type": "error", "message": "JSON 형식이 아닙니다"})
+                    continue
+                finished = control.get("type") == "end"
+            
+            if finished:
+                stt_result = await transcriber.finalize()
+                if stt_result.text:
+                    prefetch(agent.safety_filter.prefetch, stt_result.text)
+                    if prefetch_emotion:
+                        prefetch(agent.emotion_classifier.prefetch, stt_result.text)
+                await websocket.send_json({
+                    "type": "final",
+                    "text": stt_result.text,
+                    "stt_result": stt_result.dict()
+                })
+                logger.info(f"🎙️ 스트리밍 STT 최종 결과: '{stt_result.text}'")
+                
+                # 같은 연결에서 다음 발화 대기
+                transcriber = StreamingTranscriber(stt_service, on_partial=on_partial)
+    
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"❌ 스트리밍 STT 오류: {e}", exc_info=True)
+        try:
+            await websocket.send_json({"type": "error", "message": str(e)})
+        except Exception:
+            pass
+    finally:
+        transcriber.cancel()
+        logger.info(f"🔌 스트리밍 STT 연결 종료: session={session_id}")
+
+
+_CHANNEL_OPTION_DEFAULTS = {"audio_format": "webm", "tts_format": None, "deadline_ms": None}
+
+
+def _channel_option(key: str, value):
+    """
+    대화 채널 옵션 값 검증 / 변환 (config 메시지, turn 메시지의 옵션)
+    
+    Raises:
+        ValueError: 형식이 맞지 않는 값
+    """
+    if value is None:
+        return _CHANNEL_OPTION_DEFAULTS[key]
+    if key == "deadline_ms":
+        if isinstance(value, bool):
+            raise ValueError(f"deadline_ms 값이 올바르지 않습니다: {value!r}")
+        try:
+            deadline_ms = int(float(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"deadline_ms 값이 올바르지 않습니다: {value!r}")
+        if deadline_ms < 0:
+            raise ValueError(f"deadline_ms 값이 올바르지 않습니다: {value!r}")
+        return deadline_ms
+    # 포맷 이름은 파일 확장자로 쓰이므로 짧은 영숫자만 허용
+    if not isinstance(value, str) or not value.isalnum() or len(value) > 10:
+        raise ValueError(f"{key} 값이 올바르지 않습니다: {value!r}")
+    return value.lower()
+
+
+@router.websocket("/session/{session_id}/ws")
+async def dialogue_channel(
+    websocket: WebSocket,
+    session_id: str,
+    context_manager=Depends(get_context_manager),
+    stt_service=Depends(get_stt_service)
+):
+    """
+    세션 전용 대화 채널 (WebSocket)
+    
+    연결 동안 세션을 워커 메모리에 고정하고 턴을 메시지로 주고받는다.
+    턴마다 Redis를 다시 읽지 않으며, 저장은 WS_SESSION_FLUSH_INTERVAL 주기로
+    모아서 비동기로 실행하고 연결 종료 시 즉시 flush 한다.
+    연결 중에는 같은 세션으로 HTTP /turn을 함께 호출하지 않아야 한다.
+    
+    Client → Server:
+        {"type": "turn", "child_text": "...", "deadline_ms": 5000}
+        {"type": "turn", "audio_base64": "...", "audio_format": "webm"}
+        {"type": "config", "audio_format": "webm", "tts_format": "opus", "deadline_ms": 5000}
+        {"type": "ping"}
+        binary: 한 턴 분량의 오디오 파일 (config의 audio_format 사용)
+    
+    Server → Client:
+        {"type": "ready", "stage": 현재 Stage}
+        {"type": "turn_result", "data": DialogueTurnResponse}
+        {"type": "pong"} / {"type": "error", "message": ...}
+    """
+    await websocket.accept()
+    
+    session = await asyncio.to_thread(context_manager.get_session, session_id)
+    if not session:
+        await websocket.send_json({
+            "type": "error",
+            "message": "세션을 찾을 수 없습니다. /session/start를 먼저 호출하세요."
+        })
+        await websocket.close(code=4404)
+        return
+    
+    pinned = PinnedSession(session, context_manager)
+    pinned.start()
+    options = dict(_CHANNEL_OPTION_DEFAULTS)
+    
+    logger.info(f"🔌 대화 채널 연결: session={session_id}, stage={session.current_stage.value}")
+    await websocket.send_json({"type": "ready", "stage": session.current_stage.value})
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            audio_data = None
+            child_text = None
+            deadline_ms = options["deadline_ms"]
+            
+            if message.get("bytes") is not None:
+                audio_data = message["bytes"]
+            elif message.get("text") is not None:
+                try:
+                    payload = json.loads(message["text"])
+                except ValueError:
+                    await websocket.send_json({"type": "error", "message": "JSON 형식이 아닙니다"})
+                    continue
+                if not isinstance(payload, dict):
+                    await websocket.send_json({"type": "error", "message": "메시지는 JSON 객체여야 합니다"})
+                    continue
+                
+                message_type = payload.get("type")
+                if message_type == "ping":
+                    await websocket.send_json({"type": "pong"})
+                    continue
+                if message_type not in ("config", "turn"):
+                    await websocket.send_json({"type": "error", "message": f"알 수 없는 메시지: {message_type}"})
+                    continue
+                
+                # 잘못된 값은 턴을 시작하지 않고 error로 응답 (연결은 유지, 옵션은 일부만 바뀌지 않음)
+                try:
+                    if message_type == "config":
+                        options.update({key: _channel_option(key, payload[key]) for key in options if key in payload})
+                        continue
+                    
+                    if "deadline_ms" in payload:
+                        deadline_ms = _channel_option("deadline_ms", payload["deadline_ms"])
+                    if payload.get("audio_base64"):
+                        if not isinstance(payload["audio_base64"], str):
+                            raise ValueError("audio_base64는 문자열이어야 합니다")
+                        try:
+                            audio_data = base64.b64decode(payload["audio_base64"], validate=True)
+                        except binascii.Error:
+                            raise ValueError("audio_base64가 올바른 base64가 아닙니다")
+                        if "audio_format" in payload:
+                            options["audio_format"] = _channel_option("audio_format", payload["audio_format"])
+                    else:
+                        child_text = payload.get("child_text") or ""
+                        if not isinstance(child_text, str):
+                            raise ValueError("child_text는 문자열이어야 합니다")
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "message": str(e)})
+                    continue
+            else:
+                continue
+            
+            # 메시지에 traceparent가 있으면 우선, 없으면 연결 헤더의 trace를 이어받음
+            carrier = websocket.headers
+            if message.get("text") is not None and isinstance(payload.get("traceparent"), str):
+                carrier = {"traceparent": payload["traceparent"]}
+            
+            start_time = time.time()
+            with start_server_span("WS dialogue turn", carrier, session_id=session_id), \
+                    turn_deadline(deadline_seconds(deadline_ms)):
+                try:
+                    # STT (오디오) 또는 텍스트 직접 입력
+                    if audio_data is not None:
+                        stt_result = await stt_service.transcribe(
+                            audio_data, f"audio.{options['audio_format']}"
+                        )
+                        if stt_service.is_silence_text(stt_result.text):
+                            stt_result.text = ""
+                    else:
+                        stt_result = STTResult(text=child_text.strip(), confidence=1.0, language="ko")
+                    
+                    # 고정된 세션으로 턴 처리 (flush 스냅샷과 겹치지 않도록 lock)
+                    async with pinned.lock:
+                        turn_result, updated, should_transition, old_stage = await asyncio.to_thread(
+                            _run_turn_pipeline, pinned.session, stt_result
+                        )
+                        pinned.mark_dirty(updated)
+                    
+                    await _attach_tts(turn_result, options["tts_format"])
+                    
+                    response = _build_turn_response(
+                        updated, turn_result, should_transition, old_stage, start_time
+                    )
+                    await websocket.send_json({
+                        "type": "turn_result",
+                        "data": jsonable_encoder(response)
+                    })
+                    
+                except WebSocketDisconnect:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ 대화 채널 턴 처리 실패: {e}", exc_info=True)
+                    mark_span_error(e)
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": str(e),
+                        "retry_strategy": "RETRY_WITH_SAME_STAGE"
+                    })
+    
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await pinned.close()
+        logger.info(f"🔌 대화 채널 종료: session={session_id}")
@@ -0,0 +1,3 @@
+"""
+운영 / 분석용 CLI
+"""
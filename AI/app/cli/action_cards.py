@@ -0,0 +1,238 @@
+"""
+행동 카드 라이브러리 빌드 / 검증 CLI
+
+    # (동화, 감정, 제목)별 변형 생성 → 검증 → 버전 붙여 저장 (기존 라이브러리 변형은 유지)
+    python -m app.cli.action_cards build --variants 5 --cards 3
+
+    # 일부 동화만, 다른 경로로
+    python -m app.cli.action_cards build --story "해님 달님" --out /tmp/library.json
+
+    # 배포 전 검증 (길이 / 개수 / 중복 / 금칙어), 오류가 있으면 종료 코드 1
+    python -m app.cli.action_cards validate [path]
+
+생성은 런타임과 같은 ActionCardGeneratorTool 프롬프트를 쓰고, 카드 문구의 아이 이름은
+{name} 자리로 저장해 런타임에 조사와 함께 채운다.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# 생성 시 아이 이름 대신 넣는 자리 표시 (조사는 생성 후 자리 이름으로 바꿈)
+_NAME_PLACEHOLDER = "{name}"
+_PARTICLE_PLACEHOLDERS = [
+    (re.compile(r"\{name\}(이|가)(?![가-힣])"), "{name_subject}"),
+    (re.compile(r"\{name\}(은|는)(?![가-힣])"), "{name_topic}"),
+    (re.compile(r"\{name\}(아|야)(?![가-힣])"), "{name_vocative}"),
+]
+
+
+def _placeholderize(text: str) -> str:
+    for pattern, replacement in _PARTICLE_PLACEHOLDERS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _build_targets(story_filter: List[str]) -> List[Tuple[str, str, str, str]]:
+    """(동화, 감정, 제목, 장면) 목록 (제목은 에이전트 S3와 같은 규칙으로 결정)"""
+    from app.models.schemas import EmotionLabel
+    from app.tools.action_card_library import DEFAULT_ACTION_CARD_TITLE
+    from app.tools.context_manager import SEL_CHARACTERS
+
+    targets = []
+    for story_name, story in SEL_CHARACTERS.items():
+        if story_filter and story_name not in story_filter:
+            continue
+        action_card = story.get("action_card", {})
+        title = action_card.get("title") if isinstance(action_card, dict) else action_card
+        scene = " ".join(story.get("scene", "").split())
+        for emotion in EmotionLabel:
+            targets.append((story_name, emotion.value, title or DEFAULT_ACTION_CARD_TITLE, scene))
+    return targets
+
+
+def _generate_entry(generator, safety_filter, target, variants: int, cards: int, existing: Dict) -> Tuple[str, Dict, int]:
+    """키 1개의 변형 생성 (검증 통과 + 기존 변형과 중복 아닌 것만, 실패는 시도 횟수 안에서 재시도)"""
+    from app.tools.action_card_library import library_key, validate_card, validate_strategies
+
+    story_name, emotion, title, scene = target
+    key = library_key(story_name, emotion, title)
+    entry = {
+        "strategies": list(existing.get("strategies", [])),
+        "cards": list(existing.get("cards", [])),
+    }
+    rejected = 0
+
+    seen = {tuple(s) for s in entry["strategies"]}
+    added = 0
+    for _ in range(variants * 3):
+        if added >= variants:
+            break
+        try:
+            strategies = generator.generate_draft_llm(emotion, scene, title, "아이")
+        except Exception as e:
+            logging.warning(f"{key}: 전략 생성 실패 {e}")
+            rejected += 1
+            continue
+        if validate_strategies(strategies, safety_filter) or tuple(strategies) in seen:
+            rejected += 1
+            continue
+        seen.add(tuple(strategies))
+        entry["strategies"].append(strategies)
+        added += 1
+
+    seen = {card["description"] for card in entry["cards"]}
+    added = 0
+    for _ in range(cards * 3):
+        if added >= cards:
+            break
+        try:
+            card = generator.generate_final_card_llm(
+                _NAME_PLACEHOLDER, story_name, title, emotion, scene, None, scene
+            )
+        except Exception as e:
+            logging.warning(f"{key}: 카드 생성 실패 {e}")
+            rejected += 1
+            continue
+        card_data = {
+            "title": card.title,
+            "description": _placeholderize(card.description),
+            "icon": card.icon,
+            "parent_guide": [_placeholderize(g) for g in card.parent_guide],
+        }
+        if validate_card(card_data, safety_filter) or card_data["description"] in seen:
+            rejected += 1
+            continue
+        seen.add(card_data["description"])
+        entry["cards"].append(card_data)
+        added += 1
+
+    return key, entry, rejected
+
+
+def _write_library(path: str, data: Dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def _load_library(path: str) -> Optional[Dict]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build(args) -> int:
+    from app.core.config import settings
+    from app.tools.action_card import ActionCardGeneratorTool
+    from app.tools.action_card_library import default_library_path, library_key, validate_library
+    from app.tools.safety_filter import SafetyFilterTool
+
+    out_path = args.out or default_library_path()
+    base = _load_library(args.base or out_path) or {"entries": {}}
+    targets = _build_targets(args.story)
+    if not targets:
+        print("빌드할 동화가 없습니다.", file=sys.stderr)
+        return 2
+
+    generator = ActionCardGeneratorTool(api_key=settings.OPENAI_API_KEY)
+    safety_filter = SafetyFilterTool(api_key=settings.OPENAI_API_KEY)
+    entries = dict(base["entries"])
+
+    print(f"{len(targets)}개 키 생성 (키당 전략 {args.variants}, 카드 {args.cards})", file=sys.stderr)
+    rejected = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        futures = [
+            executor.submit(
+                _generate_entry, generator, safety_filter, target, args.variants, args.cards,
+                entries.get(library_key(*target[:3]), {})
+            )
+            for target in targets
+        ]
+        for future in futures:
+            key, entry, key_rejected = future.result()
+            rejected += key_rejected
+            if entry["strategies"] or entry["cards"]:
+                entries[key] = entry
+            print(f"  {key}: 전략 {len(entry['strategies'])}, 카드 {len(entry['cards'])}", file=sys.stderr)
+
+    data = {
+        "version": datetime.now().strftime("%Y-%m-%d.%H%M%S"),
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "model": getattr(generator.llm, "model_name", None),
+        "entries": dict(sorted(entries.items())),
+    }
+    errors = validate_library(data, safety_filter)
+    if errors:
+        for error in errors:
+            print(f"  ❌ {error}", file=sys.stderr)
+        print("검증 실패로 저장하지 않았습니다.", file=sys.stderr)
+        return 1
+
+    _write_library(out_path, data)
+    print(f"저장: {out_path} (버전 {data['version']}, {len(entries)}개 키, 규칙 위반 / 중복 제외 {rejected}건)", file=sys.stderr)
+    return 0
+
+
+def validate(args) -> int:
+    from app.tools.action_card_library import default_library_path, validate_library
+    from app.tools.safety_filter import SafetyFilterTool
+
+    path = args.path or default_library_path()
+    data = _load_library(path)
+    if data is None:
+        print(f"파일이 없습니다: {path}", file=sys.stderr)
+        return 2
+
+    # 금칙어 목록만 사용 (API 호출 없음)
+    errors = validate_library(data, SafetyFilterTool(api_key=os.environ.get("OPENAI_API_KEY") or "unused"))
+    for error in errors:
+        print(f"❌ {error}")
+    entries = data.get("entries", {})
+    print(
+        f"{path}: 버전 {data.get('version')}, {len(entries)}개 키, "
+        f"전략 {sum(len(e.get('strategies', [])) for e in entries.values())}개, "
+        f"카드 {sum(len(e.get('cards', [])) for e in entries.values())}개, 오류 {len(errors)}건",
+        file=sys.stderr
+    )
+    return 1 if errors else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.action_cards", description="행동 카드 라이브러리 빌드 / 검증")
+    parser.add_argument("--log-level", default="WARNING")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="변형 생성 후 라이브러리 저장")
+    p.add_argument("--out", default=None, help="저장 경로 (기본: ACTION_CARD_LIBRARY_PATH 또는 app/tools/action_card_library.json)")
+    p.add_argument("--base", default=None, help="이어 붙일 기존 라이브러리 (기본: --out 경로)")
+    p.add_argument("--story", action="append", default=[], help="이 동화만 빌드 (여러 번 지정 가능)")
+    p.add_argument("--variants", type=int, default=5, help="키당 추가할 전략 변형 수")
+    p.add_argument("--cards", type=int, default=3, help="키당 추가할 카드 변형 수")
+    p.add_argument("--concurrency", type=int, default=4)
+
+    p = sub.add_parser("validate", help="라이브러리 검증")
+    p.add_argument("path", nargs="?", default=None)
+
+    args = parser.parse_args(argv)
+    os.environ.setdefault("TRACING_ENABLED", "false")
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()))
+
+    if args.command == "build":
+        return build(args)
+    return validate(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+부모 피드백 일괄 생성 CLI (야간 리포트)
+
+    # 대화 목록 (JSONL, 한 줄에 /feedback/generate 본문 형식 + "id")
+    python -m app.cli.feedback_batch conversations.jsonl --out reports.ndjson
+
+    # 세션 ID 목록 (한 줄에 1개, Redis에 세션이 남아 있어야 함)
+    python -m app.cli.feedback_batch --session-ids finished_sessions.txt --out reports.ndjson
+
+    # 중단 후 재실행: 같은 --checkpoint면 완료된 대화는 건너뜀 (기본: <out>.checkpoint.jsonl)
+    python -m app.cli.feedback_batch conversations.jsonl --out reports.ndjson --concurrency 8
+
+결과는 /feedback/batch와 같은 NDJSON (결과 줄 + 마지막 요약 줄)이다.
+실패한 대화가 있으면 종료 코드 1 (같은 명령으로 다시 실행하면 실패분만 재시도).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Dict, List
+
+
+def _load_items(paths: List[str], session_id_paths: List[str]) -> List[Dict]:
+    items = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    items.append(json.loads(line))
+    for path in session_id_paths:
+        with open(path, encoding="utf-8") as f:
+            items.extend({"session_id": line.strip()} for line in f if line.strip())
+    return items
+
+
+def run_batch(args) -> int:
+    from app.core.container import get_context_manager
+    from app.services.feedback_batch import FileCheckpoint, prepare_items, run_feedback_batch
+
+    items = _load_items(args.inputs, args.session_ids)
+    if not items:
+        print("입력이 없습니다.", file=sys.stderr)
+        return 2
+
+    checkpoint_path = args.checkpoint or (f"{args.out}.checkpoint.jsonl" if args.out else None)
+    checkpoint = FileCheckpoint(checkpoint_path) if checkpoint_path else None
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    prepared = prepare_items(items, get_context_manager())
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    summary = {}
+    try:
+        for record in run_feedback_batch(prepared, args.concurrency, checkpoint):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if record["type"] == "summary":
+                summary = record
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(
+        f"완료 {summary.get('done', 0)} / 전체 {summary.get('total', 0)} "
+        f"(생성 {summary.get('generated', 0)}, 재개 {summary.get('resumed', 0)}, "
+        f"중복 {summary.get('deduplicated', 0)}, 실패 {summary.get('failed', 0)}, "
+        f"입력 오류 {summary.get('invalid', 0)}, {summary.get('seconds', 0)}초)",
+        file=sys.stderr
+    )
+    return 1 if summary.get("failed") else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.feedback_batch", description="부모 피드백 일괄 생성")
+    parser.add_argument("inputs", nargs="*", help="대화 목록 파일 (.jsonl)")
+    parser.add_argument("--session-ids", action="append", default=[], help="세션 ID 목록 파일 (한 줄에 1개)")
+    parser.add_argument("--out", default=None, help="결과 NDJSON 경로 (없으면 stdout)")
+    parser.add_argument("--checkpoint", default=None, help="체크포인트 경로 (기본: <out>.checkpoint.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=None, help="동시 생성 수 (기본: FEEDBACK_BATCH_CONCURRENCY)")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.session_ids:
+        parser.error("대화 목록 파일 또는 --session-ids가 필요합니다.")
+
+    os.environ.setdefault("TRACING_ENABLED", "false")
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()))
+    return run_batch(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
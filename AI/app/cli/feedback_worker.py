@@ -0,0 +1,123 @@
+"""
+부모 피드백 사전 생성 워커
+
+    python -m app.cli.feedback_worker [--max-jobs 10] [--log-level INFO]
+
+API 서버(FEEDBACK_QUEUE_ENABLED=true)가 S6에 진입한 세션의 피드백 작업을 Redis 큐에 등록하면,
+이 워커가 꺼내서 생성하고 결과를 대화 해시별로 저장한다. (/feedback은 저장된 결과를 바로 반환)
+여러 개를 띄우면 BLMOVE로 작업을 나눠 가지며, 생성 중에 중단된 워커의 작업은
+생존 표시가 만료된 뒤 다른 워커가 큐로 되돌려 다시 처리한다.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Optional
+
+logger = logging.getLogger("app.cli.feedback_worker")
+
+
+class _Stop:
+    """SIGTERM / SIGINT 수신 시 현재 작업을 끝내고 종료"""
+
+    def __init__(self):
+        self.requested = False
+        signal.signal(signal.SIGTERM, self._handle)
+        signal.signal(signal.SIGINT, self._handle)
+
+    def _handle(self, signum, frame):
+        logger.info(f"종료 신호 수신 ({signum}), 현재 작업 후 종료")
+        self.requested = True
+
+
+def run_worker(max_jobs: Optional[int] = None) -> int:
+    """
+    작업 처리 루프
+
+    Args:
+        max_jobs: 처리할 최대 작업 수 (None이면 종료 신호까지)
+
+    Returns:
+        종료 코드
+    """
+    from app.core.config import settings
+    from app.services.feedback_jobs import JOB_DONE, generate_and_store, get_feedback_queue
+
+    queue = get_feedback_queue()
+    if not queue.available:
+        logger.error("❌ Redis에 연결되지 않아 피드백 워커를 시작할 수 없습니다.")
+        return 1
+
+    stop = _Stop()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    failed = 0
+    recovered_at = 0.0
+    logger.info(f"🧑‍🏭 피드백 워커 시작 (큐: {settings.FEEDBACK_QUEUE_KEY}, 워커: {worker_id})")
+
+    while not stop.requested and (max_jobs is None or processed < max_jobs):
+        try:
+            queue.heartbeat(worker_id)
+            if time.monotonic() - recovered_at >= settings.FEEDBACK_WORKER_RECOVERY_INTERVAL:
+                queue.requeue_orphaned()
+                recovered_at = time.monotonic()
+            item = queue.next_job(worker_id, settings.FEEDBACK_WORKER_POLL_TIMEOUT)
+        except Exception as e:
+            logger.error(f"작업 조회 실패: {e}")
+            time.sleep(settings.FEEDBACK_WORKER_POLL_TIMEOUT)
+            continue
+        if item is None:
+            continue
+
+        job, payload = item
+        session_id = job["session_id"]
+        content_hash = job["content_hash"]
+        try:
+            try:
+                current = queue.get(session_id, content_hash)
+            except Exception as e:
+                logger.warning(f"작업 상태 조회 실패, 생성 진행: {e}")
+                current = None
+            if current is not None and current.get("status") == JOB_DONE:
+                # 같은 대화가 중복 등록된 경우 (이미 생성됨)
+                continue
+
+            processed += 1
+            try:
+                generate_and_store(queue, session_id, content_hash, job["input_text"])
+            except Exception as e:
+                failed += 1
+                logger.error(f"❌ 피드백 생성 실패: {session_id} ({content_hash[:8]}), {e}")
+        finally:
+            # 성공 / 실패(상태에 기록됨) 모두 처리 중 리스트에서 제거, 중단되면 남아서 다시 처리됨
+            try:
+                queue.ack(worker_id, payload)
+            except Exception as e:
+                logger.error(f"작업 완료 표시 실패: {session_id} ({content_hash[:8]}), {e}")
+
+    try:
+        queue.unregister_worker(worker_id)
+    except Exception as e:
+        logger.error(f"워커 등록 해제 실패: {e}")
+    logger.info(f"피드백 워커 종료: 처리 {processed}건, 실패 {failed}건")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.feedback_worker", description="부모 피드백 사전 생성 워커")
+    parser.add_argument("--max-jobs", type=int, default=None, help="처리할 최대 작업 수 (기본: 종료 신호까지)")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper()),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    return run_worker(args.max_jobs)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+턴 기록 재실행 / 비교 CLI
+
+    # 기록된 턴을 다른 설정으로 재실행
+    python -m app.cli.replay run recordings/turns-*.jsonl.gz --out runs/gpt-4o-mini.jsonl.gz \\
+        --chat-model gpt-4o-mini --concurrency 4
+
+    # 두 실행(또는 원본 기록과 재실행) 비교: 지연시간 / 토큰 / 판정 일치율
+    python -m app.cli.replay diff recordings/turns-20241101-123.jsonl.gz runs/gpt-4o-mini.jsonl.gz
+
+재실행은 실제 LLM을 호출한다 (OPENAI_BASE_URL로 스텁 지정 가능).
+턴 처리는 운영과 같은 dialogue._execute_turn을 사용하며, 결과는 기록과 같은 형식이라
+재실행 결과끼리도 비교할 수 있다.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def _load(paths: List[str], stage: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+    from app.services.turn_recorder import read_records
+
+    records = []
+    for path in paths:
+        for record in read_records(path):
+            if stage and record["stage"] != stage:
+                continue
+            records.append(record)
+            if limit and len(records) >= limit:
+                return records
+    return records
+
+
+# ========================================
+# 재실행
+# ========================================
+
+def _configure_agent(agent, args):
+    """CLI 옵션으로 모델 / temperature 교체"""
+    from app.services.llm_gateway import get_llm_gateway
+
+    def replace(llm, model, temperature):
+        if model is None and temperature is None:
+            return llm
+        return get_llm_gateway().chat_model(
+            model or llm.model_name,
+            temperature=llm.temperature if temperature is None else temperature,
+            api_key=agent.api_key
+        )
+
+    agent.llm = replace(agent.llm, args.chat_model, args.chat_temperature)
+    agent.eval_llm = replace(agent.eval_llm, args.eval_model, args.eval_temperature)
+    agent.emotion_classifier.llm = replace(agent.emotion_classifier.llm, args.emotion_model, None)
+
+    return {
+        "chat_model": agent.llm.model_name,
+        "chat_temperature": agent.llm.temperature,
+        "eval_model": agent.eval_llm.model_name,
+        "eval_temperature": agent.eval_llm.temperature,
+        "emotion_model": agent.emotion_classifier.llm.model_name,
+        "reuse_safety": args.reuse_safety,
+    }
+
+
+def _replay_one(record: Dict, reuse_safety: bool) -> Dict:
+    from app.api.v1.dialogue import _execute_turn
+    from app.core.container import get_agent
+    from app.core.turn_capture import capture_turn
+    from app.models.schemas import DialogueSession, SafetyCheckResult, STTResult
+    from app.services.turn_recorder import build_turn_record
+
+    session = DialogueSession(**record["session_before"])
+    session_before = session.model_copy(deep=True)
+    stt_result = STTResult(text=record["child_text"], confidence=1.0, language="ko")
+
+    started = time.perf_counter()
+    with capture_turn() as capture:
+        if reuse_safety and record["tool_outputs"].get("safety_check"):
+            recorded = SafetyCheckResult(**record["tool_outputs"]["safety_check"])
+            get_agent().safety_filter.check = lambda text: recorded
+        turn_result, session, should_transition, _ = _execute_turn(session, stt_result)
+
+    return build_turn_record(
+        session_before=session_before,
+        child_text=record["child_text"],
+        turn_result=turn_result,
+        session_after=session,
+        should_transition=should_transition,
+        capture=capture,
+        duration_seconds=time.perf_counter() - started,
+        turn_id=record["turn_id"]
+    )
+
+
+def run_replay(args) -> int:
+    from app.core.container import get_agent
+    from app.services.turn_recorder import append_records
+
+    records = _load(args.inputs, args.stage, args.limit)
+    if not records:
+        print("재실행할 기록이 없습니다", file=sys.stderr)
+        return 1
+
+    agent = get_agent()
+    config = _configure_agent(agent, args)
+    print(f"재실행: {len(records)}턴, 설정={json.dumps(config, ensure_ascii=False)}", file=sys.stderr)
+
+    # 결과 캐시가 이전 턴의 결과를 재사용하지 않도록 (호출 비용 측정 목적)
+    agent.safety_filter._result_cache.clear()
+    agent.emotion_classifier._result_cache.clear()
+
+    def run(record):
+        try:
+            result = _replay_one(record, args.reuse_safety)
+            result["replay_config"] = config
+            return result
+        except Exception as e:
+            print(f"⚠️ 재실행 실패 ({record['turn_id']}): {e}", file=sys.stderr)
+            return None
+
+    if args.concurrency > 1 and args.reuse_safety:
+        print("⚠️ --reuse-safety는 순차 실행합니다", file=sys.stderr)
+    workers = 1 if args.reuse_safety else args.concurrency
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = [r for r in executor.map(run, records) if r is not None]
+
+    if os.path.exists(args.out):
+        os.remove(args.out)
+    append_records(args.out, results)
+    print(f"결과 저장: {args.out} ({len(results)}/{len(records)}턴)", file=sys.stderr)
+    return 0 if len(results) == len(records) else 2
+
+
+# ========================================
+# 비교
+# ========================================
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)), 1) if values else None
+
+
+# LLM 호출이 아닌 외부 의존성
+_NON_LLM_DEPENDENCIES = {"moderation", "whisper", "supertone", "redis"}
+
+
+def _llm_ms(record: Dict) -> float:
+    return sum(c["duration_ms"] for c in record["calls"] if c["dependency"] not in _NON_LLM_DEPENDENCIES)
+
+
+def diff_runs(base: List[Dict], new: List[Dict], max_examples: int = 20) -> Dict:
+    """
+    두 실행 비교 (turn_id 기준 매칭)
+
+    Returns:
+        {"matched", "stages": {stage: {...}}, "agreement": {...}, "disagreements": [...]}
+    """
+    base_by_id = {r["turn_id"]: r for r in base}
+    pairs = [(base_by_id[r["turn_id"]], r) for r in new if r["turn_id"] in base_by_id]
+
+    by_stage = defaultdict(list)
+    for pair in pairs:
+        by_stage[pair[0]["stage"]].append(pair)
+
+    stages = {}
+    for stage in sorted(by_stage):
+        stage_pairs = by_stage[stage]
+        summary = {"turns": len(stage_pairs)}
+        for label, index in (("base", 0), ("new", 1)):
+            runs = [p[index] for p in stage_pairs]
+            durations = [r["duration_ms"] for r in runs]
+            summary[label] = {
+                "p50_ms": _percentile(durations, 50),
+                "p95_ms": _percentile(durations, 95),
+                "llm_ms_mean": round(float(np.mean([_llm_ms(r) for r in runs])), 1),
+                "llm_calls_mean": round(float(np.mean([len(r["llm_usage"]) for r in runs])), 2),
+                "prompt_tokens_mean": round(float(np.mean([r["tokens"]["prompt_tokens"] for r in runs])), 1),
+                "completion_tokens_mean": round(float(np.mean([r["tokens"]["completion_tokens"] for r in runs])), 1),
+            }
+        stages[stage] = summary
+
+    def agreement(key: str) -> Optional[float]:
+        comparable = [(b, n) for b, n in pairs if b["verdict"].get(key) is not None and n["verdict"].get(key) is not None]
+        if not comparable:
+            return None
+        return round(sum(b["verdict"][key] == n["verdict"][key] for b, n in comparable) / len(comparable), 4)
+
+    disagreements = [
+        {
+            "turn_id": b["turn_id"],
+            "stage": b["stage"],
+            "child_text": b["child_text"],
+            "base": b["verdict"],
+            "new": n["verdict"],
+        }
+        for b, n in pairs
+        if b["verdict"]["should_transition"] != n["verdict"]["should_transition"]
+        or b["verdict"].get("llm_success") != n["verdict"].get("llm_success")
+    ]
+
+    totals = {}
+    for label, index in (("base", 0), ("new", 1)):
+        totals[label] = {
+            key: sum(p[index]["tokens"][key] for p in pairs)
+            for key in ("prompt_tokens", "completion_tokens", "cached_tokens")
+        }
+
+    return {
+        "matched": len(pairs),
+        "base_only": len(base) - len(pairs),
+        "new_only": len(new) - len(pairs),
+        "stages": stages,
+        "token_totals": totals,
+        "agreement": {
+            "should_transition": agreement("should_transition"),
+            "next_stage": agreement("next_stage"),
+            "llm_success": agreement("llm_success"),
+        },
+        "disagreements": disagreements[:max_examples],
+        "disagreement_count": len(disagreements),
+    }
+
+
+def format_diff(diff: Dict) -> str:
+    lines = [
+        f"비교 턴: {diff['matched']} (base만 {diff['base_only']}, new만 {diff['new_only']})",
+        "",
+        f"{'stage':<6}{'turns':>6}{'p50 ms':>18}{'p95 ms':>18}{'LLM ms':>18}{'prompt tok':>18}{'compl tok':>16}",
+    ]
+    for stage, s in diff["stages"].items():
+        b, n = s["base"], s["new"]
+        cells = [
+            f"{b[key]} → {n[key]}"
+            for key in ("p50_ms", "p95_ms", "llm_ms_mean", "prompt_tokens_mean", "completion_tokens_mean")
+        ]
+        lines.append(
+            f"{stage:<6}{s['turns']:>6}{cells[0]:>18}{cells[1]:>18}{cells[2]:>18}{cells[3]:>18}{cells[4]:>16}"
+        )
+    totals = diff["token_totals"]
+    lines += [
+        "",
+        f"토큰 합계: prompt {totals['base']['prompt_tokens']} → {totals['new']['prompt_tokens']}, "
+        f"completion {totals['base']['completion_tokens']} → {totals['new']['completion_tokens']}",
+        f"판정 일치율: 전환 {diff['agreement']['should_transition']}, "
+        f"다음 Stage {diff['agreement']['next_stage']}, LLM 평가 {diff['agreement']['llm_success']}",
+        f"불일치 {diff['disagreement_count']}건",
+    ]
+    for d in diff["disagreements"]:
+        lines.append(
+            f"  [{d['stage']}] '{d['child_text']}' 전환 {d['base']['should_transition']} → {d['new']['should_transition']}, "
+            f"LLM {d['base'].get('llm_success')} → {d['new'].get('llm_success')}"
+        )
+    return "\n".join(lines)
+
+
+def run_diff(args) -> int:
+    base = _load([args.base])
+    new = _load([args.new])
+    diff = diff_runs(base, new, args.max_examples)
+    print(format_diff(diff))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(diff, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.replay", description="턴 기록 재실행 / 비교")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="기록된 턴을 지정한 설정으로 재실행")
+    run.add_argument("inputs", nargs="+", help="기록 파일 (.jsonl.gz)")
+    run.add_argument("--out", required=True, help="결과 파일 (.jsonl.gz)")
+    run.add_argument("--chat-model", default=None, help="대화 생성 모델 (기본: 현재 설정)")
+    run.add_argument("--chat-temperature", type=float, default=None)
+    run.add_argument("--eval-model", default=None, help="답변 평가 모델")
+    run.add_argument("--eval-temperature", type=float, default=None)
+    run.add_argument("--emotion-model", default=None, help="감정 분류 모델")
+    run.add_argument("--reuse-safety", action="store_true",
+                     help="Moderation 재호출 없이 기록된 안전 필터 결과 사용")
+    run.add_argument("--stage", default=None, help="특정 Stage만 (S1~S6)")
+    run.add_argument("--limit", type=int, default=None)
+    run.add_argument("--concurrency", type=int, default=4)
+
+    diff = subparsers.add_parser("diff", help="두 실행 비교")
+    diff.add_argument("base")
+    diff.add_argument("new")
+    diff.add_argument("--json", default=None, help="비교 결과 JSON 저장 경로")
+    diff.add_argument("--max-examples", type=int, default=20)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "diff":
+        return run_diff(args)
+
+    # 재실행 중에는 기록 / 트레이싱을 끄고 로그는 경고 이상만
+    os.environ["TURN_RECORDING_ENABLED"] = "false"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-replay")
+    os.environ.setdefault("TRACING_ENABLED", "false")
+    logging.basicConfig(level=logging.WARNING)
+    return run_replay(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,17 @@
 """
 Core 패키지
 """
-from app.core.orchestrator import StageOrchestrator
-from app.core.agent import DialogueAgent
 
 __all__ = ["StageOrchestrator", "DialogueAgent"]
 
+
+def __getattr__(name):
+    # app.tools → app.core.metrics 처럼 하위 모듈만 필요한 import가
+    # agent → app.tools 순환 import를 일으키지 않도록 지연 로드
+    if name == "StageOrchestrator":
+        from app.core.orchestrator import StageOrchestrator
+        return StageOrchestrator
+    if name == "DialogueAgent":
+        from app.core.agent import DialogueAgent
+        return DialogueAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,7 +8,6 @@ L2 Agent: LLM 기반 Tool 실행 및 평가
 from http import client
 from multiprocessing import context
 from typing import Dict, List, Optional
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 import logging
 import os
@@ -19,11 +18,19 @@ from app.models.schemas import (
 )
 from app.tools import (
     SafetyFilterTool,
-    EmotionClassifierTool,
-    ContextManagerTool,
     ActionCardGeneratorTool
 )
+from app.tools.context_manager import get_context_manager
+from app.tools.emotion_classifier import get_emotion_classifier
 from app.utils.name_utils import format_name_with_vocative, format_name_with_subject, format_name_with_topic
+from app.core import degraded
+from app.core.deadline import has_time_for
+from app.core.hedging import hedged_call
+from app.core.metrics import track_dependency
+from app.core.token_budget import fit_context
+from app.core.tracing import set_span_attributes, traced
+from app.services.conversation_summary import conversation_digest, summary_context
+from app.services.llm_gateway import get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -37,27 +44,22 @@ class DialogueAgent:
     
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        self.llm = ChatOpenAI(
-            model="gpt-4.1",
-            temperature=0.7,
-            api_key=self.api_key
-        )
+        gateway = get_llm_gateway()
+        self.llm = gateway.llm("chat_generation", api_key=self.api_key)
         
-        # LLM 평가용 (낮은 temperature로 일관성 있는 평가)
-        self.eval_llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.3,
-            api_key=self.api_key
-        )
+        # LLM 평가용 (chat_eval 프로필: 낮은 temperature, 한 단어 응답이라 max_tokens 제한)
+        self.eval_llm = gateway.llm("chat_eval", api_key=self.api_key)
         
         # Tools 초기화
         self.safety_filter = SafetyFilterTool(api_key=self.api_key)
-        self.emotion_classifier = EmotionClassifierTool()
-        self.context_manager = ContextManagerTool()
+        # 라우트 / 헬스 체크와 같은 인스턴스 공유 (중복 초기화 / 결과 캐시 분리 방지)
+        self.emotion_classifier = get_emotion_classifier()
+        self.context_manager = get_context_manager()
         self.action_card_generator = ActionCardGeneratorTool(api_key=self.api_key)
         
         logger.info("DialogueAgent 초기화 완료")
     
+    @traced("agent.execute_stage_turn")
     def execute_stage_turn(
         self,
         request: DialogueTurnRequest,
@@ -76,6 +78,11 @@ class DialogueAgent:
             턴 처리 결과 dict
         """
         stage = session.current_stage
+        set_span_attributes(
+            session_id=session.session_id,
+            stage=stage,
+            retry_count=session.retry_count
+        )
         
         # stt_result 검증
         if stt_result is None:
@@ -158,18 +165,22 @@ class DialogueAgent:
             logger.info(f"❌ LLM 평가: 답변이 너무 짧음 ('{child_answer}')")
             return {"success": False, "reason": "답변이 너무 짧음"}
         
+        # 턴 마감이 임박하면 LLM 호출 없이 Stage별 규칙으로 평가
+        if not has_time_for("chat_eval"):
+            return degraded.evaluate_answer_by_rules(stage, child_answer)
+        
         story = context.get("story", {})
         story_scene = story.get("scene", "")
         character_name = story.get("character_name", "캐릭터")
         
-        # 이전 대화 기록 생성 (맥락 제공)
-        conversation_history = ""
-        if session.key_moments:
-            conversation_history = "\n이전 대화 기록:\n"
-            for moment in session.key_moments[-3:]:  # 최근 3개만
-                conversation_history += f"- {moment['stage']}: {moment['content']}\n"
+        # 이전 대화 기록 (맥락 제공, 롤링 요약 + 요약 이후 최근 3개만)
+        summary_text, recent_moments = summary_context(session, max_recent=3)
+        history_lines = [f"- 요약: {summary_text}"] if summary_text else []
+        history_lines += [f"- {moment['stage']}: {moment['content']}" for moment in recent_moments]
         
         # Stage별 평가 프롬프트
+        # 평가 기준은 고정 문구만 두고(프롬프트 캐시 대상), 장면 / 시나리오 등 매번 바뀌는 값은 scene_context로 뒤에 붙임
+        scene_context = ""
         if stage == Stage.S1_EMOTION_LABELING:
             question = f"{session.story_name} 동화에서 {format_name_with_subject(character_name)} 어떤 감정을 느꼈을까?"
             evaluation_criteria = """
@@ -184,9 +195,8 @@ class DialogueAgent:
             """
         elif stage == Stage.S2_ASK_REASON_EMOTION_1:
             question = f"{session.story_name} 동화에서 {format_name_with_subject(character_name)} 왜 그런 감정을 느꼈을까?"
-            evaluation_criteria = f"""
-            동화 장면: {story_scene}
-            
+            scene_context = f"동화 장면: {story_scene}"
+            evaluation_criteria = """
             질문: "왜 그런 감정을 느꼈을까?" - 이유/원인을 묻는 질문입니다.
             
             [성공 조건]
@@ -287,9 +297,8 @@ class DialogueAgent:
             """
         elif stage == Stage.S5_ASK_REASON_EMOTION_2:
             question = "실생활 상황에서 그 사람이 왜 그런 감정을 느꼈을까?"
-            evaluation_criteria = f"""
-            S4 시나리오: {context.get('s4_scenario', '제시된 상황')}
-            
+            scene_context = f"S4 시나리오: {context.get('s4_scenario', '제시된 상황')}"
+            evaluation_criteria = """
             [성공 조건 - 아래 중 하나만 충족하면 무조건 성공]
             1. 상황의 핵심 키워드를 언급 (어미 형태 무관)
                - 시나리오가 "혼자 서 있는" 상황이면: "혼자", "혼자라서", "혼자니까", "혼자잖아" 등 혼자라는 뉘앙스가 있으면 성공
@@ -339,17 +348,25 @@ class DialogueAgent:
             logger.warning(f"❌ LLM 평가: 지원하지 않는 Stage {stage}")
             return {"success": False, "reason": f"지원하지 않는 Stage: {stage}"}
         
+        # 고정 지침 → Stage별 평가 기준 → (마지막 user 메시지) 대화 맥락 / 질문 / 답변 순서
+        # → 같은 Stage의 평가 호출은 system 메시지 전체가 바이트 단위로 같아 제공자 프롬프트 캐시가 적용됨
+        # user 메시지가 chat_eval 토큰 예산을 넘으면 오래된 대화 기록 → 장면 뒷부분 순으로 줄임
+        current = f"현재 질문: {question}\n아이의 답변: \"{child_answer}\""
+        history_lines, scene_context = fit_context(
+            "chat_eval", [current], items=history_lines, text=scene_context, keep_first=1 if summary_text else 0
+        )
+        conversation_history = "이전 대화 기록:\n" + "\n".join(history_lines) if history_lines else ""
+        dialogue = "\n\n".join(part for part in (
+            conversation_history,
+            scene_context,
+            current,
+            "평가 결과를 '성공' 또는 '실패'로만 출력해."
+        ) if part)
+        
         prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""
+            ("system", """
             너는 6살~9살 아이의 답변을 평가하는 전문가야.
-            
-            {conversation_history}
-            
-            현재 질문: {question}
-            아이의 답변: "{child_answer}"
-            
-            평가 기준:
-            {evaluation_criteria}
+            마지막 메시지의 이전 대화 기록, 현재 질문, 아이의 답변을 아래 기준으로 평가해.
             
             중요:
             1. 이전 대화 맥락을 고려하여 현재 답변이 질문과 관련성이 있는지 판단
@@ -364,14 +381,22 @@ class DialogueAgent:
             
             출력 형식:
             - "성공" 또는 "실패" 한 단어만 출력
-            """),
-            ("user", "평가 결과를 '성공' 또는 '실패'로만 출력해.")
+            
+            평가 기준:
+            """ + evaluation_criteria),
+            ("user", "{dialogue}")
         ])
         
         try:
-            response = self.eval_llm.invoke(prompt.format_messages())
+            messages = prompt.format_messages(dialogue=dialogue)
+            response = hedged_call("chat_eval", lambda: self.eval_llm.invoke(messages))
             evaluation_result = response.content.strip()
             
+            if "성공" not in evaluation_result and "실패" not in evaluation_result:
+                # 응답이 잘렸거나 형식이 다름 → 실패로 단정하지 않고 규칙 평가 (저하 모드)
+                degraded.record_degraded("chat_eval", ValueError(f"평가 키워드 없음: '{evaluation_result}'"))
+                return degraded.evaluate_answer_by_rules(stage, child_answer)
+            
             is_success = "성공" in evaluation_result
             logger.info(f"🤖 LLM 평가 ({stage.value}): '{child_answer}' → {evaluation_result}")
             
@@ -381,15 +406,12 @@ class DialogueAgent:
             }
             
         except Exception as e:
-            logger.error(f"❌ LLM 평가 실패: {e}")
-            # LLM 평가 실패 시 기본 규칙으로 폴백
-            fallback_success = len(child_answer) >= 3 and child_answer not in ["음", "어", "응", "글쎄", "몰라", "모르겠어"]
-            return {
-                "success": fallback_success,
-                "reason": "LLM 평가 실패, 기본 규칙 사용"
-            }
+            # LLM 평가 실패 / 회로 열림 시 Stage별 규칙으로 폴백
+            degraded.record_degraded("chat_eval", e)
+            return degraded.evaluate_answer_by_rules(stage, child_answer)
     
     ########################################## S1
+    @traced("agent.execute_s1")
     def _execute_s1(
         self, request: DialogueTurnRequest, session: DialogueSession, child_text: str, stt_result: STTResult
     ) -> Dict:
@@ -520,6 +542,7 @@ class DialogueAgent:
         }
 
     ##################################### S2 #####################################
+    @traced("agent.execute_s2")
     def _execute_s2(
         self, request: DialogueTurnRequest, session: DialogueSession, child_text: str, stt_result: STTResult
     ) -> Dict:
@@ -673,6 +696,7 @@ class DialogueAgent:
         return result_dict
     
     ##################################### S3 #####################################
+    @traced("agent.execute_s3")
     def _execute_s3(
         self, request: DialogueTurnRequest, session: DialogueSession, child_text: str, stt_result: STTResult
     ) -> Dict:
@@ -768,7 +792,8 @@ class DialogueAgent:
             emotion=emotion,
             situation=situation,
             action_card=action_card_title or "감정 표현하기",
-            child_name=session.child_name
+            child_name=session.child_name,
+            story_name=session.story_name
         )
         
         logger.info(f"🔍 _execute_s3: 생성된 전략들={strategies}")
@@ -867,6 +892,7 @@ class DialogueAgent:
         return result_dict
     
     ##################################### S4 #####################################
+    @traced("agent.execute_s4")
     def _execute_s4(
         self, request: DialogueTurnRequest, session: DialogueSession, child_text: str, stt_result: STTResult
     ) -> Dict:
@@ -1014,6 +1040,7 @@ class DialogueAgent:
         }
         
     ######################################## s5 ########################################
+    @traced("agent.execute_s5")
     def _execute_s5(
         self, request: DialogueTurnRequest, session: DialogueSession, child_text: str, stt_result: STTResult
     ) -> Dict:
@@ -1188,6 +1215,7 @@ class DialogueAgent:
         return result_dict
     
     ######################################## s6 ########################################
+    @traced("agent.execute_s6")
     def _execute_s6(
         self, request: DialogueTurnRequest, session: DialogueSession, child_text: str, stt_result: STTResult
     ) -> Dict:
@@ -1323,6 +1351,35 @@ class DialogueAgent:
         
         return AISpeech(text=response)
 
+    def _generate_or_template(self, prompt: ChatPromptTemplate, template: str, **variables) -> AISpeech:
+        """
+        LLM으로 응답 생성 (실패하거나 회로가 열려 있거나 턴 마감이 임박하면 템플릿 응답으로 대체)
+
+        Args:
+            prompt: 생성 프롬프트 (고정 지침 system + 이번 턴 정보 user)
+            template: 저하 모드 응답 (degraded 모듈 템플릿)
+            **variables: 프롬프트 변수 (아이 발화 등 중괄호가 들어갈 수 있는 값은 변수로 전달)
+        """
+        if not has_time_for("chat_generation"):
+            return AISpeech(text=template)
+        try:
+            with track_dependency("chat_generation"):
+                response = self.llm.invoke(prompt.format_messages(**variables))
+            return AISpeech(text=response.content.strip())
+        except Exception as e:
+            degraded.record_degraded("chat_generation", e)
+            return AISpeech(text=template)
+
+    def _fit_scene(self, story_scene: str, *fixed: str) -> str:
+        """
+        생성 요청의 동화 장면을 chat_generation 토큰 예산에 맞춤
+
+        Args:
+            story_scene: 동화 장면
+            *fixed: 같은 요청에 들어가는 길이가 변하는 값 (아이 발화, 인트로 등, 줄이지 않음)
+        """
+        return fit_context("chat_generation", fixed, text=story_scene.strip())[1]
+
     
     ## S1 Retry Functions ##
     def _generate_s1_rc1(
@@ -1338,22 +1395,19 @@ class DialogueAgent:
         if hasattr(session, 'context') and session.context:
             child_previous_text = session.context.get('s1_child_text', '')
         
+        # 고정 지침(system)은 아이 / 동화와 무관하게 같은 문구 → 프롬프트 캐시, 이번 턴 정보는 마지막 user 메시지로
         prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""
+            ("system", """
             너는 6살~9살 아이와 대화하는 따뜻하고 공감적인 동화 선생님이야.
             
-            아이 이름: {child_name}
-            동화 캐릭터: {character_name}
-            동화 장면: {story_scene}
-            
-            동화 속 '{character_name}'의 감정을 묻는 질문에 아이가 다음과 같이 대답했어:
-            아이의 답변: "{child_previous_text}"
+            동화 속 캐릭터의 감정을 묻는 질문에 아이가 대답했어.
+            아이 이름, 호칭, 동화 캐릭터, 동화 장면, 아이의 답변은 마지막 메시지에 있어.
             
             아이의 답변이 감정 표현이 아니거나 불명확해서 다시 물어봐야 해.
             아이의 답변 내용을 인정하고 공감하면서, 자연스럽게 감정에 대해 다시 질문해줘.
             
             중요:
-            1. 반드시 "{child_name}"의 이름으로 부르면서 시작 (받침에 따라 "아/야" 사용)
+            1. 반드시 아이 이름으로 부르면서 시작 (마지막 메시지의 호칭 그대로 사용)
             2. 아이의 답변을 부정하지 말고, 공감적으로 받아들이기
                - "모르겠어요" → "모르는구나", "모르겠구나"
                - "몰라요" → "잘 모르겠구나"
@@ -1365,23 +1419,31 @@ class DialogueAgent:
             6. 감정 단어를 직접 제시하지 말고, 아이가 스스로 말하도록 유도
             7. "고마워", "말해줘서 고마워" 같은 표현은 사용하지 말 것
             
-            좋은 예시:
-            - 아이: "물을 부었어요" → "{format_name_with_vocative(child_name)}, 그랬구나. 물을 계속 부었는데 차지 않았지? 그럼 {format_name_with_subject(character_name)} 어떤 기분이었을까?"
-            - 아이: "새엄마가 무서웠어요" → "{format_name_with_vocative(child_name)}, 응, 새엄마가 무서웠구나. 그래서 {format_name_with_subject(character_name)} 어떤 마음이었을 것 같아?"
-            - 아이: "모르겠어요" → "{format_name_with_vocative(child_name)}, 모르는구나. 괜찮아, 천천히 생각해보자. {format_name_with_subject(character_name)} 어떤 기분이 들었을 것 같아?"
-            - 아이: "몰라" → "{format_name_with_vocative(child_name)}, 잘 모르겠구나. 그럼 우리 같이 생각해볼까? {format_name_with_subject(character_name)} 어떤 마음이었을까?"
+            좋은 예시 ((호칭)과 (캐릭터 주어)는 마지막 메시지의 값으로 바꿔서 사용):
+            - 아이: "물을 부었어요" → "(호칭), 그랬구나. 물을 계속 부었는데 차지 않았지? 그럼 (캐릭터 주어) 어떤 기분이었을까?"
+            - 아이: "새엄마가 무서웠어요" → "(호칭), 응, 새엄마가 무서웠구나. 그래서 (캐릭터 주어) 어떤 마음이었을 것 같아?"
+            - 아이: "모르겠어요" → "(호칭), 모르는구나. 괜찮아, 천천히 생각해보자. (캐릭터 주어) 어떤 기분이 들었을 것 같아?"
+            - 아이: "몰라" → "(호칭), 잘 모르겠구나. 그럼 우리 같이 생각해볼까? (캐릭터 주어) 어떤 마음이었을까?"
             
             나쁜 예시:
             - "그건 감정이 아니야" (부정적)
             - "다시 말해봐" (반복 강요)
             - "슬펐을까? 화났을까?" (선택지 제시는 retry_2에서)
-            - 다른 아이 이름 사용 (반드시 "{child_name}"만 사용)
+            - 다른 아이 이름 사용 (반드시 마지막 메시지의 아이 이름만 사용)
             """),
-            ("user", f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서 아이의 답변 '{child_previous_text}'을 인정하면서, 자연스럽게 {character_name}의 감정을 묻는 개방형 질문을 생성해줘. 2-3문장, 한 단락으로만 출력해.")
+            ("user", "{request}")
+        ])
+        request = "\n".join([
+            f"아이 이름: {child_name}",
+            f"호칭: {format_name_with_vocative(child_name)}",
+            f"동화 캐릭터: {character_name} (캐릭터 주어: {format_name_with_subject(character_name)})",
+            f"동화 장면: {self._fit_scene(story_scene, child_previous_text, child_previous_text)}",
+            f"아이의 답변: \"{child_previous_text}\"",
+            "",
+            f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서 아이의 답변 '{child_previous_text}'을 인정하면서, 자연스럽게 {character_name}의 감정을 묻는 개방형 질문을 생성해줘. 2-3문장, 한 단락으로만 출력해."
         ])
         
-        response = self.llm.invoke(prompt.format_messages())
-        return AISpeech(text=response.content.strip())
+        return self._generate_or_template(prompt, degraded.s1_reask(child_name, character_name), request=request)
     
     def _generate_s1_rc2(
         self, child_name: str, context: Dict, session: DialogueSession
@@ -1397,22 +1459,18 @@ class DialogueAgent:
             child_previous_text = session.context.get('s1_child_text', '')
         
         prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""
+            ("system", """
             너는 6살~9살 아이와 대화하는 따뜻하고 친절한 동화 선생님이야.
             
-            아이 이름: {child_name}
-            동화 캐릭터: {character_name}
-            동화 장면: {story_scene}
-            
-            동화 속 '{character_name}'의 감정을 묻는 질문에 아이가 다음과 같이 대답했어:
-            아이의 답변: "{child_previous_text}"
+            동화 속 캐릭터의 감정을 묻는 질문에 아이가 대답했어.
+            아이 이름, 호칭, 동화 캐릭터, 동화 장면(story_scene), 아이의 답변은 마지막 메시지에 있어.
             
             이제 아이가 선택하기 쉽도록 story_scene에 맞는 2가지 감정을 제시해줘야 해.
             
             중요:
-            1. 반드시 "{child_name}"의 이름으로 부르면서 시작 (받침에 따라 "아/야" 사용)
+            1. 반드시 아이 이름으로 부르면서 시작 (마지막 메시지의 호칭 그대로 사용)
             2. story_scene의 상황에 맞는 감정 2개를 선택 (예: 슬픔, 화남, 무서움, 속상함 등)
-            3. 형식: "{format_name_with_vocative(child_name)}, {format_name_with_subject(character_name)} [감정1]었을까? 아니면 [감정2]었을까?"
+            3. 형식: "(호칭), (캐릭터 주어) [감정1]었을까? 아니면 [감정2]었을까?"
             4. 감정 표현은 과거형으로 (슬펐을까, 화났을까, 무서웠을까)
             5. 한 문장으로만 출력
             6. 너무 복잡한 감정 단어는 피하고, 6살~9살이 이해할 수 있는 기본 감정 사용
@@ -1424,21 +1482,31 @@ class DialogueAgent:
             - 무서웠을, 두려웠을
             - 놀랐을, 당황했을
             
-            좋은 예시:
-            - story_scene이 "독에 물이 안 차서 새엄마가 화낼까봐" → "{format_name_with_vocative(child_name)}, {format_name_with_subject(character_name)} 무서웠을까? 아니면 속상했을까?"
-            - story_scene이 "친구가 도와줘서 일을 다 끝냈어" → "{format_name_with_vocative(child_name)}, {format_name_with_subject(character_name)} 기뻤을까? 아니면 놀랐을까?"
+            좋은 예시 ((호칭)과 (캐릭터 주어)는 마지막 메시지의 값으로 바꿔서 사용):
+            - story_scene이 "독에 물이 안 차서 새엄마가 화낼까봐" → "(호칭), (캐릭터 주어) 무서웠을까? 아니면 속상했을까?"
+            - story_scene이 "친구가 도와줘서 일을 다 끝냈어" → "(호칭), (캐릭터 주어) 기뻤을까? 아니면 놀랐을까?"
             
             나쁜 예시:
             - "슬펐을까? 기뻤을까?" (상황과 무관하고 대조적인 감정)
             - "우울했을까? 비통했을까?" (너무 어려운 단어)
             - 세 가지 이상 감정 제시
-            - 다른 아이 이름 사용 (반드시 "{child_name}"만 사용)
+            - 다른 아이 이름 사용 (반드시 마지막 메시지의 아이 이름만 사용)
             """),
-            ("user", f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서, story_scene을 분석하고 아이의 답변 '{child_previous_text}'도 고려해서, {character_name}가 느꼈을 가능성이 높은 감정 2가지를 선택지로 제시하는 질문 한 문장만 출력해.")
+            ("user", "{request}")
+        ])
+        request = "\n".join([
+            f"아이 이름: {child_name}",
+            f"호칭: {format_name_with_vocative(child_name)}",
+            f"동화 캐릭터: {character_name} (캐릭터 주어: {format_name_with_subject(character_name)})",
+            f"동화 장면(story_scene): {self._fit_scene(story_scene, child_previous_text, child_previous_text)}",
+            f"아이의 답변: \"{child_previous_text}\"",
+            "",
+            f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서, story_scene을 분석하고 아이의 답변 '{child_previous_text}'도 고려해서, {character_name}가 느꼈을 가능성이 높은 감정 2가지를 선택지로 제시하는 질문 한 문장만 출력해."
         ])
         
-        response = self.llm.invoke(prompt.format_messages())
-        return AISpeech(text=response.content.strip())
+        return self._generate_or_template(
+            prompt, degraded.s1_emotion_choices(session.story_name, child_name, character_name), request=request
+        )
     
     ## _generate_ask_experience_retry_count_1 ##
     def _generate_s2_rc1(
@@ -1466,42 +1534,47 @@ class DialogueAgent:
         story_scene = story.get("scene", "")
         
         prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""
+            ("system", """
             너는 6살~9살 아이와 대화하는 따뜻하고 친절한 동화 선생님이야.
             
-            아이 이름: {child_name}
-            동화 캐릭터: {character_name}
-            동화 제목: {story_name}
-            동화 인트로: {story_intro}
-            동화 장면: {story_scene}
+            아이 이름, 호칭, 동화 캐릭터, 동화 제목, 동화 인트로, 동화 장면(story_scene)은 마지막 메시지에 있어.
             
-            아이가 동화 속 '{character_name}'의 감정 이유를 잘 설명하지 못하고 있어.
+            아이가 동화 속 캐릭터의 감정 이유를 잘 설명하지 못하고 있어.
             지금은 두 번째 재시도야. 아이가 쉽게 선택할 수 있도록 story_scene을 기반으로 개연성 있는 2가지 이유를 제시해줘야 해.
             
             중요:
-            1. 반드시 "{child_name}"의 이름으로 부르면서 시작 (받침에 따라 "아/야" 사용)
+            1. 반드시 아이 이름으로 부르면서 시작 (마지막 메시지의 호칭 그대로 사용)
             2. story_scene의 구체적인 상황을 반영해서 이유 2가지를 만들어야 해
             3. 두 이유는 모두 story_scene에서 실제로 일어난 일이거나 추론 가능한 일이어야 해
             4. 질문 한 문장만 출력
             5. 감정 단어를 직접 언급하지 마
             6. 6살~9살 아이가 이해할 수 있는 단어 사용
             7. 형식: "혹시 [이유1]해서 그랬을까? 아니면 [이유2]해서 그랬을까?"
-            8. 너가 아는 {story_name} 줄거리를 참고해서 이유를 만들어도 좋아. 하지만 잔혹동화면 절대 사용하지 마
+            8. 너가 아는 동화 줄거리를 참고해서 이유를 만들어도 좋아. 하지만 잔혹동화면 절대 사용하지 마
 
-            좋은 예시 (콩쥐팥쥐):
+            좋은 예시 (콩쥐팥쥐, (호칭)은 마지막 메시지의 값으로 바꿔서 사용):
             - story_scene: "물을 몇 시간째 붓고 있는데 아무리 물을 부어도 독에 물이 차지 않아. 곧 있으면 새엄마가 올텐데 어쩌지?"
-            - 출력: "{format_name_with_vocative(child_name)}, 혹시 아무리 해도 물이 안 차서 그랬을까? 아니면 새엄마가 화낼까봐 무서워서 그랬을까?"
+            - 출력: "(호칭), 혹시 아무리 해도 물이 안 차서 그랬을까? 아니면 새엄마가 화낼까봐 무서워서 그랬을까?"
             
             나쁜 예시:
             - "혹시 힘들어서 그랬을까? 아니면 슬퍼서 그랬을까?" (story_scene과 무관하고 감정 언급)
             - "혹시 착해서 그랬을까? 아니면 나빠서 그랬을까?" (이유가 아닌 성격 묘사)
-            - 다른 아이 이름 사용 (반드시 "{child_name}"만 사용)
+            - 다른 아이 이름 사용 (반드시 마지막 메시지의 아이 이름만 사용)
             """),
-            ("user", f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서, story_scene을 자세히 읽고 '{character_name}'가 그렇게 느낀 구체적인 이유 2가지를 선택지로 제시하는 질문 한 문장만 출력해.")
-            ])
+            ("user", "{request}")
+        ])
+        request = "\n".join([
+            f"아이 이름: {child_name}",
+            f"호칭: {format_name_with_vocative(child_name)}",
+            f"동화 캐릭터: {character_name}",
+            f"동화 제목: {story_name}",
+            f"동화 인트로: {story_intro}",
+            f"동화 장면(story_scene): {self._fit_scene(story_scene, story_intro)}",
+            "",
+            f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서, story_scene을 자세히 읽고 '{character_name}'가 그렇게 느낀 구체적인 이유 2가지를 선택지로 제시하는 질문 한 문장만 출력해."
+        ])
             
-        response = self.llm.invoke(prompt.format_messages())
-        return AISpeech(text=response.content.strip())
+        return self._generate_or_template(prompt, degraded.s2_reason_choices(story_name, child_name), request=request)
     
     
     def _generate_s5_rc2(
@@ -1523,38 +1596,41 @@ class DialogueAgent:
         if s3_answer_content:
             logger.info(f"🔍 아이가 자신의 경험을 말함'")
             prompt = ChatPromptTemplate.from_messages([
-                ("system", f"""
+                ("system", """
                 너는 6살~9살 아이와 대화하는 따뜻하고 친절한 동화 선생님이야.
                 
-                아이 이름: {child_name}
-                
-                아이가 자신이 본 친구의 경험에 대해 이야기했어:
-                "{s3_answer_content}"
-                
-                그리고 S4에서 그 사람의 감정에 대해 물어봤어:
-                "{s4_scenario}"
+                아이가 자신이 본 친구의 경험에 대해 이야기했고,
+                S4에서 그 사람의 감정에 대해 물어봤어.
+                아이 이름, 호칭, 아이가 말한 경험, S4 질문은 마지막 메시지에 있어.
                 
                 지금 아이가 그 사람의 감정 이유를 잘 설명하지 못하고 있어.
                 두 번째 재시도야. 아이가 말한 경험 속 친구가 그런 감정을 느낀 이유 2가지를 제시해줘.
                 
                 중요:
-                1. 반드시 "{child_name}"의 이름으로 부르면서 시작 (받침에 따라 "아/야" 사용)
+                1. 반드시 아이 이름으로 부르면서 시작 (마지막 메시지의 호칭 그대로 사용)
                 2. 아이가 말한 상황을 참고해서 구체적인 이유 2가지 제시
                 3. 질문 한 문장만 출력
                 4. 6살~9살 아이가 이해할 수 있는 단어 사용
                 5. 형식: "혹시 [이유1]해서 그랬을까? 아니면 [이유2]해서 그랬을까?"
                 
                 예시: 
-                - 아이가 "친구가 혼자 있었어"라고 했다면 → "(아이이름+아/야), 혹시 친구들이 같이 안 놀아줘서 그랬을까? 아니면 하고 싶은 게 없어서 그랬을까?"
-                - 아이가 "친구가 울었어"라고 했다면 → "{format_name_with_vocative(child_name)}, 혹시 누가 놀렸어서 그랬을까? 아니면 무언가를 잃어버려서 그랬을까?"
+                - 아이가 "친구가 혼자 있었어"라고 했다면 → "(호칭), 혹시 친구들이 같이 안 놀아줘서 그랬을까? 아니면 하고 싶은 게 없어서 그랬을까?"
+                - 아이가 "친구가 울었어"라고 했다면 → "(호칭), 혹시 누가 놀렸어서 그랬을까? 아니면 무언가를 잃어버려서 그랬을까?"
                 
                 나쁜 예시:
-                - 다른 아이 이름 사용 (반드시 "{child_name}"만 사용)
+                - 다른 아이 이름 사용 (반드시 마지막 메시지의 아이 이름만 사용)
                 """),
-                ("user", f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서, 아이가 말한 경험 속 친구가 그런 감정을 느낀 이유 2가지를 선택지로 제시하는 질문 한 문장만 출력해.")
+                ("user", "{request}")
             ])
-            response = self.llm.invoke(prompt.format_messages())
-            return AISpeech(text=response.content.strip())
+            request = "\n".join([
+                f"아이 이름: {child_name}",
+                f"호칭: {format_name_with_vocative(child_name)}",
+                f"아이가 말한 경험: \"{s3_answer_content}\"",
+                f"S4 질문: \"{s4_scenario}\"",
+                "",
+                f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서, 아이가 말한 경험 속 친구가 그런 감정을 느낀 이유 2가지를 선택지로 제시하는 질문 한 문장만 출력해."
+            ])
+            return self._generate_or_template(prompt, degraded.s5_reason_choices(child_name), request=request)
         else:
             logger.info(f"🔍 아이가 자신의 경험을 말하지 않음 - scenario_1 기반 질문")
             # AI가 제시한 scenario_1 시나리오에 대한 이유 2가지 제시
@@ -1610,14 +1686,11 @@ class DialogueAgent:
         
         # 아동이 말한 경험을 LLM으로 요약 후 감정 질문
         prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""
+            ("system", """
             너는 6살~9살 아이와 대화하는 따뜻한 선생님이야.
             
-            아이 이름: {child_name}
-            
             아이가 자신이 본 경험을 이야기했어.
-            아이의 말: "{child_text}"
-            아이가 언급한 대상: "{mentioned_person.rstrip('는은')}"
+            아이 이름, 아이의 말, 아이가 언급한 대상, 마지막 질문은 마지막 메시지에 있어.
             
             너의 역할:
             1. 아이가 말한 내용을 간단히 정리해서 되물어주기
@@ -1627,7 +1700,7 @@ class DialogueAgent:
             
             형식:
             [아이가 말한 핵심 상황을 1-2문장으로 요약].
-            그때 {mentioned_person} 어떤 마음이었을 것 같아?"
+            [마지막 질문]
             
             예시:
             - 아이: "친구가 혼자 앉아있었어요"
@@ -1638,14 +1711,21 @@ class DialogueAgent:
             
             중요:
             - 아이가 말한 내용을 그대로 반복하지 말고 자연스럽게 요약
-            - 반드시 "그때 {mentioned_person} 어떤 마음이었을 것 같아?"로 끝나야 함
+            - 반드시 마지막 메시지의 마지막 질문으로 끝나야 함
             - 3문장 이내로 간결하게
             """),
-            ("user", "아이가 말한 경험을 정리하고 대상의 감정을 물어봐.")
+            ("user", "{request}")
+        ])
+        request = "\n".join([
+            f"아이 이름: {child_name}",
+            f"아이의 말: \"{child_text}\"",
+            f"아이가 언급한 대상: \"{mentioned_person.rstrip('는은')}\"",
+            f"마지막 질문: \"그때 {mentioned_person} 어떤 마음이었을 것 같아?\"",
+            "",
+            "아이가 말한 경험을 정리하고 대상의 감정을 물어봐."
         ])
         
-        response = self.llm.invoke(prompt.format_messages())
-        return AISpeech(text=response.content.strip())
+        return self._generate_or_template(prompt, degraded.s3_situation_summary(mentioned_person), request=request)
     
     def _generate_s3_rc2(
         self, child_name: str, context: Dict
@@ -1668,11 +1748,9 @@ class DialogueAgent:
         
         # 기본: 2가지 경험 예시 질문
         prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""
+            ("system", """
             아이에게 비슷한 경험이 있는지 2가지 구체적인 예시를 들어 질문해야 해.
-            
-            동화 인트로: {story_intro}
-            동화 장면: {story_scene}
+            아이 이름, 동화 인트로, 동화 장면은 마지막 메시지에 있어.
 
             중요: 
             1. 질문 한 문장만 출력해. 다른 말은 하지 마.
@@ -1680,18 +1758,24 @@ class DialogueAgent:
             3. 감정 단어를 반복하지 마
             4. 6살~9살 사이의 아이에 맞는 단어 사용
             
-            형식: "혹시 {child_name}이도 [경험1] 했던 적이 있어? 아니면 [경험2] 했어?"
+            형식: "혹시 (아이 이름)이도 [경험1] 했던 적이 있어? 아니면 [경험2] 했어?"
             
-            예시: "혹시 {child_name}이도 친구한테 섭섭했던 적이 있어? 아니면 가족한테 속상했던 적이 있어?"
+            예시: "혹시 (아이 이름)이도 친구한테 섭섭했던 적이 있어? 아니면 가족한테 속상했던 적이 있어?"
             
             나쁜 예시:
-            - 다른 아이 이름 사용 (반드시 "{child_name}"만 사용)
+            - 다른 아이 이름 사용 (반드시 마지막 메시지의 아이 이름만 사용)
             """),
-            ("user", f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서, 비슷한 경험 2가지를 예시로 제시하는 질문 한 문장만 출력해. 감정 단어를 반복하지 마.")
+            ("user", "{request}")
+        ])
+        request = "\n".join([
+            f"아이 이름: {child_name}",
+            f"동화 인트로: {story_intro}",
+            f"동화 장면: {self._fit_scene(story_scene, story_intro)}",
+            "",
+            f"아이 이름은 '{child_name}'이야. 반드시 이 이름을 사용해서, 비슷한 경험 2가지를 예시로 제시하는 질문 한 문장만 출력해. 감정 단어를 반복하지 마."
         ])
         
-        response = self.llm.invoke(prompt.format_messages())
-        return AISpeech(text=response.content.strip())
+        return self._generate_or_template(prompt, degraded.s3_experience_choices(child_name), request=request)
     
     def _generate_s4_situation_summary(
         self, child_name: str, child_text: str, context: Dict, session: DialogueSession = None
@@ -1834,14 +1918,11 @@ class DialogueAgent:
     #     return AISpeech(text=response.content.strip())
     
     def _summarize_conversation(self, session: DialogueSession) -> str:
-        """대화 요약"""
-        moments = session.key_moments
-        if not moments:
+        """대화 요약 (롤링 요약 + 최근 대화, action_card 토큰 예산을 넘으면 맨 앞만 남기고 오래된 대화부터 제외)"""
+        summary_parts = conversation_digest(session)
+        if not summary_parts:
             return "대화 없음"
-        
-        summary_parts = []
-        for moment in moments:
-            summary_parts.append(f"{moment['stage']}: {moment['content']}")
+        summary_parts, _ = fit_context("action_card", [], items=summary_parts, keep_first=1)
         
         return " | ".join(summary_parts)
     
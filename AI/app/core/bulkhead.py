@@ -0,0 +1,218 @@
+"""
+외부 의존성별 Bulkhead (동시 호출 제한)
+OpenAI / Supertone 계정을 모든 워커가 공유하므로, 몰리는 시점에 호출 수를 제한하지 않으면
+429 / 타임아웃이 여러 의존성에서 동시에 발생한다. 의존성마다 별도 풀을 두어
+한 의존성이 느려져도 다른 의존성 호출은 영향을 받지 않게 한다.
+
+- 동시 호출 한도는 AIMD로 조정: 목표 지연시간 이내 성공 시 조금씩 증가,
+  실패 또는 목표 초과 시 비율로 감소 (같은 혼잡으로 여러 번 줄이지 않도록 쿨다운)
+- 대기열 길이 / 대기 시간 상한 초과 시 BulkheadRejectedError
+- 한도는 워커 프로세스 단위 (gunicorn 워커 수만큼 곱해진 값이 전체 한도)
+
+호출부는 metrics.track_dependency를 통해 사용한다.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.deadline import request_timeout
+
+logger = logging.getLogger(__name__)
+
+
+class BulkheadRejectedError(Exception):
+    """Bulkhead 슬롯을 얻지 못함 (대기열 가득 참 / 대기 시간 초과)"""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"{name} 동시 호출 한도 초과 ({reason})")
+        self.name = name
+        self.reason = reason
+
+
+class Bulkhead:
+    """
+    의존성 1개의 동시 호출 제한 (스레드 기반)
+
+    Args:
+        name: 의존성 이름
+        initial_limit: 초기 동시 호출 한도
+        min_limit / max_limit: 한도 범위
+        target_latency: 목표 호출 시간 (초), 초과하면 혼잡으로 간주
+        max_queue: 최대 대기 수
+        queue_timeout: 최대 대기 시간 (초)
+        backoff_ratio: 감소 시 곱할 비율
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float,
+        min_limit: float,
+        max_limit: float,
+        target_latency: float,
+        max_queue: int,
+        queue_timeout: float,
+        backoff_ratio: float = 0.75
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.target_latency = target_latency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.backoff_ratio = backoff_ratio
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> float:
+        """
+        슬롯 획득 (한도가 찰 때까지 대기)
+
+        Returns:
+            대기한 시간 (초)
+
+        Raises:
+            BulkheadRejectedError: 대기열이 가득 찼거나 queue_timeout(턴 마감이 더 이르면 남은 시간) 초과
+        """
+        start = time.monotonic()
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return 0.0
+
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise BulkheadRejectedError(self.name, "queue_full")
+
+            deadline = start + request_timeout(self.queue_timeout)
+            self.waiting += 1
+            try:
+                while self.in_flight >= int(self.limit):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise BulkheadRejectedError(self.name, "queue_timeout")
+                    self._condition.wait(remaining)
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+        return time.monotonic() - start
+
+    def release(self, latency: float, ok: bool, adjust: bool = True):
+        """
+        슬롯 반환 및 한도 조정
+
+        Args:
+            latency: 호출 시간 (초)
+            ok: 성공 여부
+            adjust: False면 한도를 조정하지 않음 (턴 마감으로 끊긴 호출)
+        """
+        with self._condition:
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            if not adjust:
+                self._condition.notify_all()
+                return
+
+            if not ok or latency > self.target_latency:
+                # 한 번의 혼잡에 동시에 끝난 호출들이 연달아 줄이지 않도록 목표 지연시간 동안은 1회만 감소
+                if now - self._last_decrease >= self.target_latency:
+                    previous = self.limit
+                    self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                    self._last_decrease = now
+                    if int(previous) != int(self.limit):
+                        logger.warning(
+                            f"⚠️ {self.name} 동시 호출 한도 감소: {int(previous)} → {int(self.limit)} "
+                            f"({'실패' if not ok else f'{latency:.2f}초'})"
+                        )
+            elif in_flight * 2 >= self.limit:
+                # 한도를 어느 정도 사용 중일 때만 증가 (한가할 때 한도가 최대치까지 올라가지 않도록)
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """
+        슬롯을 잡고 호출 (호출 시간 / 성공 여부로 한도 조정)
+
+        Example:
+            with bulkhead.slot():
+                client.moderations.create(...)
+        """
+        self.acquire()
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.release(time.perf_counter() - start, ok)
+
+    def is_saturated(self) -> bool:
+        """한도가 모두 사용 중인지 (대기 중인 호출 포함)"""
+        with self._condition:
+            return self.waiting > 0 or self.in_flight >= int(self.limit)
+
+    def status(self) -> Dict:
+        """현재 상태"""
+        with self._condition:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "rejected": self.rejected,
+            }
+
+
+# 의존성 이름 → Bulkhead (설정에 없는 의존성은 제한하지 않음)
+_bulkheads: Dict[str, Bulkhead] = {}
+_bulkheads_lock = threading.Lock()
+
+
+def get_bulkhead(dependency: str) -> Optional[Bulkhead]:
+    """
+    의존성의 Bulkhead 반환
+
+    Returns:
+        Bulkhead (비활성화 또는 BULKHEAD_LIMITS에 없으면 None)
+    """
+    if not settings.BULKHEAD_ENABLED:
+        return None
+
+    bulkhead = _bulkheads.get(dependency)
+    if bulkhead is not None:
+        return bulkhead
+
+    config = settings.BULKHEAD_LIMITS.get(dependency)
+    if config is None:
+        return None
+
+    with _bulkheads_lock:
+        if dependency not in _bulkheads:
+            _bulkheads[dependency] = Bulkhead(
+                name=dependency,
+                initial_limit=config["initial"],
+                min_limit=config["min"],
+                max_limit=config["max"],
+                target_latency=config["target_latency"],
+                max_queue=settings.BULKHEAD_MAX_QUEUE,
+                queue_timeout=settings.BULKHEAD_QUEUE_TIMEOUT,
+                backoff_ratio=settings.BULKHEAD_BACKOFF_RATIO
+            )
+        return _bulkheads[dependency]
+
+
+def bulkhead_status() -> Dict[str, Dict]:
+    """생성된 Bulkhead 상태 (헬스 체크용)"""
+    return {name: bulkhead.status() for name, bulkhead in _bulkheads.items()}
@@ -0,0 +1,191 @@
+"""
+외부 의존성별 Circuit Breaker
+OpenAI / Supertone 장애 시 모든 턴이 타임아웃까지 기다리지 않도록,
+실패가 이어지면 회로를 열어 호출 없이 즉시 실패시킨다. (호출부는 저하 모드로 응답)
+
+- CLOSED: 정상 호출. 연속 실패 CIRCUIT_FAILURE_THRESHOLD회 또는
+  최근 CIRCUIT_WINDOW회 중 실패율 CIRCUIT_FAILURE_RATE 이상이면 OPEN
+- OPEN: 호출 없이 CircuitOpenError. CIRCUIT_RESET_TIMEOUT 후 HALF_OPEN
+- HALF_OPEN: 시험 호출 1개만 허용. 성공하면 CLOSED, 실패하면 다시 OPEN
+
+상태는 워커 프로세스 단위이며, 호출부는 metrics.track_dependency를 통해 사용한다.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 호출하지 않음"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} 회로 열림 ({retry_after:.1f}초 후 재시도)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    의존성 1개의 Circuit Breaker (스레드 안전)
+
+    Args:
+        name: 의존성 이름
+        failure_threshold: 연속 실패 허용 횟수
+        failure_rate: 최근 호출 중 실패율 상한
+        window: 실패율 계산에 쓰는 최근 호출 수
+        min_calls: 실패율 판정 최소 호출 수
+        reset_timeout: OPEN 유지 시간 (초)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        failure_rate: float,
+        window: int,
+        min_calls: int,
+        reset_timeout: float
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+
+        self.state = CircuitState.CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        호출 가능 여부 확인
+
+        Raises:
+            CircuitOpenError: 회로가 열려 있거나 시험 호출이 진행 중
+        """
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return
+
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == CircuitState.OPEN and remaining <= 0:
+                self.state = CircuitState.HALF_OPEN
+                logger.info(f"🔌 {self.name} 회로 시험 호출 (half-open)")
+
+            if self.state == CircuitState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+
+            raise CircuitOpenError(self.name, max(remaining, 0.0))
+
+    def cancel(self):
+        """before_call 후 실제로 호출하지 못한 경우 (bulkhead 거절 등)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record(self, ok: bool):
+        """호출 결과 기록 및 상태 전환"""
+        with self._lock:
+            self._probe_in_flight = False
+
+            if self.state == CircuitState.HALF_OPEN:
+                if ok:
+                    self._close()
+                else:
+                    self._open("시험 호출 실패")
+                return
+
+            self._outcomes.append(ok)
+            self._consecutive_failures = 0 if ok else self._consecutive_failures + 1
+            if ok or self.state == CircuitState.OPEN:
+                return
+
+            failures = self._outcomes.count(False)
+            if self._consecutive_failures >= self.failure_threshold:
+                self._open(f"연속 실패 {self._consecutive_failures}회")
+            elif len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._open(f"실패율 {failures}/{len(self._outcomes)}")
+
+    def _open(self, reason: str):
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        logger.warning(f"🔌 {self.name} 회로 열림: {reason}, {self.reset_timeout:.0f}초간 저하 모드")
+
+    def _close(self):
+        self.state = CircuitState.CLOSED
+        self._outcomes.clear()
+        self._consecutive_failures = 0
+        logger.info(f"🔌 {self.name} 회로 복구 (closed)")
+
+    def is_open(self) -> bool:
+        """호출하면 즉시 실패하는 상태인지 (저하 모드 판단용)"""
+        with self._lock:
+            return self.state != CircuitState.CLOSED
+
+    def status(self) -> Dict:
+        """현재 상태"""
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self.state.value,
+                "recent_calls": calls,
+                "recent_failure_rate": round(self._outcomes.count(False) / calls, 3) if calls else 0.0,
+            }
+
+
+# 의존성 이름 → CircuitBreaker
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(dependency: str) -> Optional[CircuitBreaker]:
+    """
+    의존성의 CircuitBreaker 반환
+
+    Returns:
+        CircuitBreaker (CIRCUIT_BREAKER_ENABLED=False면 None)
+    """
+    if not settings.CIRCUIT_BREAKER_ENABLED:
+        return None
+
+    breaker = _breakers.get(dependency)
+    if breaker is None:
+        with _breakers_lock:
+            if dependency not in _breakers:
+                _breakers[dependency] = CircuitBreaker(
+                    name=dependency,
+                    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                    failure_rate=settings.CIRCUIT_FAILURE_RATE,
+                    window=settings.CIRCUIT_WINDOW,
+                    min_calls=settings.CIRCUIT_MIN_CALLS,
+                    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT
+                )
+            breaker = _breakers[dependency]
+    return breaker
+
+
+def is_circuit_open(dependency: str) -> bool:
+    """의존성 회로가 열려 있는지 (아직 호출한 적 없으면 False)"""
+    breaker = _breakers.get(dependency)
+    return breaker is not None and breaker.is_open()
+
+
+def circuit_status() -> Dict[str, Dict]:
+    """생성된 CircuitBreaker 상태 (헬스 체크용)"""
+    return {name: breaker.status() for name, breaker in _breakers.items()}
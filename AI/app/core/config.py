@@ -3,7 +3,7 @@
 환경변수 로드 및 전역 설정 관리
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import os
 
 
@@ -27,13 +27,196 @@ class Settings(BaseSettings):
     REDIS_USERNAME: str | None = None
     REDIS_PASSWORD: Optional[str] = None
     REDIS_URL: Optional[str] = None
+    REDIS_SSL: bool = True  # 서버리스 Valkey는 TLS 필수, 로컬 Redis는 False
     
     # 세션 설정
     SESSION_TTL: int = 3600  # 1시간 (초)
     SESSION_PREFIX: str = "session:"
+    SESSION_INDEX_KEY: str = "session_index"  # 세션 ID → 만료 시각 sorted set (세션 수 집계, KEYS 대신 사용)
+    WS_SESSION_FLUSH_INTERVAL: float = 2.0  # WebSocket 채널 세션 저장 주기 (초)
     
     # Whisper 설정
     WHISPER_MODEL: str = "whisper-1"
+
+    # STT 오디오 전처리 (VAD / 무음 제거 / 재인코딩)
+    STT_PREPROCESS_ENABLED: bool = True
+    STT_UPLOAD_FORMAT: str = "wav"  # wav | opus
+    STT_VAD_FRAME_MS: int = 30
+    STT_VAD_ENERGY_THRESHOLD_DB: float = -45.0
+    STT_VAD_NOISE_MARGIN_DB: float = 10.0
+    STT_VAD_NOISE_EDGE_MS: int = 300  # 배경 소음은 녹음 앞뒤 구간으로 추정
+    STT_VAD_NOISE_FLOOR_MAX_DB: float = -50.0  # 소음 추정 상한 (처음부터 끝까지 말한 녹음의 임계값이 발화보다 높아지지 않도록)
+    STT_VAD_MIN_SPEECH_MS: int = 150
+    STT_VAD_PADDING_MS: int = 200
+
+    # STT 결과 캐시 (오디오 해시 → 인식 결과, 재시도 업로드 대비)
+    STT_CACHE_ENABLED: bool = True
+    STT_CACHE_TTL: int = 300  # 5분 (초)
+    STT_CACHE_PREFIX: str = "stt_cache:"
+
+    # 스트리밍 STT (WebSocket) endpointing
+    STT_STREAM_SEGMENT_SILENCE_MS: int = 400
+    STT_STREAM_ENDPOINT_SILENCE_MS: int = 1000
+    STT_STREAM_MAX_SEGMENT_MS: int = 8000
+    # 스트리밍 STT 최종 결과로 미리 실행한 안전성 검사 / 감정 분류 (Redis 공유 → 다른 워커의 /turn에서도 재사용)
+    STT_PREFETCH_SHARED: bool = True
+    STT_PREFETCH_TTL: int = 120  # 초
+    STT_PREFETCH_PREFIX: str = "stt_prefetch:"
+
+    # 부모 피드백 사전 생성 (S6 진입 시 작업 큐에 등록 → 별도 워커가 생성, 대화 해시별 결과 캐시)
+    FEEDBACK_QUEUE_ENABLED: bool = False  # False면 /feedback에서 직접 생성 (결과 캐시는 동일)
+    FEEDBACK_QUEUE_KEY: str = "feedback_queue"
+    FEEDBACK_PREFIX: str = "feedback:"
+    FEEDBACK_RESULT_TTL: int = 86400  # 생성 결과 보관 (초)
+    FEEDBACK_JOB_TIMEOUT: int = 300  # queued / running 상태 만료 (워커 중단 시 재등록 가능)
+    FEEDBACK_WORKER_POLL_TIMEOUT: int = 2  # 워커 BLMOVE 대기 (초, Redis socket_timeout보다 짧게)
+    FEEDBACK_WORKER_HEARTBEAT_TTL: int = 300  # 워커 생존 표시 만료 (작업 1건 최대 처리 시간보다 길게)
+    FEEDBACK_WORKER_RECOVERY_INTERVAL: float = 60.0  # 중단된 워커의 처리 중 작업을 큐로 되돌리는 주기 (초)
+    FEEDBACK_WAIT_TIMEOUT: float = 45.0  # /feedback이 워커 결과를 기다리는 최대 시간 (넘으면 직접 생성)
+    FEEDBACK_WAIT_INTERVAL: float = 0.5  # 워커 결과 확인 주기 (초)
+
+    # 부모 피드백 일괄 생성 (야간 리포트, 대화형 요청과 별도 bulkhead "feedback_batch" 사용)
+    FEEDBACK_BATCH_CONCURRENCY: int = 4
+    FEEDBACK_BATCH_MAX_ITEMS: int = 5000  # API 요청 1건당 최대 대화 수 (CLI는 제한 없음)
+    FEEDBACK_BATCH_RETRIES: int = 2  # 동시 호출 한도 초과 / 일시 오류 재시도 횟수
+    FEEDBACK_BATCH_PREFIX: str = "feedback_batch:"  # batch_id별 체크포인트 (Redis 해시)
+
+    # 행동 카드 라이브러리 (오프라인 사전 생성, 없는 조합만 LLM 생성)
+    ACTION_CARD_LIBRARY_ENABLED: bool = True
+    ACTION_CARD_LIBRARY_PATH: Optional[str] = None  # 기본: app/tools/action_card_library.json
+
+    # 롤링 대화 요약 (턴 처리 후 백그라운드에서 증분 갱신, 평가 프롬프트 / S6 / 긴 대화의 피드백이 원문 대신 사용)
+    CONVERSATION_SUMMARY_ENABLED: bool = True
+    CONVERSATION_SUMMARY_MAX_CHARS: int = 300
+    CONVERSATION_SUMMARY_PREFIX: str = "summary:"  # 세션별 요약 (Redis, TTL은 SESSION_TTL)
+    CONVERSATION_SUMMARY_WORKERS: int = 4
+
+    # 호출부별 프롬프트 토큰 예산 (매번 바뀌는 user 메시지 기준, 넘으면 오래된 대화 → 장면 뒷부분 순으로 줄임)
+    TOKEN_BUDGET_ENABLED: bool = True
+    TOKEN_COUNT_MODEL: str = "gpt-4o-mini"  # tiktoken 인코딩 선택용
+    LLM_TOKEN_BUDGETS: Dict[str, int] = {
+        "chat_eval": 600,
+        "chat_generation": 800,
+        "action_card": 600,
+        "feedback": 2000,
+        "feedback_batch": 2000,
+    }
+    SESSION_TOKEN_WARN_THRESHOLD: int = 40000  # 세션 누적 토큰(프롬프트 + 응답)이 넘으면 경고 로그
+
+    # 턴 마감 시간 (X-Turn-Deadline-Ms 헤더 / WebSocket deadline_ms가 없으면 사용, 0이면 마감 없음 = 요청이 정할 때만 적용)
+    # 단계별 예약 시간: 남은 시간이 이보다 적으면 그 단계를 저하 모드로 처리 (그 단계 + 뒤 단계에 필요한 시간)
+    # 예약 시간이 큰 순서대로 저하: LLM 평가 → 규칙, 감정 분류 → 키워드, 생성 → 템플릿, TTS → 텍스트만
+    TURN_DEADLINE_SECONDS: float = 0.0
+    TURN_DEADLINE_RESERVES: Dict[str, float] = {
+        "chat_eval": 4.0,
+        "emotion_classifier": 3.5,
+        "chat_generation": 2.5,
+        "supertone": 1.0,
+    }
+
+    # TTS 설정
+    SUPERTONE_BASE_URL: str = "https://supertoneapi.com/v1"
+    TTS_OUTPUT_FORMAT: str = "wav"  # wav | opus | aac
+    TTS_AUDIO_DIR: str = "generated_audio"  # TTS 음성 파일 저장 경로 (/audio로 서빙)
+    TTS_OPUS_BITRATE: str = "24k"
+    TTS_AAC_BITRATE: str = "48k"
+    TTS_TRANSCODE_WORKERS: int = 2
+    
+    # 호출부별 LLM 프로필 (키 = track_dependency 이름)
+    # model / temperature / max_tokens(응답 최대 토큰) / timeout(요청 타임아웃, 초) / retries(SDK 재시도) / fallback_model(실패 시 대체 모델)
+    # LLM_PROFILES_PATH JSON({"chat_eval": {"model": "..."}})은 프로필 필드 단위로 덮어쓰고, 파일이 바뀌면 다음 호출부터 반영
+    LLM_PROFILES: Dict[str, Dict[str, Any]] = {
+        "chat_generation": {"model": "gpt-4.1", "temperature": 0.7, "max_tokens": 600, "timeout": 10.0, "retries": 1, "fallback_model": "gpt-4o-mini"},
+        "chat_eval": {"model": "gpt-4o-mini", "temperature": 0.3, "max_tokens": 20, "timeout": 5.0, "retries": 1, "fallback_model": None},
+        "emotion_classifier": {"model": "gpt-4o-mini", "temperature": 0.3, "max_tokens": 400, "timeout": 5.0, "retries": 1, "fallback_model": None},
+        "action_card": {"model": "gpt-4o-mini", "temperature": 0.7, "max_tokens": 500, "timeout": 15.0, "retries": 1, "fallback_model": None},
+        "feedback": {"model": "gpt-4o-mini", "temperature": 0.3, "max_tokens": 1200, "timeout": 30.0, "retries": 2, "fallback_model": None},
+        "conversation_summary": {"model": "gpt-4o-mini", "temperature": 0.0, "max_tokens": 400, "timeout": 15.0, "retries": 2, "fallback_model": None},
+    }
+    LLM_PROFILES_PATH: Optional[str] = None
+    LLM_PROFILES_RELOAD_INTERVAL: float = 10.0  # 프로필 파일 변경 확인 주기 (초)
+
+    # 외부 API HTTP 커넥션 풀 (워커 프로세스당 OpenAI / Supertone 각 1개, 모든 도구 공유)
+    HTTP2_ENABLED: bool = True  # h2 패키지가 없으면 HTTP/1.1
+    HTTP_MAX_CONNECTIONS: int = 64
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 32
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0  # 유휴 커넥션 유지 시간 (초)
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 60.0
+    HTTP_PREWARM_ENABLED: bool = True  # 시작 시 TLS 연결 미리 맺기
+    
+    # 외부 의존성별 동시 호출 제한 (워커 프로세스 단위, AIMD로 한도 자동 조정)
+    BULKHEAD_ENABLED: bool = True
+    BULKHEAD_MAX_QUEUE: int = 64  # 의존성별 최대 대기 수 (초과 시 즉시 실패)
+    BULKHEAD_QUEUE_TIMEOUT: float = 10.0  # 최대 대기 시간 (초)
+    BULKHEAD_BACKOFF_RATIO: float = 0.75  # 실패 / 목표 지연시간 초과 시 한도 감소 비율
+    BULKHEAD_LIMITS: Dict[str, Dict[str, float]] = {
+        "chat_generation": {"initial": 8, "min": 2, "max": 32, "target_latency": 5.0},
+        "chat_eval": {"initial": 8, "min": 2, "max": 32, "target_latency": 3.0},
+        "emotion_classifier": {"initial": 8, "min": 2, "max": 32, "target_latency": 3.0},
+        "action_card": {"initial": 4, "min": 1, "max": 16, "target_latency": 8.0},
+        "feedback": {"initial": 4, "min": 1, "max": 16, "target_latency": 20.0},
+        "feedback_batch": {"initial": 4, "min": 1, "max": 8, "target_latency": 20.0},
+        "conversation_summary": {"initial": 4, "min": 1, "max": 16, "target_latency": 5.0},
+        "moderation": {"initial": 16, "min": 4, "max": 64, "target_latency": 1.5},
+        "whisper": {"initial": 8, "min": 2, "max": 32, "target_latency": 5.0},
+        "supertone": {"initial": 8, "min": 2, "max": 32, "target_latency": 4.0},
+    }
+
+    # 외부 의존성별 Circuit Breaker (열리면 규칙 / 템플릿 기반 저하 모드로 응답)
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # 연속 실패 횟수
+    CIRCUIT_FAILURE_RATE: float = 0.5  # 최근 호출 중 실패율
+    CIRCUIT_WINDOW: int = 20  # 실패율 계산에 쓰는 최근 호출 수
+    CIRCUIT_MIN_CALLS: int = 10  # 실패율 판정 최소 호출 수
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # 열린 뒤 시험 호출까지 대기 (초)
+
+    # Hedged request (멱등 호출이 최근 p90 안에 응답하지 않으면 한 번 더 요청)
+    HEDGING_ENABLED: bool = False
+    HEDGING_DEPENDENCIES: List[str] = ["chat_eval", "emotion_classifier", "moderation", "supertone"]
+    HEDGING_PERCENTILE: float = 90.0
+    HEDGING_BUDGET_RATIO: float = 0.05  # hedge 요청 수 상한 (전체 호출 대비)
+    HEDGING_MIN_SAMPLES: int = 20  # 지연시간 표본이 이보다 적으면 hedge 안 함
+    HEDGING_WINDOW: int = 200  # 백분위수 계산에 쓰는 최근 호출 수
+    HEDGING_MIN_DELAY: float = 0.05  # 최소 대기 시간 (초)
+    HEDGING_MAX_WORKERS: int = 32
+    
+    # 트레이싱 (OpenTelemetry)
+    TRACING_ENABLED: bool = True
+    TRACING_EXPORTER: str = "none"  # none | memory | file | otlp (기본 비활성, 명시적으로 선택)
+    TRACING_FILE_PATH: str = "traces/spans.jsonl"
+    TRACING_FILE_MAX_BYTES: int = 50 * 1024 * 1024  # file exporter: 이 크기를 넘으면 .1, .2 ...로 회전
+    TRACING_FILE_BACKUP_COUNT: int = 3
+    TRACING_BUFFER_SIZE: int = 2000  # memory exporter 보관 span 수
+    TRACING_SAMPLE_RATIO: float = 0.1  # BE가 샘플링한 요청은 비율과 관계없이 기록
+    TRACING_SERVICE_NAME: str = "ai-dialogue-engine"
+    
+    # 턴 기록 (재실행 비교용, opt-in)
+    TURN_RECORDING_ENABLED: bool = False
+    TURN_RECORDING_DIR: str = "recordings"
+    TURN_RECORDING_SAMPLE_RATE: float = 1.0
+    
+    # 이벤트 루프 지연 측정 주기 (초)
+    EVENT_LOOP_MONITOR_INTERVAL: float = 0.5
+
+    # 헬스 체크 (백그라운드 태스크가 주기적으로 갱신한 상태를 /health, /ready가 그대로 응답 → 프로브는 I/O 없음)
+    HEALTH_REFRESH_INTERVAL: float = 5.0
+    HEALTH_STALE_AFTER: float = 30.0  # 마지막 갱신이 이보다 오래되면 not ready (갱신 태스크 정지)
+    HEALTH_WINDOW: int = 50  # 의존성별 지연시간 / 오류율 계산에 쓰는 최근 호출 수
+    HEALTH_MIN_CALLS: int = 5  # 최근 호출이 이보다 적으면 지연시간 / 오류율로 판정하지 않음
+    HEALTH_MAX_ERROR_RATE: float = 0.5
+    HEALTH_MAX_P95_LATENCY: Dict[str, float] = {
+        "redis": 0.5,
+        "whisper": 8.0,
+        "moderation": 3.0,
+        "chat_eval": 5.0,
+        "emotion_classifier": 5.0,
+        "chat_generation": 8.0,
+        "supertone": 6.0,
+    }
+    # 이 의존성이 degraded / down이면 /ready 503 (나머지는 degraded로 표시만, 턴은 저하 모드로 응답 가능)
+    # 기본은 비어 있음: Redis 순간 장애에 모든 파드가 동시에 빠지지 않도록 (세션 경로는 Redis 없이도 저하 모드로 동작)
+    READINESS_REQUIRED_DEPENDENCIES: List[str] = []
     
     # 로그 설정
     LOG_LEVEL: str = "INFO"
@@ -0,0 +1,145 @@
+"""
+지연 의존성 컨테이너
+DialogueAgent(모든 도구와 LLM 클라이언트 포함), STT / TTS 서비스, Redis 연결처럼 생성 비용이 큰
+싱글톤을 모듈 import 시점이 아니라 처음 사용할 때 만든다.
+
+- 라우트는 FastAPI Depends로 주입받는다 (예: agent=Depends(get_agent))
+- LangChain / OpenAI 같은 무거운 모듈은 각 provider 안에서 import
+- 시작 시 warm_up()을 백그라운드에서 실행하고, 끝나면 ready를 표시해 readiness(/ready)를 연다
+- 컴포넌트별 생성 시간은 startup_report()로 확인 (/health, app.core.health가 주기적으로 수집)
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Container:
+    """이름 → provider 등록, 처음 조회할 때 생성 후 재사용"""
+
+    def __init__(self):
+        self._providers: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._init_seconds: Dict[str, float] = {}
+        # provider 안에서 다른 컴포넌트를 조회할 수 있도록 재진입 가능 락
+        self._lock = threading.RLock()
+        self.ready = threading.Event()
+
+    def register(self, name: str, provider: Callable[[], Any]):
+        self._providers[name] = provider
+
+    def resolve(self, name: str) -> Any:
+        """컴포넌트 반환 (없으면 생성)"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._providers[name]()
+                self._init_seconds[name] = round(time.perf_counter() - start, 3)
+                logger.info(f"📦 {name} 생성 완료 ({self._init_seconds[name]:.2f}초)")
+            return self._instances[name]
+
+    def get_if_created(self, name: str) -> Any:
+        """이미 생성된 컴포넌트만 반환 (없으면 None, 생성하지 않음 - 헬스 체크용)"""
+        return self._instances.get(name)
+
+    def warm_up(self, names: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        컴포넌트 미리 생성 (등록 순서대로)
+
+        Returns:
+            컴포넌트별 생성 시간 (초)
+        """
+        for name in names or list(self._providers):
+            try:
+                self.resolve(name)
+            except Exception as e:
+                logger.error(f"❌ {name} 생성 실패: {e}", exc_info=True)
+        return dict(self._init_seconds)
+
+    def startup_report(self) -> Dict:
+        """컴포넌트별 생성 시간 / 준비 여부"""
+        return {
+            "ready": self.ready.is_set(),
+            "init_seconds": dict(self._init_seconds),
+            "pending": [name for name in self._providers if name not in self._instances],
+        }
+
+
+container = Container()
+
+
+# ========================================
+# Providers (무거운 import는 생성 시점에)
+# ========================================
+
+def _redis_service():
+    from app.services.redis_service import get_redis_service
+    return get_redis_service()
+
+
+def _context_manager():
+    from app.tools.context_manager import get_context_manager
+    return get_context_manager()
+
+
+def _orchestrator():
+    from app.core.orchestrator import StageOrchestrator
+    return StageOrchestrator()
+
+
+def _agent():
+    from app.core.agent import DialogueAgent
+    return DialogueAgent()
+
+
+def _stt_service():
+    from app.services.stt_service import STTService
+    return STTService()
+
+
+def _tts_service():
+    from app.services.tts_service import get_tts_service
+    return get_tts_service()
+
+
+# warm_up 순서: Redis 연결을 먼저 (세션 조회 / STT 캐시가 공유)
+container.register("redis_service", _redis_service)
+container.register("context_manager", _context_manager)
+container.register("orchestrator", _orchestrator)
+container.register("agent", _agent)
+container.register("stt_service", _stt_service)
+container.register("tts_service", _tts_service)
+
+
+# ========================================
+# FastAPI Depends용 getter
+# ========================================
+
+def get_redis_service():
+    return container.resolve("redis_service")
+
+
+def get_context_manager():
+    return container.resolve("context_manager")
+
+
+def get_orchestrator():
+    return container.resolve("orchestrator")
+
+
+def get_agent():
+    return container.resolve("agent")
+
+
+def get_stt_service():
+    return container.resolve("stt_service")
+
+
+def get_tts_service():
+    return container.resolve("tts_service")
@@ -0,0 +1,161 @@
+"""
+턴 마감 시간 (per-turn deadline)
+BE가 정한 시간 안에 AI 응답을 돌려주도록 턴 시작 시 마감 시각을 정하고
+(X-Turn-Deadline-Ms 헤더 / WebSocket turn 메시지의 deadline_ms, 없으면 TURN_DEADLINE_SECONDS)
+STT / 안전 필터 / 평가 / 생성 / TTS가 남은 시간을 확인한다.
+
+- 외부 요청 타임아웃: 남은 시간으로 줄임 (request_timeout)
+- 단계별 저하: 남은 시간이 단계 예약 시간(TURN_DEADLINE_RESERVES, 그 단계와 뒤 단계에 필요한 시간)보다
+  적으면 외부 호출 없이 저하 모드로 처리. 예약 시간이 큰 단계부터 저하되므로 기본 순서는
+  LLM 평가 → 규칙 평가, 감정 분류 → 키워드 분류, 생성 → 템플릿 응답, TTS → 텍스트만 응답
+- 오류 / 회로 열림으로 인한 저하(degraded.record_degraded)도 같은 목록에 기록 → 응답의 degradations
+- 마감 시간 컨텍스트는 asyncio.to_thread / hedge 스레드에도 복사되어 같은 객체를 공유
+- 마감 때문에 짧아진 타임아웃은 의존성 장애가 아니므로 Circuit Breaker / Bulkhead 한도 조정에 반영하지 않음
+  (is_deadline_timeout, Bulkhead 대기도 남은 시간까지만)
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 단계(track_dependency 이름) → 저하 이름
+DEGRADATIONS = {
+    "chat_eval": "rule_evaluation",
+    "emotion_classifier": "keyword_emotion",
+    "chat_generation": "template_response",
+    "supertone": "text_only",
+    "moderation": "badword_only_safety",
+    "whisper": "stt_unavailable",
+    "conversation_summary": "rule_summary",
+}
+
+# 마감이 임박해도 외부 요청에 주는 최소 타임아웃 (초)
+MIN_REQUEST_TIMEOUT = 0.1
+
+
+class TurnDeadline:
+    """턴 1개의 마감 시각과 적용된 저하 목록"""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.degradations: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        """남은 시간 (초, 지났으면 음수)"""
+        return self.expires_at - time.monotonic()
+
+    def note(self, degradation: str):
+        with self._lock:
+            if degradation not in self.degradations:
+                self.degradations.append(degradation)
+
+
+_current_deadline: ContextVar[Optional[TurnDeadline]] = ContextVar("turn_deadline", default=None)
+
+
+def deadline_seconds(deadline_ms: Optional[int] = None) -> Optional[float]:
+    """요청이 정한 마감(ms) 또는 TURN_DEADLINE_SECONDS (0 이하 / 미설정이면 None = 마감 없음)"""
+    if deadline_ms is not None and deadline_ms > 0:
+        return deadline_ms / 1000
+    return settings.TURN_DEADLINE_SECONDS if settings.TURN_DEADLINE_SECONDS > 0 else None
+
+
+@contextmanager
+def turn_deadline(seconds: Optional[float]):
+    """
+    이 블록을 턴 1개로 보고 마감 시각 설정 (seconds가 None이면 마감 없이 저하 기록만)
+
+    Example:
+        with turn_deadline(deadline_seconds(x_turn_deadline_ms)) as deadline:
+            ...
+            deadline.degradations
+    """
+    deadline = TurnDeadline(seconds if seconds is not None else float("inf"))
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[TurnDeadline]:
+    return _current_deadline.get()
+
+
+def current_degradations() -> List[str]:
+    """이번 턴에 적용된 저하 목록 (턴 밖이면 빈 목록)"""
+    deadline = _current_deadline.get()
+    return list(deadline.degradations) if deadline is not None else []
+
+
+def note_degradation(step: str):
+    """턴 처리 중이면 저하 기록 (오류 / 회로 열림 등, 마감과 무관한 저하)"""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.note(DEGRADATIONS.get(step, step))
+
+
+def has_time_for(step: str) -> bool:
+    """
+    남은 시간이 단계 예약 시간 이상인지 (마감 없음 → True)
+    부족하면 저하를 기록하고 False → 호출자는 외부 호출 없이 저하 모드로 처리
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return True
+    remaining = deadline.remaining()
+    reserve = settings.TURN_DEADLINE_RESERVES.get(step, 0.0)
+    if remaining >= reserve:
+        return True
+
+    # metrics가 이 모듈을 import하므로 지연 import
+    from app.core.metrics import record_deadline_degradation
+    deadline.note(DEGRADATIONS.get(step, step))
+    record_deadline_degradation(step)
+    logger.warning(f"⏱️ 턴 마감 임박({remaining:.2f}초 남음, {step} 예약 {reserve}초): {DEGRADATIONS.get(step, step)}")
+    return False
+
+
+def request_timeout(default: Optional[float]) -> Optional[float]:
+    """
+    외부 요청 타임아웃 (마감이 있으면 남은 시간으로 줄임)
+
+    Returns:
+        초 단위 타임아웃 (마감도 default도 없으면 None → 호출자 기본값 사용)
+    """
+    deadline = _current_deadline.get()
+    if deadline is None or deadline.expires_at == float("inf"):
+        return default
+    remaining = max(deadline.remaining(), MIN_REQUEST_TIMEOUT)
+    return remaining if default is None else min(default, remaining)
+
+
+def timeout_kwargs(default: Optional[float] = None) -> Dict[str, float]:
+    """
+    OpenAI SDK / httpx 요청에 넘길 타임아웃 인자
+    (마감이 없으면 빈 dict → 클라이언트 기본 타임아웃, SDK는 timeout=None을 '타임아웃 없음'으로 처리하므로 넘기지 않음)
+    """
+    if request_timeout(None) is None:
+        return {}
+    return {"timeout": request_timeout(default)}
+
+
+def is_deadline_timeout(error: BaseException) -> bool:
+    """
+    턴 마감 때문에 난 타임아웃인지 (마감이 거의 지난 시점의 타임아웃 예외)
+    OpenAI SDK(APITimeoutError) / httpx(TimeoutException)는 클래스 이름으로 판별 (SDK import 없이)
+    """
+    deadline = _current_deadline.get()
+    if deadline is None or deadline.expires_at == float("inf"):
+        return False
+    if not (isinstance(error, TimeoutError) or "Timeout" in type(error).__name__):
+        return False
+    return deadline.remaining() <= MIN_REQUEST_TIMEOUT
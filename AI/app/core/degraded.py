@@ -0,0 +1,166 @@
+"""
+저하 모드 (Degraded dialogue mode)
+LLM 호출이 실패하거나 회로가 열려 있을 때 외부 호출 없이 턴을 이어가기 위한
+규칙 기반 답변 평가와 동화별 / 재시도 단계별 템플릿 응답.
+
+- 답변 평가: Stage별 키워드 / 이유 표현 규칙 (_evaluate_child_answer_with_llm 대체)
+- 대화 요약: 기존 요약 + 최근 대화 이어 붙이기 (ConversationSummarizer 대체)
+- 감정 분류: EmotionClassifierTool._fallback_classify (키워드 사전)
+- 응답 생성: 아래 템플릿 (LLM 생성 응답과 같은 형식의 질문)
+- 안전 필터: 금칙어 검사만 (SafetyFilterTool)
+- 음성 인식: 빈 결과 (무음과 같이 다시 말해 달라고 요청, STTService)
+
+턴 마감이 임박해도 같은 경로를 사용 (app.core.deadline.has_time_for)
+"""
+import logging
+from typing import Dict, List, Optional
+
+from app.core.bulkhead import BulkheadRejectedError
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.deadline import note_degradation
+from app.core.metrics import DEGRADED_RESPONSES
+from app.models.schemas import Stage
+from app.utils.name_utils import format_name_with_subject, format_name_with_vocative
+
+logger = logging.getLogger(__name__)
+
+# 회피성 답변
+_EVASIVE_ANSWERS = {"음", "어", "응", "글쎄", "몰라", "모르겠어", "몰라요", "모르겠어요", "아니", "그냥"}
+
+# 이유를 설명하는 표현 (S2, S5)
+_REASON_MARKERS = ("니까", "해서", "어서", "아서", "라서", "워서", "때문", "잖아", "거든", "못해서", "없어서")
+
+# 감정 표현 (S1, S4 평가 보조)
+_EMOTION_MARKERS = (
+    "기쁘", "기뻐", "좋아", "좋았", "행복", "즐거", "신나", "슬프", "슬퍼", "슬펐", "속상", "우울", "외로",
+    "화나", "화났", "짜증", "억울", "무서", "불안", "걱정", "두려", "놀라", "놀랐", "당황", "힘들", "미안"
+)
+
+# 동화별 재시도 템플릿 (S1 감정 선택지, S2 이유 선택지)
+STORY_TEMPLATES = {
+    "콩쥐팥쥐": {
+        "emotion_choices": ("슬펐을까", "속상했을까"),
+        "reason_choices": "혹시 혼자만 나무 호미로 힘든 일을 해야 해서 그랬을까? 아니면 새엄마가 팥쥐만 챙겨줘서 그랬을까?",
+    },
+    "가난한 유산": {
+        "emotion_choices": ("미안했을까", "걱정됐을까"),
+        "reason_choices": "혹시 물려줄 게 낡은 나무상자 하나뿐이라서 그랬을까? 아니면 마음만은 꼭 물려주고 싶어서 그랬을까?",
+    },
+    "삼년 고개": {
+        "emotion_choices": ("힘들었을까", "뿌듯했을까"),
+        "reason_choices": "혹시 돌이 너무 무거워서 그랬을까? 아니면 약속을 꼭 지키고 싶어서 그랬을까?",
+    },
+    "해님 달님": {
+        "emotion_choices": ("무서웠을까", "걱정됐을까"),
+        "reason_choices": "혹시 호랑이가 쫓아와서 그랬을까? 아니면 동생을 꼭 지켜야 해서 그랬을까?",
+    },
+    "금도끼 은도끼": {
+        "emotion_choices": ("놀랐을까", "당황했을까"),
+        "reason_choices": "혹시 소중한 도끼를 잃어버려서 그랬을까? 아니면 산신령이 갑자기 나타나서 그랬을까?",
+    },
+}
+
+_DEFAULT_TEMPLATE = {
+    "emotion_choices": ("슬펐을까", "화났을까"),
+    "reason_choices": "혹시 일이 너무 힘들어서 그랬을까? 아니면 도와주는 사람이 없어서 그랬을까?",
+}
+
+
+def is_dependency_unavailable(error: BaseException) -> bool:
+    """
+    의존성을 지금 쓸 수 없는 경우인지 (회로 열림 / 동시 호출 한도 초과 / 타임아웃)
+    → 요청 내용 문제가 아니므로 저하 모드로 응답
+    """
+    if isinstance(error, (CircuitOpenError, BulkheadRejectedError, TimeoutError)):
+        return True
+    # OpenAI SDK(APITimeoutError) / httpx(TimeoutException)는 SDK import 없이 클래스 이름으로 판별
+    return "Timeout" in type(error).__name__
+
+
+def record_degraded(component: str, error: Optional[Exception] = None):
+    """저하 모드 응답 기록 (회로 열림은 예상된 상황이므로 traceback 없이 경고만)"""
+    DEGRADED_RESPONSES.labels(component).inc()
+    note_degradation(component)
+    logger.warning(f"⚠️ {component} 저하 모드 응답: {error}")
+
+
+def evaluate_answer_by_rules(stage: Stage, child_answer: str) -> Dict:
+    """
+    규칙 기반 답변 평가 (LLM 평가 대체)
+
+    Returns:
+        {"success": bool, "reason": str}
+    """
+    text = (child_answer or "").strip()
+    compact = text.replace(" ", "").rstrip(".?!~")
+
+    if len(compact) < 2 or compact in _EVASIVE_ANSWERS:
+        success = False
+    elif stage in (Stage.S2_ASK_REASON_EMOTION_1, Stage.S5_ASK_REASON_EMOTION_2):
+        # 이유 표현이 있거나, 감정 단어만 반복한 게 아닌 충분히 긴 답변
+        success = any(marker in text for marker in _REASON_MARKERS) or (
+            len(compact) >= 5 and not any(marker in text for marker in _EMOTION_MARKERS)
+        )
+    elif stage in (Stage.S1_EMOTION_LABELING, Stage.S4_REAL_WORLD_EMOTION):
+        success = any(marker in text for marker in _EMOTION_MARKERS)
+    else:
+        success = len(compact) >= 3
+
+    return {"success": success, "reason": "규칙 기반 평가 (저하 모드)"}
+
+
+def summarize_by_rules(previous: str, new_lines: List[str], max_chars: int) -> str:
+    """
+    규칙 기반 롤링 요약 (LLM 요약 대체)
+    기존 요약 뒤에 새 대화를 붙이고, 길이를 넘으면 맨 앞(기존 요약, 없으면 첫 대화)과 최근 대화만 남긴다.
+    """
+    parts = ([previous] if previous else []) + new_lines
+    while len(parts) > 2 and len(" | ".join(parts)) > max_chars:
+        del parts[1]
+    text = " | ".join(parts)
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+# ========================================
+# 템플릿 응답 (DialogueAgent의 LLM 생성 응답 대체)
+# ========================================
+
+def _story_template(story_name: str) -> Dict:
+    return STORY_TEMPLATES.get(story_name, _DEFAULT_TEMPLATE)
+
+
+def s1_reask(child_name: str, character_name: str) -> str:
+    """S1 retry_1: 개방형 감정 재질문"""
+    return (
+        f"{format_name_with_vocative(child_name)}, 괜찮아, 천천히 생각해보자. "
+        f"{format_name_with_subject(character_name)} 어떤 기분이었을까?"
+    )
+
+
+def s1_emotion_choices(story_name: str, child_name: str, character_name: str) -> str:
+    """S1 retry_2: 동화별 감정 2지선다"""
+    first, second = _story_template(story_name)["emotion_choices"]
+    return f"{format_name_with_vocative(child_name)}, {format_name_with_subject(character_name)} {first}? 아니면 {second}?"
+
+
+def s2_reason_choices(story_name: str, child_name: str) -> str:
+    """S2 retry_2: 동화별 이유 2지선다"""
+    return f"{format_name_with_vocative(child_name)}, {_story_template(story_name)['reason_choices']}"
+
+
+def s3_situation_summary(mentioned_person: str) -> str:
+    """S3 경험 정리 + 대상 감정 질문"""
+    return f"아아, 그런 일이 있었구나. 그때 {mentioned_person} 어떤 마음이었을 것 같아?"
+
+
+def s3_experience_choices(child_name: str) -> str:
+    """S3 retry_2: 경험 2지선다"""
+    return f"{format_name_with_vocative(child_name)}, 혹시 너도 친구한테 섭섭했던 적이 있어? 아니면 가족한테 속상했던 적이 있어?"
+
+
+def s5_reason_choices(child_name: str) -> str:
+    """S5 retry_2: 경험 속 친구의 감정 이유 2지선다"""
+    return (
+        f"{format_name_with_vocative(child_name)}, 혹시 누가 같이 안 놀아줘서 그랬을까? "
+        f"아니면 속상한 일이 있어서 그랬을까?"
+    )
@@ -0,0 +1,206 @@
+"""
+헬스 체크 / Readiness (캐시된 컴포넌트 상태)
+로드밸런서 프로브마다 Redis를 조회하지 않도록, 백그라운드 태스크가 HEALTH_REFRESH_INTERVAL마다
+컴포넌트 상태를 갱신하고 /health, /ready는 마지막 결과를 그대로 응답한다.
+
+- 외부 의존성: 최근 호출(track_dependency)의 p95 지연시간 / 오류율 + Circuit Breaker 상태
+  ok: 정상 / degraded: 회로 시험 중, 오류율 또는 p95가 기준 초과 / down: 회로 열림
+- Redis: PING 지연시간 + 세션 수 (세션 인덱스 ZCARD, KEYS 사용 안 함)
+- ready: 컴포넌트 준비(container.ready) + READINESS_REQUIRED_DEPENDENCIES가 모두 ok (기본은 없음, Redis는 상세만 표시)
+  + 마지막 갱신이 HEALTH_STALE_AFTER 이내
+- 상태는 워커 프로세스 단위 (Circuit Breaker / Bulkhead와 같음)
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.bulkhead import bulkhead_status
+from app.core.circuit_breaker import circuit_status
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_DEGRADED = "degraded"
+STATUS_DOWN = "down"
+
+
+class DependencyWindow:
+    """의존성 1개의 최근 호출 (지연시간, 성공 여부)"""
+
+    def __init__(self, window: int):
+        self._calls = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self._calls.append((seconds, ok))
+
+    def stats(self) -> Dict:
+        """최근 호출 수 / 오류율 / p50, p95 지연시간 (밀리초)"""
+        with self._lock:
+            calls = list(self._calls)
+        if not calls:
+            return {"recent_calls": 0, "error_rate": 0.0, "p50_ms": None, "p95_ms": None}
+        latencies = np.array([seconds for seconds, _ in calls])
+        failures = sum(1 for _, ok in calls if not ok)
+        return {
+            "recent_calls": len(calls),
+            "error_rate": round(failures / len(calls), 3),
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+            "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1),
+        }
+
+
+# 의존성 이름 → 최근 호출
+_windows: Dict[str, DependencyWindow] = {}
+_windows_lock = threading.Lock()
+
+
+def record_dependency_call(dependency: str, seconds: float, ok: bool):
+    """외부 호출 1건 기록 (metrics.track_dependency에서 호출)"""
+    window = _windows.get(dependency)
+    if window is None:
+        with _windows_lock:
+            window = _windows.setdefault(dependency, DependencyWindow(settings.HEALTH_WINDOW))
+    window.record(seconds, ok)
+
+
+def _classify(name: str, stats: Dict, circuit: Optional[Dict]) -> str:
+    """의존성 상태 판정 (회로 → 오류율 → p95 지연시간 순)"""
+    if circuit is not None and circuit["state"] == "open":
+        return STATUS_DOWN
+    if circuit is not None and circuit["state"] == "half_open":
+        return STATUS_DEGRADED
+    if stats["recent_calls"] < settings.HEALTH_MIN_CALLS:
+        return STATUS_OK
+    if stats["error_rate"] >= settings.HEALTH_MAX_ERROR_RATE:
+        return STATUS_DEGRADED
+    max_latency = settings.HEALTH_MAX_P95_LATENCY.get(name)
+    if max_latency is not None and stats["p95_ms"] > max_latency * 1000:
+        return STATUS_DEGRADED
+    return STATUS_OK
+
+
+def dependency_health() -> Dict[str, Dict]:
+    """호출 기록 / 회로가 있는 의존성별 상태"""
+    circuits = circuit_status()
+    health = {}
+    for name in sorted(set(_windows) | set(circuits)):
+        window = _windows.get(name)
+        stats = window.stats() if window is not None else DependencyWindow(1).stats()
+        circuit = circuits.get(name)
+        health[name] = {
+            "status": _classify(name, stats, circuit),
+            **stats,
+            "circuit": circuit["state"] if circuit is not None else None,
+        }
+    return health
+
+
+class HealthMonitor:
+    """컴포넌트 상태를 주기적으로 갱신하고 마지막 결과를 보관"""
+
+    def __init__(self):
+        self._snapshot: Optional[Dict] = None
+        self._refreshed_at = 0.0
+
+    def refresh(self) -> Dict:
+        """
+        컴포넌트 상태 갱신 (동기, 백그라운드 스레드에서 호출)
+        아직 생성되지 않은 컴포넌트는 만들지 않고 건너뜀 (생성은 warm_up 담당)
+        """
+        from app.core.container import container
+
+        dependencies = dependency_health()
+        components = {}
+
+        redis_service = container.get_if_created("redis_service")
+        if redis_service is not None:
+            components["redis"] = self._check_redis(redis_service, dependencies.get("redis"))
+            dependencies["redis"] = {**dependencies.get("redis", {}), "status": components["redis"]["status"]}
+
+        stt_service = container.get_if_created("stt_service")
+        if stt_service is not None:
+            try:
+                components["stt_cache"] = stt_service.cache_stats()
+            except Exception as e:
+                components["stt_cache"] = f"error: {e}"
+
+        startup = container.startup_report()
+        required = settings.READINESS_REQUIRED_DEPENDENCIES
+        unhealthy = [
+            name for name in required
+            if dependencies.get(name, {}).get("status", STATUS_DOWN) != STATUS_OK
+        ]
+        ready = startup["ready"] and not unhealthy
+
+        if not startup["ready"]:
+            status = "starting"
+        elif unhealthy or any(d["status"] != STATUS_OK for d in dependencies.values()):
+            status = STATUS_DEGRADED
+        else:
+            status = STATUS_OK
+
+        self._snapshot = {
+            "status": status,
+            "ready": ready,
+            "unhealthy": unhealthy,
+            "checked_at": datetime.now().isoformat(),
+            "components": components,
+            "dependencies": dependencies,
+            "bulkheads": bulkhead_status(),
+            "startup": startup,
+        }
+        self._refreshed_at = time.monotonic()
+        return self._snapshot
+
+    @staticmethod
+    def _check_redis(redis_service, recent: Optional[Dict]) -> Dict:
+        """PING 지연시간 + 세션 수 (최근 세션 조회 / 저장 오류율과 회로 상태도 반영)"""
+        start = time.perf_counter()
+        if not redis_service.ping():
+            return {"status": STATUS_DOWN, "latency_ms": None, "sessions": None}
+        latency = time.perf_counter() - start
+
+        status = recent["status"] if recent is not None else STATUS_OK
+        if status == STATUS_OK and latency > settings.HEALTH_MAX_P95_LATENCY.get("redis", float("inf")):
+            status = STATUS_DEGRADED
+        return {
+            "status": status,
+            "latency_ms": round(latency * 1000, 1),
+            "sessions": redis_service.count_sessions(),
+        }
+
+    def snapshot(self) -> Dict:
+        """마지막 갱신 결과 (갱신이 멈췄으면 not ready)"""
+        if self._snapshot is None:
+            return {"status": "starting", "ready": False}
+        age = time.monotonic() - self._refreshed_at
+        snapshot = {**self._snapshot, "age_seconds": round(age, 1)}
+        if age > settings.HEALTH_STALE_AFTER:
+            snapshot.update(status="stale", ready=False)
+        return snapshot
+
+    async def run(self, interval: float):
+        """interval마다 상태 갱신 (앱 시작 시 백그라운드 태스크로 실행)"""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"❌ 헬스 상태 갱신 실패: {e}", exc_info=True)
+            await asyncio.sleep(interval)
+
+
+# Singleton 인스턴스
+_health_monitor = HealthMonitor()
+
+
+def get_health_monitor() -> HealthMonitor:
+    return _health_monitor
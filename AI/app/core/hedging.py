@@ -0,0 +1,209 @@
+"""
+Hedged request (지연 꼬리 절단)
+멱등한 외부 호출(답변 평가, 감정 분류, Moderation, TTS 합성)이 최근 p90 시간 안에
+응답하지 않으면 같은 요청을 한 번 더 보내고 먼저 끝난 결과를 사용한다.
+
+- 대기 기준: 의존성별 최근 성공 호출 시간의 백분위수 (HEDGING_PERCENTILE)
+- 예산: 호출마다 HEDGING_BUDGET_RATIO만큼 토큰이 쌓이고 hedge 1회에 1개 사용
+  → hedge 수는 누적 호출 수 × 비율을 넘지 않음
+- Bulkhead가 가득 찬 의존성에는 hedge하지 않음 (혼잡을 키우지 않도록)
+- 늦게 끝난 요청은 취소할 수 없으므로 백그라운드에서 끝까지 실행된다
+"""
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, TypeVar
+
+import numpy as np
+
+from app.core.bulkhead import get_bulkhead
+from app.core.config import settings
+from app.core.metrics import (
+    HEDGE_CALLS,
+    HEDGE_REQUESTS,
+    HEDGE_SKIPPED,
+    HEDGE_WINS,
+    track_dependency,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 예산 토큰 최대 보유량 (한가할 때 쌓인 토큰으로 한꺼번에 hedge하지 않도록)
+_BUDGET_BURST = 10.0
+
+
+class Hedger:
+    """의존성 1개의 hedge 정책 (최근 지연시간 / 예산)"""
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float,
+        budget_ratio: float,
+        min_samples: int,
+        window: int,
+        min_delay: float
+    ):
+        self.name = name
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies = deque(maxlen=window)
+        self._budget = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """성공한 호출 시간 기록"""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        두 번째 요청을 보내기 전 대기 시간
+
+        Returns:
+            초 (표본이 부족하면 None → hedge 안 함)
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            samples = list(self._latencies)
+        return max(self.min_delay, float(np.percentile(samples, self.percentile)))
+
+    def add_budget(self):
+        with self._lock:
+            self._budget = min(_BUDGET_BURST, self._budget + self.budget_ratio)
+
+    def take_budget(self) -> bool:
+        """hedge 1회분 예산 사용"""
+        with self._lock:
+            if self._budget < 1.0:
+                return False
+            self._budget -= 1.0
+            return True
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """
+        hedge 적용 호출
+
+        Args:
+            fn: 외부 호출 (멱등이어야 함)
+
+        Returns:
+            먼저 성공한 요청의 결과 (둘 다 실패하면 첫 번째 예외)
+        """
+        def attempt():
+            with track_dependency(self.name):
+                start = time.perf_counter()
+                result = fn()
+                self.observe(time.perf_counter() - start)
+            return result
+
+        HEDGE_CALLS.labels(self.name).inc()
+        self.add_budget()
+        delay = self.hedge_delay()
+        executor = get_hedge_executor()
+
+        # 트레이싱 span / 턴 수집 컨텍스트가 이어지도록 요청마다 컨텍스트 복사
+        primary = executor.submit(contextvars.copy_context().run, attempt)
+        if delay is None:
+            return primary.result()
+
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        bulkhead = get_bulkhead(self.name)
+        if bulkhead is not None and bulkhead.is_saturated():
+            HEDGE_SKIPPED.labels(self.name, "saturated").inc()
+            return primary.result()
+        if not self.take_budget():
+            HEDGE_SKIPPED.labels(self.name, "budget").inc()
+            return primary.result()
+
+        logger.info(f"⏱️ {self.name} {delay:.2f}초 내 응답 없음, hedge 요청")
+        HEDGE_REQUESTS.labels(self.name).inc()
+        hedge = executor.submit(contextvars.copy_context().run, attempt)
+
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        HEDGE_WINS.labels(self.name).inc()
+                    return future.result()
+                first_error = first_error or future.exception()
+        raise first_error
+
+
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+_hedge_executor = None
+
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """hedge 대상 호출 실행용 스레드 풀 반환"""
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedgers_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(
+                    max_workers=settings.HEDGING_MAX_WORKERS,
+                    thread_name_prefix="hedge"
+                )
+    return _hedge_executor
+
+
+def shutdown_hedge_executor():
+    """hedge 스레드 풀 종료"""
+    global _hedge_executor
+    if _hedge_executor is not None:
+        _hedge_executor.shutdown(wait=False, cancel_futures=True)
+        _hedge_executor = None
+
+
+def get_hedger(dependency: str) -> Optional[Hedger]:
+    """
+    의존성의 Hedger 반환
+
+    Returns:
+        Hedger (비활성화 또는 HEDGING_DEPENDENCIES에 없으면 None)
+    """
+    if not settings.HEDGING_ENABLED or dependency not in settings.HEDGING_DEPENDENCIES:
+        return None
+
+    hedger = _hedgers.get(dependency)
+    if hedger is None:
+        with _hedgers_lock:
+            hedger = _hedgers.setdefault(dependency, Hedger(
+                name=dependency,
+                percentile=settings.HEDGING_PERCENTILE,
+                budget_ratio=settings.HEDGING_BUDGET_RATIO,
+                min_samples=settings.HEDGING_MIN_SAMPLES,
+                window=settings.HEDGING_WINDOW,
+                min_delay=settings.HEDGING_MIN_DELAY
+            ))
+    return hedger
+
+
+def hedged_call(dependency: str, fn: Callable[[], T]) -> T:
+    """
+    외부 호출 (hedge 대상이면 hedge 적용, 아니면 track_dependency로 그대로 호출)
+
+    Example:
+        response = hedged_call("moderation", lambda: client.moderations.create(...))
+    """
+    hedger = get_hedger(dependency)
+    if hedger is None:
+        with track_dependency(dependency):
+            return fn()
+    return hedger.call(fn)
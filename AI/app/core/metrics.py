@@ -0,0 +1,389 @@
+"""
+Prometheus 메트릭
+Stage별 턴 지연시간, 외부 의존성 호출 지연시간 / 동시 호출 제한(bulkhead) / 회로 상태,
+전환/재시도/Fallback/안전 필터/캐시 카운터, 호출부별 LLM 토큰 (프롬프트 캐시 적중 포함)
+
+gunicorn 멀티 워커 환경에서는 PROMETHEUS_MULTIPROC_DIR 환경변수를 설정하면
+prometheus_client 멀티프로세스 모드로 모든 워커의 값이 합산된다.
+(gunicorn.conf.py에서 디렉토리 초기화 및 종료된 워커 정리)
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# 멀티프로세스 모드 디렉토리는 gunicorn on_starting이 만들지만, gunicorn 없이 실행하는
+# CLI(피드백 워커 / 일괄 생성 / 행동 카드 / 재실행)는 첫 메트릭 생성 전에 직접 만든다
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    REGISTRY,
+)
+from prometheus_client import multiprocess
+
+from app.core.bulkhead import BulkheadRejectedError, get_bulkhead
+from app.core.circuit_breaker import CircuitOpenError, CircuitState, get_circuit_breaker
+from app.core.deadline import is_deadline_timeout
+from app.core.health import record_dependency_call
+from app.core.tracing import get_tracer
+from app.core.turn_capture import note_dependency_call
+
+# 턴 처리는 수 초 단위, 외부 호출은 수십 ms ~ 수 초 단위
+TURN_BUCKETS = (0.25, 0.5, 1, 2, 3, 4, 5, 7.5, 10, 15, 20, 30, 60)
+DEPENDENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20, 30)
+QUEUE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+TURN_DURATION = Histogram(
+    "dialogue_turn_duration_seconds",
+    "대화 턴 전체 처리 시간 (Stage별)",
+    ["stage"],
+    buckets=TURN_BUCKETS,
+)
+
+TURNS_TOTAL = Counter(
+    "dialogue_turns_total",
+    "처리된 대화 턴 수",
+    ["stage", "status"],
+)
+
+DEPENDENCY_DURATION = Histogram(
+    "dependency_call_duration_seconds",
+    "외부 의존성 호출 시간",
+    ["dependency"],
+    buckets=DEPENDENCY_BUCKETS,
+)
+
+DEPENDENCY_ERRORS = Counter(
+    "dependency_call_errors_total",
+    "외부 의존성 호출 실패 수",
+    ["dependency"],
+)
+
+BULKHEAD_QUEUE_WAIT = Histogram(
+    "bulkhead_queue_wait_seconds",
+    "외부 의존성 동시 호출 슬롯 대기 시간",
+    ["dependency"],
+    buckets=QUEUE_WAIT_BUCKETS,
+)
+
+BULKHEAD_REJECTIONS = Counter(
+    "bulkhead_rejections_total",
+    "동시 호출 한도 초과로 거절된 호출 수",
+    ["dependency", "reason"],
+)
+
+BULKHEAD_LIMIT = Gauge(
+    "bulkhead_limit",
+    "현재 동시 호출 한도 (워커 합산)",
+    ["dependency"],
+    multiprocess_mode="livesum",
+)
+
+BULKHEAD_IN_FLIGHT = Gauge(
+    "bulkhead_in_flight",
+    "진행 중인 외부 호출 수 (워커 합산)",
+    ["dependency"],
+    multiprocess_mode="livesum",
+)
+
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit Breaker 상태 (0=closed, 1=half_open, 2=open, 워커 중 최대값)",
+    ["dependency"],
+    multiprocess_mode="livemax",
+)
+
+CIRCUIT_REJECTIONS = Counter(
+    "circuit_breaker_rejections_total",
+    "회로가 열려 호출하지 않은 수",
+    ["dependency"],
+)
+
+DEGRADED_RESPONSES = Counter(
+    "degraded_responses_total",
+    "외부 호출 대신 저하 모드(규칙 / 템플릿 / 금칙어 검사)로 처리한 수",
+    ["component"],
+)
+
+HEDGE_CALLS = Counter(
+    "hedge_eligible_calls_total",
+    "hedge 대상 외부 호출 수",
+    ["dependency"],
+)
+
+HEDGE_REQUESTS = Counter(
+    "hedge_requests_total",
+    "보낸 hedge(두 번째) 요청 수",
+    ["dependency"],
+)
+
+HEDGE_WINS = Counter(
+    "hedge_wins_total",
+    "hedge 요청이 먼저 성공한 수",
+    ["dependency"],
+)
+
+HEDGE_SKIPPED = Counter(
+    "hedge_skipped_total",
+    "hedge 조건이었지만 보내지 않은 수 (예산 소진 / bulkhead 포화)",
+    ["dependency", "reason"],
+)
+
+STAGE_TRANSITIONS = Counter(
+    "dialogue_stage_transitions_total",
+    "Stage 전환 수",
+    ["from_stage", "to_stage"],
+)
+
+STAGE_RETRIES = Counter(
+    "dialogue_stage_retries_total",
+    "Stage 재시도 수",
+    ["stage"],
+)
+
+FALLBACK_RESPONSES = Counter(
+    "dialogue_fallback_responses_total",
+    "Fallback 응답 생성 수 (generate_fallback_response)",
+    ["stage"],
+)
+
+SAFETY_FLAGS = Counter(
+    "safety_flags_total",
+    "안전 필터 감지 수",
+    ["category"],
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "캐시 조회 수",
+    ["cache", "result"],
+)
+
+FEEDBACK_STREAM_FIRST_CONTENT = Histogram(
+    "feedback_stream_first_content_seconds",
+    "피드백 스트리밍 요청부터 첫 본문 조각 전송까지 시간",
+    buckets=DEPENDENCY_BUCKETS,
+)
+
+# 프롬프트 캐시 적중률 = cached / (cached + uncached), 호출부는 track_dependency 이름
+LLM_PROMPT_TOKENS = Counter(
+    "llm_prompt_tokens_total",
+    "LLM 프롬프트 토큰 수 (cache=cached: 제공자 프롬프트 캐시 적중분)",
+    ["call_site", "cache"],
+)
+
+LLM_COMPLETION_TOKENS = Counter(
+    "llm_completion_tokens_total",
+    "LLM 응답 토큰 수",
+    ["call_site"],
+)
+
+LLM_TRUNCATIONS = Counter(
+    "llm_truncated_responses_total",
+    "max_tokens에 걸려 잘린 LLM 응답 수 (finish_reason=length)",
+    ["call_site"],
+)
+
+LLM_PROMPT_TRIMS = Counter(
+    "llm_prompt_trims_total",
+    "토큰 예산을 넘어 프롬프트 맥락을 줄인 횟수",
+    ["call_site"],
+)
+
+TURN_LLM_TOKENS = Histogram(
+    "turn_llm_tokens",
+    "턴 1개의 LLM 토큰 수 (프롬프트 + 응답, 모든 호출부 합계)",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000),
+)
+
+TURN_DEADLINE_DEGRADATIONS = Counter(
+    "turn_deadline_degradations_total",
+    "턴 마감 시간이 부족해 저하 모드로 처리한 단계",
+    ["step"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "이벤트 루프 지연 (예정보다 늦게 깨어난 시간)",
+    buckets=LOOP_LAG_BUCKETS,
+)
+
+EVENT_LOOP_LAG_CURRENT = Gauge(
+    "event_loop_lag_current_seconds",
+    "가장 최근 측정한 이벤트 루프 지연 (워커 중 최대값)",
+    multiprocess_mode="livemax",
+)
+
+
+_CIRCUIT_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+@contextmanager
+def track_dependency(dependency: str):
+    """
+    외부 의존성 호출 시간 측정 (트레이싱 중이면 span도 함께 기록)
+
+    Circuit Breaker가 열려 있으면 호출하지 않고 즉시 실패하며,
+    Bulkhead가 설정된 의존성이면 슬롯을 얻은 뒤 호출한다.
+    슬롯 대기 시간은 호출 시간에 포함하지 않는다.
+
+    Example:
+        with track_dependency("whisper"):
+            client.audio.transcriptions.create(...)
+
+    Raises:
+        CircuitOpenError: 회로가 열려 있음
+        BulkheadRejectedError: 동시 호출 한도 초과로 대기열에 들어가지 못함
+    """
+    breaker = get_circuit_breaker(dependency)
+    if breaker is not None:
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            CIRCUIT_REJECTIONS.labels(dependency).inc()
+            raise
+
+    bulkhead = get_bulkhead(dependency)
+    if bulkhead is not None:
+        try:
+            waited = bulkhead.acquire()
+        except BulkheadRejectedError as e:
+            BULKHEAD_REJECTIONS.labels(dependency, e.reason).inc()
+            if breaker is not None:
+                breaker.cancel()
+            raise
+        BULKHEAD_QUEUE_WAIT.labels(dependency).observe(waited)
+        BULKHEAD_IN_FLIGHT.labels(dependency).inc()
+
+    start = time.perf_counter()
+    ok = False
+    # 턴 마감으로 끊긴 호출은 의존성 장애가 아니므로 회로 / 한도 조정에 반영하지 않음
+    deadline_cut = False
+    try:
+        with _measure_dependency(dependency):
+            yield
+        ok = True
+    except BaseException as e:
+        deadline_cut = is_deadline_timeout(e)
+        raise
+    finally:
+        if bulkhead is not None:
+            bulkhead.release(time.perf_counter() - start, ok, adjust=not deadline_cut)
+            BULKHEAD_IN_FLIGHT.labels(dependency).dec()
+            BULKHEAD_LIMIT.labels(dependency).set(bulkhead.status()["limit"])
+        if breaker is not None:
+            if deadline_cut:
+                breaker.cancel()
+            else:
+                breaker.record(ok)
+            CIRCUIT_STATE.labels(dependency).set(_CIRCUIT_STATE_VALUES[breaker.state])
+
+
+# 진행 중인 외부 호출 이름 (LLM 토큰 사용량을 호출부별로 나누는 데 사용)
+_current_dependency: ContextVar[Optional[str]] = ContextVar("current_dependency", default=None)
+
+
+def current_dependency() -> Optional[str]:
+    """현재 컨텍스트에서 진행 중인 외부 호출 이름 (없으면 None)"""
+    return _current_dependency.get()
+
+
+@contextmanager
+def _measure_dependency(dependency: str):
+    start = time.perf_counter()
+    ok = False
+    token = _current_dependency.set(dependency)
+    try:
+        with get_tracer().start_as_current_span(f"dependency.{dependency}"):
+            yield
+        ok = True
+    except BaseException:
+        DEPENDENCY_ERRORS.labels(dependency).inc()
+        raise
+    finally:
+        _current_dependency.reset(token)
+        elapsed = time.perf_counter() - start
+        DEPENDENCY_DURATION.labels(dependency).observe(elapsed)
+        note_dependency_call(dependency, elapsed, ok)
+        record_dependency_call(dependency, elapsed, ok)
+
+
+def record_cache(cache: str, hit: bool):
+    """캐시 적중/미적중 기록"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_llm_usage(call_site: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int):
+    """LLM 호출 1건의 토큰 사용량 기록 (프롬프트는 캐시 적중 / 미적중으로 나눔)"""
+    cached_tokens = min(cached_tokens, prompt_tokens)
+    LLM_PROMPT_TOKENS.labels(call_site, "cached").inc(cached_tokens)
+    LLM_PROMPT_TOKENS.labels(call_site, "uncached").inc(prompt_tokens - cached_tokens)
+    LLM_COMPLETION_TOKENS.labels(call_site).inc(completion_tokens)
+
+
+def record_llm_truncation(call_site: str):
+    """max_tokens 때문에 응답이 잘림 (프로필 max_tokens가 너무 작다는 신호)"""
+    LLM_TRUNCATIONS.labels(call_site).inc()
+
+
+def record_prompt_trim(call_site: str):
+    """토큰 예산 초과로 프롬프트 맥락을 줄임"""
+    LLM_PROMPT_TRIMS.labels(call_site).inc()
+
+
+def record_turn_tokens(tokens: int):
+    """턴 1개의 LLM 토큰 수 기록"""
+    TURN_LLM_TOKENS.observe(tokens)
+
+
+def record_deadline_degradation(step: str):
+    """턴 마감 임박으로 단계를 저하 모드로 처리"""
+    TURN_DEADLINE_DEGRADATIONS.labels(step).inc()
+
+
+def record_turn(stage: str, duration_seconds: float, status: str = "ok"):
+    """턴 처리 시간 및 결과 기록"""
+    TURN_DURATION.labels(stage).observe(duration_seconds)
+    TURNS_TOTAL.labels(stage, status).inc()
+
+
+async def monitor_event_loop_lag(interval: float):
+    """
+    이벤트 루프 포화도 측정 (앱 시작 시 백그라운드 태스크로 실행)
+
+    interval마다 잠들었다가 실제로 깨어난 시각과의 차이를 기록한다.
+    동기 호출이 루프를 막고 있으면 이 값이 커진다.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_CURRENT.set(lag)
+
+
+def render_metrics() -> tuple:
+    """
+    /metrics 응답 본문 생성
+
+    Returns:
+        (본문 바이트, Content-Type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -13,6 +13,7 @@ from app.models.schemas import (
     Stage, DialogueTurnRequest, DialogueTurnResponse,
     StageConfig, ToolType, DialogueSession, EmotionLabel
 )
+from app.core.tracing import set_span_attributes, traced
 
 logger = logging.getLogger(__name__)
 
@@ -130,6 +131,7 @@ class StageOrchestrator:
         """Stage 설정 조회"""
         return self.stage_configs[stage]
     
+    @traced("orchestrator.should_transition")
     def should_transition_to_next_stage(
         self,
         session: DialogueSession,
@@ -150,6 +152,12 @@ class StageOrchestrator:
         """
         current_stage = session.current_stage
         config = self.stage_configs[current_stage]
+        set_span_attributes(
+            session_id=session.session_id,
+            stage=current_stage,
+            retry_count=session.retry_count,
+            max_retry=config.max_retry
+        )
         
         logger.info(f"🔍 Stage 전환 판단 시작: {current_stage.value}, 재시도 횟수: {session.retry_count}/{config.max_retry}")
         
@@ -161,6 +169,7 @@ class StageOrchestrator:
         # 1차: 규칙 기반 평가 (빠른 성공 판단)
         rule_based_success = self._check_rule_based_success(current_stage, current_result)
         logger.info(f"📊 규칙 기반 평가 결과: {rule_based_success}")
+        set_span_attributes(rule_based_success=bool(rule_based_success))
         if rule_based_success:
             logger.info(f"✅ {current_stage.value} 성공 (규칙 기반): 다음 Stage로 전환")
             return True
@@ -168,6 +177,7 @@ class StageOrchestrator:
         # 2차: LLM 평가 (규칙 기반에서 실패한 경우 정밀 평가)
         agent_success = current_result.get("llm_evaluation", {}).get("success", False)
         logger.info(f"📊 Agent LLM 평가 결과: {agent_success}")
+        set_span_attributes(llm_success=bool(agent_success))
         if agent_success:
             logger.info(f"✅ {current_stage.value} 성공 (Agent LLM 평가): 다음 Stage로 전환")
             return True
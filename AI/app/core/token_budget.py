@@ -0,0 +1,196 @@
+"""
+호출부별 프롬프트 토큰 예산 / 세션별 토큰 집계
+
+- 예산: LLM_TOKEN_BUDGETS[호출부] (호출부 = track_dependency 이름)
+  매 호출마다 바뀌는 마지막 user 메시지(대화 기록, 동화 장면, 아동 발화 등)에 적용한다.
+  고정 지침(system)은 길이가 변하지 않고 프롬프트 캐시 대상이라 예산에서 제외.
+- 넘으면 오래된 대화 기록부터 빼고, 그래도 넘으면 긴 본문(동화 장면 등)의 뒷부분을 자른다.
+- 토큰 수: tiktoken이 있으면 모델 인코딩, 없거나 인코딩 파일을 못 받으면 글자 수 기반 근사
+- 세션 집계: track_session_tokens() 안에서 일어난 LLM 호출의 토큰 수를 모아
+  (LLM Gateway 콜백이 add_session_usage로 전달) add_turn_usage로 session.token_usage[호출부]에 누적
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.metrics import record_prompt_trim, record_turn_tokens
+
+logger = logging.getLogger(__name__)
+
+# 자를 때 본문에 최소한 남길 토큰 수 (예산이 빠듯해도 장면이 통째로 사라지지 않도록)
+MIN_TEXT_TOKENS = 64
+TRUNCATION_MARK = "…"
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def load_tokenizer():
+    """tiktoken 인코딩 (처음 쓸 때 1회만 로드, 실패하면 None → 근사치 사용, 앱 시작 시 미리 호출)"""
+    global _encoding, _encoding_loaded
+    if _encoding_loaded:
+        return _encoding
+    with _encoding_lock:
+        if _encoding_loaded:
+            return _encoding
+        try:
+            import tiktoken
+            try:
+                _encoding = tiktoken.encoding_for_model(settings.TOKEN_COUNT_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.warning(f"⚠️ tiktoken 인코딩 로드 실패, 글자 수 기반 근사치 사용: {e}")
+        _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """텍스트 토큰 수 (tiktoken이 없으면 한국어 기준 약 1.5자 = 1토큰으로 근사)"""
+    if not text:
+        return 0
+    encoding = load_tokenizer()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) * 2 + 2) // 3
+
+
+def budget_for(call_site: str) -> Optional[int]:
+    """호출부 토큰 예산 (비활성화 / 미설정 / 0이면 None)"""
+    if not settings.TOKEN_BUDGET_ENABLED:
+        return None
+    return settings.LLM_TOKEN_BUDGETS.get(call_site) or None
+
+
+def within_budget(call_site: str, parts: Sequence[str]) -> bool:
+    """parts 합계가 호출부 예산 이내인지 (예산이 없으면 True)"""
+    budget = budget_for(call_site)
+    return budget is None or sum(count_tokens(part) for part in parts) <= budget
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """앞부분을 남기고 max_tokens 이하로 자름 (잘렸으면 끝에 …)"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = load_tokenizer()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens]).rstrip() + TRUNCATION_MARK
+    return text[:max_tokens * 3 // 2].rstrip() + TRUNCATION_MARK
+
+
+def fit_context(
+    call_site: str,
+    fixed: Sequence[str],
+    items: Optional[List[str]] = None,
+    text: str = "",
+    keep_first: int = 0
+) -> Tuple[List[str], str]:
+    """
+    호출부 예산에 맞게 프롬프트 맥락 줄이기
+
+    Args:
+        call_site: 호출부 (LLM_TOKEN_BUDGETS 키)
+        fixed: 줄일 수 없는 부분 (질문, 아동 발화 등)
+        items: 오래된 것부터 뺄 수 있는 항목 (시간순 대화 기록 등)
+        text: 뒷부분을 자를 수 있는 본문 (동화 장면 등)
+        keep_first: items 앞쪽에서 빼지 않고 남길 개수 (S1 첫 답변 등)
+
+    Returns:
+        (남은 items, 잘린 text) - 예산이 없거나 넘지 않으면 그대로
+    """
+    items = list(items or [])
+    budget = budget_for(call_site)
+    if budget is None:
+        return items, text
+
+    available = budget - sum(count_tokens(part) for part in fixed)
+    item_tokens = [count_tokens(item) for item in items]
+    text_tokens = count_tokens(text)
+    if sum(item_tokens) + text_tokens <= available:
+        return items, text
+
+    # 1. 오래된 항목부터 제외 (본문 최소 분량은 남겨 둠)
+    dropped = 0
+    text_floor = min(text_tokens, MIN_TEXT_TOKENS)
+    while len(items) > keep_first and sum(item_tokens) + text_floor > available:
+        del items[keep_first]
+        del item_tokens[keep_first]
+        dropped += 1
+
+    # 2. 본문 뒷부분 자르기
+    truncated = False
+    if text and sum(item_tokens) + text_tokens > available:
+        text = truncate_tokens(text, max(available - sum(item_tokens), MIN_TEXT_TOKENS))
+        truncated = True
+
+    record_prompt_trim(call_site)
+    logger.info(
+        f"✂️ 토큰 예산 초과({call_site}, 예산 {budget}): "
+        f"항목 {dropped}개 제외{', 본문 자름' if truncated else ''}"
+    )
+    return items, text
+
+
+# ========================================
+# 세션별 토큰 집계
+# ========================================
+
+_session_usage: ContextVar[Optional[Dict[str, Dict[str, int]]]] = ContextVar("session_token_usage", default=None)
+_session_usage_lock = threading.Lock()
+
+
+def add_session_usage(call_site: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int):
+    """집계 중이면 LLM 호출 1건의 토큰 수 누적 (hedge 스레드도 같은 dict를 공유하므로 lock)"""
+    usage = _session_usage.get()
+    if usage is None:
+        return
+    with _session_usage_lock:
+        totals = usage.setdefault(call_site, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["cached_tokens"] += min(cached_tokens, prompt_tokens)
+        totals["completion_tokens"] += completion_tokens
+
+
+def session_token_total(token_usage: Dict[str, Dict[str, int]]) -> int:
+    """세션 누적 토큰 수 (프롬프트 + 응답)"""
+    return sum(u.get("prompt_tokens", 0) + u.get("completion_tokens", 0) for u in token_usage.values())
+
+
+@contextmanager
+def track_session_tokens():
+    """
+    이 블록에서 일어난 LLM 호출 토큰 수를 호출부별로 모음 (턴 1개 단위)
+
+    Example:
+        with track_session_tokens() as turn_usage:
+            turn_result, session, ... = _execute_turn(session, stt_result)
+        add_turn_usage(session, turn_usage)
+    """
+    turn_usage: Dict[str, Dict[str, int]] = {}
+    token = _session_usage.set(turn_usage)
+    try:
+        yield turn_usage
+    finally:
+        _session_usage.reset(token)
+
+
+def add_turn_usage(session, turn_usage: Dict[str, Dict[str, int]]):
+    """턴 토큰 수를 session.token_usage에 누적 (누적치가 경고 기준을 처음 넘는 턴에 경고 로그)"""
+    if not turn_usage:
+        return
+    before = session_token_total(session.token_usage)
+    for call_site, totals in turn_usage.items():
+        merged = session.token_usage.setdefault(call_site, {})
+        for key, value in totals.items():
+            merged[key] = merged.get(key, 0) + value
+    turn_total = session_token_total(turn_usage)
+    record_turn_tokens(turn_total)
+
+    threshold = settings.SESSION_TOKEN_WARN_THRESHOLD
+    if before <= threshold < before + turn_total:
+        logger.warning(f"⚠️ 세션 누적 토큰 {before + turn_total}, 기준 {threshold} 초과: {session.session_id}")
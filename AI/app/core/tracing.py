@@ -0,0 +1,308 @@
+"""
+분산 트레이싱 (OpenTelemetry)
+느린 턴 하나를 BE 요청부터 STT / 안전 필터 / Stage 실행 / 전환 판단 / TTS / Redis까지 추적
+
+- BE가 보낸 traceparent 헤더(W3C Trace Context)를 이어받아 같은 trace로 기록
+- ParentBased + TraceIdRatio 샘플링: BE가 샘플링한 요청은 항상, 나머지는 비율만큼 기록
+- Exporter 선택 (TRACING_EXPORTER)
+    memory : 프로세스 내 최근 span 버퍼 (DEBUG일 때만 /debug/traces 조회 가능)
+    file   : JSON Lines 파일 (외부 collector 불필요, TRACING_FILE_MAX_BYTES마다 회전)
+    otlp   : OTLP collector (opentelemetry-exporter-otlp 설치 시)
+    none   : 비활성화 (기본값)
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "app"
+
+
+def _span_to_dict(span: ReadableSpan) -> Dict:
+    """span → 직렬화 가능한 dict"""
+    context = span.get_span_context()
+    duration_ms = None
+    if span.start_time and span.end_time:
+        duration_ms = round((span.end_time - span.start_time) / 1e6, 3)
+
+    return {
+        "name": span.name,
+        "trace_id": format(context.trace_id, "032x"),
+        "span_id": format(context.span_id, "016x"),
+        "parent_span_id": format(span.parent.span_id, "016x") if span.parent else None,
+        "kind": span.kind.name,
+        "start_time_ns": span.start_time,
+        "duration_ms": duration_ms,
+        "status": span.status.status_code.name,
+        "status_description": span.status.description,
+        "attributes": dict(span.attributes or {}),
+        "events": [
+            {"name": event.name, "attributes": dict(event.attributes or {})}
+            for event in span.events
+        ],
+    }
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """span을 JSON Lines 파일에 추가 기록 (크기 기준 회전: spans.jsonl → spans.jsonl.1 → ...)"""
+
+    def __init__(self, file_path: str, max_bytes: int = 0, backup_count: int = 0):
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(
+            json.dumps(_span_to_dict(span), ensure_ascii=False, default=str) + "\n"
+            for span in spans
+        )
+        try:
+            # 여러 워커가 같은 파일에 쓰므로 배치를 한 번에 append
+            with self._lock:
+                self._rotate_if_needed()
+                with open(self.file_path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+            return SpanExportResult.SUCCESS
+        except OSError as e:
+            logger.warning(f"⚠️ span 파일 기록 실패: {e}")
+            return SpanExportResult.FAILURE
+
+    def _rotate_if_needed(self):
+        """파일이 max_bytes 이상이면 백업으로 밀어내고 새 파일 시작 (0이면 회전 안 함)"""
+        if self.max_bytes <= 0:
+            return
+        try:
+            if os.path.getsize(self.file_path) < self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+        try:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.file_path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.file_path}.{index + 1}")
+            if self.backup_count > 0:
+                os.replace(self.file_path, f"{self.file_path}.1")
+            else:
+                os.remove(self.file_path)
+        except OSError as e:
+            # 다른 워커가 먼저 회전한 경우 등 → 회전은 건너뛰고 계속 기록
+            logger.debug(f"span 파일 회전 건너뜀: {e}")
+
+    def shutdown(self):
+        pass
+
+
+class BufferSpanExporter(SpanExporter):
+    """최근 span을 메모리에 보관 (크기 제한)"""
+
+    def __init__(self, max_spans: int = 2000):
+        self._spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        with self._lock:
+            self._spans.extend(_span_to_dict(span) for span in spans)
+        return SpanExportResult.SUCCESS
+
+    def get_spans(self, trace_id: Optional[str] = None) -> List[Dict]:
+        """보관 중인 span 조회 (trace_id 지정 시 해당 trace만)"""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id:
+            spans = [s for s in spans if s["trace_id"] == trace_id]
+        return spans
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self):
+        pass
+
+
+_provider: Optional[TracerProvider] = None
+_buffer_exporter: Optional[BufferSpanExporter] = None
+
+
+def _create_exporter(name: str) -> Optional[SpanExporter]:
+    """설정 이름으로 exporter 생성"""
+    global _buffer_exporter
+
+    if name == "file":
+        return JsonFileSpanExporter(
+            settings.TRACING_FILE_PATH,
+            max_bytes=settings.TRACING_FILE_MAX_BYTES,
+            backup_count=settings.TRACING_FILE_BACKUP_COUNT
+        )
+    if name == "memory":
+        _buffer_exporter = BufferSpanExporter(settings.TRACING_BUFFER_SIZE)
+        return _buffer_exporter
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("⚠️ opentelemetry-exporter-otlp 미설치, 트레이싱 비활성화")
+            return None
+        return OTLPSpanExporter()
+    if name != "none":
+        logger.warning(f"⚠️ 알 수 없는 TRACING_EXPORTER: {name}, 트레이싱 비활성화")
+    return None
+
+
+def setup_tracing(exporter: Optional[SpanExporter] = None) -> Optional[TracerProvider]:
+    """
+    TracerProvider 초기화 (워커 프로세스당 1회, 앱 시작 시 호출)
+
+    Args:
+        exporter: 직접 지정할 exporter (없으면 TRACING_EXPORTER 설정 사용)
+
+    Returns:
+        TracerProvider 또는 None (비활성화)
+    """
+    global _provider
+
+    if _provider is not None:
+        return _provider
+    if not settings.TRACING_ENABLED:
+        logger.info("트레이싱 비활성화")
+        return None
+
+    exporter = exporter or _create_exporter(settings.TRACING_EXPORTER.lower())
+    if exporter is None:
+        return None
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    if isinstance(exporter, BufferSpanExporter):
+        # 메모리 버퍼는 바로 조회할 수 있도록 동기 처리
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    else:
+        provider.add_span_processor(BatchSpanProcessor(exporter, max_queue_size=2048))
+
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    logger.info(
+        f"✅ 트레이싱 초기화: exporter={type(exporter).__name__}, "
+        f"sample_ratio={settings.TRACING_SAMPLE_RATIO}"
+    )
+    return provider
+
+
+def shutdown_tracing():
+    """남은 span flush 후 종료"""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def get_tracer() -> trace.Tracer:
+    """트레이서 조회 (초기화 전에는 no-op)"""
+    return trace.get_tracer(TRACER_NAME)
+
+
+def get_buffered_spans(trace_id: Optional[str] = None) -> Optional[List[Dict]]:
+    """메모리 exporter에 보관된 span 조회 (memory exporter가 아니면 None)"""
+    if _buffer_exporter is None:
+        return None
+    return _buffer_exporter.get_spans(trace_id)
+
+
+def set_span_attributes(**attributes):
+    """현재 span에 속성 추가 (None 값은 제외, 샘플링되지 않은 span이면 무시)"""
+    span = trace.get_current_span()
+    if not span.is_recording():
+        return
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if hasattr(value, "value"):  # Enum (Stage 등)
+            value = value.value
+        span.set_attribute(key, value)
+
+
+def current_trace_id() -> Optional[str]:
+    """현재 trace ID (16진수), 샘플링되지 않았으면 None"""
+    context = trace.get_current_span().get_span_context()
+    if not context.is_valid or not context.trace_flags.sampled:
+        return None
+    return format(context.trace_id, "032x")
+
+
+@contextmanager
+def start_server_span(name: str, headers, **attributes):
+    """
+    들어온 요청의 헤더(traceparent)를 이어받아 SERVER span 시작
+
+    Args:
+        name: span 이름
+        headers: 요청 헤더 (Mapping)
+        **attributes: span 속성
+    """
+    context = propagate.extract(headers)
+    with get_tracer().start_as_current_span(
+        name, context=context, kind=SpanKind.SERVER
+    ) as span:
+        set_span_attributes(**attributes)
+        yield span
+
+
+def traced(name: str):
+    """
+    함수 실행을 span으로 기록하는 데코레이터 (sync / async 모두 지원)
+
+    Example:
+        @traced("stt.transcribe")
+        async def transcribe_audio_file(...): ...
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().start_as_current_span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().start_as_current_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def mark_span_error(error: BaseException):
+    """현재 span을 오류로 표시"""
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.record_exception(error)
+        span.set_status(Status(StatusCode.ERROR, str(error)))
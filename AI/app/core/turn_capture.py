@@ -0,0 +1,107 @@
+"""
+턴 단위 외부 호출 수집
+한 턴 처리 동안 발생한 외부 의존성 호출 시간과 LLM 토큰 사용량을 모은다.
+(턴 기록 / 재실행 비교용)
+
+- 외부 호출 시간: metrics.track_dependency가 note_dependency_call로 전달
+- 토큰 사용량: LangChain 콜백 훅으로 모든 ChatOpenAI 호출에서 자동 수집
+  (metrics가 이 모듈을 import하므로 langchain_core는 처음 수집할 때 import)
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+
+class TurnCapture:
+    """턴 1개 동안의 외부 호출 기록"""
+
+    def __init__(self):
+        self.calls: List[Dict] = []
+        self.llm_usage: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def add_call(self, dependency: str, seconds: float, ok: bool):
+        with self._lock:
+            self.calls.append({
+                "dependency": dependency,
+                "duration_ms": round(seconds * 1000, 1),
+                "ok": ok
+            })
+
+    def add_llm_usage(self, model: Optional[str], usage: Dict, call_site: Optional[str] = None):
+        details = usage.get("prompt_tokens_details") or {}
+        with self._lock:
+            self.llm_usage.append({
+                "model": model,
+                "call_site": call_site,
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "cached_tokens": details.get("cached_tokens", 0) or 0
+            })
+
+    def token_totals(self) -> Dict[str, int]:
+        """토큰 사용량 합계"""
+        return {
+            key: sum(u[key] for u in self.llm_usage)
+            for key in ("prompt_tokens", "completion_tokens", "cached_tokens")
+        }
+
+
+_current_capture: ContextVar[Optional[TurnCapture]] = ContextVar("turn_capture", default=None)
+_usage_handler: ContextVar = ContextVar("turn_capture_llm_usage", default=None)
+_usage_handler_class = None
+_usage_handler_lock = threading.Lock()
+
+
+def _make_usage_handler(capture: TurnCapture):
+    """ChatOpenAI 응답의 token_usage를 capture에 기록하는 LangChain 콜백 (첫 호출 시 훅 등록)"""
+    global _usage_handler_class
+    if _usage_handler_class is None:
+        with _usage_handler_lock:
+            if _usage_handler_class is None:
+                from langchain_core.callbacks import BaseCallbackHandler
+                from langchain_core.tracers.context import register_configure_hook
+
+                class _LLMUsageHandler(BaseCallbackHandler):
+                    def __init__(self, capture: TurnCapture):
+                        self.capture = capture
+
+                    def on_llm_end(self, response, **kwargs):
+                        from app.core.metrics import current_dependency
+
+                        llm_output = response.llm_output or {}
+                        usage = llm_output.get("token_usage")
+                        if usage:
+                            self.capture.add_llm_usage(llm_output.get("model_name"), usage, current_dependency())
+
+                register_configure_hook(_usage_handler, inheritable=True)
+                _usage_handler_class = _LLMUsageHandler
+    return _usage_handler_class(capture)
+
+
+@contextmanager
+def capture_turn():
+    """
+    현재 컨텍스트(스레드)에서 외부 호출 수집 시작
+
+    Example:
+        with capture_turn() as capture:
+            agent.execute_stage_turn(...)
+        capture.calls, capture.token_totals()
+    """
+    capture = TurnCapture()
+    capture_token = _current_capture.set(capture)
+    handler_token = _usage_handler.set(_make_usage_handler(capture))
+    try:
+        yield capture
+    finally:
+        _usage_handler.reset(handler_token)
+        _current_capture.reset(capture_token)
+
+
+def note_dependency_call(dependency: str, seconds: float, ok: bool):
+    """수집 중이면 외부 호출 시간 기록"""
+    capture = _current_capture.get()
+    if capture is not None:
+        capture.add_call(dependency, seconds, ok)
@@ -10,14 +10,22 @@ load_dotenv(env_path)
 # load_dotenv()
 # print("Loaded key:", os.getenv("OPENAI_API_KEY"))
 
-from fastapi import FastAPI
+import time
+
+# 콜드 스타트 측정 (앱 모듈 import 시간)
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import logging
 import sys
 from pathlib import Path
 
 from app.api.v1 import dialogue
+from app.core.config import settings
+from app.core.tracing import current_trace_id, start_server_span
 
 # 로깅 설정
 logging.basicConfig(
@@ -46,9 +54,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """요청별 SERVER span (BE의 traceparent 헤더를 이어받음)"""
+    with start_server_span(
+        f"{request.method} {request.url.path}",
+        request.headers,
+        **{"http.method": request.method, "http.target": request.url.path}
+    ) as span:
+        response = await call_next(request)
+        
+        # 경로 파라미터(session_id 등)가 span 이름에 들어가지 않도록 라우트 템플릿 사용
+        route = request.scope.get("route")
+        if route is not None and span.is_recording():
+            span.update_name(f"{request.method} {route.path}")
+            span.set_attribute("http.route", route.path)
+        span.set_attribute("http.status_code", response.status_code)
+        
+        trace_id = current_trace_id()
+        if trace_id:
+            response.headers["X-Trace-Id"] = trace_id
+        return response
+
+
 # 정적 파일 서빙 (TTS 음성 파일)
-audio_dir = Path("generated_audio")
-audio_dir.mkdir(exist_ok=True)
+audio_dir = Path(settings.TTS_AUDIO_DIR)
+audio_dir.mkdir(parents=True, exist_ok=True)
 app.mount("/audio", StaticFiles(directory=str(audio_dir)), name="audio")
 
 # 라우터 등록
@@ -58,6 +91,60 @@ app.include_router(
     tags=["dialogue"]
 )
 
+IMPORT_SECONDS = round(time.perf_counter() - _IMPORT_STARTED, 3)
+
+
+async def _warm_up():
+    """
+    컴포넌트 생성 + 외부 API 연결 예열 (백그라운드)
+    끝나면 /ready가 200을 반환해 트래픽을 받기 시작한다.
+    어느 단계가 실패해도 ready는 표시한다 (실제 의존성 상태는 HealthMonitor가 readiness에 반영)
+    """
+    from app.core.config import settings
+    from app.core.container import container
+    from app.core.health import get_health_monitor
+    
+    init_seconds = {}
+    try:
+        init_seconds = await asyncio.to_thread(container.warm_up)
+        
+        # 세션 인덱스 도입 전 세션을 인덱스에 추가 (/health 세션 수, 최초 1회)
+        try:
+            redis_service = container.get_if_created("redis_service")
+            if redis_service is not None:
+                await asyncio.to_thread(redis_service.backfill_session_index)
+        except Exception as e:
+            logger.error(f"❌ 세션 인덱스 보충 실패: {e}", exc_info=True)
+        
+        # 토큰 예산용 tiktoken 인코딩 (첫 턴에 인코딩 파일을 받지 않도록)
+        if settings.TOKEN_BUDGET_ENABLED:
+            try:
+                from app.core.token_budget import load_tokenizer
+                await asyncio.to_thread(load_tokenizer)
+            except Exception as e:
+                logger.error(f"❌ tiktoken 인코딩 로드 실패: {e}", exc_info=True)
+        
+        if settings.HTTP_PREWARM_ENABLED:
+            try:
+                from app.services.llm_gateway import get_llm_gateway
+                await asyncio.to_thread(get_llm_gateway().prewarm)
+            except Exception as e:
+                logger.error(f"❌ 외부 API 연결 예열 실패: {e}", exc_info=True)
+    except Exception as e:
+        logger.error(f"❌ 컴포넌트 준비 실패: {e}", exc_info=True)
+    finally:
+        container.ready.set()
+    
+    # readiness를 다음 주기까지 기다리지 않고 바로 반영
+    try:
+        await asyncio.to_thread(get_health_monitor().refresh)
+    except Exception as e:
+        logger.error(f"❌ 헬스 상태 갱신 실패: {e}", exc_info=True)
+    logger.info(
+        f"🚀 서버 준비 완료: import {IMPORT_SECONDS:.2f}초, "
+        f"컴포넌트 {sum(init_seconds.values()):.2f}초 {init_seconds}"
+    )
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -66,42 +153,51 @@ async def startup_event():
     logger.info("AI Dialogue Agent Engine 시작")
     logger.info("=" * 60)
     
-    # Tools 초기화 (싱글톤)
-    from app.tools.emotion_classifier import get_emotion_classifier
-    from app.tools.context_manager import get_context_manager
-    from app.services.redis_service import get_redis_service
-    from app.services.tts_service import get_tts_service
-    
-    # Redis 연결 확인
-    try:
-        logger.info("Redis 연결 확인 중...")
-        redis_service = get_redis_service()
-        if redis_service.ping():
-            logger.info("✅ Redis 연결 성공")
-        else:
-            logger.warning("⚠️ Redis 연결 실패, 메모리 모드로 전환")
-    except Exception as e:
-        logger.warning(f"⚠️ Redis 사용 불가: {e}")
-    
-    logger.info("감정 분류기 초기화 중 (GPT 기반)...")
-    get_emotion_classifier()
-    logger.info("✅ 감정 분류기 초기화 완료")
+    from app.core.tracing import setup_tracing
+    setup_tracing()
     
-    logger.info("컨텍스트 매니저 초기화...")
-    get_context_manager()
-    logger.info("✅ 컨텍스트 매니저 초기화 완료")
+    # 이벤트 루프 지연 측정 (부하 테스트 시 포화도 지표)
+    from app.core.config import settings
+    from app.core.metrics import monitor_event_loop_lag
+    app.state.loop_monitor = asyncio.create_task(
+        monitor_event_loop_lag(settings.EVENT_LOOP_MONITOR_INTERVAL)
+    )
     
-    logger.info("TTS 서비스 초기화...")
-    get_tts_service()
-    logger.info("✅ TTS 서비스 초기화 완료")
+    # 컴포넌트 상태 주기 갱신 (/health, /ready는 갱신된 결과만 응답)
+    from app.core.health import get_health_monitor
+    app.state.health_monitor = asyncio.create_task(
+        get_health_monitor().run(settings.HEALTH_REFRESH_INTERVAL)
+    )
     
-    logger.info("🚀 서버 준비 완료")
+    # Redis 연결 / Agent / STT / TTS 생성과 연결 예열은 백그라운드에서 (준비 여부는 /ready)
+    app.state.warmup = asyncio.create_task(_warm_up())
+    logger.info(f"서버 시작 (앱 import {IMPORT_SECONDS:.2f}초), 컴포넌트 준비 중...")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """앱 종료 시 실행"""
     logger.info("서버 종료 중...")
+    
+    for task_name in ("loop_monitor", "health_monitor"):
+        task = getattr(app.state, task_name, None)
+        if task is not None:
+            task.cancel()
+    
+    from app.services.tts_service import shutdown_transcode_executor
+    shutdown_transcode_executor()
+    
+    from app.core.hedging import shutdown_hedge_executor
+    shutdown_hedge_executor()
+    
+    from app.services.conversation_summary import shutdown_conversation_summarizer
+    shutdown_conversation_summarizer()
+    
+    from app.services.llm_gateway import shutdown_llm_gateway
+    shutdown_llm_gateway()
+    
+    from app.core.tracing import shutdown_tracing
+    shutdown_tracing()
 
 
 @app.get("/")
@@ -114,42 +210,64 @@ async def root():
     }
 
 
+@app.get("/live")
+async def liveness():
+    """Liveness (프로세스 / 이벤트 루프가 응답하면 200, 외부 의존성은 확인하지 않음)"""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def readiness():
+    """
+    Readiness (백그라운드에서 갱신한 상태, 프로브 요청은 I/O 없음)
+    컴포넌트 생성 / 연결 예열 전, 필수 의존성(READINESS_REQUIRED_DEPENDENCIES) 이상,
+    상태 갱신이 멈춘 경우 503
+    """
+    from app.core.health import get_health_monitor
+    snapshot = get_health_monitor().snapshot()
+    report = {
+        key: snapshot.get(key)
+        for key in ("status", "ready", "unhealthy", "checked_at", "age_seconds", "startup")
+        if key in snapshot
+    }
+    if not snapshot["ready"]:
+        raise HTTPException(status_code=503, detail=report)
+    return report
+
+
 @app.get("/health")
 async def health_check():
-    """상세 헬스 체크"""
-    # 각 컴포넌트 상태 확인
-    status = {
-        "api": "ok",
-        "redis": "unknown",
-        "emotion_classifier": "ok",
-        "context_manager": "ok"
-    }
-    
-    # Redis 상태
-    try:
-        from app.services.redis_service import get_redis_service
-        redis_service = get_redis_service()
-        if redis_service.ping():
-            status["redis"] = "ok"
-            status["redis_sessions"] = redis_service.count_sessions()
-        else:
-            status["redis"] = "disconnected"
-    except Exception as e:
-        status["redis"] = f"error: {str(e)}"
-    
-    # Emotion Classifier 상태
-    try:
-        from app.tools.emotion_classifier import get_emotion_classifier
-        classifier = get_emotion_classifier()
-        if classifier:
-            status["emotion_classifier"] = "ok"
-    except Exception as e:
-        status["emotion_classifier"] = f"error: {str(e)}"
-    
-    return {
-        "status": "ok",
-        "components": status
-    }
+    """
+    상세 헬스 체크 (백그라운드에서 갱신한 상태)
+    Redis 지연시간 / 세션 수, 외부 의존성별 p95 지연시간 / 오류율 / 회로 상태,
+    의존성별 동시 호출 한도, STT 캐시 적중 통계, 콜드 스타트 시간 (이 워커 기준)
+    """
+    from app.core.health import get_health_monitor
+    snapshot = get_health_monitor().snapshot()
+    startup = {"import_seconds": IMPORT_SECONDS, **snapshot.get("startup", {})}
+    return {**snapshot, "startup": startup}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 메트릭 (gunicorn 멀티 워커 합산)"""
+    from app.core.metrics import render_metrics
+    data, content_type = render_metrics()
+    return Response(content=data, media_type=content_type)
+
+
+async def get_trace(trace_id: str):
+    """메모리 exporter에 보관된 trace 조회 (TRACING_EXPORTER=memory)"""
+    from app.core.tracing import get_buffered_spans
+    spans = get_buffered_spans(trace_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="memory exporter가 아닙니다")
+    return {"trace_id": trace_id, "spans": sorted(spans, key=lambda s: s["start_time_ns"])}
+
+
+# 인증 없는 디버그 엔드포인트 (세션별 span 노출) → DEBUG + memory exporter를 명시적으로 켠 경우에만 등록
+if settings.DEBUG and settings.TRACING_EXPORTER == "memory":
+    app.add_api_route("/debug/traces/{trace_id}", get_trace, methods=["GET"], include_in_schema=False)
 
 
 if __name__ == "__main__":
@@ -188,6 +188,7 @@ class DialogueTurnResponse(BaseModel):
     
     # 메타데이터
     processing_time_ms: int = Field(..., description="처리 시간 (밀리초)")
+    degradations: List[str] = Field(default_factory=list, description="이번 턴에 적용된 저하 모드 (rule_evaluation, template_response, text_only 등)")
     timestamp: datetime = Field(default_factory=datetime.now)
     
     class Config:
@@ -217,6 +218,13 @@ class ErrorResponse(BaseModel):
 # Session Management
 # ========================================
 
+class ConversationSummary(BaseModel):
+    """롤링 대화 요약 (key_moments 앞쪽 version개를 요약, 턴 처리 후 백그라운드에서 증분 갱신)"""
+    version: int = 0  # 요약에 반영된 key_moments 수 (클수록 최신)
+    text: str = ""
+    updated_at: Optional[datetime] = None
+
+
 class DialogueSession(BaseModel):
     """대화 세션 (메모리 또는 DB 저장)"""
     session_id: str
@@ -232,6 +240,8 @@ class DialogueSession(BaseModel):
     emotion_history: List[EmotionLabel] = []
     key_moments: List[Dict] = []  # {"stage": "S2", "content": "엄마가 화났어요"}
     context: Dict[str, Any] = Field(default_factory=dict)
+    summary: ConversationSummary = Field(default_factory=ConversationSummary)
+    token_usage: Dict[str, Dict[str, int]] = Field(default_factory=dict)  # 호출부별 LLM 토큰 누적 {"chat_eval": {"calls", "prompt_tokens", ...}}
     
     # 메타데이터
     created_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,160 @@
+"""
+Audio Preprocessor: Whisper 호출 전 오디오 전처리
+- 메모리 내 디코딩 (16kHz mono PCM)
+- 프레임 에너지 기반 VAD로 무음 판별 (무음이면 Whisper 호출 생략)
+- 앞뒤 무음 제거 후 WAV 또는 Opus로 재인코딩
+"""
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.audio_utils import (
+    TARGET_SAMPLE_RATE,
+    decode_to_pcm,
+    frame_energies_db,
+    pcm_to_opus_bytes,
+    pcm_to_wav_bytes,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AudioPreprocessor:
+    """STT 입력 오디오 전처리기"""
+
+    def __init__(
+        self,
+        frame_ms: int = None,
+        energy_threshold_db: float = None,
+        noise_margin_db: float = None,
+        min_speech_ms: int = None,
+        padding_ms: int = None,
+        upload_format: str = None
+    ):
+        self.frame_ms = frame_ms or settings.STT_VAD_FRAME_MS
+        self.energy_threshold_db = (
+            energy_threshold_db if energy_threshold_db is not None
+            else settings.STT_VAD_ENERGY_THRESHOLD_DB
+        )
+        self.noise_margin_db = (
+            noise_margin_db if noise_margin_db is not None
+            else settings.STT_VAD_NOISE_MARGIN_DB
+        )
+        self.noise_edge_ms = settings.STT_VAD_NOISE_EDGE_MS
+        self.noise_floor_max_db = settings.STT_VAD_NOISE_FLOOR_MAX_DB
+        self.min_speech_ms = min_speech_ms or settings.STT_VAD_MIN_SPEECH_MS
+        self.padding_ms = padding_ms if padding_ms is not None else settings.STT_VAD_PADDING_MS
+        self.upload_format = (upload_format or settings.STT_UPLOAD_FORMAT).lower()
+
+    def detect_speech(self, pcm: np.ndarray) -> Optional[tuple]:
+        """
+        프레임 에너지 기반 음성 구간 탐지
+
+        고정 하한(energy_threshold_db)을 넘는 프레임이 없으면(min_speech_ms 미만) 무음으로 본다.
+        구간을 자를 때는 고정 하한과 배경 소음 추정치 + noise_margin_db 중 큰 값을 쓰며,
+        소음은 앞뒤 noise_edge_ms 프레임의 하위 10% 에너지로 추정하고 noise_floor_max_db를 넘지 않게 한다.
+        (무음 없이 처음부터 끝까지 말한 녹음도 발화로 판정)
+
+        Args:
+            pcm: 16kHz int16 PCM 샘플 배열
+
+        Returns:
+            (시작 샘플, 끝 샘플) 또는 음성이 없으면 None
+        """
+        energies = frame_energies_db(pcm, TARGET_SAMPLE_RATE, self.frame_ms)
+        if len(energies) == 0:
+            return None
+
+        loud_frames = np.flatnonzero(energies > self.energy_threshold_db)
+        if len(loud_frames) * self.frame_ms < self.min_speech_ms:
+            return None
+
+        edge = max(1, self.noise_edge_ms // self.frame_ms)
+        edges = np.concatenate([energies[:edge], energies[-edge:]])
+        noise_floor = min(float(np.percentile(edges, 10)), self.noise_floor_max_db)
+        threshold = max(self.energy_threshold_db, noise_floor + self.noise_margin_db)
+        speech_frames = np.flatnonzero(energies > threshold)
+        if len(speech_frames) == 0:
+            speech_frames = loud_frames
+
+        frame_len = TARGET_SAMPLE_RATE * self.frame_ms // 1000
+        padding = TARGET_SAMPLE_RATE * self.padding_ms // 1000
+        start = max(0, int(speech_frames[0]) * frame_len - padding)
+        end = min(len(pcm), (int(speech_frames[-1]) + 1) * frame_len + padding)
+        return start, end
+
+    def encode(self, pcm: np.ndarray) -> tuple:
+        """
+        Whisper 업로드용 인코딩
+
+        Returns:
+            (파일명, 오디오 바이트)
+        """
+        if self.upload_format == "opus":
+            try:
+                return "audio.ogg", pcm_to_opus_bytes(pcm, TARGET_SAMPLE_RATE)
+            except Exception as e:
+                logger.warning(f"⚠️ Opus 인코딩 실패, WAV로 전송: {e}")
+
+        return "audio.wav", pcm_to_wav_bytes(pcm, TARGET_SAMPLE_RATE)
+
+    def process(self, audio_bytes: bytes) -> Dict:
+        """
+        오디오 전처리 (디코딩 → VAD → 무음 제거 → 재인코딩)
+
+        Args:
+            audio_bytes: 업로드된 원본 오디오 바이트
+
+        Returns:
+            {
+                "has_speech": 음성 포함 여부,
+                "filename": 업로드용 파일명 (음성 없으면 None),
+                "audio_bytes": 업로드용 바이트 (음성 없으면 None),
+                "duration_ms": 원본 길이,
+                "speech_ms": 무음 제거 후 길이
+            }
+        """
+        pcm = decode_to_pcm(audio_bytes, TARGET_SAMPLE_RATE)
+        duration_ms = int(len(pcm) * 1000 / TARGET_SAMPLE_RATE)
+
+        segment = self.detect_speech(pcm)
+        if segment is None:
+            logger.info(f"🔇 음성 구간 없음 (길이: {duration_ms}ms), Whisper 호출 생략")
+            return {
+                "has_speech": False,
+                "filename": None,
+                "audio_bytes": None,
+                "duration_ms": duration_ms,
+                "speech_ms": 0
+            }
+
+        start, end = segment
+        trimmed = pcm[start:end]
+        filename, encoded = self.encode(trimmed)
+        speech_ms = int(len(trimmed) * 1000 / TARGET_SAMPLE_RATE)
+
+        logger.info(
+            f"🎚️ 오디오 전처리 완료: {duration_ms}ms → {speech_ms}ms, "
+            f"{len(audio_bytes)} → {len(encoded)} bytes ({filename})"
+        )
+
+        return {
+            "has_speech": True,
+            "filename": filename,
+            "audio_bytes": encoded,
+            "duration_ms": duration_ms,
+            "speech_ms": speech_ms
+        }
+
+
+# 싱글톤 인스턴스
+_audio_preprocessor_instance = None
+
+def get_audio_preprocessor() -> AudioPreprocessor:
+    """AudioPreprocessor 싱글톤 인스턴스 반환"""
+    global _audio_preprocessor_instance
+    if _audio_preprocessor_instance is None:
+        _audio_preprocessor_instance = AudioPreprocessor()
+    return _audio_preprocessor_instance
@@ -0,0 +1,250 @@
+"""
+롤링 대화 요약
+턴이 끝날 때마다 새로 쌓인 key_moments만 기존 요약에 합쳐(증분) 짧은 요약 하나로 유지한다.
+갱신은 응답을 보낸 뒤 백그라운드 스레드에서 하고, 평가 프롬프트 / S6 / 긴 대화의 부모 피드백은
+원문 전체 대신 "요약 + 아직 요약에 반영되지 않은 최근 대화"를 사용한다.
+
+- 버전: 요약에 반영된 key_moments 수 (더 큰 버전만 저장 → 늦게 끝난 갱신이 최신 요약을 덮지 않음)
+- 저장: "{CONVERSATION_SUMMARY_PREFIX}{session_id}" 키 (세션 저장과 분리해 턴 처리 중 세션 저장과 경합하지 않음)
+  읽을 때 더 새로운 요약이면 session.summary에 반영 → 다음 세션 저장 때 함께 저장
+- 크기: CONVERSATION_SUMMARY_MAX_CHARS 이하 (LLM 지시 + 잘라내기)
+- LLM 실패 / 회로 열림 시 규칙 기반 요약 (degraded.summarize_by_rules)
+- 같은 세션의 갱신이 진행 중이면 새로 등록하지 않음 (다음 턴 갱신이 그 사이 대화까지 한 번에 반영)
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.core import degraded
+from app.core.config import settings
+from app.core.metrics import track_dependency
+from app.models.schemas import ConversationSummary, DialogueSession
+from app.services.llm_gateway import get_llm_gateway
+
+logger = logging.getLogger(__name__)
+
+
+def format_moment(moment: Dict) -> str:
+    """key_moment 1개를 요약 / 프롬프트용 한 줄로 (감정이 있으면 함께)"""
+    emotion = moment.get("emotion")
+    stage = f"{moment.get('stage', '')} ({emotion})" if emotion else moment.get("stage", "")
+    return f"{stage}: {moment.get('content', '')}"
+
+
+class ConversationSummaryStore:
+    """세션별 요약 저장소 (Redis, 연결이 없으면 프로세스 메모리)"""
+
+    def __init__(self, client):
+        """
+        Args:
+            client: redis.Redis (decode_responses=True), None이면 메모리 사용
+        """
+        self.client = client
+        self._memory: Dict[str, ConversationSummary] = {}
+
+    def _key(self, session_id: str) -> str:
+        return f"{settings.CONVERSATION_SUMMARY_PREFIX}{session_id}"
+
+    def get(self, session_id: str) -> Optional[ConversationSummary]:
+        if self.client is None:
+            return self._memory.get(session_id)
+        with track_dependency("redis"):
+            value = self.client.get(self._key(session_id))
+        return ConversationSummary(**json.loads(value)) if value is not None else None
+
+    def put(self, session_id: str, summary: ConversationSummary) -> bool:
+        """더 새로운 버전일 때만 저장 (저장했으면 True)"""
+        current = self.get(session_id)
+        if current is not None and current.version >= summary.version:
+            return False
+        if self.client is None:
+            self._memory[session_id] = summary
+            return True
+        with track_dependency("redis"):
+            self.client.setex(
+                self._key(session_id), settings.SESSION_TTL,
+                json.dumps(summary.dict(), ensure_ascii=False, default=str)
+            )
+        return True
+
+
+class ConversationSummarizer:
+    """롤링 대화 요약 생성 / 백그라운드 갱신"""
+
+    def __init__(self, store: ConversationSummaryStore, api_key: str = None):
+        self.store = store
+        self.llm = get_llm_gateway().llm("conversation_summary", api_key=api_key)
+        self._prompt = ChatPromptTemplate.from_messages([
+            ("system", """
+            너는 6살~9살 아이와 동화 캐릭터의 대화를 요약하는 도우미야.
+            마지막 메시지의 기존 요약에 새 대화를 합쳐서 하나의 요약으로 다시 써.
+            요약은 다음 질문 생성과 부모 피드백에 원문 대신 쓰여.
+
+            규칙:
+            1. 아이가 말한 감정, 이유, 비슷한 경험, 고른 행동 전략을 단계(S1~S6) 순서대로 남겨
+            2. 같은 질문에 여러 번 답했으면 처음 답과 마지막 답만 남겨
+            3. 부적절한 표현은 내용을 옮기지 말고 "부적절한 표현 사용"으로만 적어
+            4. 대화에 없는 내용을 추측해서 쓰지 마
+            5. {max_chars}자 이내 한 단락, 요약만 출력해
+            """),
+            ("user", "{request}")
+        ]).partial(max_chars=str(settings.CONVERSATION_SUMMARY_MAX_CHARS))
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.CONVERSATION_SUMMARY_WORKERS,
+            thread_name_prefix="summary"
+        )
+        self._inflight = set()
+        self._lock = threading.Lock()
+
+    def current(self, session: DialogueSession) -> ConversationSummary:
+        """저장소에 더 새로운 요약이 있으면 session.summary에 반영 후 반환 (조회 실패 시 세션 값)"""
+        try:
+            stored = self.store.get(session.session_id)
+        except Exception as e:
+            logger.warning(f"⚠️ 대화 요약 조회 실패: {session.session_id}, {e}")
+            stored = None
+        if stored is not None and stored.version > session.summary.version:
+            session.summary = stored
+        return session.summary
+
+    def submit(self, session: DialogueSession) -> bool:
+        """
+        새 대화가 있으면 백그라운드 갱신 등록
+
+        Returns:
+            등록 여부 (새 대화 없음 / 같은 세션 갱신 중이면 False)
+        """
+        moments = list(session.key_moments)
+        if len(moments) <= session.summary.version:
+            return False
+        with self._lock:
+            if session.session_id in self._inflight:
+                return False
+            self._inflight.add(session.session_id)
+        self._executor.submit(self._run, session.session_id, session.summary.model_copy(), moments)
+        return True
+
+    def _run(self, session_id: str, base: ConversationSummary, moments: List[Dict]):
+        try:
+            self.update(session_id, base, moments)
+        except Exception as e:
+            logger.error(f"❌ 대화 요약 갱신 실패: {session_id}, {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(session_id)
+
+    def update(self, session_id: str, base: ConversationSummary, moments: List[Dict]) -> ConversationSummary:
+        """
+        기존 요약에 base.version 이후 대화를 합쳐 저장 (동기, 백그라운드 스레드에서 호출)
+
+        Args:
+            session_id: 세션 ID
+            base: 호출 시점의 세션 요약 (저장소에 더 새로운 요약이 있으면 그것부터 이어감)
+            moments: 세션 key_moments 스냅샷
+        """
+        stored = self.store.get(session_id)
+        if stored is not None and stored.version > base.version:
+            base = stored
+        new_lines = [format_moment(m) for m in moments[base.version:] if m.get("content")]
+        if not new_lines:
+            return base
+
+        summary = ConversationSummary(
+            version=len(moments),
+            text=self._summarize(base.text, new_lines),
+            updated_at=datetime.now()
+        )
+        if self.store.put(session_id, summary):
+            logger.info(f"📝 대화 요약 갱신: {session_id} (v{base.version} → v{summary.version}, {len(summary.text)}자)")
+        return summary
+
+    def _summarize(self, previous: str, new_lines: List[str]) -> str:
+        max_chars = settings.CONVERSATION_SUMMARY_MAX_CHARS
+        request = "\n".join([
+            f"기존 요약: {previous or '없음'}",
+            "",
+            "새 대화:",
+            *(f"- {line}" for line in new_lines)
+        ])
+        try:
+            with track_dependency("conversation_summary"):
+                response = self.llm.invoke(self._prompt.format_messages(request=request))
+            text = " ".join(response.content.split())
+        except Exception as e:
+            degraded.record_degraded("conversation_summary", e)
+            return degraded.summarize_by_rules(previous, new_lines, max_chars)
+        return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def summary_context(session: DialogueSession, max_recent: Optional[int] = None) -> Tuple[str, List[Dict]]:
+    """
+    프롬프트용 대화 맥락 (원문 key_moments 대신 사용)
+
+    Args:
+        session: 대화 세션
+        max_recent: 최근 대화 최대 개수 (None이면 요약 이후 전부)
+
+    Returns:
+        (요약 텍스트, 요약에 아직 반영되지 않은 최근 key_moments)
+        요약이 꺼져 있으면 ("", key_moments)
+    """
+    if not settings.CONVERSATION_SUMMARY_ENABLED:
+        summary = ConversationSummary()
+    else:
+        summary = get_conversation_summarizer().current(session)
+    recent = session.key_moments[summary.version:]
+    if max_recent is not None:
+        recent = recent[-max_recent:] if max_recent > 0 else []
+    return summary.text, recent
+
+
+def conversation_digest(session: DialogueSession) -> List[str]:
+    """요약 + 최근 대화를 시간순 줄 목록으로 (대화가 없으면 빈 목록)"""
+    summary_text, recent = summary_context(session)
+    lines = [f"요약: {summary_text}"] if summary_text else []
+    return lines + [format_moment(m) for m in recent if m.get("content")]
+
+
+def schedule_summary_update(session: DialogueSession):
+    """턴 처리 후 요약 갱신 등록 (CONVERSATION_SUMMARY_ENABLED, 실패해도 턴에는 영향 없음)"""
+    if not settings.CONVERSATION_SUMMARY_ENABLED:
+        return
+    try:
+        get_conversation_summarizer().submit(session)
+    except Exception as e:
+        logger.warning(f"⚠️ 대화 요약 갱신 등록 실패: {session.session_id}, {e}")
+
+
+# Singleton 인스턴스
+_summarizer_instance = None
+_summarizer_lock = threading.Lock()
+
+
+def get_conversation_summarizer() -> ConversationSummarizer:
+    """싱글톤 요약기 반환 (세션 저장소와 같은 Redis 연결 사용)"""
+    global _summarizer_instance
+    if _summarizer_instance is None:
+        with _summarizer_lock:
+            if _summarizer_instance is None:
+                from app.core.container import get_redis_service
+                _summarizer_instance = ConversationSummarizer(
+                    ConversationSummaryStore(get_redis_service().client),
+                    api_key=settings.OPENAI_API_KEY
+                )
+    return _summarizer_instance
+
+
+def shutdown_conversation_summarizer():
+    """요약 스레드 풀 종료"""
+    global _summarizer_instance
+    if _summarizer_instance is not None:
+        _summarizer_instance.shutdown()
+        _summarizer_instance = None
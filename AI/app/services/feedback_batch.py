@@ -0,0 +1,271 @@
+"""
+부모 피드백 일괄 생성 (기관별 야간 리포트)
+대화 목록 또는 세션 ID 목록을 받아 제한된 동시성으로 피드백을 생성하고 결과를 하나씩 돌려준다.
+API(/feedback/batch, NDJSON 스트리밍)와 CLI(python -m app.cli.feedback_batch)가 공유한다.
+
+- 동시성: FEEDBACK_BATCH_CONCURRENCY 스레드 + 별도 bulkhead("feedback_batch")
+  → 대화형 /feedback, /turn이 쓰는 의존성 슬롯을 차지하지 않음
+- 중복 제거: 피드백 입력 해시가 같은 대화는 한 번만 생성
+- 체크포인트: 완료된 해시별 결과를 저장 (CLI는 JSONL 파일, API는 batch_id별 Redis 해시)
+  → 중단 후 같은 체크포인트로 다시 실행하면 남은 대화만 생성
+- 세션 ID 항목은 결과를 /feedback 결과 저장소에도 기록 (부모 화면에서 바로 조회)
+"""
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.core.bulkhead import BulkheadRejectedError
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.core.metrics import track_dependency
+from app.services.feedback_jobs import (
+    build_feedback_input, build_feedback_input_from_history, feedback_input_hash, get_feedback_queue
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ========================================
+# 체크포인트 (완료된 입력 해시 → 결과)
+# ========================================
+
+class FileCheckpoint:
+    """JSONL 파일 체크포인트 (한 줄에 완료된 해시 1개, 추가만 함)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Dict[str, Dict]:
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 중단 시점에 마지막 줄이 잘렸을 수 있음
+                    continue
+                done[record["content_hash"]] = record["result"]
+        return done
+
+    def save(self, content_hash: str, result: Dict):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"content_hash": content_hash, "result": result}, ensure_ascii=False) + "\n")
+            f.flush()
+
+
+class RedisCheckpoint:
+    """batch_id별 Redis 해시 체크포인트 (FEEDBACK_RESULT_TTL 동안 보관)"""
+
+    def __init__(self, client, batch_id: str):
+        self.client = client
+        self.key = f"{settings.FEEDBACK_BATCH_PREFIX}{batch_id}"
+
+    def load(self) -> Dict[str, Dict]:
+        with track_dependency("redis"):
+            values = self.client.hgetall(self.key)
+        return {content_hash: json.loads(value) for content_hash, value in values.items()}
+
+    def save(self, content_hash: str, result: Dict):
+        with track_dependency("redis"):
+            pipe = self.client.pipeline()
+            pipe.hset(self.key, content_hash, json.dumps(result, ensure_ascii=False))
+            pipe.expire(self.key, settings.FEEDBACK_RESULT_TTL)
+            pipe.execute()
+
+
+# ========================================
+# 입력 준비
+# ========================================
+
+def prepare_items(items: Iterable[Dict], context_manager) -> List[Dict]:
+    """
+    일괄 생성 항목 → 피드백 입력
+
+    Args:
+        items: {"session_id": ...} 또는
+               {"id"?, "conversation_history": [...], "emotion_history"?, "child_name"?, "story_name"?}
+        context_manager: 세션 / 동화 정보 조회
+
+    Returns:
+        [{"id", "session_id"?, "content_hash", "input_text"}] (입력을 만들 수 없으면 "error")
+    """
+    prepared = []
+    for index, item in enumerate(items):
+        session_id = item.get("session_id")
+        entry = {"id": str(item.get("id") or session_id or index)}
+        if session_id:
+            entry["session_id"] = session_id
+
+        try:
+            if session_id and not item.get("conversation_history"):
+                session = context_manager.get_session(session_id)
+                if session is None:
+                    entry["error"] = f"세션을 찾을 수 없습니다: {session_id}"
+                    prepared.append(entry)
+                    continue
+                story_context = context_manager.get_story_context(session.story_name)
+                input_text = build_feedback_input(session, story_context)
+            else:
+                story_name = item.get("story_name")
+                story_context = context_manager.get_story_context(story_name) if story_name else None
+                input_text = build_feedback_input_from_history(
+                    item.get("conversation_history") or [],
+                    item.get("emotion_history") or [],
+                    item.get("child_name"),
+                    story_context
+                )
+        except Exception as e:
+            entry["error"] = f"입력 구성 실패: {e}"
+            prepared.append(entry)
+            continue
+
+        if input_text is None:
+            entry["error"] = "아동의 응답이 없습니다."
+        else:
+            entry["content_hash"] = feedback_input_hash(input_text)
+            entry["input_text"] = input_text
+        prepared.append(entry)
+    return prepared
+
+
+# ========================================
+# 실행
+# ========================================
+
+def _generate(input_text: str) -> Dict:
+    """피드백 1건 생성 (동시 호출 한도 초과 / 회로 열림은 대기 후 재시도)"""
+    from app.tools.feedback import get_feedback_generator
+
+    for attempt in range(settings.FEEDBACK_BATCH_RETRIES + 1):
+        try:
+            result = get_feedback_generator().generate_feedback(
+                input_text, raise_on_error=True, dependency="feedback_batch"
+            )
+            result["generated_at"] = datetime.now().isoformat()
+            return result
+        except (BulkheadRejectedError, CircuitOpenError) as e:
+            if attempt == settings.FEEDBACK_BATCH_RETRIES:
+                raise
+            retry_after = getattr(e, "retry_after", None) or 2 ** attempt
+            logger.warning(f"⏳ 일괄 피드백 재시도 대기 {retry_after:.1f}초: {e}")
+            time.sleep(retry_after)
+
+
+def _result_record(entry: Dict, status: str, **fields) -> Dict:
+    record = {"type": "result", "id": entry["id"], "status": status}
+    if "session_id" in entry:
+        record["session_id"] = entry["session_id"]
+    if "content_hash" in entry:
+        record["content_hash"] = entry["content_hash"]
+    record.update(fields)
+    return record
+
+
+def _store_session_result(entry: Dict, result: Dict):
+    """세션 항목 결과를 /feedback 결과 저장소에도 기록 (실패는 무시)"""
+    if "session_id" not in entry:
+        return
+    queue = get_feedback_queue()
+    if not queue.available:
+        return
+    try:
+        queue.complete(entry["session_id"], entry["content_hash"], result)
+    except Exception as e:
+        logger.warning(f"세션 피드백 저장 실패: {entry['session_id']}, {e}")
+
+
+def run_feedback_batch(
+    prepared: List[Dict],
+    concurrency: Optional[int] = None,
+    checkpoint=None
+) -> Iterator[Dict]:
+    """
+    피드백 일괄 생성 (완료되는 순서대로 결과 반환, 마지막에 요약)
+
+    Args:
+        prepared: prepare_items 결과
+        concurrency: 동시 생성 수 (기본: FEEDBACK_BATCH_CONCURRENCY)
+        checkpoint: FileCheckpoint / RedisCheckpoint (None이면 재개 불가)
+
+    Yields:
+        {"type": "result", "id", "session_id"?, "status": "done" | "failed" | "invalid",
+         "child_analysis_feedback", "parent_action_guide", "generated_at", "resumed", "deduplicated"}
+        {"type": "summary", "total", "done", "failed", "invalid", "generated", "resumed", "deduplicated", "seconds"}
+    """
+    started = time.perf_counter()
+    concurrency = max(1, concurrency or settings.FEEDBACK_BATCH_CONCURRENCY)
+    # bulkhead 최대 한도보다 많은 스레드는 대기열에서 기다리기만 함
+    limits = settings.BULKHEAD_LIMITS.get("feedback_batch")
+    if settings.BULKHEAD_ENABLED and limits:
+        concurrency = min(concurrency, int(limits["max"]))
+    summary = {"type": "summary", "total": len(prepared), "done": 0, "failed": 0, "invalid": 0,
+               "generated": 0, "resumed": 0, "deduplicated": 0}
+
+    # 입력 해시별로 묶기 (같은 대화는 한 번만 생성)
+    groups: Dict[str, List[Dict]] = {}
+    for entry in prepared:
+        if "error" in entry:
+            summary["invalid"] += 1
+            yield _result_record(entry, "invalid", error=entry["error"])
+            continue
+        groups.setdefault(entry["content_hash"], []).append(entry)
+    summary["deduplicated"] = sum(len(entries) - 1 for entries in groups.values())
+
+    # 체크포인트에 있는 결과는 다시 생성하지 않음
+    completed = checkpoint.load() if checkpoint is not None else {}
+    for content_hash in [h for h in groups if h in completed]:
+        for i, entry in enumerate(groups.pop(content_hash)):
+            summary["done"] += 1
+            summary["resumed"] += 1
+            yield _result_record(entry, "done", resumed=True, deduplicated=i > 0, **completed[content_hash])
+
+    if groups:
+        logger.info(
+            f"📚 피드백 일괄 생성 시작: {len(groups)}건 생성 "
+            f"(전체 {len(prepared)}, 재개 {summary['resumed']}, 중복 {summary['deduplicated']}, 동시 {concurrency})"
+        )
+
+    pending_hashes = list(groups)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="feedback-batch")
+    try:
+        # 동시 실행 수만큼만 제출 (취소 / 중단 시 대기 작업이 쌓여 있지 않도록)
+        running = {}
+        while pending_hashes or running:
+            while pending_hashes and len(running) < concurrency:
+                content_hash = pending_hashes.pop(0)
+                future = executor.submit(_generate, groups[content_hash][0]["input_text"])
+                running[future] = content_hash
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                content_hash = running.pop(future)
+                entries = groups.pop(content_hash)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"❌ 일괄 피드백 생성 실패: {content_hash[:8]}, {e}")
+                    for entry in entries:
+                        summary["failed"] += 1
+                        yield _result_record(entry, "failed", error=str(e))
+                    continue
+
+                summary["generated"] += 1
+                if checkpoint is not None:
+                    checkpoint.save(content_hash, result)
+                for i, entry in enumerate(entries):
+                    _store_session_result(entry, result)
+                    summary["done"] += 1
+                    yield _result_record(entry, "done", resumed=False, deduplicated=i > 0, **result)
+    finally:
+        # 소비자가 중단하면(연결 끊김 등) 진행 중인 생성만 마치고 종료
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    logger.info(f"📚 피드백 일괄 생성 완료: {summary}")
+    yield summary
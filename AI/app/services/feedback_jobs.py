@@ -0,0 +1,441 @@
+"""
+부모 피드백 사전 생성 작업 큐
+S6에 진입한 세션의 피드백을 별도 워커(python -m app.cli.feedback_worker)가 미리 생성하고,
+/feedback은 저장된 결과나 진행 상태를 바로 반환한다.
+
+- 작업 큐: Redis 리스트 (API가 LPUSH, 워커가 BLMOVE로 워커별 처리 중 리스트로 옮기고 끝나면 제거)
+  워커가 중단되면 생존 표시(heartbeat)가 만료되고, 다른 워커가 그 처리 중 리스트를 큐로 되돌린다
+- 결과 / 상태: "{FEEDBACK_PREFIX}{session_id}:{대화 해시}" 키에 JSON
+  (queued → running → done / failed)
+- 대화 내용(피드백 입력)이 같으면 같은 키를 사용하므로 같은 대화로 다시 생성하지 않는다
+- queued / running 상태는 FEEDBACK_JOB_TIMEOUT 후 만료되어 워커가 중단돼도 다시 등록할 수 있다
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import track_dependency
+from app.core.token_budget import fit_context, within_budget
+from app.models.schemas import DialogueSession
+from app.services.conversation_summary import summary_context
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def _collect_child_responses(conversation_history: List[Dict]) -> Tuple[List[str], List[str], List[Dict]]:
+    """
+    아동 발화 수집 (모든 항목이 아동의 대사)
+
+    Returns:
+        (감정 태그가 붙은 발화 목록, 발화에서 추출한 감정 목록, 금칙어 사용 내역)
+    """
+    child_responses = []
+    extracted_emotions = []
+    inappropriate_words_details = []
+
+    for moment in conversation_history:
+        # key_moments 구조: {'stage': 'S2', 'turn': 2, 'content': '...', 'emotion': '슬픔', 'safety_check': {...}}
+        content = moment.get("content", "")
+        if not content:
+            continue
+
+        # 금칙어 사용 확인
+        safety_check = moment.get("safety_check")
+        if safety_check and not safety_check.get("is_safe", True):
+            inappropriate_words_details.append({
+                "stage": moment.get("stage", ""),
+                "content": content,
+                "categories": safety_check.get("flagged_categories", [])
+            })
+
+        # 감정 정보가 있으면 수집
+        emotion = moment.get("emotion", "")
+        if emotion:
+            extracted_emotions.append(emotion)
+            child_responses.append(f"[감정: {emotion}] {content}")
+        else:
+            child_responses.append(content)
+
+    return child_responses, extracted_emotions, inappropriate_words_details
+
+
+def _emotion_comparison_text(correct_emotion: Optional[str], child_first_emotion: Optional[str]) -> str:
+    """S1 감정 정답과 아동 답변 비교"""
+    if not correct_emotion:
+        return ""
+    if not child_first_emotion:
+        # 아동 감정을 찾지 못했지만 정답은 알려줌
+        return f"\n\n[S1 감정 답변 참고]\n동화 속 캐릭터가 느낀 정답 감정: {correct_emotion}"
+    if child_first_emotion != correct_emotion:
+        return f"\n\n[S1 감정 답변 비교]\n정답 감정: {correct_emotion}\n아동이 선택한 감정: {child_first_emotion}\n→ 아동이 정답과 다른 감정을 선택했습니다."
+    return f"\n\n[S1 감정 답변 비교]\n정답 감정: {correct_emotion}\n아동이 선택한 감정: {child_first_emotion}\n→ 아동이 정답 감정을 정확히 선택했습니다."
+
+
+def _compose_input(
+    child_responses: List[str],
+    extracted_emotions: List[str],
+    emotion_history: List[str],
+    emotion_comparison: str,
+    inappropriate_words_details: List[Dict],
+    child_info: str = ""
+) -> str:
+    # 감정 정보 (대화에서 추출한 것 우선, 없으면 emotion_history 사용)
+    if extracted_emotions:
+        emotions = ", ".join(extracted_emotions)
+    elif emotion_history:
+        emotions = ", ".join(emotion_history)
+    else:
+        emotions = "감정 정보 없음"
+
+    # 금칙어 사용 내역 텍스트 구성
+    inappropriate_words_text = ""
+    if inappropriate_words_details:
+        inappropriate_words_text = f"\n\n[금칙어 사용 내역]\n아동이 대화 중 부적절한 표현을 {len(inappropriate_words_details)}회 사용했습니다."
+        for idx, detail in enumerate(inappropriate_words_details, 1):
+            categories_str = ", ".join(detail["categories"])
+            inappropriate_words_text += f"\n{idx}. {detail['stage']} - \"{detail['content']}\" (유형: {categories_str})"
+
+    # feedback 토큰 예산을 넘으면 S1 첫 발화만 남기고 오래된 발화부터 제외
+    kept, _ = fit_context(
+        "feedback", [child_info, emotions, emotion_comparison, inappropriate_words_text],
+        items=child_responses, keep_first=1
+    )
+    if len(kept) < len(child_responses):
+        kept.insert(1, f"(중간 발화 {len(child_responses) - len(kept)}개 생략)")
+    child_dialogue = "\n".join(kept)
+    return f"""[아동 발화]
+        {child_dialogue}{child_info}
+
+        [아동 감정]
+        {emotions}{emotion_comparison}{inappropriate_words_text}
+        """
+
+
+def build_feedback_input(
+    session: DialogueSession,
+    story_context: Optional[Dict] = None
+) -> Optional[str]:
+    """
+    세션 대화로 피드백 프롬프트 입력 구성 (아동 발화 + 감정 + S1 감정 비교 + 금칙어 내역)
+
+    Args:
+        session: 대화 세션 (key_moments / emotion_history / 긴 대화면 summary 사용)
+        story_context: 동화 메타데이터 (S1 정답 감정 비교용)
+
+    Returns:
+        입력 텍스트 또는 None (아동 발화가 없을 때)
+    """
+    conversation_history: List[Dict] = session.key_moments
+    emotion_history = [e.value for e in session.emotion_history]
+    child_responses, extracted_emotions, inappropriate_words_details = _collect_child_responses(conversation_history)
+    if not child_responses:
+        return None
+
+    # 발화 원문이 feedback 토큰 예산을 넘는 긴 대화는 롤링 요약 + 요약 이후 발화로 대체
+    # (감정 / 금칙어 내역은 원문 전체에서 수집)
+    if not within_budget("feedback", child_responses):
+        summary_text, recent_moments = summary_context(session)
+        if summary_text:
+            recent_responses, _, _ = _collect_child_responses(recent_moments)
+            child_responses = [f"(이전 대화 요약) {summary_text}"] + recent_responses
+
+    # 아동의 첫 감정 (emotion_history → S1 발화 감정 → 추출된 첫 감정 순)
+    child_first_emotion = None
+    if emotion_history:
+        child_first_emotion = emotion_history[0]
+    elif conversation_history:
+        for moment in conversation_history:
+            if moment.get("stage", "").startswith("S1") and moment.get("emotion"):
+                child_first_emotion = moment.get("emotion")
+                break
+    elif extracted_emotions:
+        child_first_emotion = extracted_emotions[0]
+
+    emotion_comparison = _emotion_comparison_text((story_context or {}).get("emotion_ans"), child_first_emotion)
+    return _compose_input(
+        child_responses, extracted_emotions, emotion_history, emotion_comparison, inappropriate_words_details
+    )
+
+
+def build_feedback_input_from_history(
+    conversation_history: List[Dict],
+    emotion_history: List[str],
+    child_name: Optional[str] = None,
+    story_context: Optional[Dict] = None
+) -> Optional[str]:
+    """
+    직접 받은 대화 내역으로 피드백 프롬프트 입력 구성 (세션 만료 후 /feedback/generate 계열)
+
+    Args:
+        conversation_history: 아동 발화 내역 [{"stage", "turn", "content", "emotion"?, "safety_check"?}]
+        emotion_history: 감정 히스토리 (하위 호환용)
+        child_name: 아동 이름
+        story_context: 동화 메타데이터 (S1 정답 감정 비교용, 없으면 비교 생략)
+
+    Returns:
+        입력 텍스트 또는 None (아동 발화가 없을 때)
+    """
+    child_responses, extracted_emotions, inappropriate_words_details = _collect_child_responses(conversation_history)
+    if not child_responses:
+        return None
+
+    # 아동의 첫 감정 (S1 발화 감정 → 추출된 첫 감정 → emotion_history 순)
+    child_first_emotion = None
+    for moment in conversation_history:
+        if moment.get("stage", "").startswith("S1") and moment.get("emotion"):
+            child_first_emotion = moment.get("emotion")
+            break
+    if not child_first_emotion and extracted_emotions:
+        child_first_emotion = extracted_emotions[0]
+    if not child_first_emotion and emotion_history:
+        child_first_emotion = emotion_history[0]
+
+    emotion_comparison = _emotion_comparison_text((story_context or {}).get("emotion_ans"), child_first_emotion)
+    child_info = f"\n아동 이름: {child_name}" if child_name else ""
+    return _compose_input(
+        child_responses, extracted_emotions, emotion_history, emotion_comparison, inappropriate_words_details,
+        child_info
+    )
+
+
+def feedback_input_hash(input_text: str) -> str:
+    """피드백 입력 해시 (같은 대화면 같은 값)"""
+    return hashlib.sha256(input_text.encode("utf-8")).hexdigest()[:32]
+
+
+class FeedbackJobQueue:
+    """Redis 기반 피드백 작업 큐 / 결과 저장소"""
+
+    def __init__(self, client):
+        """
+        Args:
+            client: redis.Redis (decode_responses=True), None이면 비활성
+        """
+        self.client = client
+
+    @property
+    def available(self) -> bool:
+        return self.client is not None
+
+    def _key(self, session_id: str, content_hash: str) -> str:
+        return f"{settings.FEEDBACK_PREFIX}{session_id}:{content_hash}"
+
+    def _set_status(self, session_id: str, content_hash: str, status: str, ttl: int, **fields) -> Dict:
+        job = {
+            "session_id": session_id,
+            "content_hash": content_hash,
+            "status": status,
+            "updated_at": datetime.now().isoformat(),
+            **fields
+        }
+        with track_dependency("redis"):
+            self.client.setex(self._key(session_id, content_hash), ttl, json.dumps(job, ensure_ascii=False))
+        return job
+
+    def get(self, session_id: str, content_hash: str) -> Optional[Dict]:
+        """작업 상태 / 결과 조회 (없으면 None)"""
+        with track_dependency("redis"):
+            value = self.client.get(self._key(session_id, content_hash))
+        return json.loads(value) if value is not None else None
+
+    def enqueue(self, session_id: str, content_hash: str, input_text: str) -> Dict:
+        """
+        피드백 생성 작업 등록 (이미 등록 / 완료된 대화면 기존 상태 반환)
+
+        Returns:
+            작업 상태 dict
+        """
+        key = self._key(session_id, content_hash)
+        job = {
+            "session_id": session_id,
+            "content_hash": content_hash,
+            "status": JOB_QUEUED,
+            "updated_at": datetime.now().isoformat()
+        }
+        with track_dependency("redis"):
+            created = self.client.set(
+                key, json.dumps(job, ensure_ascii=False), nx=True, ex=settings.FEEDBACK_JOB_TIMEOUT
+            )
+
+        if not created:
+            existing = self.get(session_id, content_hash)
+            if existing is None or existing.get("status") != JOB_FAILED:
+                return existing or job
+            # 실패한 작업은 다시 등록
+            job = self._set_status(session_id, content_hash, JOB_QUEUED, settings.FEEDBACK_JOB_TIMEOUT)
+
+        payload = {"session_id": session_id, "content_hash": content_hash, "input_text": input_text}
+        with track_dependency("redis"):
+            self.client.lpush(settings.FEEDBACK_QUEUE_KEY, json.dumps(payload, ensure_ascii=False))
+        logger.info(f"📨 피드백 작업 등록: {session_id} ({content_hash[:8]})")
+        return job
+
+    @staticmethod
+    def _processing_key(worker_id: str) -> str:
+        return f"{settings.FEEDBACK_QUEUE_KEY}:processing:{worker_id}"
+
+    @staticmethod
+    def _heartbeat_key(worker_id: str) -> str:
+        return f"{settings.FEEDBACK_QUEUE_KEY}:worker:{worker_id}"
+
+    @staticmethod
+    def _workers_key() -> str:
+        return f"{settings.FEEDBACK_QUEUE_KEY}:workers"
+
+    def heartbeat(self, worker_id: str):
+        """워커 등록 / 생존 표시 갱신 (FEEDBACK_WORKER_HEARTBEAT_TTL 동안 유효)"""
+        with track_dependency("redis"):
+            pipe = self.client.pipeline(transaction=False)
+            pipe.sadd(self._workers_key(), worker_id)
+            pipe.setex(self._heartbeat_key(worker_id), settings.FEEDBACK_WORKER_HEARTBEAT_TTL, int(time.time()))
+            pipe.execute()
+
+    def unregister_worker(self, worker_id: str):
+        """정상 종료 시 등록 해제 (남은 처리 중 작업은 큐로 되돌림)"""
+        self._requeue(worker_id)
+        with track_dependency("redis"):
+            pipe = self.client.pipeline(transaction=False)
+            pipe.srem(self._workers_key(), worker_id)
+            pipe.delete(self._heartbeat_key(worker_id))
+            pipe.execute()
+
+    def next_job(self, worker_id: str, timeout: int) -> Optional[Tuple[Dict, str]]:
+        """
+        다음 작업 대기 (워커용, timeout초 동안 없으면 None)
+        작업은 큐에서 워커의 처리 중 리스트로 옮겨지며, 끝나면 ack()로 제거한다.
+        BLMOVE는 대기 시간이 호출 시간에 포함되므로 의존성 지표로 기록하지 않는다.
+
+        Returns:
+            (작업 dict, ack에 넘길 원본 payload) 또는 None
+        """
+        payload = self.client.blmove(
+            settings.FEEDBACK_QUEUE_KEY, self._processing_key(worker_id), timeout, "RIGHT", "LEFT"
+        )
+        if payload is None:
+            return None
+        return json.loads(payload), payload
+
+    def ack(self, worker_id: str, payload: str):
+        """처리가 끝난 작업(성공 / 실패 / 건너뜀)을 처리 중 리스트에서 제거"""
+        with track_dependency("redis"):
+            self.client.lrem(self._processing_key(worker_id), 1, payload)
+
+    def requeue_orphaned(self) -> int:
+        """
+        생존 표시가 만료된 워커(중단 / 강제 종료)의 처리 중 작업을 큐로 되돌림
+
+        Returns:
+            되돌린 작업 수
+        """
+        with track_dependency("redis"):
+            worker_ids = self.client.smembers(self._workers_key())
+        requeued = 0
+        for worker_id in worker_ids:
+            with track_dependency("redis"):
+                alive = self.client.exists(self._heartbeat_key(worker_id))
+            if alive:
+                continue
+            requeued += self._requeue(worker_id)
+            with track_dependency("redis"):
+                self.client.srem(self._workers_key(), worker_id)
+        if requeued:
+            logger.warning(f"♻️ 중단된 워커의 피드백 작업 {requeued}건을 큐로 되돌림")
+        return requeued
+
+    def _requeue(self, worker_id: str) -> int:
+        """워커의 처리 중 작업을 큐의 꺼내는 쪽(오른쪽)으로 되돌림 → 다음에 바로 처리"""
+        requeued = 0
+        while True:
+            with track_dependency("redis"):
+                moved = self.client.lmove(
+                    self._processing_key(worker_id), settings.FEEDBACK_QUEUE_KEY, "RIGHT", "RIGHT"
+                )
+            if moved is None:
+                return requeued
+            requeued += 1
+
+    def mark_running(self, session_id: str, content_hash: str) -> Dict:
+        return self._set_status(session_id, content_hash, JOB_RUNNING, settings.FEEDBACK_JOB_TIMEOUT)
+
+    def complete(self, session_id: str, content_hash: str, result: Dict) -> Dict:
+        return self._set_status(
+            session_id, content_hash, JOB_DONE, settings.FEEDBACK_RESULT_TTL, result=result
+        )
+
+    def fail(self, session_id: str, content_hash: str, error: str) -> Dict:
+        return self._set_status(
+            session_id, content_hash, JOB_FAILED, settings.FEEDBACK_JOB_TIMEOUT, error=error
+        )
+
+
+def generate_and_store(queue: Optional[FeedbackJobQueue], session_id: str, content_hash: str, input_text: str) -> Dict:
+    """
+    피드백 생성 후 결과 저장 (워커 / 큐 비활성 시 /feedback 공용, 오류는 실패 상태 기록 후 호출자에게 전달)
+    queue가 None이면 저장하지 않는다 (Redis 미연결).
+
+    Returns:
+        {"child_analysis_feedback", "parent_action_guide", "generated_at"}
+    """
+    from app.tools.feedback import get_feedback_generator
+
+    store = queue is not None and queue.available
+    if store:
+        queue.mark_running(session_id, content_hash)
+
+    started = time.perf_counter()
+    try:
+        result = get_feedback_generator().generate_feedback(input_text, raise_on_error=True)
+    except Exception as e:
+        if store:
+            queue.fail(session_id, content_hash, str(e))
+        raise
+
+    result["generated_at"] = datetime.now().isoformat()
+    if store:
+        queue.complete(session_id, content_hash, result)
+    logger.info(f"✅ 피드백 생성 완료: {session_id} ({content_hash[:8]}, {time.perf_counter() - started:.1f}초)")
+    return result
+
+
+def enqueue_session_feedback(session: DialogueSession) -> Optional[Dict]:
+    """
+    세션의 현재 대화로 피드백 작업 등록 (큐 비활성 / Redis 미연결 / 아동 발화 없음이면 None)
+    """
+    if not settings.FEEDBACK_QUEUE_ENABLED:
+        return None
+    queue = get_feedback_queue()
+    if not queue.available:
+        return None
+
+    from app.core.container import get_context_manager
+    story_context = get_context_manager().get_story_context(session.story_name)
+    input_text = build_feedback_input(session, story_context)
+    if input_text is None:
+        return None
+    return queue.enqueue(session.session_id, feedback_input_hash(input_text), input_text)
+
+
+# Singleton 인스턴스
+_feedback_queue_instance = None
+_feedback_queue_lock = threading.Lock()
+
+
+def get_feedback_queue() -> FeedbackJobQueue:
+    """싱글톤 피드백 작업 큐 반환 (세션 저장소와 같은 Redis 연결 사용)"""
+    global _feedback_queue_instance
+    if _feedback_queue_instance is None:
+        with _feedback_queue_lock:
+            if _feedback_queue_instance is None:
+                from app.core.container import get_redis_service
+                _feedback_queue_instance = FeedbackJobQueue(get_redis_service().client)
+    return _feedback_queue_instance
@@ -0,0 +1,353 @@
+"""
+LLM / HTTP Gateway
+OpenAI / Supertone 호출용 HTTP 커넥션 풀을 워커 프로세스당 하나씩 두고 모든 도구가 공유한다.
+
+- OpenAI: httpx.Client 1개를 ChatOpenAI 핸들과 OpenAI SDK 클라이언트(Moderation / Whisper)가 함께 사용
+  → keep-alive 커넥션 재사용, 커넥션 수 한도가 프로세스 전체에 적용
+- Supertone: TTS용 httpx.Client 1개
+- HTTP/2는 h2 패키지가 설치된 경우에만 사용 (없으면 HTTP/1.1 keep-alive)
+- 시작 시 prewarm()으로 TLS 연결을 미리 맺어 첫 턴의 핸드셰이크 지연 제거
+- 모든 ChatOpenAI 응답의 토큰 사용량(프롬프트 캐시 적중분 포함)을 호출부(track_dependency 이름)별로 기록
+  (스트리밍도 마지막 청크의 usage로 기록, 턴 처리 중이면 세션별 누적에도 더함)
+  max_tokens에 걸려 잘린 응답(finish_reason=length)은 경고 로그 + 호출부별 카운터
+- 호출부별 LLM 프로필(LLM_PROFILES): 모델 / 온도 / 최대 응답 토큰 / 타임아웃 / 재시도 / 대체 모델
+  도구는 llm(프로필 이름)으로 받은 핸들을 쓰고, 프로필 파일(LLM_PROFILES_PATH)이 바뀌면 다음 호출부터 반영
+- 턴 마감 시간이 있으면 요청 타임아웃을 남은 시간으로 줄임 (app.core.deadline)
+- langchain_openai / openai는 import 비용이 커서 핸들을 처음 만들 때 import
+"""
+import importlib.util
+import json
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple
+
+import httpx
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.deadline import request_timeout
+from app.core.metrics import current_dependency, record_llm_truncation, record_llm_usage
+from app.core.token_budget import add_session_usage
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class LLMProfile(BaseModel):
+    """호출부 LLM 설정"""
+    model: str
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None  # None이면 제한 없음
+    timeout: Optional[float] = None  # 요청 타임아웃 (초, None이면 HTTP_READ_TIMEOUT)
+    retries: int = 2  # SDK 재시도 횟수 (연결 오류 / 429 / 5xx)
+    fallback_model: Optional[str] = None  # 재시도 후에도 실패하면 같은 설정으로 이 모델 호출
+
+
+def load_llm_profiles() -> Dict[str, LLMProfile]:
+    """
+    LLM 프로필 로드 (LLM_PROFILES 기본값 + LLM_PROFILES_PATH JSON 덮어쓰기)
+
+    Raises:
+        파일 형식 / 값 오류
+    """
+    raw: Dict[str, Dict[str, Any]] = {name: dict(fields) for name, fields in settings.LLM_PROFILES.items()}
+    if settings.LLM_PROFILES_PATH:
+        with open(settings.LLM_PROFILES_PATH, encoding="utf-8") as f:
+            overrides = json.load(f)
+        for name, fields in overrides.items():
+            raw.setdefault(name, {}).update(fields)
+    return {name: LLMProfile(**fields) for name, fields in raw.items()}
+
+
+class ProfiledChatModel:
+    """
+    프로필 이름으로 묶인 채팅 모델 핸들
+    호출할 때마다 Gateway에서 현재 프로필의 모델(+ 대체 모델)을 찾으므로 프로필 재로드가 바로 반영된다.
+    """
+
+    def __init__(self, gateway: "LLMGateway", profile: str, api_key: Optional[str] = None):
+        self.gateway = gateway
+        self.profile = profile
+        self.api_key = api_key
+
+    @property
+    def settings(self) -> LLMProfile:
+        return self.gateway.profile(self.profile)
+
+    @property
+    def model_name(self) -> str:
+        return self.settings.model
+
+    @property
+    def temperature(self) -> float:
+        return self.settings.temperature
+
+    def invoke(self, messages, **kwargs):
+        return self.gateway.profile_runnable(self.profile, self.api_key).invoke(messages, **self._bounded(kwargs))
+
+    def stream(self, messages, **kwargs) -> Iterator:
+        return self.gateway.profile_runnable(self.profile, self.api_key).stream(messages, **self._bounded(kwargs))
+
+    def _bounded(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """턴 마감 시간이 있으면 요청 타임아웃을 프로필 타임아웃과 남은 시간 중 짧은 쪽으로"""
+        if "timeout" not in kwargs and request_timeout(None) is not None:
+            kwargs["timeout"] = request_timeout(self.settings.timeout or settings.HTTP_READ_TIMEOUT)
+        return kwargs
+
+
+class LLMGateway:
+    """OpenAI / Supertone 공유 HTTP 클라이언트 및 모델 핸들 관리"""
+
+    def __init__(self):
+        self.http2 = settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+        if settings.HTTP2_ENABLED and not self.http2:
+            logger.warning("⚠️ h2 패키지가 없어 HTTP/1.1 keep-alive로 연결합니다")
+
+        self.openai_http = self._build_http_client()
+        self.supertone_http = self._build_http_client(base_url=settings.SUPERTONE_BASE_URL)
+
+        # (model, temperature, api_key, max_tokens, timeout, retries) → ChatOpenAI
+        self._chat_models: Dict[Tuple, "ChatOpenAI"] = {}
+        # LLM 프로필 / (프로필, api_key) → 모델(+ 대체 모델) Runnable, 재로드 시 비움
+        try:
+            self._profiles: Dict[str, LLMProfile] = load_llm_profiles()
+        except Exception as e:
+            logger.error(f"❌ LLM 프로필 파일 로드 실패, 기본 프로필 사용: {e}")
+            self._profiles = {name: LLMProfile(**fields) for name, fields in settings.LLM_PROFILES.items()}
+        self._profile_runnables: Dict[Tuple, Any] = {}
+        self._profiles_mtime = self._profiles_file_mtime()
+        self._profiles_checked_at = time.monotonic()
+        # api_key → OpenAI
+        self._openai_clients: Dict[Optional[str], "OpenAI"] = {}
+        self._lock = threading.Lock()
+
+        logger.info(f"LLMGateway 초기화 완료 (HTTP/{'2' if self.http2 else '1.1'})")
+
+    def _build_http_client(self, base_url: str = "") -> httpx.Client:
+        return httpx.Client(
+            base_url=base_url,
+            http2=self.http2,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        """기본 요청 타임아웃 (연결 / 응답)"""
+        return httpx.Timeout(settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+
+    def _api_key(self, api_key: Optional[str]) -> Optional[str]:
+        return api_key or settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+
+    def chat_model(
+        self,
+        model: str,
+        temperature: float,
+        api_key: str = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retries: int = 2
+    ) -> "ChatOpenAI":
+        """
+        ChatOpenAI 핸들 반환 (같은 설정이면 같은 인스턴스)
+
+        Args:
+            model: 모델 이름
+            temperature: 샘플링 온도
+            api_key: OpenAI API 키 (기본: 설정 / 환경변수)
+            max_tokens: 응답 최대 토큰 (None이면 제한 없음)
+            timeout: 요청 타임아웃 (초, None이면 HTTP_READ_TIMEOUT)
+            retries: SDK 재시도 횟수
+        """
+        api_key = self._api_key(api_key)
+        key = (model, temperature, api_key, max_tokens, timeout, retries)
+        handle = self._chat_models.get(key)
+        if handle is None:
+            with self._lock:
+                handle = self._chat_models.get(key)
+                if handle is None:
+                    from langchain_openai import ChatOpenAI
+                    handle = ChatOpenAI(
+                        model=model,
+                        temperature=temperature,
+                        api_key=api_key,
+                        max_tokens=max_tokens,
+                        timeout=self.timeout if timeout is None else httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT),
+                        max_retries=retries,
+                        http_client=self.openai_http,
+                        stream_usage=True,
+                        callbacks=[_usage_callback()]
+                    )
+                    self._chat_models[key] = handle
+        return handle
+
+    def llm(self, profile: str, api_key: str = None) -> ProfiledChatModel:
+        """호출부 프로필 핸들 반환 (invoke / stream, 프로필이 없으면 호출 시 KeyError)"""
+        return ProfiledChatModel(self, profile, api_key)
+
+    def profile(self, name: str) -> LLMProfile:
+        """현재 프로필 (파일이 바뀌었으면 재로드 후)"""
+        self._maybe_reload_profiles()
+        return self._profiles[name]
+
+    def profile_runnable(self, name: str, api_key: str = None):
+        """프로필의 ChatOpenAI (fallback_model이 있으면 실패 시 대체 모델로 다시 호출하는 Runnable)"""
+        profile = self.profile(name)
+        key = (name, api_key)
+        runnable = self._profile_runnables.get(key)
+        if runnable is None:
+            options = dict(max_tokens=profile.max_tokens, timeout=profile.timeout, retries=profile.retries)
+            runnable = self.chat_model(profile.model, profile.temperature, api_key, **options)
+            if profile.fallback_model and profile.fallback_model != profile.model:
+                runnable = runnable.with_fallbacks([
+                    self.chat_model(profile.fallback_model, profile.temperature, api_key, **options)
+                ])
+            self._profile_runnables[key] = runnable
+        return runnable
+
+    def reload_profiles(self) -> bool:
+        """
+        프로필 다시 로드 (다음 호출부터 반영, 파일 오류 시 기존 프로필 유지)
+
+        Returns:
+            성공 여부
+        """
+        try:
+            profiles = load_llm_profiles()
+        except Exception as e:
+            logger.error(f"❌ LLM 프로필 로드 실패, 기존 프로필 유지: {e}")
+            return False
+        with self._lock:
+            self._profiles = profiles
+            self._profile_runnables = {}
+        models = {name: profile.model for name, profile in profiles.items()}
+        logger.info(f"🔁 LLM 프로필 로드: {models}")
+        return True
+
+    def _profiles_file_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(settings.LLM_PROFILES_PATH) if settings.LLM_PROFILES_PATH else None
+        except OSError:
+            return None
+
+    def _maybe_reload_profiles(self):
+        """LLM_PROFILES_RELOAD_INTERVAL마다 프로필 파일 수정 시각 확인"""
+        if not settings.LLM_PROFILES_PATH:
+            return
+        now = time.monotonic()
+        if now - self._profiles_checked_at < settings.LLM_PROFILES_RELOAD_INTERVAL:
+            return
+        self._profiles_checked_at = now
+        mtime = self._profiles_file_mtime()
+        if mtime != self._profiles_mtime:
+            self._profiles_mtime = mtime
+            self.reload_profiles()
+
+    def openai_client(self, api_key: str = None) -> "OpenAI":
+        """OpenAI SDK 클라이언트 반환 (Moderation / Whisper용)"""
+        api_key = self._api_key(api_key)
+        client = self._openai_clients.get(api_key)
+        if client is None:
+            with self._lock:
+                client = self._openai_clients.get(api_key)
+                if client is None:
+                    from openai import OpenAI
+                    client = OpenAI(api_key=api_key, timeout=self.timeout, http_client=self.openai_http)
+                    self._openai_clients[api_key] = client
+        return client
+
+    def prewarm(self) -> Dict[str, Optional[float]]:
+        """
+        OpenAI / Supertone TLS 연결을 미리 맺어 둠 (응답 상태 코드는 무시)
+
+        Returns:
+            호스트별 연결 시간 (초, 실패 시 None)
+        """
+        targets = {
+            # OpenAI base_url은 SDK 클라이언트에서 (API 키가 없으면 생성 실패 → 예열만 건너뜀)
+            "openai": (self.openai_http, lambda: str(self.openai_client().base_url)),
+            "supertone": (self.supertone_http, lambda: settings.SUPERTONE_BASE_URL),
+        }
+        results = {}
+        for name, (client, base_url) in targets.items():
+            start = time.perf_counter()
+            try:
+                client.head(base_url())
+                results[name] = round(time.perf_counter() - start, 3)
+            except Exception as e:
+                logger.warning(f"⚠️ {name} 연결 예열 실패: {e}")
+                results[name] = None
+        logger.info(f"🔥 외부 API 연결 예열 완료: {results}")
+        return results
+
+    def close(self):
+        """커넥션 풀 종료"""
+        self.openai_http.close()
+        self.supertone_http.close()
+
+
+_usage_callback_instance = None
+
+
+def _usage_callback():
+    """ChatOpenAI 응답의 usage_metadata를 호출부별 토큰 지표로 기록하는 콜백 (langchain_core는 처음 쓸 때 import)"""
+    global _usage_callback_instance
+    if _usage_callback_instance is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class _LLMUsageCallback(BaseCallbackHandler):
+            def on_llm_end(self, response, **kwargs):
+                for generations in response.generations:
+                    for generation in generations:
+                        message = getattr(generation, "message", None)
+                        metadata = getattr(message, "response_metadata", None) or generation.generation_info or {}
+                        if metadata.get("finish_reason") == "length":
+                            call_site = current_dependency() or "unknown"
+                            record_llm_truncation(call_site)
+                            logger.warning(f"⚠️ LLM 응답이 max_tokens에서 잘림: {call_site}")
+                        usage = getattr(message, "usage_metadata", None)
+                        if not usage:
+                            continue
+                        details = usage.get("input_token_details") or {}
+                        counts = (
+                            current_dependency() or "unknown",
+                            usage.get("input_tokens", 0),
+                            details.get("cache_read", 0) or 0,
+                            usage.get("output_tokens", 0)
+                        )
+                        record_llm_usage(*counts)
+                        add_session_usage(*counts)
+
+        _usage_callback_instance = _LLMUsageCallback()
+    return _usage_callback_instance
+
+
+_llm_gateway_instance = None
+_llm_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """싱글톤 LLM Gateway 반환"""
+    global _llm_gateway_instance
+    if _llm_gateway_instance is None:
+        with _llm_gateway_lock:
+            if _llm_gateway_instance is None:
+                _llm_gateway_instance = LLMGateway()
+    return _llm_gateway_instance
+
+
+def shutdown_llm_gateway():
+    """LLM Gateway 커넥션 풀 종료"""
+    global _llm_gateway_instance
+    if _llm_gateway_instance is not None:
+        _llm_gateway_instance.close()
+        _llm_gateway_instance = None
@@ -1,13 +1,19 @@
 """
 Redis Service
 세션 데이터 저장/조회를 위한 Redis 클라이언트
+
+세션 수는 KEYS 대신 세션 인덱스(SESSION_INDEX_KEY, 세션 ID → 만료 시각 sorted set)로 센다.
+저장 / TTL 연장 / 삭제 때 인덱스도 함께 갱신하고, 셀 때 만료 시각이 지난 항목을 지운다.
+(서버리스 Valkey는 keyspace 만료 알림을 지원하지 않아 만료 시각으로 처리)
 """
 import redis
 from typing import Optional
 import json
 import logging
+import time
 
 from app.core.config import settings
+from app.core.metrics import track_dependency
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +31,7 @@ class RedisService:
                 username=settings.REDIS_USERNAME,
                 password=settings.REDIS_PASSWORD,
                 decode_responses=True,  # 자동으로 bytes → str 변환
-                ssl=True,               #서버리스 Valkey는 TLS 필수
+                ssl=settings.REDIS_SSL,  #서버리스 Valkey는 TLS 필수
                 ssl_cert_reqs=None,
                 socket_connect_timeout=5,
                 socket_timeout=5
@@ -67,7 +73,11 @@ class RedisService:
             
             # TTL과 함께 저장
             ttl = ttl or settings.SESSION_TTL
-            self.client.setex(key, ttl, value)
+            with track_dependency("redis"):
+                pipe = self.client.pipeline(transaction=False)
+                pipe.setex(key, ttl, value)
+                pipe.zadd(settings.SESSION_INDEX_KEY, {session_id: time.time() + ttl})
+                pipe.execute()
             
             logger.debug(f"세션 저장: {session_id} (TTL: {ttl}초)")
             return True
@@ -95,7 +105,8 @@ class RedisService:
         
         try:
             key = self._make_key(session_id)
-            value = self.client.get(key)
+            with track_dependency("redis"):
+                value = self.client.get(key)
             
             if value is None:
                 logger.debug(f"세션 없음: {session_id}")
@@ -125,7 +136,10 @@ class RedisService:
         
         try:
             key = self._make_key(session_id)
-            result = self.client.delete(key)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.zrem(settings.SESSION_INDEX_KEY, session_id)
+            result = pipe.execute()[0]
             
             logger.debug(f"세션 삭제: {session_id}, deleted={result}")
             return result > 0
@@ -176,6 +190,8 @@ class RedisService:
             ttl = ttl or settings.SESSION_TTL
             
             result = self.client.expire(key, ttl)
+            if result:
+                self.client.zadd(settings.SESSION_INDEX_KEY, {session_id: time.time() + ttl})
             logger.debug(f"세션 TTL 연장: {session_id}, TTL={ttl}초")
             return result
         
@@ -246,7 +262,8 @@ class RedisService:
     
     def count_sessions(self) -> int:
         """
-        현재 세션 개수
+        현재 세션 개수 (세션 인덱스 기준, 만료된 항목은 정리 후 집계)
+        인덱스 도입 전 세션은 시작 시 backfill_session_index가 추가한다.
         
         Returns:
             세션 개수
@@ -256,13 +273,152 @@ class RedisService:
             return 0
         
         try:
-            pattern = self._make_key("*")
-            return len(self.client.keys(pattern))
+            pipe = self.client.pipeline(transaction=False)
+            pipe.zremrangebyscore(settings.SESSION_INDEX_KEY, "-inf", time.time())
+            pipe.zcard(settings.SESSION_INDEX_KEY)
+            return pipe.execute()[1]
         
         except Exception as e:
             logger.error(f"세션 개수 조회 실패: {e}")
             return 0
     
+    def backfill_session_index(self) -> int:
+        """
+        세션 인덱스 도입 전에 저장된 세션을 인덱스에 추가 (남은 TTL 기준 만료 시각)
+        
+        표시 키로 Redis 전체에서 한 번만 실행되며, 이미 인덱스에 있는 세션은 건드리지 않는다.
+        실행 전에는 count_sessions가 인덱스에 등록된 세션만 센다.
+        
+        Returns:
+            추가한 세션 수 (이미 실행됐거나 실패하면 0)
+        """
+        if not self._connected or not self.client:
+            return 0
+        
+        try:
+            marker = f"{settings.SESSION_INDEX_KEY}:backfilled"
+            if not self.client.set(marker, int(time.time()), nx=True):
+                return 0
+            
+            added = 0
+            now = time.time()
+            batch = []
+            for key in self.client.scan_iter(match=self._make_key("*"), count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    added += self._index_sessions(batch, now)
+                    batch = []
+            if batch:
+                added += self._index_sessions(batch, now)
+            
+            logger.info(f"🗂️ 세션 인덱스 보충: {added}개")
+            return added
+        
+        except Exception as e:
+            logger.error(f"세션 인덱스 보충 실패: {e}")
+            return 0
+    
+    def _index_sessions(self, keys: list, now: float) -> int:
+        """세션 키 목록을 남은 TTL로 인덱스에 추가 (nx: 기존 항목 유지)"""
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+        ttls = pipe.execute()
+        
+        expiries = {
+            key[len(settings.SESSION_PREFIX):]: now + ttl
+            for key, ttl in zip(keys, ttls) if ttl and ttl > 0
+        }
+        if not expiries:
+            return 0
+        return self.client.zadd(settings.SESSION_INDEX_KEY, expiries, nx=True)
+    
+    def get_cached(self, key: str) -> Optional[dict]:
+        """
+        캐시 데이터 조회 (세션 외 용도, 예: STT 결과 캐시)
+        
+        Args:
+            key: 전체 Redis 키
+        
+        Returns:
+            캐시 데이터 (dict) 또는 None
+        """
+        if not self._connected or not self.client:
+            return None
+        
+        try:
+            value = self.client.get(key)
+            return json.loads(value) if value is not None else None
+        
+        except Exception as e:
+            logger.error(f"캐시 조회 실패: {key}, {e}")
+            return None
+    
+    def set_cached(self, key: str, data: dict, ttl: int) -> bool:
+        """
+        캐시 데이터 저장
+        
+        Args:
+            key: 전체 Redis 키
+            data: 저장할 데이터 (dict)
+            ttl: 만료 시간 (초)
+        
+        Returns:
+            성공 여부
+        """
+        if not self._connected or not self.client:
+            return False
+        
+        try:
+            self.client.setex(key, ttl, json.dumps(data, ensure_ascii=False, default=str))
+            return True
+        
+        except Exception as e:
+            logger.error(f"캐시 저장 실패: {key}, {e}")
+            return False
+    
+    def increment_counter(self, key: str, amount: int = 1) -> Optional[int]:
+        """
+        카운터 증가 (모든 워커가 공유)
+        
+        Args:
+            key: 카운터 키
+            amount: 증가량
+        
+        Returns:
+            증가 후 값 또는 None
+        """
+        if not self._connected or not self.client:
+            return None
+        
+        try:
+            return self.client.incrby(key, amount)
+        
+        except Exception as e:
+            logger.error(f"카운터 증가 실패: {key}, {e}")
+            return None
+    
+    def get_counters(self, keys: list) -> dict:
+        """
+        여러 카운터 값 조회
+        
+        Args:
+            keys: 카운터 키 리스트
+        
+        Returns:
+            {키: 값} (없는 키는 0)
+        """
+        if not self._connected or not self.client or not keys:
+            return {key: 0 for key in keys}
+        
+        try:
+            values = self.client.mget(keys)
+            return {key: int(value or 0) for key, value in zip(keys, values)}
+        
+        except Exception as e:
+            logger.error(f"카운터 조회 실패: {keys}, {e}")
+            return {key: 0 for key in keys}
+    
     def _make_key(self, session_id: str) -> str:
         """
         Redis 키 생성
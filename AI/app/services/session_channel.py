@@ -0,0 +1,79 @@
+"""
+Pinned Session: WebSocket 연결 동안 세션을 워커 메모리에 고정
+- 턴마다 Redis에서 다시 읽지 않음
+- Redis 쓰기는 주기적으로 모아서(write-behind) 비동기 실행
+- 연결 종료 시 마지막 상태를 즉시 저장(flush)
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.models.schemas import DialogueSession
+
+logger = logging.getLogger(__name__)
+
+
+class PinnedSession:
+    """연결 1개에 고정된 대화 세션"""
+
+    def __init__(self, session: DialogueSession, context_manager, flush_interval: float = None):
+        """
+        Args:
+            session: Redis에서 한 번 읽어온 세션
+            context_manager: 세션 저장에 사용할 ContextManagerTool
+            flush_interval: 변경분을 모아서 저장하는 주기 (초)
+        """
+        self.session = session
+        self.context_manager = context_manager
+        self.flush_interval = flush_interval or settings.WS_SESSION_FLUSH_INTERVAL
+
+        # 턴 처리와 스냅샷 생성이 겹치지 않도록 보호
+        self.lock = asyncio.Lock()
+        self._version = 0
+        self._flushed_version = 0
+        self._flusher: Optional[asyncio.Task] = None
+
+    def start(self):
+        """백그라운드 flush 작업 시작"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    def mark_dirty(self, session: DialogueSession = None):
+        """턴 처리 후 변경 표시 (lock 안에서 호출)"""
+        if session is not None:
+            self.session = session
+        self._version += 1
+
+    async def flush(self):
+        """변경분이 있으면 Redis에 저장"""
+        async with self.lock:
+            version = self._version
+            if version == self._flushed_version:
+                return
+            snapshot = self.session.model_copy(deep=True)
+
+        try:
+            await asyncio.to_thread(self.context_manager.save_session, snapshot)
+            self._flushed_version = max(self._flushed_version, version)
+        except Exception as e:
+            logger.error(f"❌ 세션 flush 실패: {snapshot.session_id}, {e}")
+
+    async def _flush_loop(self):
+        """주기적으로 변경분 저장"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self):
+        """flush 작업 중단 후 마지막 상태 저장"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        await self.flush()
+        logger.info(f"💾 세션 최종 저장: {self.session.session_id} (v{self._flushed_version})")
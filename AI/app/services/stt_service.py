@@ -1,12 +1,19 @@
 """
 STT Service: Whisper API를 사용한 음성 인식
 """
-import tempfile
-import os
+import asyncio
+import hashlib
 import logging
-from openai import OpenAI
 
+from app.core.config import settings
+from app.core.deadline import timeout_kwargs
+from app.core.degraded import is_dependency_unavailable, record_degraded
+from app.core.metrics import record_cache, track_dependency
+from app.core.tracing import set_span_attributes, traced
 from app.models.schemas import STTResult
+from app.services.audio_preprocessor import get_audio_preprocessor
+from app.services.llm_gateway import get_llm_gateway
+from app.services.redis_service import get_redis_service
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +21,14 @@ logger = logging.getLogger(__name__)
 class STTService:
     """음성 인식 서비스"""
     
+    # STT 캐시 적중/미적중 카운터 키 (Redis, 워커 공유)
+    CACHE_HITS_KEY = f"{settings.STT_CACHE_PREFIX}stats:hits"
+    CACHE_MISSES_KEY = f"{settings.STT_CACHE_PREFIX}stats:misses"
+    
     def __init__(self, api_key: str = None):
-        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        self.client = get_llm_gateway().openai_client(api_key)
+        self.preprocessor = get_audio_preprocessor()
+        self.redis = get_redis_service()
     
     def is_silence_text(self, text: str) -> bool:
         """
@@ -56,6 +69,7 @@ class STTService:
         
         return False
 
+    @traced("stt.transcribe")
     async def transcribe(
         self, audio_data: bytes, filename: str = "audio.wav"
     ) -> STTResult:
@@ -72,14 +86,72 @@ class STTService:
         # 파일 확장자 추출
         audio_format = filename.split('.')[-1] if '.' in filename else "wav"
         
-        return await self.transcribe_audio_file(audio_data, audio_format)
+        if not settings.STT_CACHE_ENABLED:
+            return await self.transcribe_audio_file(audio_data, audio_format)
+        
+        # 같은 녹음의 재업로드(BE 타임아웃 재시도 등)는 캐시된 결과 반환
+        # (해시 계산 / Redis 왕복이 이벤트 루프를 막지 않도록 스레드에서)
+        cache_key, cached = await asyncio.to_thread(self._lookup_cache, audio_data)
+        record_cache("stt", hit=cached is not None)
+        set_span_attributes(cache_hit=cached is not None)
+        if cached is not None:
+            logger.info(f"♻️ STT 캐시 적중: {cache_key}")
+            return STTResult(**cached)
+        
+        stt_result = await self.transcribe_audio_file(audio_data, audio_format)
+        # Whisper가 인식한 결과만 캐시 (무음 / 저하 모드 빈 결과는 재업로드 때 다시 인식)
+        if stt_result.confidence > 0:
+            await asyncio.to_thread(
+                self.redis.set_cached, cache_key, stt_result.dict(), settings.STT_CACHE_TTL
+            )
+        return stt_result
+    
+    def _lookup_cache(self, audio_data: bytes) -> tuple:
+        """
+        캐시 조회 + 적중/미적중 카운터 증가 (동기, 스레드에서 호출)
+        
+        Returns:
+            (캐시 키, 캐시된 결과 또는 None)
+        """
+        cache_key = self._make_cache_key(audio_data)
+        cached = self.redis.get_cached(cache_key)
+        self.redis.increment_counter(
+            self.CACHE_HITS_KEY if cached is not None else self.CACHE_MISSES_KEY
+        )
+        return cache_key, cached
     
+    def _make_cache_key(self, audio_data: bytes) -> str:
+        """오디오 내용 해시 기반 캐시 키 (모델별로 분리)"""
+        digest = hashlib.blake2b(audio_data, digest_size=16).hexdigest()
+        return f"{settings.STT_CACHE_PREFIX}{settings.WHISPER_MODEL}:{digest}"
+    
+    def cache_stats(self) -> dict:
+        """
+        STT 캐시 적중 통계 (모든 워커 합산)
+        
+        Returns:
+            {"hits": int, "misses": int, "hit_rate": float}
+        """
+        counters = self.redis.get_counters([self.CACHE_HITS_KEY, self.CACHE_MISSES_KEY])
+        hits = counters[self.CACHE_HITS_KEY]
+        misses = counters[self.CACHE_MISSES_KEY]
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0
+        }
+    
+    @traced("stt.recognize")
     async def transcribe_audio_file(
         self, audio_file_bytes: bytes, audio_format: str = "webm"
     ) -> STTResult:
         """
         오디오 파일을 텍스트로 변환
         
+        전처리가 켜져 있으면 메모리에서 디코딩/VAD/무음 제거 후 업로드하고,
+        음성 구간이 없으면 Whisper를 호출하지 않고 빈 결과를 반환한다.
+        
         Args:
             audio_file_bytes: 오디오 파일 바이트
             audio_format: 파일 형식 (webm, mp3, wav 등)
@@ -87,27 +159,56 @@ class STTService:
         Returns:
             STTResult
         """
-        try:
-            # 임시 파일 저장
-            with tempfile.NamedTemporaryFile(
-                delete=False, suffix=f".{audio_format}"
-            ) as temp_audio:
-                temp_audio.write(audio_file_bytes)
-                temp_audio_path = temp_audio.name
+        filename = f"audio.{audio_format}"
+        upload_bytes = audio_file_bytes
+        set_span_attributes(audio_bytes=len(audio_file_bytes), audio_format=audio_format)
+        
+        if settings.STT_PREPROCESS_ENABLED:
+            try:
+                processed = await asyncio.to_thread(
+                    self.preprocessor.process, audio_file_bytes
+                )
+            except Exception as e:
+                # 디코딩 실패 시 원본 그대로 Whisper에 전달
+                logger.warning(f"⚠️ 오디오 전처리 실패, 원본으로 STT 진행: {e}")
+                processed = None
             
-            logger.info(f"STT 시작: {temp_audio_path}")
+            if processed is not None:
+                set_span_attributes(
+                    duration_ms=processed["duration_ms"],
+                    speech_ms=processed["speech_ms"]
+                )
+                if not processed["has_speech"]:
+                    return STTResult(text="", confidence=0.0, language="ko")
+                filename = processed["filename"]
+                upload_bytes = processed["audio_bytes"]
+        
+        # Whisper 호출 / 동시 호출 슬롯 대기가 이벤트 루프를 막지 않도록 스레드에서 실행
+        return await asyncio.to_thread(self.transcribe_bytes, upload_bytes, filename)
+    
+    def transcribe_bytes(self, audio_bytes: bytes, filename: str) -> STTResult:
+        """
+        Whisper API 호출 (메모리 버퍼 업로드, 임시 파일 없음)
+        
+        Args:
+            audio_bytes: 업로드할 오디오 바이트
+            filename: 파일명 (확장자로 형식 판단)
+        
+        Returns:
+            STTResult (Whisper 장애 / 혼잡 / 타임아웃이면 빈 결과 → 무음처럼 다시 말해 달라고 요청)
+        """
+        try:
+            logger.info(f"STT 시작: {filename} ({len(audio_bytes)} bytes)")
             
             # Whisper API 호출
-            with open(temp_audio_path, "rb") as audio_file:
+            with track_dependency("whisper"):
                 transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="ko"  # 한국어 명시
+                    model=settings.WHISPER_MODEL,
+                    file=(filename, audio_bytes),
+                    language="ko",  # 한국어 명시
+                    **timeout_kwargs(settings.HTTP_READ_TIMEOUT)
                 )
             
-            # 임시 파일 삭제
-            os.remove(temp_audio_path)
-            
             text = transcript.text.strip()
             logger.info(f"STT 완료: {text}")
             
@@ -118,13 +219,8 @@ class STTService:
             )
         
         except Exception as e:
+            if is_dependency_unavailable(e):
+                record_degraded("whisper", e)
+                return STTResult(text="", confidence=0.0, language="ko")
             logger.error(f"STT 오류: {e}", exc_info=True)
-            # 임시 파일 정리
-            if 'temp_audio_path' in locals():
-                try:
-                    os.remove(temp_audio_path)
-                except:
-                    pass
-            
             raise Exception(f"음성 인식 실패: {str(e)}")
-
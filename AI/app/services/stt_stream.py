@@ -0,0 +1,223 @@
+"""
+Streaming STT: 말하는 도중 도착하는 오디오 프레임을 실시간으로 분할/인식
+- 프레임 에너지 기반 서버 측 endpointing
+- 완료된 발화 구간(segment)을 STTService로 순차 인식하여 부분 결과 전달
+- 아이가 말을 멈추면(긴 무음) 최종 결과 확정
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.schemas import STTResult
+from app.services.audio_preprocessor import get_audio_preprocessor
+from app.utils.audio_utils import TARGET_SAMPLE_RATE, frame_energies_db
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingTranscriber:
+    """
+    스트리밍 음성 인식기 (연결 1개당 1개)
+
+    입력: 16kHz mono 16bit little-endian PCM 바이트 조각
+    """
+
+    def __init__(
+        self,
+        stt_service,
+        on_partial: Optional[Callable[[str, int], Awaitable[None]]] = None,
+        frame_ms: int = None,
+        segment_silence_ms: int = None,
+        endpoint_silence_ms: int = None,
+        max_segment_ms: int = None
+    ):
+        """
+        Args:
+            stt_service: STTService 인스턴스
+            on_partial: 구간 인식 완료 시 호출 (누적 텍스트, 구간 번호)
+            frame_ms: VAD 프레임 길이
+            segment_silence_ms: 구간을 끊는 무음 길이
+            endpoint_silence_ms: 발화 종료로 보는 무음 길이
+            max_segment_ms: 구간 최대 길이 (넘으면 강제 분할)
+        """
+        self.stt_service = stt_service
+        self.on_partial = on_partial
+        self.preprocessor = get_audio_preprocessor()
+
+        self.frame_ms = frame_ms or settings.STT_VAD_FRAME_MS
+        self.frame_len = TARGET_SAMPLE_RATE * self.frame_ms // 1000
+        self.segment_silence_ms = segment_silence_ms or settings.STT_STREAM_SEGMENT_SILENCE_MS
+        self.endpoint_silence_ms = endpoint_silence_ms or settings.STT_STREAM_ENDPOINT_SILENCE_MS
+        self.max_segment_ms = max_segment_ms or settings.STT_STREAM_MAX_SEGMENT_MS
+
+        # VAD 상태
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._noise_db = -60.0
+        self._preroll = deque(maxlen=max(1, settings.STT_VAD_PADDING_MS // self.frame_ms))
+        self._segment: List[np.ndarray] = []
+        self._segment_speech_ms = 0
+        self._in_speech = False
+        self._silence_ms = 0
+        self._heard_speech = False
+        self._endpointed = False
+
+        # 구간 인식 상태
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._texts: List[str] = []
+        self._worker = asyncio.create_task(self._transcribe_worker())
+
+    @property
+    def text(self) -> str:
+        """지금까지 인식된 누적 텍스트"""
+        return " ".join(t for t in self._texts if t)
+
+    @property
+    def endpointed(self) -> bool:
+        """발화 종료(endpoint) 감지 여부"""
+        return self._endpointed
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        PCM 조각 입력
+
+        Args:
+            chunk: 16kHz mono s16le PCM 바이트
+
+        Returns:
+            발화 종료가 감지되었으면 True
+        """
+        if self._endpointed or not chunk:
+            return self._endpointed
+
+        samples = np.frombuffer(chunk[: len(chunk) - len(chunk) % 2], dtype=np.int16)
+        self._pending = np.concatenate([self._pending, samples])
+
+        frame_count = len(self._pending) // self.frame_len
+        if frame_count == 0:
+            return False
+
+        usable = frame_count * self.frame_len
+        frames = self._pending[:usable].reshape(frame_count, self.frame_len)
+        energies = frame_energies_db(self._pending[:usable], TARGET_SAMPLE_RATE, self.frame_ms)
+        self._pending = self._pending[usable:]
+
+        for frame, energy in zip(frames, energies):
+            self._process_frame(frame, float(energy))
+            if self._endpointed:
+                break
+
+        return self._endpointed
+
+    def _process_frame(self, frame: np.ndarray, energy: float):
+        """프레임 1개에 대한 endpointing 상태 전이"""
+        threshold = max(
+            settings.STT_VAD_ENERGY_THRESHOLD_DB,
+            self._noise_db + settings.STT_VAD_NOISE_MARGIN_DB
+        )
+        is_speech = energy > threshold
+
+        if not is_speech:
+            # 배경 소음 추정 갱신 (무음 프레임만 반영)
+            self._noise_db = 0.95 * self._noise_db + 0.05 * energy
+
+        if is_speech:
+            if not self._in_speech:
+                self._in_speech = True
+                self._segment = list(self._preroll)
+                self._preroll.clear()
+            self._segment.append(frame)
+            self._segment_speech_ms += self.frame_ms
+            self._silence_ms = 0
+            self._heard_speech = True
+
+            if len(self._segment) * self.frame_ms >= self.max_segment_ms:
+                self._close_segment()
+                # 말이 이어지는 중이므로 다음 구간을 바로 시작
+                self._in_speech = True
+            return
+
+        self._silence_ms += self.frame_ms
+
+        if self._in_speech:
+            self._segment.append(frame)
+            if self._silence_ms >= self.segment_silence_ms:
+                self._close_segment()
+        else:
+            self._preroll.append(frame)
+
+        if self._heard_speech and self._silence_ms >= self.endpoint_silence_ms:
+            self._endpointed = True
+            logger.info(f"🛑 발화 종료 감지 (무음 {self._silence_ms}ms)")
+
+    def _close_segment(self):
+        """현재 구간을 확정하고 인식 대기열에 추가"""
+        segment, speech_ms = self._segment, self._segment_speech_ms
+        self._segment, self._segment_speech_ms = [], 0
+        self._in_speech = False
+
+        if speech_ms < settings.STT_VAD_MIN_SPEECH_MS or not segment:
+            return
+
+        # 구간 끝의 긴 무음은 패딩 길이만 남김
+        trailing = max(0, self._silence_ms - settings.STT_VAD_PADDING_MS) // self.frame_ms
+        if trailing:
+            segment = segment[: len(segment) - trailing] or segment
+
+        self._queue.put_nowait(np.concatenate(segment))
+
+    async def _transcribe_worker(self):
+        """구간을 순서대로 인식하고 부분 결과 전달"""
+        while True:
+            pcm = await self._queue.get()
+            if pcm is None:
+                return
+
+            index = len(self._texts)
+            try:
+                filename, audio_bytes = await asyncio.to_thread(self.preprocessor.encode, pcm)
+                result = await asyncio.to_thread(
+                    self.stt_service.transcribe_bytes, audio_bytes, filename
+                )
+                text = "" if self.stt_service.is_silence_text(result.text) else result.text
+            except Exception as e:
+                logger.error(f"❌ 구간 {index} 인식 실패: {e}")
+                text = ""
+
+            self._texts.append(text)
+            logger.info(f"🎙️ 구간 {index} 인식: '{text}' → 누적: '{self.text}'")
+
+            if text and self.on_partial:
+                try:
+                    await self.on_partial(self.text, index)
+                except Exception as e:
+                    logger.warning(f"⚠️ 부분 결과 전달 실패: {e}")
+
+    async def finalize(self) -> STTResult:
+        """
+        남은 구간을 인식하고 최종 결과 반환
+
+        Returns:
+            STTResult (음성이 없으면 빈 텍스트)
+        """
+        if self._in_speech:
+            self._close_segment()
+        self._endpointed = True
+
+        self._queue.put_nowait(None)
+        await self._worker
+
+        text = self.text
+        return STTResult(
+            text=text,
+            confidence=1.0 if text else 0.0,
+            language="ko"
+        )
+
+    def cancel(self):
+        """연결 종료 시 인식 작업 취소"""
+        if not self._worker.done():
+            self._worker.cancel()
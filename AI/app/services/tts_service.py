@@ -2,20 +2,50 @@
 TTS (Text-to-Speech) Service
 Supertone API를 사용하여 텍스트를 음성으로 변환
 """
-import requests
 import os
 import logging
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Dict
 import uuid
 from pathlib import Path
 import base64
 
+from app.core.config import settings
+from app.core.deadline import timeout_kwargs
+from app.core.hedging import hedged_call
+from app.core.metrics import track_dependency
+from app.core.tracing import set_span_attributes, traced
+from app.services.llm_gateway import get_llm_gateway
+from app.utils.audio_utils import OUTPUT_FORMATS, audio_duration_ms, transcode_audio
+
 logger = logging.getLogger(__name__)
 
+# 포맷 변환용 프로세스 풀 (워커 프로세스마다 지연 생성, 크기 제한)
+_transcode_executor = None
+
+def get_transcode_executor() -> ProcessPoolExecutor:
+    """TTS 포맷 변환 프로세스 풀 반환"""
+    global _transcode_executor
+    if _transcode_executor is None:
+        _transcode_executor = ProcessPoolExecutor(
+            max_workers=settings.TTS_TRANSCODE_WORKERS
+        )
+    return _transcode_executor
+
+
+def shutdown_transcode_executor():
+    """TTS 포맷 변환 프로세스 풀 종료"""
+    global _transcode_executor
+    if _transcode_executor is not None:
+        _transcode_executor.shutdown(wait=False, cancel_futures=True)
+        _transcode_executor = None
+
 class TTSService:
     """
     TTS 서비스
     - Supertone API를 사용하여 텍스트를 음성(.wav)으로 변환
+    - 필요 시 Opus(Ogg) / AAC로 변환하여 전송량 절감
     - 생성된 음성 파일을 저장하고 경로 반환
     """
     
@@ -25,14 +55,19 @@ class TTSService:
             api_key: Supertone API Key (환경변수 SUPERTONE_API_KEY 또는 직접 입력)
         """
         self.api_key = api_key or os.getenv("SUPERTONE_API_KEY")
-        self.base_url = "https://supertoneapi.com/v1"
+        self.base_url = settings.SUPERTONE_BASE_URL
         self.headers = {
             "x-sup-api-key": self.api_key
         }
+        # 공유 커넥션 풀 (keep-alive)
+        self.http = get_llm_gateway().supertone_http
         
         # 음성 파일 저장 디렉토리 설정
-        self.audio_dir = Path("generated_audio")
-        self.audio_dir.mkdir(exist_ok=True)
+        self.audio_dir = Path(settings.TTS_AUDIO_DIR)
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        
+        # 출력 포맷 (wav | opus | aac)
+        self.output_format = settings.TTS_OUTPUT_FORMAT
         
         # 기본 voice_id (캐싱용)
         self._default_voice_id = None
@@ -56,11 +91,13 @@ class TTSService:
         try:
             # 보이스 목록 조회
             voices_url = f"{self.base_url}/voices/search"
-            response = requests.get(voices_url, headers=self.headers)
-            
-            if response.status_code != 200:
-                logger.error(f"보이스 목록 조회 실패: {response.status_code} {response.text}")
-                raise Exception(f"보이스 목록 조회 실패: {response.status_code}")
+            # 429 / 5xx도 실패로 집계되도록 상태 코드 확인까지 측정 구간에 포함
+            with track_dependency("supertone"):
+                response = self.http.get(voices_url, headers=self.headers)
+                
+                if response.status_code != 200:
+                    logger.error(f"보이스 목록 조회 실패: {response.status_code} {response.text}")
+                    raise Exception(f"보이스 목록 조회 실패: {response.status_code}")
             
             voices = response.json()
             
@@ -84,16 +121,107 @@ class TTSService:
             logger.error(f"보이스 ID 조회 중 오류: {e}")
             raise
     
+    def _normalize_format(self, output_format: Optional[str]) -> str:
+        """요청 포맷 검증 (알 수 없는 포맷은 WAV)"""
+        output_format = (output_format or self.output_format or "wav").lower()
+        if output_format not in OUTPUT_FORMATS:
+            logger.warning(f"⚠️ 지원하지 않는 TTS 포맷 '{output_format}', WAV로 대체")
+            return "wav"
+        return output_format
+    
+    def _bitrate_for(self, output_format: str) -> Optional[str]:
+        """포맷별 목표 비트레이트"""
+        return {
+            "opus": settings.TTS_OPUS_BITRATE,
+            "aac": settings.TTS_AAC_BITRATE
+        }.get(output_format)
+    
+    def _synthesize_wav(
+        self,
+        text: str,
+        voice_name: str,
+        language: str,
+        style: str,
+        model: str
+    ) -> bytes:
+        """Supertone API 호출 → WAV 바이트"""
+        # 1. voice_id 조회
+        voice_id = self.get_voice_id(voice_name)
+        
+        # 2. TTS 요청
+        tts_url = f"{self.base_url}/text-to-speech/{voice_id}"
+        tts_data = {
+            "text": text,
+            "language": language,
+            "style": style,
+            "model": model
+        }
+        
+        logger.info(f"TTS 요청: text='{text[:50]}...', voice={voice_name}")
+        
+        def request_tts() -> bytes:
+            response = self.http.post(
+                tts_url, headers=self.headers, json=tts_data, **timeout_kwargs(settings.HTTP_READ_TIMEOUT)
+            )
+            if response.status_code != 200:
+                logger.error(f"TTS 생성 실패: {response.status_code} {response.text}")
+                raise Exception(f"TTS 생성 실패: {response.status_code}")
+            return response.content
+        
+        # 같은 요청을 다시 보내도 결과가 같으므로 hedge 대상
+        return hedged_call("supertone", request_tts)
+    
+    def _build_result(
+        self,
+        text: str,
+        audio_bytes: bytes,
+        audio_format: str,
+        duration_ms: Optional[int]
+    ) -> Dict:
+        """음성 파일 저장 및 응답 딕셔너리 구성"""
+        spec = OUTPUT_FORMATS[audio_format]
+        
+        # 고유한 파일명 생성 (UUID)
+        file_id = str(uuid.uuid4())
+        file_name = f"tts_{file_id}.{spec['extension']}"
+        file_path = self.audio_dir / file_name
+        
+        # 파일로 저장 (백업용)
+        with open(file_path, "wb") as f:
+            f.write(audio_bytes)
+        
+        # Base64 인코딩
+        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+        
+        if duration_ms is None:
+            # 헤더 파싱 실패 시에만 추정 (대략 150자/분 = 2.5자/초 → 400ms/자)
+            duration_ms = int(len(text) * 400)
+        
+        logger.info(
+            f"TTS 음성 파일 생성 완료: {file_path}, 포맷: {audio_format}, "
+            f"크기: {len(audio_bytes)} bytes, 길이: {duration_ms}ms, Base64 길이: {len(audio_base64)}"
+        )
+        
+        return {
+            "file_path": str(file_path),
+            "file_url": f"/audio/{file_name}",
+            "audio_base64": audio_base64,
+            "duration_ms": duration_ms,
+            "audio_format": audio_format,
+            "mime_type": spec["mime_type"]
+        }
+    
     def text_to_speech(
         self,
         text: str,
         voice_name: str = "Anna",  # 어린 여자 아이 목소리 (child, female)
         language: str = "ko",
         style: str = "neutral",
-        model: str = "sona_speech_1"
+        model: str = "sona_speech_1",
+        output_format: Optional[str] = None
     ) -> Dict[str, str]:
         """
-        텍스트를 음성으로 변환하고 파일로 저장
+        텍스트를 음성으로 변환하고 파일로 저장 (동기 버전)
         
         Args:
             text: 변환할 텍스트
@@ -101,64 +229,83 @@ class TTSService:
             language: 언어 코드 (기본값: "ko")
             style: 말하기 스타일 (기본값: "neutral")
             model: 사용할 TTS 모델 (기본값: "sona_speech_1")
+            output_format: 출력 포맷 "wav" | "opus" | "aac" (기본값: TTS_OUTPUT_FORMAT)
         
         Returns:
             {
                 "file_path": "생성된 음성 파일 경로",
                 "file_url": "파일 URL (서버에서 접근 가능한 경로)",
-                "duration_ms": "음성 길이 (밀리초, 추정값)"
+                "audio_base64": "Base64 인코딩된 오디오",
+                "duration_ms": "음성 길이 (밀리초, 헤더 기준)",
+                "audio_format": "출력 포맷",
+                "mime_type": "MIME 타입"
             }
         """
         try:
-            # 1. voice_id 조회
-            voice_id = self.get_voice_id(voice_name)
-            
-            # 2. TTS 요청
-            tts_url = f"{self.base_url}/text-to-speech/{voice_id}"
-            tts_data = {
-                "text": text,
-                "language": language,
-                "style": style,
-                "model": model
-            }
+            output_format = self._normalize_format(output_format)
+            wav_bytes = self._synthesize_wav(text, voice_name, language, style, model)
+            duration_ms = audio_duration_ms(wav_bytes)
             
-            logger.info(f"TTS 요청: text='{text[:50]}...', voice={voice_name}")
+            audio_bytes, audio_format = wav_bytes, "wav"
+            if output_format != "wav":
+                try:
+                    audio_bytes = transcode_audio(
+                        wav_bytes, output_format, self._bitrate_for(output_format)
+                    )
+                    audio_format = output_format
+                except Exception as e:
+                    logger.warning(f"⚠️ TTS 포맷 변환 실패, WAV로 반환: {e}")
             
-            response = requests.post(tts_url, headers=self.headers, json=tts_data)
-            
-            if response.status_code != 200:
-                logger.error(f"TTS 생성 실패: {response.status_code} {response.text}")
-                raise Exception(f"TTS 생성 실패: {response.status_code}")
-            
-            # 3. 파일 저장 및 Base64 인코딩
-            # 고유한 파일명 생성 (UUID + timestamp)
-            file_id = str(uuid.uuid4())
-            file_name = f"tts_{file_id}.wav"
-            file_path = self.audio_dir / file_name
-            
-            audio_bytes = response.content
-            
-            # 파일로 저장 (백업용)
-            with open(file_path, "wb") as f:
-                f.write(audio_bytes)
-            
-            # Base64 인코딩
-            audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-            
-            # 4. 음성 길이 추정 (대략 150자/분 = 2.5자/초 → 400ms/자)
-            estimated_duration_ms = int(len(text) * 400)
-            
-            logger.info(f"TTS 음성 파일 생성 완료: {file_path}, 크기: {len(audio_bytes)} bytes, Base64 길이: {len(audio_base64)}")
+            return self._build_result(text, audio_bytes, audio_format, duration_ms)
+        
+        except Exception as e:
+            logger.error(f"TTS 변환 중 오류: {e}")
+            raise
+    
+    @traced("tts.synthesize")
+    async def text_to_speech_async(
+        self,
+        text: str,
+        voice_name: str = "Anna",
+        language: str = "ko",
+        style: str = "neutral",
+        model: str = "sona_speech_1",
+        output_format: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        텍스트를 음성으로 변환 (비동기 버전)
+        
+        Supertone 호출 / 길이 계산 / 파일 저장은 스레드에서, 포맷 변환은 크기가 제한된
+        프로세스 풀에서 실행하여 이벤트 루프를 막지 않는다.
+        반환 형식은 text_to_speech와 동일.
+        """
+        try:
+            output_format = self._normalize_format(output_format)
+            set_span_attributes(text_length=len(text), output_format=output_format)
+            wav_bytes = await asyncio.to_thread(
+                self._synthesize_wav, text, voice_name, language, style, model
+            )
+            # WAV 헤더가 깨졌으면 ffmpeg 디코딩까지 갈 수 있으므로 이벤트 루프 밖에서 계산
+            duration_ms = await asyncio.to_thread(audio_duration_ms, wav_bytes)
             
-            # 5. 파일 URL 및 Base64 반환
-            file_url = f"/audio/{file_name}"
+            audio_bytes, audio_format = wav_bytes, "wav"
+            if output_format != "wav":
+                try:
+                    loop = asyncio.get_running_loop()
+                    audio_bytes = await loop.run_in_executor(
+                        get_transcode_executor(),
+                        transcode_audio,
+                        wav_bytes,
+                        output_format,
+                        self._bitrate_for(output_format)
+                    )
+                    audio_format = output_format
+                except Exception as e:
+                    logger.warning(f"⚠️ TTS 포맷 변환 실패, WAV로 반환: {e}")
             
-            return {
-                "file_path": str(file_path),
-                "file_url": file_url,
-                "audio_base64": audio_base64,
-                "duration_ms": estimated_duration_ms
-            }
+            return await asyncio.to_thread(
+                self._build_result, text, audio_bytes, audio_format, duration_ms
+            )
         
         except Exception as e:
             logger.error(f"TTS 변환 중 오류: {e}")
@@ -0,0 +1,186 @@
+"""
+Turn Recorder: 운영 턴 기록 (opt-in)
+프롬프트 / 모델 변경 전후의 지연시간, 토큰, 판정을 비교하기 위해
+턴 입력과 결과를 gzip JSON Lines로 남긴다. (재실행: python -m app.cli.replay)
+
+기록 항목: Stage, 턴 전 세션 스냅샷, 아동 발화, Tool 결과, 전환 판정,
+외부 호출 시간, LLM 토큰 사용량
+개인정보: 아동 이름은 받침 여부가 같은 가명으로 치환 (조사 처리가 달라지지 않도록),
+세션 ID는 해시로 대체
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.core.turn_capture import TurnCapture
+from app.models.schemas import DialogueSession
+from app.utils.name_utils import has_jongseong
+
+logger = logging.getLogger(__name__)
+
+RECORD_VERSION = 1
+
+# 받침 없음 / 있음
+_PSEUDONYMS = ("지우", "하늘")
+
+# 기록할 Tool 결과 키 (ai_response는 텍스트만)
+_TOOL_OUTPUT_KEYS = ("safety_check", "emotion_detected", "llm_evaluation", "action_items")
+
+
+def pseudonym_for(name: str) -> str:
+    """받침 여부가 같은 가명"""
+    return _PSEUDONYMS[1] if name and has_jongseong(name[-1]) else _PSEUDONYMS[0]
+
+
+def redact(value: Any, name: str, replacement: str) -> Any:
+    """dict / list / 문자열 안의 이름을 가명으로 치환"""
+    if not name or name == replacement:
+        return value
+    if isinstance(value, str):
+        if len(name) >= 2:
+            return value.replace(name, replacement)
+        # 한 글자 이름은 단어 시작에서 조사와 함께 쓰인 경우만 치환 (예: "은아", "은이는")
+        return re.sub(
+            rf"(?<![가-힣]){re.escape(name)}(?=(아|야|이|가|는|은|을|를|의)?(?![가-힣]))",
+            replacement,
+            value
+        )
+    if isinstance(value, dict):
+        return {k: redact(v, name, replacement) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v, name, replacement) for v in value]
+    return value
+
+
+def hash_session_id(session_id: str) -> str:
+    """세션 ID → 기록용 가명 ID (같은 세션의 턴끼리는 연결 가능)"""
+    return hashlib.blake2b(session_id.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def build_turn_record(
+    session_before: DialogueSession,
+    child_text: str,
+    turn_result: Dict,
+    session_after: DialogueSession,
+    should_transition: bool,
+    capture: TurnCapture,
+    duration_seconds: float,
+    turn_id: Optional[str] = None
+) -> Dict:
+    """
+    턴 기록 1건 생성 (이름 치환 포함)
+
+    Returns:
+        기록 dict
+    """
+    name = session_before.child_name
+    alias = pseudonym_for(name)
+
+    snapshot = session_before.dict()
+    snapshot["session_id"] = hash_session_id(session_before.session_id)
+
+    tool_outputs = {key: turn_result.get(key) for key in _TOOL_OUTPUT_KEYS if key in turn_result}
+    ai_response = turn_result.get("ai_response") or {}
+    tool_outputs["ai_response_text"] = ai_response.get("text", "")
+
+    record = {
+        "v": RECORD_VERSION,
+        "turn_id": turn_id or uuid.uuid4().hex,
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "session": snapshot["session_id"],
+        "stage": session_before.current_stage.value,
+        "retry_count": session_before.retry_count,
+        "session_before": snapshot,
+        "child_text": child_text,
+        "tool_outputs": tool_outputs,
+        "verdict": {
+            "should_transition": should_transition,
+            "next_stage": session_after.current_stage.value,
+            "retry_count_after": session_after.retry_count,
+            "llm_success": (turn_result.get("llm_evaluation") or {}).get("success"),
+        },
+        "calls": capture.calls,
+        "llm_usage": capture.llm_usage,
+        "tokens": capture.token_totals(),
+        "duration_ms": round(duration_seconds * 1000, 1),
+    }
+    return redact(record, name, alias)
+
+
+def append_records(path: str, records: List[Dict]):
+    """gzip 멤버 단위로 추가 기록 (이어붙인 gzip은 하나의 스트림으로 읽힘)"""
+    if not records:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = "".join(
+        json.dumps(r, ensure_ascii=False, default=str, separators=(",", ":")) + "\n"
+        for r in records
+    )
+    with open(path, "ab") as f:
+        f.write(gzip.compress(payload.encode("utf-8")))
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """기록 파일 읽기 (.gz 또는 일반 JSON Lines)"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class TurnRecorder:
+    """턴 기록기 (설정으로 켜고 끔, 샘플링 지원)"""
+
+    def __init__(
+        self,
+        enabled: bool = None,
+        directory: str = None,
+        sample_rate: float = None
+    ):
+        self.enabled = settings.TURN_RECORDING_ENABLED if enabled is None else enabled
+        self.directory = directory or settings.TURN_RECORDING_DIR
+        self.sample_rate = settings.TURN_RECORDING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self._lock = threading.Lock()
+
+    def should_record(self) -> bool:
+        """이번 턴을 기록할지 여부"""
+        return self.enabled and random.random() < self.sample_rate
+
+    def current_path(self) -> str:
+        """오늘 날짜의 기록 파일 (워커별로 분리)"""
+        day = datetime.now().strftime("%Y%m%d")
+        return os.path.join(self.directory, f"turns-{day}-{os.getpid()}.jsonl.gz")
+
+    def record(self, **kwargs):
+        """턴 기록 (실패해도 턴 처리에는 영향 없음)"""
+        try:
+            record = build_turn_record(**kwargs)
+            with self._lock:
+                append_records(self.current_path(), [record])
+        except Exception as e:
+            logger.warning(f"⚠️ 턴 기록 실패: {e}")
+
+
+# 싱글톤 인스턴스
+_turn_recorder_instance = None
+
+
+def get_turn_recorder() -> TurnRecorder:
+    """TurnRecorder 싱글톤 반환"""
+    global _turn_recorder_instance
+    if _turn_recorder_instance is None:
+        _turn_recorder_instance = TurnRecorder()
+    return _turn_recorder_instance
@@ -3,13 +3,14 @@ TOOL 4: Action Card Generator
 행동 카드 생성 (S3, S5에서 사용)
 """
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from typing import Dict, List, Optional
 import logging
-import os
 
 from app.models.schemas import ActionCard
+from app.core.metrics import record_cache, track_dependency
+from app.tools.action_card_library import get_action_card_library
+from app.services.llm_gateway import get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -18,34 +19,59 @@ class ActionCardGeneratorTool:
     """행동 카드 생성 도구"""
     
     def __init__(self, api_key: str = None):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.7,
-            api_key=api_key or os.getenv("OPENAI_API_KEY")
-        )
+        self.llm = get_llm_gateway().llm("action_card", api_key=api_key)
     
     def generate_draft(
         self,
         emotion: str,
         situation: str,
         action_card: str,
-        child_name: str,        
+        child_name: str,
+        story_name: Optional[str] = None,
     ) -> List[str]:
         """
         S3에서 사용: 행동 전략 초안 생성 (2-3개)
+        사전 생성 라이브러리에 있으면 바로 반환, 없을 때만 LLM 생성
         
         Args:
             emotion: 감정 라벨
             situation: 상황 설명
             child_name: 아동 이름
+            story_name: 동화 제목 (라이브러리 조회용)
         
         Returns:
             행동 전략 리스트 (12자 이내)
         """
+        library = get_action_card_library()
+        if library is not None:
+            strategies = library.select_strategies(story_name, emotion, action_card, child_name)
+            record_cache("action_card_library", strategies is not None)
+            if strategies is not None:
+                logger.info(f"행동 전략 초안 (라이브러리): {strategies}")
+                return strategies
+        
+        try:
+            strategies = self.generate_draft_llm(emotion, situation, action_card, child_name)
+            logger.info(f"행동 전략 초안 생성: {strategies}")
+            return strategies
+        
+        except Exception as e:
+            logger.error(f"행동 전략 생성 오류: {e}", exc_info=True)
+            # Fallback 전략
+            return self._get_fallback_strategies(emotion)
+    
+    def generate_draft_llm(
+        self,
+        emotion: str,
+        situation: str,
+        action_card: str,
+        child_name: str,
+    ) -> List[str]:
+        """LLM 행동 전략 생성 (실패 시 예외, 라이브러리 빌드에서도 사용)"""
         prompt = ChatPromptTemplate.from_messages([
             ("system", """
             너는 아동 SEL 교육 전문가야.
-            아이가 {emotion} 감정을 느낄 때 사용할 수 있는 
+            아이가 마지막 메시지의 감정을 느낄 때 사용할 수 있는 
             구체적이고 실천 가능한 행동 전략을 제안해야 해.
 
             규칙:
@@ -54,7 +80,10 @@ class ActionCardGeneratorTool:
             3. 오늘 당장 실천 가능한 간단한 행동
             4. 2-3개 전략 제시
             5. 아동(7-10세)이 이해하기 쉬운 표현
-            6. {action_card}의 하위 분류에 해당하는 전략 제안
+            6. 마지막 메시지의 행동 카드의 하위 분류에 해당하는 전략 제안
+            
+            형식: JSON 배열
+            예시: ["심호흡 3번 하기", "10까지 세기", "물 한 컵 마시기"]
             """),
             
             ("user", """
@@ -63,13 +92,11 @@ class ActionCardGeneratorTool:
             아이 이름: {child_name}
             행동 카드: {action_card}
 
-            2-3개의 행동 전략을 제안해줘.
-            형식: JSON 배열
-            예시: ["심호흡 3번 하기", "10까지 세기", "물 한 컵 마시기"]
+            2-3개의 행동 전략을 JSON 배열로 제안해줘.
             """)
         ])
         
-        try:
+        with track_dependency("action_card"):
             response = self.llm.invoke(
                 prompt.format_messages(
                     emotion=emotion,
@@ -78,29 +105,23 @@ class ActionCardGeneratorTool:
                     child_name=child_name
                 )
             )
-            
-            content = response.content.strip()
-            
-            # JSON 파싱 시도
-            import json
-            # JSON 추출 (```json ... ``` 형태 처리)
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            strategies = json.loads(content)
-            
-            # 12자 제한 검증
-            strategies = [s[:12] for s in strategies]
-            
-            logger.info(f"행동 전략 초안 생성: {strategies}")
-            return strategies[:3]
         
-        except Exception as e:
-            logger.error(f"행동 전략 생성 오류: {e}", exc_info=True)
-            # Fallback 전략
-            return self._get_fallback_strategies(emotion)
+        content = response.content.strip()
+        
+        # JSON 파싱 시도
+        import json
+        # JSON 추출 (```json ... ``` 형태 처리)
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0].strip()
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0].strip()
+        
+        strategies = json.loads(content)
+        
+        # 12자 제한 검증
+        strategies = [s[:12] for s in strategies]
+        
+        return strategies[:3]
     
     def generate_final_card(
         self,
@@ -114,6 +135,7 @@ class ActionCardGeneratorTool:
     ) -> ActionCard:
         """
         S5에서 사용: 최종 행동 카드 생성
+        사전 생성 라이브러리에 있으면 바로 반환, 없을 때만 LLM 생성
         
         Args:
             child_name: 아동 이름
@@ -126,39 +148,73 @@ class ActionCardGeneratorTool:
         Returns:
             ActionCard
         """
+        library = get_action_card_library()
+        if library is not None:
+            card = library.select_card(story_name, emotion, action_card, child_name)
+            record_cache("action_card_library", card is not None)
+            if card is not None:
+                logger.info(f"최종 행동 카드 (라이브러리): {card.title}")
+                return card
+        
+        try:
+            card = self.generate_final_card_llm(
+                child_name, story_name, action_card, emotion, situation, selected_strategy, conversation_summary
+            )
+            logger.info(f"최종 행동 카드 생성: {card.title}")
+            return card
+        
+        except Exception as e:
+            logger.error(f"행동 카드 생성 오류: {e}", exc_info=True)
+            # Fallback 카드
+            return self._get_fallback_card(emotion)
+    
+    def generate_final_card_llm(
+        self,
+        child_name: str,
+        story_name: str,
+        action_card: str,
+        emotion: str,
+        situation: str,
+        selected_strategy: Optional[str],
+        conversation_summary: str
+    ) -> ActionCard:
+        """LLM 행동 카드 생성 (실패 시 예외, 라이브러리 빌드에서도 사용)"""
         prompt = ChatPromptTemplate.from_messages([
             ("system", """
                 너는 아동 SEL 교육 전문가이자 부모 코칭 전문가야.
                 아이와의 대화를 바탕으로 행동 카드를 만들어야 해.
 
                 행동 카드 구성:
-                1. 제목: {action_card}
+                1. 제목: 마지막 메시지의 행동 카드 (15자 이내)
                 2. 설명: 50자 이내, 구체적 행동 설명
                 3. 아이콘: 이모지 1개 (행동을 상징)
                 4. 부모 가이드: 3줄, 각 30자 이내
                 - 1줄: 아이의 감정 설명
                 - 2줄: 전략 사용 시기
                 - 3줄: 부모의 격려 방법
+
+                출력 형식 (JSON):
+            {{
+                "title": "15자 이내 제목",
+                "description": "50자 이내 설명",
+                "icon": "🌟",
+                "parent_guide": ["가이드1", "가이드2", "가이드3"]
+            }}
                 """),
             ("user", """
                 아이 이름: {child_name}
                 동화: {story_name}
+                행동 카드: {action_card}
                 감정: {emotion}
                 상황: {situation}
                 선택한 전략: {strategy}
                 대화 요약: {summary}
 
-                위 정보를 바탕으로 행동 카드를 JSON 형식으로 생성해줘:
-            {{
-                "title": "15자 이내 제목",
-                "description": "50자 이내 설명",
-                "icon": "🌟",
-                "parent_guide": ["가이드1", "가이드2", "가이드3"]
-            }}
+                위 정보를 바탕으로 행동 카드를 JSON 형식으로 생성해줘.
         """)
         ])
         
-        try:
+        with track_dependency("action_card"):
             response = self.llm.invoke(
                 prompt.format_messages(
                     child_name=child_name,
@@ -170,32 +226,24 @@ class ActionCardGeneratorTool:
                     summary=conversation_summary
                 )
             )
-            
-            content = response.content.strip()
-            
-            # JSON 파싱
-            import json
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            card_data = json.loads(content)
-            
-            # 길이 제한 적용
-            card_data["title"] = card_data["title"][:15]
-            card_data["description"] = card_data["description"][:50]
-            card_data["parent_guide"] = [g[:30] for g in card_data["parent_guide"][:3]]
-            
-            card = ActionCard(**card_data)
-            
-            logger.info(f"최종 행동 카드 생성: {card.title}")
-            return card
         
-        except Exception as e:
-            logger.error(f"행동 카드 생성 오류: {e}", exc_info=True)
-            # Fallback 카드
-            return self._get_fallback_card(emotion)
+        content = response.content.strip()
+        
+        # JSON 파싱
+        import json
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0].strip()
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0].strip()
+        
+        card_data = json.loads(content)
+        
+        # 길이 제한 적용
+        card_data["title"] = card_data["title"][:15]
+        card_data["description"] = card_data["description"][:50]
+        card_data["parent_guide"] = [g[:30] for g in card_data["parent_guide"][:3]]
+        
+        return ActionCard(**card_data)
     
     def _get_fallback_strategies(self, emotion: str) -> List[str]:
         """기본 전략 (오류 시)"""
@@ -254,7 +302,8 @@ def action_card_generator_tool(action: str, **kwargs) -> Dict:
             emotion=kwargs.get("emotion", ""),
             situation=kwargs.get("situation", ""),
             action_card=kwargs.get("action_card", ""),
-            child_name=kwargs.get("child_name", "")
+            child_name=kwargs.get("child_name", ""),
+            story_name=kwargs.get("story_name")
         )
         return {"strategies": strategies}
     
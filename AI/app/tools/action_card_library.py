@@ -0,0 +1,270 @@
+"""
+행동 카드 라이브러리 (오프라인 사전 생성)
+(동화, 감정, 행동 카드 제목)별로 검증된 전략 / 카드 변형을 미리 만들어 두고,
+런타임에는 LLM 없이 고른 뒤 아이 이름만 넣어서 반환한다. (없을 때만 LLM 생성)
+
+- 데이터: action_card_library.json (버전 포함, python -m app.cli.action_cards build로 생성)
+- 조회 순서: (동화, 감정, 제목) → (동화, *, 제목) → (*, 감정, 제목) → (*, *, 제목)
+- 변형 선택: 키별 순환 (같은 카드를 연속으로 보지 않도록)
+- 개인화: {name} / {name_subject} / {name_topic} / {name_vocative} 자리에 아이 이름 + 조사
+"""
+import itertools
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.schemas import ActionCard
+from app.utils.name_utils import format_name_with_subject, format_name_with_topic, format_name_with_vocative
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = "*"
+DEFAULT_ACTION_CARD_TITLE = "감정 표현하기"
+
+# 검증 시 이름 자리 길이 계산용 (3글자 이름 기준)
+_SAMPLE_NAME = "가나다"
+
+STRATEGY_MAX_LENGTH = 12
+TITLE_MAX_LENGTH = 15
+DESCRIPTION_MAX_LENGTH = 50
+GUIDE_MAX_LENGTH = 30
+
+
+def library_key(story_name: str, emotion: str, title: str) -> str:
+    """라이브러리 키 (동화|감정|제목)"""
+    return f"{story_name}|{emotion}|{title}"
+
+
+def _name_fields(child_name: Optional[str]) -> Dict[str, str]:
+    name = (child_name or "").strip() or "친구"
+    return {
+        "name": name,
+        "name_subject": format_name_with_subject(name),
+        "name_topic": format_name_with_topic(name),
+        "name_vocative": format_name_with_vocative(name),
+    }
+
+
+def personalize(text: str, child_name: Optional[str]) -> str:
+    """이름 자리 채우기 (알 수 없는 자리 / 중괄호는 그대로 둠)"""
+    if "{" not in text:
+        return text
+    try:
+        return text.format_map(_name_fields(child_name))
+    except (KeyError, IndexError, ValueError):
+        return text
+
+
+# ========================================
+# 검증 (빌드 시 + 로드 시)
+# ========================================
+
+def validate_strategies(strategies, safety_filter=None) -> List[str]:
+    """
+    전략 변형 1개 검증
+
+    Args:
+        strategies: 전략 리스트
+        safety_filter: contains_badword(text)를 가진 객체 (빌드 시에만 전달)
+
+    Returns:
+        오류 목록 (비어 있으면 통과)
+    """
+    if not isinstance(strategies, list) or not 2 <= len(strategies) <= 3:
+        return ["전략은 2-3개여야 합니다"]
+
+    errors = []
+    for strategy in strategies:
+        if not isinstance(strategy, str) or not strategy.strip():
+            errors.append(f"빈 전략: {strategy!r}")
+            continue
+        text = personalize(strategy, _SAMPLE_NAME)
+        if len(text) > STRATEGY_MAX_LENGTH:
+            errors.append(f"{STRATEGY_MAX_LENGTH}자 초과: {strategy}")
+        if safety_filter is not None and safety_filter.contains_badword(text)[0]:
+            errors.append(f"금칙어 포함: {strategy}")
+    if len(set(strategies)) != len(strategies):
+        errors.append("중복 전략")
+    return errors
+
+
+def validate_card(card, safety_filter=None) -> List[str]:
+    """카드 변형 1개 검증 (제목 15자, 설명 50자, 부모 가이드 3줄 × 30자)"""
+    if not isinstance(card, dict):
+        return ["카드는 객체여야 합니다"]
+
+    errors = []
+    texts = []
+    for field, limit in (("title", TITLE_MAX_LENGTH), ("description", DESCRIPTION_MAX_LENGTH)):
+        value = card.get(field)
+        if not isinstance(value, str) or not value.strip():
+            errors.append(f"{field} 없음")
+            continue
+        texts.append(personalize(value, _SAMPLE_NAME))
+        if len(texts[-1]) > limit:
+            errors.append(f"{field} {limit}자 초과: {value}")
+
+    guide = card.get("parent_guide")
+    if not isinstance(guide, list) or len(guide) != 3:
+        errors.append("parent_guide는 3줄이어야 합니다")
+    else:
+        for line in guide:
+            if not isinstance(line, str) or not line.strip():
+                errors.append(f"빈 가이드: {line!r}")
+                continue
+            texts.append(personalize(line, _SAMPLE_NAME))
+            if len(texts[-1]) > GUIDE_MAX_LENGTH:
+                errors.append(f"가이드 {GUIDE_MAX_LENGTH}자 초과: {line}")
+
+    if safety_filter is not None:
+        for text in texts:
+            if safety_filter.contains_badword(text)[0]:
+                errors.append(f"금칙어 포함: {text}")
+    return errors
+
+
+def validate_library(data: Dict, safety_filter=None) -> List[str]:
+    """라이브러리 전체 검증 ("키: 오류" 목록)"""
+    if not isinstance(data, dict) or not isinstance(data.get("entries"), dict):
+        return ["entries 없음"]
+    if not data.get("version"):
+        return ["version 없음"]
+
+    errors = []
+    for key, entry in data["entries"].items():
+        if len(key.split("|")) != 3:
+            errors.append(f"{key}: 키 형식은 동화|감정|제목")
+            continue
+        if not entry.get("strategies") and not entry.get("cards"):
+            errors.append(f"{key}: 변형 없음")
+        for i, strategies in enumerate(entry.get("strategies", [])):
+            errors.extend(f"{key}: strategies[{i}] {e}" for e in validate_strategies(strategies, safety_filter))
+        for i, card in enumerate(entry.get("cards", [])):
+            errors.extend(f"{key}: cards[{i}] {e}" for e in validate_card(card, safety_filter))
+    return errors
+
+
+# ========================================
+# 라이브러리
+# ========================================
+
+class ActionCardLibrary:
+    """사전 생성 행동 카드 라이브러리 (읽기 전용, 변형 순환만 상태로 가짐)"""
+
+    def __init__(self, data: Dict):
+        self.version = data.get("version", "unknown")
+        self.entries: Dict[str, Dict[str, List]] = {}
+        dropped = 0
+        # 손으로 고친 파일이 섞여도 런타임에는 규칙을 통과한 변형만 사용
+        for key, entry in (data.get("entries") or {}).items():
+            strategies = [s for s in entry.get("strategies", []) if not validate_strategies(s)]
+            cards = [c for c in entry.get("cards", []) if not validate_card(c)]
+            dropped += len(entry.get("strategies", [])) + len(entry.get("cards", [])) - len(strategies) - len(cards)
+            if strategies or cards:
+                self.entries[key] = {"strategies": strategies, "cards": cards}
+        if dropped:
+            logger.warning(f"⚠️ 행동 카드 라이브러리: 규칙 위반 변형 {dropped}개 제외")
+
+        self._cursors: Dict[Tuple[str, str], itertools.count] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "ActionCardLibrary":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _lookup(self, kind: str, story_name: Optional[str], emotion: str, title: str) -> Optional[Tuple[str, List]]:
+        candidates = []
+        if story_name:
+            candidates.append(library_key(story_name, emotion, title))
+            candidates.append(library_key(story_name, WILDCARD, title))
+        candidates.append(library_key(WILDCARD, emotion, title))
+        candidates.append(library_key(WILDCARD, WILDCARD, title))
+
+        for key in candidates:
+            variants = self.entries.get(key, {}).get(kind)
+            if variants:
+                return key, variants
+        return None
+
+    def _next_variant(self, kind: str, key: str, variants: List):
+        with self._lock:
+            cursor = self._cursors.setdefault((kind, key), itertools.count())
+            index = next(cursor)
+        return variants[index % len(variants)]
+
+    def select_strategies(
+        self,
+        story_name: Optional[str],
+        emotion: str,
+        title: str,
+        child_name: Optional[str] = None
+    ) -> Optional[List[str]]:
+        """전략 변형 선택 (없으면 None → LLM 생성)"""
+        found = self._lookup("strategies", story_name, emotion, title)
+        if found is None:
+            return None
+        key, variants = found
+        strategies = self._next_variant("strategies", key, variants)
+        return [personalize(s, child_name)[:STRATEGY_MAX_LENGTH] for s in strategies]
+
+    def select_card(
+        self,
+        story_name: Optional[str],
+        emotion: str,
+        title: str,
+        child_name: Optional[str] = None
+    ) -> Optional[ActionCard]:
+        """카드 변형 선택 (없으면 None → LLM 생성)"""
+        found = self._lookup("cards", story_name, emotion, title)
+        if found is None:
+            return None
+        key, variants = found
+        card = self._next_variant("cards", key, variants)
+        return ActionCard(
+            title=personalize(card["title"], child_name)[:TITLE_MAX_LENGTH],
+            description=personalize(card["description"], child_name)[:DESCRIPTION_MAX_LENGTH],
+            icon=card.get("icon") or "🌟",
+            parent_guide=[personalize(g, child_name)[:GUIDE_MAX_LENGTH] for g in card["parent_guide"]]
+        )
+
+
+def default_library_path() -> str:
+    """기본 라이브러리 경로 (ACTION_CARD_LIBRARY_PATH가 없으면 이 모듈 옆 JSON)"""
+    return settings.ACTION_CARD_LIBRARY_PATH or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "action_card_library.json"
+    )
+
+
+# Singleton 인스턴스
+_library_instance = None
+_library_loaded = False
+_library_lock = threading.Lock()
+
+
+def get_action_card_library() -> Optional[ActionCardLibrary]:
+    """싱글톤 라이브러리 반환 (비활성화 / 파일 없음 / 로드 실패 시 None)"""
+    global _library_instance, _library_loaded
+    if _library_loaded:
+        return _library_instance
+    with _library_lock:
+        if _library_loaded:
+            return _library_instance
+        if settings.ACTION_CARD_LIBRARY_ENABLED:
+            path = default_library_path()
+            try:
+                _library_instance = ActionCardLibrary.load(path)
+                logger.info(f"📇 행동 카드 라이브러리 로드: {len(_library_instance)}개 키 (버전 {_library_instance.version})")
+            except FileNotFoundError:
+                logger.warning(f"⚠️ 행동 카드 라이브러리 파일 없음, LLM 생성만 사용: {path}")
+            except Exception as e:
+                logger.error(f"❌ 행동 카드 라이브러리 로드 실패, LLM 생성만 사용: {e}")
+        _library_loaded = True
+    return _library_instance
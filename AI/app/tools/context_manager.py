@@ -254,8 +254,9 @@ class ContextManagerTool:
                 context["s4_scenario"] = session.context.get('s4_scenario', '그 상황')
                 
         elif stage == Stage.S6_ACTION_CARD:
-            # 전체 대화 요약
-            context["all_turns"] = session.key_moments
+            # 전체 대화 요약 (원문 대신 롤링 요약 + 최근 대화)
+            from app.services.conversation_summary import conversation_digest
+            context["conversation_summary"] = " | ".join(conversation_digest(session)) or "대화 없음"
         
         return context
     
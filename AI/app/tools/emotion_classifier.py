@@ -3,15 +3,18 @@ TOOL 2: Emotion Classifier
 GPT-4o-mini 기반 감정 분류기
 """
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 import logging
 from typing import Dict, List
 import json
-import os
 
 from app.models.schemas import EmotionResult, EmotionLabel
+from app.utils.result_cache import SharedResultStore, TextResultCache
+from app.core.deadline import has_time_for
+from app.core.degraded import is_dependency_unavailable, record_degraded
+from app.core.hedging import hedged_call
+from app.services.llm_gateway import get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -44,11 +47,17 @@ class EmotionClassifierTool:
         """
         logger.info("감정 분류기 초기화 (GPT-4o-mini)")
         
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.3,  # 일관성을 위해 낮은 temperature
-            api_key=api_key or os.getenv("OPENAI_API_KEY")
-        )
+        # 일관성을 위해 낮은 temperature
+        self.llm = get_llm_gateway().llm("emotion_classifier", api_key=api_key)
+        
+        # 분류 결과 캐시 (같은 발화 재분류 방지)
+        self._result_cache = TextResultCache(name="emotion", maxsize=256, ttl_seconds=300)
+        # 스트리밍 STT 선행 분류 결과 (다른 워커와 공유)
+        self._shared_results = SharedResultStore(name="emotion")
+        
+        # 프롬프트는 한 번만 구성 (출력 스키마까지 포함한 system 메시지가 매 호출 동일 → 프롬프트 캐시)
+        self._parser = JsonOutputParser(pydantic_object=EmotionResult)
+        self._prompt = self._build_prompt(self._parser)
         
         logger.info("감정 분류기 초기화 완료")
     
@@ -56,84 +65,124 @@ class EmotionClassifierTool:
         """
         텍스트에서 감정 분류
         
+        같은 발화의 결과는 잠시 캐시되며, 진행 중인 분류(스트리밍 STT
+        선행 분류 등)가 있으면 그 결과를 기다린다.
+        
         Args:
             text: 분류할 텍스트 (아동 발화)
         
         Returns:
             EmotionResult: 감정 분류 결과
         """
+        # 턴 마감이 임박하면 LLM 호출 없이 키워드 기반 분류
+        if not has_time_for("emotion_classifier"):
+            return self._fallback_classify(text)
+        
         try:
-            parser = JsonOutputParser(pydantic_object=EmotionResult)
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", """
-                    너는 아동 심리 전문가로서 아이의 발화에서 감정을 정확히 분류해야 해.
-
-                    6가지 기본 감정:
-                    1. 행복 (기쁨, 즐거움, 만족)
-                    2. 슬픔 (속상함, 우울, 외로움)
-                    3. 분노 (화남, 짜증, 억울함)
-                    4. 두려움 (무서움, 불안, 걱정)
-                    5. 놀람 (신기함, 당황, 의외)
-                    6. 중립 (감정 표현 없음)
-
-                    [중요 규칙 - 반드시 지킬 것]
-                    1. **과도한 추론 금지**: 텍스트에 감정 표현이 명시되지 않았다면, 대상이 긍정적이어도(예: "치킨", "선물") 감정을 할당하지 말고 **'중립'**으로 분류해.
-                    2. **단순 명사/사실**: 아이가 단순히 사물 이름을 말하거나("교촌치킨", "구름"), 사실을 말할 때("배가 고파")는 **'중립'**이야.
-                    3. 문맥상 명확한 감정 형용사나 부사가 있을 때만 감정을 선택해.
-                    4. 주 감정 1개는 반드시 선택
-                    5. 부 감정은 0-2개 (확실한 경우만)
-                    6. 신뢰도는 0.0~1.0 사이
-                    
-                    [Few-shot 예시]
-                    - "와! 치킨이다!" -> 행복 (감탄사 및 문맥 존재)
-                    - "교촌양념치킨" -> 중립 (단순 명사)
-                    - "선생님 미워" -> 분노
-                    - "학교 갔어" -> 중립
-                    - "친구가 생겨서 정말 기뻐요" -> 행복
-                    - "무서워요, 어두워요" -> 두려움
-                    - "별로 안 좋아요" -> 중립 (모호한 표현)
-                    
-                    다음 스키마를 엄격하게 따르세요.
-                    {format_instructions}
-                    
-                """),
-                ("user", "아이의 발화: \"{text}\"\n\n이 아이의 감정을 분석해줘.")
-            ])
-            
-            response = self.llm.invoke(prompt.format_messages(text=text, format_instructions=parser.get_format_instructions()))
-            print(response)
-            result = parser.parse(response.content)
-            print(result)
-
-            # EmotionLabel로 변환
-            # print(result)
-            primary_emotion = self._map_to_emotion_label(result["primary"])
-            secondary_emotions = [
-                self._map_to_emotion_label(e) 
-                for e in result.get("secondary", [])
-            ]
-            confidence = float(result.get("confidence", 0.8))
-            
-            logger.info(
-                f"감정 분류 완료: primary={primary_emotion.value}({confidence:.2f}), "
-                f"secondary={[e.value for e in secondary_emotions]}, "
-                f"reasoning={result.get('reasoning', '')}"
-            )
-            
-            return EmotionResult(
-                primary=primary_emotion,
-                secondary=secondary_emotions[:2],
-                confidence=confidence,
-                raw_scores={
-                    primary_emotion.value: confidence
-                }
+            return self._result_cache.get_or_compute(
+                text, lambda: self._classify_shared_or_llm(text)
             )
         
         except Exception as e:
+            if is_dependency_unavailable(e):
+                # 저하 모드 (회로 열림 / 혼잡 / 타임아웃): 키워드 기반 분류
+                record_degraded("emotion_classifier", e)
+                return self._fallback_classify(text)
+            
             logger.error(f"감정 분류 오류: {e}", exc_info=True)
             # Fallback: 간단한 키워드 기반 분류
             return self._fallback_classify(text)
     
+    @staticmethod
+    def _build_prompt(parser: JsonOutputParser) -> ChatPromptTemplate:
+        """분류 프롬프트 (고정 지침 + 출력 스키마는 system, 아이 발화만 마지막 user 메시지)"""
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", """
+                너는 아동 심리 전문가로서 아이의 발화에서 감정을 정확히 분류해야 해.
+
+                6가지 기본 감정:
+                1. 행복 (기쁨, 즐거움, 만족)
+                2. 슬픔 (속상함, 우울, 외로움)
+                3. 분노 (화남, 짜증, 억울함)
+                4. 두려움 (무서움, 불안, 걱정)
+                5. 놀람 (신기함, 당황, 의외)
+                6. 중립 (감정 표현 없음)
+
+                [중요 규칙 - 반드시 지킬 것]
+                1. **과도한 추론 금지**: 텍스트에 감정 표현이 명시되지 않았다면, 대상이 긍정적이어도(예: "치킨", "선물") 감정을 할당하지 말고 **'중립'**으로 분류해.
+                2. **단순 명사/사실**: 아이가 단순히 사물 이름을 말하거나("교촌치킨", "구름"), 사실을 말할 때("배가 고파")는 **'중립'**이야.
+                3. 문맥상 명확한 감정 형용사나 부사가 있을 때만 감정을 선택해.
+                4. 주 감정 1개는 반드시 선택
+                5. 부 감정은 0-2개 (확실한 경우만)
+                6. 신뢰도는 0.0~1.0 사이
+                
+                [Few-shot 예시]
+                - "와! 치킨이다!" -> 행복 (감탄사 및 문맥 존재)
+                - "교촌양념치킨" -> 중립 (단순 명사)
+                - "선생님 미워" -> 분노
+                - "학교 갔어" -> 중립
+                - "친구가 생겨서 정말 기뻐요" -> 행복
+                - "무서워요, 어두워요" -> 두려움
+                - "별로 안 좋아요" -> 중립 (모호한 표현)
+                
+                다음 스키마를 엄격하게 따르세요.
+                {format_instructions}
+                
+            """),
+            ("user", "아이의 발화: \"{text}\"\n\n이 아이의 감정을 분석해줘.")
+        ])
+        return prompt.partial(format_instructions=parser.get_format_instructions())
+    
+    def prefetch(self, text: str):
+        """
+        스트리밍 STT 최종 결과 선행 분류
+        결과를 Redis에도 두어 /turn이 다른 워커에서 처리돼도 재사용한다. (오류 / 키워드 분류 결과는 공유하지 않음)
+        """
+        try:
+            result = self._result_cache.get_or_compute(
+                text, lambda: self._classify_shared_or_llm(text)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ 선행 감정 분류 실패, /turn에서 다시 분류: {e}")
+            return
+        self._shared_results.set(text, result.dict())
+    
+    def _classify_shared_or_llm(self, text: str) -> EmotionResult:
+        """다른 워커가 선행 분류한 결과가 있으면 사용, 없으면 LLM 분류"""
+        shared = self._shared_results.get(text)
+        if shared is not None:
+            return EmotionResult(**shared)
+        return self._classify_with_llm(text)
+    
+    def _classify_with_llm(self, text: str) -> EmotionResult:
+        """GPT 기반 감정 분류 (오류는 호출자에게 전달)"""
+        messages = self._prompt.format_messages(text=text)
+        response = hedged_call("emotion_classifier", lambda: self.llm.invoke(messages))
+        result = self._parser.parse(response.content)
+
+        # EmotionLabel로 변환
+        primary_emotion = self._map_to_emotion_label(result["primary"])
+        secondary_emotions = [
+            self._map_to_emotion_label(e) 
+            for e in result.get("secondary", [])
+        ]
+        confidence = float(result.get("confidence", 0.8))
+        
+        logger.info(
+            f"감정 분류 완료: primary={primary_emotion.value}({confidence:.2f}), "
+            f"secondary={[e.value for e in secondary_emotions]}, "
+            f"reasoning={result.get('reasoning', '')}"
+        )
+        
+        return EmotionResult(
+            primary=primary_emotion,
+            secondary=secondary_emotions[:2],
+            confidence=confidence,
+            raw_scores={
+                primary_emotion.value: confidence
+            }
+        )
+    
     def _map_to_emotion_label(self, label_text: str) -> EmotionLabel:
         """텍스트를 EmotionLabel로 매핑"""
         label_text = label_text.strip()
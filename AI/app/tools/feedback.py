@@ -4,36 +4,33 @@ TOOL 5: Feedback Generator
 """
 from exceptiongroup import catch
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import logging
-import os
 
 from app.models.schemas import Feedback
+from app.core.metrics import track_dependency
+from app.services.llm_gateway import get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
+CHILD_SECTION_HEADER = "아동 대화 분석 피드백:"
+PARENT_SECTION_HEADER = "부모 행동 지침:"
+
+# 생성 실패 시 안내 문구
+FEEDBACK_ERROR_RESULT = {
+    "child_analysis_feedback": "피드백 생성 중 오류가 발생했습니다.",
+    "parent_action_guide": "잠시 후 다시 시도해주세요."
+}
+
 class FeedbackGeneratorTool:
     """피드백 생성 도구"""
     
     def __init__(self, api_key: str = None):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.3,
-            api_key=api_key or os.getenv("OPENAI_API_KEY")
-        )
+        self.llm = get_llm_gateway().llm("feedback", api_key=api_key)
     
-    def generate_feedback(self, input_text: str) -> Dict:
-        """
-        아동-AI 대화 전체 분석 후 부모 피드백 생성
-        
-        Args:
-            input_text: 대화 텍스트 + 감정 정보
-        
-        Returns:
-            {"child_analysis_feedback": str, "parent_action_guide": str}
-        """
+    def _messages(self, input_text: str) -> List:
+        """피드백 프롬프트 메시지 구성"""
         prompt = ChatPromptTemplate.from_messages([
             ("system", """
              # 아동 대화 분석 및 부모 가이드 생성 시스템 프롬프트
@@ -117,39 +114,173 @@ class FeedbackGeneratorTool:
             ),
             ("user", "{input}")
         ])
+        return prompt.format_messages(input=input_text)
+    
+    def generate_feedback(self, input_text: str, raise_on_error: bool = False, dependency: str = "feedback") -> Dict:
+        """
+        아동-AI 대화 전체 분석 후 부모 피드백 생성
         
+        Args:
+            input_text: 대화 텍스트 + 감정 정보
+            raise_on_error: True면 오류 안내 문구 대신 예외 전달 (결과 캐시 / 작업 실패 처리용)
+            dependency: 호출 지표 / 동시 호출 제한 이름 (일괄 생성은 "feedback_batch"로 대화형 요청과 분리)
+        
+        Returns:
+            {"child_analysis_feedback": str, "parent_action_guide": str}
+        """
         try:
-            response = self.llm.invoke(
-                prompt.format_messages(input=input_text)
-            )
-            
-            content = response.content.strip()
+            with track_dependency(dependency):
+                response = self.llm.invoke(self._messages(input_text))
             
-            # 응답 파싱: "아동 대화 분석 피드백:" 과 "부모 행동 지침:" 구분
-            child_feedback = ""
-            parent_guide = ""
-            
-            if "아동 대화 분석 피드백:" in content and "부모 행동 지침:" in content:
-                parts = content.split("부모 행동 지침:")
-                child_part = parts[0].replace("아동 대화 분석 피드백:", "").strip()
-                parent_part = parts[1].strip() if len(parts) > 1 else ""
-                
-                child_feedback = child_part
-                parent_guide = parent_part
-            else:
-                # 파싱 실패 시 전체 텍스트를 child_feedback에 넣음
-                logger.warning("피드백 응답 형식이 예상과 다름, 전체를 child_feedback으로 저장")
-                child_feedback = content
-                parent_guide = "부모님께 구체적인 행동 지침을 제공하지 못했습니다. 아동의 감정 표현을 수용하고 공감해주세요."
-            
-            return {
-                "child_analysis_feedback": child_feedback,
-                "parent_action_guide": parent_guide
-            }
+            return parse_feedback(response.content)
             
         except Exception as e:
             logger.error(f"피드백 생성 오류: {e}", exc_info=True)
-            return {
-                "child_analysis_feedback": "피드백 생성 중 오류가 발생했습니다.",
-                "parent_action_guide": "잠시 후 다시 시도해주세요."
-            }
+            if raise_on_error:
+                raise
+            return dict(FEEDBACK_ERROR_RESULT)
+    
+    def stream_feedback(self, input_text: str) -> Iterator[Dict]:
+        """
+        부모 피드백 스트리밍 생성 (토큰이 도착하는 대로 섹션별 이벤트 전달)
+        
+        Args:
+            input_text: 대화 텍스트 + 감정 정보
+        
+        Yields:
+            {"event": "section", "section": str}              섹션 시작
+            {"event": "delta", "section": str, "text": str}   섹션 본문 조각
+            {"event": "done", "child_analysis_feedback": str, "parent_action_guide": str}
+            {"event": "error", "message": str}                 (생성 실패 시, 마지막 이벤트)
+        """
+        parser = FeedbackSectionParser()
+        try:
+            with track_dependency("feedback"):
+                for chunk in self.llm.stream(self._messages(input_text)):
+                    if chunk.content:
+                        yield from parser.feed(chunk.content)
+            yield from parser.close()
+            yield {"event": "done", **parse_feedback(parser.content)}
+        
+        except Exception as e:
+            logger.error(f"피드백 스트리밍 생성 오류: {e}", exc_info=True)
+            yield {"event": "error", "message": FEEDBACK_ERROR_RESULT["child_analysis_feedback"]}
+
+
+def parse_feedback(content: str) -> Dict:
+    """
+    응답 파싱: "아동 대화 분석 피드백:" 과 "부모 행동 지침:" 구분
+    
+    Returns:
+        {"child_analysis_feedback": str, "parent_action_guide": str}
+    """
+    content = content.strip()
+    
+    child_feedback = ""
+    parent_guide = ""
+    
+    if CHILD_SECTION_HEADER in content and PARENT_SECTION_HEADER in content:
+        parts = content.split(PARENT_SECTION_HEADER)
+        child_part = parts[0].replace(CHILD_SECTION_HEADER, "").strip()
+        parent_part = parts[1].strip() if len(parts) > 1 else ""
+        
+        child_feedback = child_part
+        parent_guide = parent_part
+    else:
+        # 파싱 실패 시 전체 텍스트를 child_feedback에 넣음
+        logger.warning("피드백 응답 형식이 예상과 다름, 전체를 child_feedback으로 저장")
+        child_feedback = content
+        parent_guide = "부모님께 구체적인 행동 지침을 제공하지 못했습니다. 아동의 감정 표현을 수용하고 공감해주세요."
+    
+    return {
+        "child_analysis_feedback": child_feedback,
+        "parent_action_guide": parent_guide
+    }
+
+
+class FeedbackSectionParser:
+    """
+    스트리밍 응답에서 섹션 제목을 점진적으로 찾아 섹션별 본문 조각으로 나눔
+    
+    - 제목 이전 / 제목 없이 시작한 본문은 child_analysis_feedback으로 취급
+    - 제목이 토큰 경계에 걸쳐 도착할 수 있으므로 제목 앞부분과 겹치는 끝부분은 다음 조각까지 보류
+    - 섹션 시작의 공백 / 줄바꿈은 버림
+    """
+    
+    HEADERS = {
+        CHILD_SECTION_HEADER: "child_analysis_feedback",
+        PARENT_SECTION_HEADER: "parent_action_guide",
+    }
+    
+    def __init__(self):
+        self.section: Optional[str] = None
+        self._pending = ""
+        self._parts: List[str] = []
+        self._section_started = False
+    
+    @property
+    def content(self) -> str:
+        """지금까지 받은 전체 응답"""
+        return "".join(self._parts)
+    
+    def feed(self, text: str) -> List[Dict]:
+        """응답 조각 입력 → 이벤트 목록"""
+        self._parts.append(text)
+        self._pending += text
+        events: List[Dict] = []
+        
+        while True:
+            found = [(self._pending.find(h), h) for h in self.HEADERS if h in self._pending]
+            if not found:
+                break
+            index, header = min(found)
+            self._emit(self._pending[:index], events)
+            self._pending = self._pending[index + len(header):]
+            self._switch(self.HEADERS[header], events)
+        
+        # 제목 앞부분일 수 있는 끝부분만 남기고 전달
+        hold = self._partial_header_length(self._pending)
+        self._emit(self._pending[:len(self._pending) - hold], events)
+        self._pending = self._pending[len(self._pending) - hold:]
+        return events
+    
+    def close(self) -> List[Dict]:
+        """응답 종료 → 보류 중인 조각 전달"""
+        events: List[Dict] = []
+        self._emit(self._pending, events)
+        self._pending = ""
+        return events
+    
+    def _partial_header_length(self, text: str) -> int:
+        for length in range(min(len(text), max(len(h) for h in self.HEADERS) - 1), 0, -1):
+            suffix = text[-length:]
+            if any(h.startswith(suffix) for h in self.HEADERS):
+                return length
+        return 0
+    
+    def _switch(self, section: str, events: List[Dict]):
+        if section != self.section:
+            self.section = section
+            events.append({"event": "section", "section": section})
+        self._section_started = False
+    
+    def _emit(self, text: str, events: List[Dict]):
+        if not self._section_started:
+            text = text.lstrip()
+        if not text:
+            return
+        if self.section is None:
+            self._switch("child_analysis_feedback", events)
+        self._section_started = True
+        events.append({"event": "delta", "section": self.section, "text": text})
+
+
+# Singleton 인스턴스 (요청마다 LLM 핸들을 새로 만들지 않도록)
+_feedback_generator_instance = None
+
+def get_feedback_generator() -> FeedbackGeneratorTool:
+    """싱글톤 피드백 생성기 반환"""
+    global _feedback_generator_instance
+    if _feedback_generator_instance is None:
+        _feedback_generator_instance = FeedbackGeneratorTool()
+    return _feedback_generator_instance
@@ -5,12 +5,18 @@ OpenAI Moderation API를 사용한 유해 콘텐츠 필터링
 import re
 import unicodedata
 from langchain.tools import tool
-from openai import OpenAI
 import os
 import logging
 from typing import Dict, List
 
 from app.models.schemas import SafetyCheckResult
+from app.utils.result_cache import SharedResultStore, TextResultCache
+from app.core.config import settings
+from app.core.deadline import timeout_kwargs
+from app.core.degraded import is_dependency_unavailable, record_degraded
+from app.core.hedging import hedged_call
+from app.core.tracing import traced
+from app.services.llm_gateway import get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +25,7 @@ class SafetyFilterTool:
     """안전 필터 도구"""
     
     def __init__(self, api_key: str = None):
-        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        self.client = get_llm_gateway().openai_client(api_key)
         
         # 금칙어 파일 경로 (현재 파일 기준 상대 경로)
         badwords_path = os.path.join(
@@ -27,6 +33,11 @@ class SafetyFilterTool:
             "korean_badwords.txt"
         )
         self.badwords = self._load_badwords(badwords_path)
+        
+        # 검사 결과 캐시 (같은 발화 재검사 방지)
+        self._result_cache = TextResultCache(name="safety", maxsize=256, ttl_seconds=300)
+        # 스트리밍 STT 선행 검사 결과 (다른 워커와 공유)
+        self._shared_results = SharedResultStore(name="safety")
         logger.info(f"[SAFETY] SafetyFilterTool 초기화 완료, 금칙어: {len(self.badwords)}개")
     
     def _load_badwords(self, filepath: str) -> List[str]:
@@ -110,10 +121,14 @@ class SafetyFilterTool:
         
         return False, ""
     
+    @traced("safety_filter.check")
     def check(self, text: str) -> SafetyCheckResult:
         """
         텍스트의 안전성 검사
         
+        같은 텍스트의 결과는 잠시 캐시되며, 이미 진행 중인 검사(스트리밍 STT
+        선행 검사 등)가 있으면 새로 호출하지 않고 그 결과를 기다린다.
+        
         Args:
             text: 검사할 텍스트
         
@@ -121,66 +136,17 @@ class SafetyFilterTool:
             SafetyCheckResult: 안전성 검사 결과
         """
         try:
-            logger.info(f"[SAFETY] 안전성 검사 시작: '{text}'")
-            
-            #########################################
-            # (A) 1차 필터: 금칙어(Blacklist) 검사
-            #########################################
-            contains_bad, detected_word = self.contains_badword(text)
-            if contains_bad:
-                logger.warning(f"[SAFETY] ❌ 금칙어 감지됨: '{detected_word}' in '{text}'")
-                flagged_categories = ["harassment", "profanity"]
-                
-                return SafetyCheckResult(
-                    is_safe=False,
-                    flagged_categories=flagged_categories,
-                    message="그 말은 너무 거칠어서 사용하기 어려워. 다른 말로 이야기해볼까?"
-                )
-                
-            #########################################
-            # (B) 2차 필터: OpenAI Moderation
-            #########################################    
-            response = self.client.moderations.create(
-                model="omni-moderation-latest",
-                input=text
-            )
-            result = response.results[0]
-            categories = result.categories
-            
-            # 위반 카테고리 수집
-            flagged_categories = []
-            if categories.self_harm:
-                flagged_categories.append("self_harm")
-            if categories.sexual:
-                flagged_categories.append("sexual")
-            if categories.hate:
-                flagged_categories.append("hate")
-            if categories.hate_threatening:
-                flagged_categories.append("hate_threatening")
-            if categories.harassment:
-                flagged_categories.append("harassment")
-            if categories.harassment_threatening:
-                flagged_categories.append("harassment_threatening")
-            if categories.violence:
-                flagged_categories.append("violence")
-            
-            is_safe = len(flagged_categories) == 0
-            
-            # 경고 메시지 생성
-            message = None
-            if not is_safe:
-                message = self._get_child_friendly_warning(flagged_categories)
-                logger.warning(f"[SAFETY] ❌ OpenAI Moderation 감지: {flagged_categories}")
-            else:
-                logger.info(f"[SAFETY] ✅ 안전한 텍스트")
-            
-            return SafetyCheckResult(
-                is_safe=is_safe,
-                flagged_categories=flagged_categories,
-                message=message
+            return self._result_cache.get_or_compute(
+                text, lambda: self._check_shared_or_uncached(text)
             )
         
         except Exception as e:
+            if is_dependency_unavailable(e):
+                # Moderation 장애 / 혼잡 / 타임아웃 (저하 모드): 금칙어 검사는 이미 통과했으므로 안전으로 간주
+                # (캐시하지 않으므로 회복되면 다시 Moderation 검사)
+                record_degraded("moderation", e)
+                return SafetyCheckResult(is_safe=True, flagged_categories=[], message=None)
+            
             logger.error(f"[SAFETY] ❌ 안전 필터 오류: {e}", exc_info=True)
             # 오류 시 안전하지 않음으로 간주 (보수적 접근)
             return SafetyCheckResult(
@@ -189,6 +155,89 @@ class SafetyFilterTool:
                 message="잠깐, 다른 말로 해볼까?"
             )
     
+    def prefetch(self, text: str):
+        """
+        스트리밍 STT 최종 결과 선행 검사
+        결과를 Redis에도 두어 /turn이 다른 워커에서 처리돼도 재사용한다. (오류 / 저하 결과는 공유하지 않음)
+        """
+        try:
+            result = self._result_cache.get_or_compute(
+                text, lambda: self._check_shared_or_uncached(text)
+            )
+        except Exception as e:
+            logger.warning(f"[SAFETY] ⚠️ 선행 검사 실패, /turn에서 다시 검사: {e}")
+            return
+        self._shared_results.set(text, result.dict())
+    
+    def _check_shared_or_uncached(self, text: str) -> SafetyCheckResult:
+        """다른 워커가 선행 검사한 결과가 있으면 사용, 없으면 검사"""
+        shared = self._shared_results.get(text)
+        if shared is not None:
+            return SafetyCheckResult(**shared)
+        return self._check_uncached(text)
+    
+    def _check_uncached(self, text: str) -> SafetyCheckResult:
+        """금칙어 + OpenAI Moderation 검사 (오류는 호출자에게 전달)"""
+        logger.info(f"[SAFETY] 안전성 검사 시작: '{text}'")
+        
+        #########################################
+        # (A) 1차 필터: 금칙어(Blacklist) 검사
+        #########################################
+        contains_bad, detected_word = self.contains_badword(text)
+        if contains_bad:
+            logger.warning(f"[SAFETY] ❌ 금칙어 감지됨: '{detected_word}' in '{text}'")
+            flagged_categories = ["harassment", "profanity"]
+            
+            return SafetyCheckResult(
+                is_safe=False,
+                flagged_categories=flagged_categories,
+                message="그 말은 너무 거칠어서 사용하기 어려워. 다른 말로 이야기해볼까?"
+            )
+            
+        #########################################
+        # (B) 2차 필터: OpenAI Moderation
+        #########################################    
+        response = hedged_call("moderation", lambda: self.client.moderations.create(
+            model="omni-moderation-latest",
+            input=text,
+            **timeout_kwargs(settings.HTTP_READ_TIMEOUT)
+        ))
+        result = response.results[0]
+        categories = result.categories
+        
+        # 위반 카테고리 수집
+        flagged_categories = []
+        if categories.self_harm:
+            flagged_categories.append("self_harm")
+        if categories.sexual:
+            flagged_categories.append("sexual")
+        if categories.hate:
+            flagged_categories.append("hate")
+        if categories.hate_threatening:
+            flagged_categories.append("hate_threatening")
+        if categories.harassment:
+            flagged_categories.append("harassment")
+        if categories.harassment_threatening:
+            flagged_categories.append("harassment_threatening")
+        if categories.violence:
+            flagged_categories.append("violence")
+        
+        is_safe = len(flagged_categories) == 0
+        
+        # 경고 메시지 생성
+        message = None
+        if not is_safe:
+            message = self._get_child_friendly_warning(flagged_categories)
+            logger.warning(f"[SAFETY] ❌ OpenAI Moderation 감지: {flagged_categories}")
+        else:
+            logger.info(f"[SAFETY] ✅ 안전한 텍스트")
+        
+        return SafetyCheckResult(
+            is_safe=is_safe,
+            flagged_categories=flagged_categories,
+            message=message
+        )
+    
     def _get_child_friendly_warning(self, categories: list) -> str:
         """
         아동 친화적 경고 메시지 생성
@@ -0,0 +1,220 @@
+"""
+오디오 처리 유틸리티
+ffmpeg 파이프와 NumPy를 사용해 임시 파일 없이 메모리에서 오디오를 다룸
+"""
+import io
+import logging
+import wave
+
+import ffmpeg
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper 입력 기준 포맷 (16kHz, mono, 16bit PCM)
+TARGET_SAMPLE_RATE = 16000
+
+
+def decode_to_pcm(audio_bytes: bytes, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    오디오 바이트를 mono 16bit PCM 배열로 디코딩
+
+    PCM WAV는 파이썬에서 바로 읽고, 그 외 포맷(webm, m4a, mp3 등)은
+    ffmpeg stdin/stdout 파이프로 변환한다.
+
+    Args:
+        audio_bytes: 원본 오디오 바이트
+        sample_rate: 출력 샘플레이트
+
+    Returns:
+        int16 PCM 샘플 배열
+    """
+    pcm = _decode_pcm_wav(audio_bytes, sample_rate)
+    if pcm is not None:
+        return pcm
+
+    out, _ = (
+        ffmpeg
+        .input("pipe:0")
+        .output("pipe:1", format="s16le", acodec="pcm_s16le", ac=1, ar=sample_rate)
+        .global_args("-hide_banner", "-loglevel", "error")
+        .run(input=audio_bytes, capture_stdout=True, capture_stderr=True)
+    )
+    return np.frombuffer(out, dtype=np.int16)
+
+
+def _decode_pcm_wav(audio_bytes: bytes, sample_rate: int):
+    """16bit PCM WAV이면 ffmpeg 없이 디코딩 (아니면 None)"""
+    if audio_bytes[:4] != b"RIFF" or audio_bytes[8:12] != b"WAVE":
+        return None
+
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+            if wav.getsampwidth() != 2:
+                return None
+            channels = wav.getnchannels()
+            source_rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    pcm = np.frombuffer(frames, dtype=np.int16)
+    if channels > 1:
+        pcm = pcm[: len(pcm) - len(pcm) % channels]
+        pcm = pcm.reshape(-1, channels).mean(axis=1).astype(np.int16)
+
+    if source_rate != sample_rate and len(pcm) > 0:
+        # 선형 보간 리샘플링 (음성 인식 용도로 충분)
+        target_len = int(round(len(pcm) * sample_rate / source_rate))
+        positions = np.linspace(0, len(pcm) - 1, num=target_len)
+        pcm = np.interp(positions, np.arange(len(pcm)), pcm).astype(np.int16)
+
+    return pcm
+
+
+def frame_energies_db(
+    pcm: np.ndarray,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    frame_ms: int = 30
+) -> np.ndarray:
+    """
+    프레임 단위 RMS 에너지(dBFS) 계산
+
+    Args:
+        pcm: int16 PCM 샘플 배열
+        sample_rate: 샘플레이트
+        frame_ms: 프레임 길이 (밀리초)
+
+    Returns:
+        프레임별 에너지 배열 (dBFS, 무음은 약 -100)
+    """
+    frame_len = max(1, sample_rate * frame_ms // 1000)
+    frame_count = len(pcm) // frame_len
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = pcm[: frame_count * frame_len].astype(np.float32).reshape(frame_count, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames / 32768.0), axis=1))
+    return (20.0 * np.log10(np.maximum(rms, 1e-5))).astype(np.float32)
+
+
+def pcm_to_wav_bytes(pcm: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> bytes:
+    """int16 PCM 배열을 WAV 바이트로 변환"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def pcm_to_opus_bytes(
+    pcm: np.ndarray,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    bitrate: str = "24k"
+) -> bytes:
+    """int16 PCM 배열을 Ogg/Opus 바이트로 인코딩 (ffmpeg 파이프)"""
+    out, _ = (
+        ffmpeg
+        .input("pipe:0", format="s16le", acodec="pcm_s16le", ac=1, ar=sample_rate)
+        .output("pipe:1", format="ogg", acodec="libopus", audio_bitrate=bitrate, application="voip")
+        .global_args("-hide_banner", "-loglevel", "error")
+        .run(input=pcm.astype(np.int16).tobytes(), capture_stdout=True, capture_stderr=True)
+    )
+    return out
+
+
+# TTS 출력 포맷별 ffmpeg 설정 (컨테이너, 코덱, 확장자, MIME)
+OUTPUT_FORMATS = {
+    "wav": {"container": "wav", "codec": "pcm_s16le", "extension": "wav", "mime_type": "audio/wav"},
+    "opus": {"container": "ogg", "codec": "libopus", "extension": "ogg", "mime_type": "audio/ogg"},
+    "aac": {"container": "adts", "codec": "aac", "extension": "aac", "mime_type": "audio/aac"},
+}
+
+
+def transcode_audio(audio_bytes: bytes, output_format: str, bitrate: str = None) -> bytes:
+    """
+    오디오를 지정한 포맷으로 변환 (ffmpeg 파이프)
+
+    프로세스 풀에서 실행할 수 있도록 모듈 최상위 함수로 둔다.
+
+    Args:
+        audio_bytes: 원본 오디오 바이트 (주로 WAV)
+        output_format: "wav" | "opus" | "aac"
+        bitrate: 목표 비트레이트 (예: "24k")
+
+    Returns:
+        변환된 오디오 바이트
+    """
+    spec = OUTPUT_FORMATS[output_format]
+    output_kwargs = {"format": spec["container"], "acodec": spec["codec"]}
+    if bitrate and output_format != "wav":
+        output_kwargs["audio_bitrate"] = bitrate
+
+    out, _ = (
+        ffmpeg
+        .input("pipe:0")
+        .output("pipe:1", **output_kwargs)
+        .global_args("-hide_banner", "-loglevel", "error")
+        .run(input=audio_bytes, capture_stdout=True, capture_stderr=True)
+    )
+    return out
+
+
+def audio_duration_ms(audio_bytes: bytes):
+    """
+    오디오 길이(밀리초)를 헤더 또는 샘플 수로 정확히 계산
+
+    - WAV: 데이터 프레임 수 / 샘플레이트
+    - Ogg/Opus: 마지막 페이지 granule position - pre-skip (48kHz 기준)
+    - 그 외: PCM으로 디코딩한 샘플 수
+
+    Returns:
+        길이 (밀리초), 계산할 수 없으면 None
+    """
+    if audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE":
+        try:
+            with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+                return int(round(wav.getnframes() * 1000 / wav.getframerate()))
+        except (wave.Error, EOFError):
+            pass
+
+    if audio_bytes[:4] == b"OggS":
+        duration = _ogg_opus_duration_ms(audio_bytes)
+        if duration is not None:
+            return duration
+
+    try:
+        pcm = decode_to_pcm(audio_bytes, TARGET_SAMPLE_RATE)
+        return int(round(len(pcm) * 1000 / TARGET_SAMPLE_RATE))
+    except Exception as e:
+        logger.warning(f"⚠️ 오디오 길이 계산 실패: {e}")
+        return None
+
+
+def _ogg_opus_duration_ms(audio_bytes: bytes):
+    """Ogg 페이지 헤더에서 Opus 길이 계산 (Opus가 아니면 None)"""
+    pos = 0
+    pre_skip = None
+    last_granule = None
+
+    while pos + 27 <= len(audio_bytes) and audio_bytes[pos:pos + 4] == b"OggS":
+        granule = int.from_bytes(audio_bytes[pos + 6:pos + 14], "little", signed=True)
+        segment_count = audio_bytes[pos + 26]
+        body_start = pos + 27 + segment_count
+        body_len = sum(audio_bytes[pos + 27:body_start])
+
+        if pre_skip is None:
+            body = audio_bytes[body_start:body_start + 19]
+            if body[:8] != b"OpusHead":
+                return None
+            pre_skip = int.from_bytes(body[10:12], "little")
+        if granule >= 0:
+            last_granule = granule
+
+        pos = body_start + body_len
+
+    if pre_skip is None or last_granule is None:
+        return None
+    return int(round(max(0, last_granule - pre_skip) * 1000 / 48000))
@@ -0,0 +1,113 @@
+"""
+텍스트 기반 결과 캐시
+같은 입력에 대한 계산(안전성 검사, 감정 분류 등)을 짧은 시간 동안 재사용하고,
+이미 진행 중인 계산은 중복 호출 없이 결과를 기다린다.
+SharedResultStore는 워커 간 공유가 필요한 결과(스트리밍 STT 선행 실행)를 Redis에 둔다.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+
+
+class TextResultCache:
+    """스레드 안전 LRU + TTL 캐시 (진행 중 계산 공유)"""
+
+    def __init__(self, name: str, maxsize: int = 256, ttl_seconds: float = 300.0):
+        """
+        Args:
+            name: 캐시 이름 (메트릭 라벨)
+            maxsize: 최대 항목 수
+            ttl_seconds: 항목 유효 시간 (초)
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        캐시된 결과 반환, 없으면 계산 후 저장
+
+        다른 스레드가 같은 키를 계산 중이면 그 결과를 기다린다.
+        계산이 예외로 끝나면 캐시에 남기지 않고 예외를 그대로 전달한다.
+
+        Args:
+            key: 캐시 키 (보통 입력 텍스트)
+            compute: 결과 계산 함수
+
+        Returns:
+            계산 결과
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                future, owner = entry[1], False
+            else:
+                future, owner = Future(), True
+                self._entries[key] = (now + self.ttl_seconds, future)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        record_cache(self.name, hit=not owner)
+
+        if owner:
+            try:
+                future.set_result(compute())
+            except BaseException as e:
+                future.set_exception(e)
+                with self._lock:
+                    current = self._entries.get(key)
+                    if current is not None and current[1] is future:
+                        del self._entries[key]
+
+        return future.result()
+
+    def clear(self):
+        """캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedResultStore:
+    """
+    워커 간 공유 결과 (Redis, 텍스트 해시 키)
+    스트리밍 STT 연결과 이어지는 /turn이 다른 워커에서 처리돼도 선행 실행 결과를 재사용하기 위함
+    (STT_PREFETCH_SHARED가 꺼져 있거나 Redis 미연결이면 아무것도 하지 않음)
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: 결과 종류 (Redis 키 / 메트릭 라벨)
+        """
+        self.name = name
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{settings.STT_PREFETCH_PREFIX}{self.name}:{digest}"
+
+    def get(self, text: str) -> Optional[dict]:
+        """공유된 결과 조회 (없으면 None)"""
+        if not settings.STT_PREFETCH_SHARED:
+            return None
+        from app.services.redis_service import get_redis_service
+        value = get_redis_service().get_cached(self._key(text))
+        record_cache(f"{self.name}_shared", hit=value is not None)
+        return value
+
+    def set(self, text: str, value: dict):
+        """결과 공유 (STT_PREFETCH_TTL 동안)"""
+        if not settings.STT_PREFETCH_SHARED:
+            return
+        from app.services.redis_service import get_redis_service
+        get_redis_service().set_cached(self._key(text), value, settings.STT_PREFETCH_TTL)
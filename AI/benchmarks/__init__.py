@@ -0,0 +1,11 @@
+"""
+CPU 핫패스 마이크로벤치마크
+
+매 턴 실행되는 순수 CPU 경로(안전 필터 정규화, 무음 필터, 대상 추출, 규칙 기반 평가,
+조사 처리, 세션 직렬화, 응답 구성)를 고정 코퍼스로 측정하고 커밋 간 비교한다.
+
+사용법:
+    python -m benchmarks run --out bench/base.json
+    python -m benchmarks run --out bench/new.json
+    python -m benchmarks compare bench/base.json bench/new.json --threshold 0.1
+"""
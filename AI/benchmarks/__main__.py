@@ -0,0 +1,71 @@
+"""
+벤치마크 CLI
+
+    python -m benchmarks run [--filter safety] [--rounds 7] [--min-time 0.2] [--out result.json]
+    python -m benchmarks compare base.json new.json [--threshold 0.1]
+      (회귀가 있으면 종료 코드 1)
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+
+def _prepare_environment(log_level: str):
+    """외부 호출 없이 앱 모듈을 import 할 수 있도록 설정"""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ.setdefault("TRACING_ENABLED", "false")
+    logging.basicConfig(level=getattr(logging, log_level.upper()))
+    logging.getLogger().setLevel(getattr(logging, log_level.upper()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="CPU 핫패스 마이크로벤치마크")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="벤치마크 실행")
+    run.add_argument("--filter", default=None, help="이름에 포함된 문자열로 선택")
+    run.add_argument("--rounds", type=int, default=7)
+    run.add_argument("--min-time", type=float, default=0.2, help="라운드당 최소 시간 (초)")
+    run.add_argument("--out", default=None, help="결과 JSON 경로 (없으면 stdout)")
+    run.add_argument("--log-level", default="WARNING",
+                     help="측정 중 로그 레벨 (운영과 같은 조건은 INFO)")
+
+    cmp = subparsers.add_parser("compare", help="두 결과 비교")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=0.1, help="회귀 판정 비율")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        _prepare_environment(args.log_level)
+        from benchmarks.harness import run_suite
+        from benchmarks.suite import BENCHMARKS
+
+        result = run_suite(BENCHMARKS, args.filter, args.rounds, args.min_time)
+        output = json.dumps(result, ensure_ascii=False, indent=2)
+        if args.out:
+            directory = os.path.dirname(args.out)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                f.write(output + "\n")
+            print(f"결과 저장: {args.out}", file=sys.stderr)
+        else:
+            print(output)
+        return 0
+
+    from benchmarks.harness import compare, format_comparison
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    comparison = compare(base, new, args.threshold)
+    print(format_comparison(comparison))
+    return 1 if comparison["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
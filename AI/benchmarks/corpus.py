@@ -0,0 +1,116 @@
+"""
+벤치마크 고정 코퍼스 (아동 발화 / 현실적인 길이의 세션)
+
+결과 비교가 가능하도록 내용과 순서는 바꾸지 않는다.
+바꿔야 하면 CORPUS_VERSION을 올린다 (compare가 버전이 다르면 경고).
+"""
+from datetime import datetime
+from typing import Dict, List
+
+from app.models.schemas import DialogueSession, EmotionLabel, Stage
+
+CORPUS_VERSION = 1
+
+# 실제 대화 로그 형태의 아동 발화 (짧은 단답 ~ 긴 경험 서술, 회피성 / 헛소리 / 영어 포함)
+UTTERANCES: List[str] = [
+    "슬펐을 것 같아",
+    "콩쥐가 속상했을 것 같아요",
+    "화났어",
+    "몰라",
+    "음",
+    "에베베베",
+    "2번",
+    "무서웠을 거야 호랑이가 나와서",
+    "팥쥐가 괴롭혀서 슬펐어",
+    "혼자 일을 다 해야 해서 힘들었을 것 같아",
+    "새엄마가 잔치에 못 가게 해서 속상했어",
+    "구멍 난 독에 물을 채워야 하니까 너무 힘들었을 거야",
+    "응 나도 그런 적 있어",
+    "아니 없어",
+    "유치원에서 친구가 장난감 뺏어서 속상했어",
+    "동생이 내 그림 찢었을 때 진짜 화났어",
+    "엄마한테 혼났을 때 슬펐어",
+    "선생님이 나만 안 불러줘서 서운했어",
+    "할머니 집에 갔을 때 강아지가 짖어서 무서웠어",
+    "형이 게임 안 시켜줘서 짜증났어",
+    "그때 진짜 화났어",
+    "속상하고 화났어",
+    "친구가 놀려서 그랬어",
+    "내 말을 안 들어줘서",
+    "혼자 놀아서 심심하고 슬펐어",
+    "좋아 해볼게",
+    "심호흡 해볼래",
+    "응 알겠어",
+    "시청해주셔서 감사합니다",
+    "MBC 뉴스 이덕영입니다",
+    "okay okay",
+    "어... 그러니까... 친구가... 음... 같이 안 놀아줘서... 슬펐어",
+    "아빠가 출장 가서 보고 싶었어 그래서 울었어",
+    "누나가 내 과자 다 먹어서 화가 났는데 엄마가 누나 편만 들었어",
+    "삼촌이 선물 사준다고 했는데 안 사줘서 실망했어",
+    "친구랑 싸웠는데 먼저 미안하다고 못 했어",
+]
+
+CHILD_NAMES: List[str] = ["민수", "서연", "지호", "하은", "우진", "지유", "은", "현"]
+FULL_NAMES: List[str] = ["김민수", "이서연", "박지호", "최하은", "남궁민", "선우진", "제갈현", "강지유"]
+
+_STAGE_PLAN = [
+    (Stage.S1_EMOTION_LABELING, 2),
+    (Stage.S2_ASK_REASON_EMOTION_1, 2),
+    (Stage.S3_ASK_EXPERIENCE, 1),
+    (Stage.S4_REAL_WORLD_EMOTION, 2),
+    (Stage.S5_ASK_REASON_EMOTION_2, 3),
+    (Stage.S6_ACTION_CARD, 1),
+]
+
+
+def build_session(index: int = 0) -> DialogueSession:
+    """S6까지 진행된 세션 (재시도 포함 11턴)"""
+    key_moments: List[Dict] = []
+    turn = 1
+    for stage, turns in _STAGE_PLAN:
+        for _ in range(turns):
+            content = UTTERANCES[(index * 7 + turn * 3) % len(UTTERANCES)]
+            turn += 1
+            key_moments.append({
+                "stage": stage.value,
+                "turn": turn,
+                "content": content,
+                "emotion": "슬픔" if stage in (Stage.S1_EMOTION_LABELING, Stage.S4_REAL_WORLD_EMOTION) else None,
+                "safety_check": {"is_safe": True, "flagged_categories": [], "message": None},
+            })
+
+    return DialogueSession(
+        session_id=f"bench-session-{index:04d}",
+        child_name=CHILD_NAMES[index % len(CHILD_NAMES)],
+        story_name="콩쥐팥쥐",
+        current_stage=Stage.S6_ACTION_CARD,
+        current_turn=turn,
+        retry_count=0,
+        emotion_history=[EmotionLabel.SAD, EmotionLabel.ANGRY],
+        key_moments=key_moments,
+        context={
+            "s3_answer_type": "positive",
+            "s3_answer_content": "유치원에서 친구가 장난감 뺏어서 속상했어",
+            "s1_emotion": "슬픔",
+            "s4_emotion": "분노",
+        },
+        created_at=datetime(2024, 11, 1, 10, 0, 0),
+        updated_at=datetime(2024, 11, 1, 10, 12, 30),
+    )
+
+
+def build_turn_result(text: str, tts_base64_chars: int = 64_000) -> Dict:
+    """agent.execute_stage_turn 결과 형태 (TTS Base64 포함, 약 3초 분량 Opus)"""
+    return {
+        "stt_result": {"text": text, "confidence": 1.0, "language": "ko"},
+        "safety_check": {"is_safe": True, "flagged_categories": []},
+        "emotion_detected": {"primary": "슬픔", "secondary": [], "confidence": 0.9},
+        "ai_response": {
+            "text": "그랬구나, 정말 속상했겠다. 그때 어떤 마음이 들었는지 말해줄래?",
+            "tts_audio_base64": "A" * tts_base64_chars,
+            "tts_url": "/audio/tts_bench.ogg",
+            "duration_ms": 3050,
+            "tts_audio_format": "opus",
+        },
+    }
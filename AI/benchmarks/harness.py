@@ -0,0 +1,169 @@
+"""
+측정 / 결과 저장 / 비교
+
+- 라운드당 최소 시간(min_time)을 채우도록 반복 횟수를 보정한 뒤 rounds번 측정
+- 측정 중에는 GC를 끄고 (timeit과 동일) 작업 1회당 시간(ns)을 기록
+- 결과 JSON에는 커밋 / 파이썬 / 플랫폼 / 코퍼스 버전을 함께 저장
+"""
+import gc
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.corpus import CORPUS_VERSION
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(op: Callable[[], None], rounds: int = 7, min_time: float = 0.2) -> Dict:
+    """
+    작업 1회당 시간 측정
+
+    Args:
+        op: 측정할 작업
+        rounds: 측정 라운드 수
+        min_time: 라운드당 최소 시간 (초)
+
+    Returns:
+        {"loops", "rounds", "min_ns", "median_ns", "mean_ns", "stdev_ns"}
+    """
+    # 워밍업 + 반복 횟수 보정
+    op()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+
+    samples: List[float] = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter_ns()
+            for _ in range(loops):
+                op()
+            samples.append((time.perf_counter_ns() - start) / loops)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        "loops": loops,
+        "rounds": rounds,
+        "min_ns": round(min(samples), 1),
+        "median_ns": round(statistics.median(samples), 1),
+        "mean_ns": round(statistics.fmean(samples), 1),
+        "stdev_ns": round(statistics.stdev(samples), 1) if len(samples) > 1 else 0.0,
+    }
+
+
+def run_suite(
+    benchmarks: Dict[str, Callable],
+    name_filter: Optional[str] = None,
+    rounds: int = 7,
+    min_time: float = 0.2
+) -> Dict:
+    """등록된 벤치마크 실행 후 결과 dict 반환"""
+    results = {}
+    for name, setup in benchmarks.items():
+        if name_filter and name_filter not in name:
+            continue
+        op, items = setup()
+        result = measure(op, rounds=rounds, min_time=min_time)
+        result["items"] = items
+        result["per_item_ns"] = round(result["median_ns"] / max(items, 1), 1)
+        results[name] = result
+        print(f"{name:<34}{result['median_ns'] / 1000:>12.2f} µs/op  "
+              f"(±{result['stdev_ns'] / 1000:.2f}, {items} items)", file=sys.stderr)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "corpus_version": CORPUS_VERSION,
+            "rounds": rounds,
+            "min_time_s": min_time,
+        },
+        "results": results,
+    }
+
+
+def compare(base: Dict, new: Dict, threshold: float = 0.1) -> Dict:
+    """
+    두 결과 비교 (중앙값 기준)
+
+    Args:
+        base: 기준 결과
+        new: 비교 대상 결과
+        threshold: 회귀 / 개선 판정 비율 (0.1 = 10%)
+
+    Returns:
+        {"rows": [...], "regressions": [이름], "warnings": [...]}
+    """
+    warnings = []
+    for key in ("corpus_version", "python", "machine"):
+        if base["meta"].get(key) != new["meta"].get(key):
+            warnings.append(f"{key} 다름: {base['meta'].get(key)} → {new['meta'].get(key)}")
+
+    rows, regressions = [], []
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        before = base["results"].get(name)
+        after = new["results"].get(name)
+        if not before or not after:
+            rows.append({"name": name, "status": "added" if after else "removed"})
+            continue
+
+        ratio = after["median_ns"] / before["median_ns"] if before["median_ns"] else 1.0
+        # 변화가 두 측정의 노이즈보다 작으면 판정하지 않음
+        noise = (before["stdev_ns"] + after["stdev_ns"]) / before["median_ns"] if before["median_ns"] else 0.0
+        if ratio > 1 + max(threshold, noise):
+            status = "regression"
+            regressions.append(name)
+        elif ratio < 1 - max(threshold, noise):
+            status = "improvement"
+        else:
+            status = "same"
+        rows.append({
+            "name": name,
+            "base_ns": before["median_ns"],
+            "new_ns": after["median_ns"],
+            "ratio": round(ratio, 3),
+            "status": status,
+        })
+
+    return {"rows": rows, "regressions": regressions, "warnings": warnings}
+
+
+def format_comparison(comparison: Dict) -> str:
+    """비교 결과 표"""
+    lines = [f"⚠️ {w}" for w in comparison["warnings"]]
+    lines.append(f"{'benchmark':<34}{'base µs':>12}{'new µs':>12}{'ratio':>8}  status")
+    for row in comparison["rows"]:
+        if "ratio" not in row:
+            lines.append(f"{row['name']:<34}{'':>12}{'':>12}{'':>8}  {row['status']}")
+            continue
+        lines.append(
+            f"{row['name']:<34}{row['base_ns'] / 1000:>12.2f}{row['new_ns'] / 1000:>12.2f}"
+            f"{row['ratio']:>8.3f}  {row['status']}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,188 @@
+"""
+벤치마크 정의
+
+각 벤치마크는 준비(setup) 함수로 등록하며, setup은 측정할 작업(인자 없는 함수)을 반환한다.
+작업 1회 = 코퍼스 전체 1회 처리 (items: 처리 항목 수).
+"""
+import copy
+import json
+import time
+from typing import Callable, Dict, Tuple
+
+from benchmarks.corpus import (
+    CHILD_NAMES, FULL_NAMES, UTTERANCES, build_session, build_turn_result
+)
+
+# name -> setup() -> (작업, 항목 수)
+BENCHMARKS: Dict[str, Callable[[], Tuple[Callable[[], None], int]]] = {}
+
+
+def benchmark(name: str):
+    """벤치마크 등록 데코레이터"""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+# ========================================
+# 안전 필터
+# ========================================
+
+def _safety_filter():
+    from app.tools.safety_filter import SafetyFilterTool
+    return SafetyFilterTool()
+
+
+@benchmark("safety.normalize")
+def bench_safety_normalize():
+    tool = _safety_filter()
+
+    def run():
+        for text in UTTERANCES:
+            tool._normalize(text)
+    return run, len(UTTERANCES)
+
+
+@benchmark("safety.contains_badword")
+def bench_safety_contains_badword():
+    tool = _safety_filter()
+
+    def run():
+        for text in UTTERANCES:
+            tool.contains_badword(text)
+    return run, len(UTTERANCES)
+
+
+# ========================================
+# STT 무음 / 헛소리 필터
+# ========================================
+
+@benchmark("stt.is_silence_text")
+def bench_is_silence_text():
+    from app.core.container import get_stt_service
+    stt_service = get_stt_service()
+
+    def run():
+        for text in UTTERANCES:
+            stt_service.is_silence_text(text)
+    return run, len(UTTERANCES)
+
+
+# ========================================
+# Agent / Orchestrator
+# ========================================
+
+@benchmark("agent.extract_mentioned_person")
+def bench_extract_mentioned_person():
+    from app.core.container import get_agent
+    agent = get_agent()
+    session = build_session()
+
+    def run():
+        for text in UTTERANCES:
+            agent._extract_mentioned_person(text, session)
+    return run, len(UTTERANCES)
+
+
+@benchmark("orchestrator.rule_based_success")
+def bench_rule_based_success():
+    from app.core.container import get_orchestrator
+    from app.models.schemas import Stage
+    orchestrator = get_orchestrator()
+
+    cases = []
+    for i, text in enumerate(UTTERANCES):
+        stage = list(Stage)[i % len(Stage)]
+        result = build_turn_result(text, tts_base64_chars=0)
+        if i % 4 == 0:
+            result["emotion_detected"] = {"primary": "중립", "secondary": [], "confidence": 0.5}
+        cases.append((stage, result))
+
+    def run():
+        for stage, result in cases:
+            orchestrator._check_rule_based_success(stage, result)
+    return run, len(cases)
+
+
+# ========================================
+# 이름 / 조사 처리
+# ========================================
+
+@benchmark("name_utils.particles")
+def bench_name_particles():
+    from app.utils.name_utils import (
+        extract_first_name,
+        format_name_with_subject,
+        format_name_with_topic,
+        format_name_with_vocative,
+    )
+
+    def run():
+        for full_name in FULL_NAMES:
+            extract_first_name(full_name)
+        for name in CHILD_NAMES:
+            format_name_with_vocative(name)
+            format_name_with_subject(name)
+            format_name_with_topic(name)
+    return run, len(FULL_NAMES) + len(CHILD_NAMES) * 3
+
+
+# ========================================
+# 세션 직렬화 (ContextManager ↔ Redis 경로와 동일)
+# ========================================
+
+@benchmark("session.serialize")
+def bench_session_serialize():
+    session = build_session()
+
+    def run():
+        json.dumps(session.dict(), ensure_ascii=False, default=str)
+    return run, 1
+
+
+@benchmark("session.deserialize")
+def bench_session_deserialize():
+    from app.models.schemas import DialogueSession
+    payload = json.dumps(build_session().dict(), ensure_ascii=False, default=str)
+
+    def run():
+        DialogueSession(**json.loads(payload))
+    return run, 1
+
+
+# ========================================
+# 응답 구성 (dialogue.py)
+# ========================================
+
+@benchmark("dialogue.build_turn_response")
+def bench_build_turn_response():
+    from app.api.v1.dialogue import _build_turn_response
+    from app.models.schemas import Stage
+
+    session = build_session()
+    session.current_stage = Stage.S2_ASK_REASON_EMOTION_1
+    turn_result = build_turn_result(UTTERANCES[8])
+
+    def run():
+        _build_turn_response(
+            session, copy.copy(turn_result), True, Stage.S1_EMOTION_LABELING, time.time()
+        )
+    return run, 1
+
+
+@benchmark("dialogue.encode_turn_response")
+def bench_encode_turn_response():
+    from fastapi.encoders import jsonable_encoder
+    from app.api.v1.dialogue import _build_turn_response
+    from app.models.schemas import Stage
+
+    session = build_session()
+    session.current_stage = Stage.S2_ASK_REASON_EMOTION_1
+    response = _build_turn_response(
+        session, build_turn_result(UTTERANCES[8]), True, Stage.S1_EMOTION_LABELING, time.time()
+    )
+
+    def run():
+        json.dumps(jsonable_encoder(response), ensure_ascii=False)
+    return run, 1
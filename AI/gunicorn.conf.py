@@ -0,0 +1,21 @@
+"""
+gunicorn 설정
+Prometheus 멀티프로세스 모드용 디렉토리 초기화 및 종료된 워커 메트릭 정리
+"""
+import os
+import shutil
+
+
+def on_starting(server):
+    """마스터 시작 시 이전 실행의 메트릭 파일 제거"""
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """종료된 워커의 live gauge 정리"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
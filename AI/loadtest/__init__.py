@@ -0,0 +1,12 @@
+"""
+부하 테스트 (네트워크 없이 로컬에서 실행)
+
+- stubs   : OpenAI 호환 스텁 (chat / moderation / transcription) + Supertone 스텁
+- serve   : 스텁을 바라보도록 설정한 AI 서버 실행 (fakeredis 또는 로컬 Redis)
+- runner  : 가상 아동 N명이 S1→S6 대화를 동시에 진행하며 지연시간/처리량 측정
+- corpus  : Stage별 아동 발화 코퍼스
+
+사용법:
+    pip install -r loadtest/requirements.txt
+    python -m loadtest all --children 20 --duration 60
+"""
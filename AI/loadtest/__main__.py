@@ -0,0 +1,177 @@
+"""
+부하 테스트 CLI
+
+    python -m loadtest stub  --port 9100 --chat-latency 900:2500
+    python -m loadtest serve --port 8000 --stub-url http://127.0.0.1:9100 [--fake-redis]
+    python -m loadtest run   --base-url http://127.0.0.1:8000 --children 20 --duration 60
+    python -m loadtest all   --children 20 --duration 60 --json result.json
+      (스텁 + 서버(fakeredis)를 하위 프로세스로 띄우고 측정 후 종료)
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from loadtest.runner import format_report, run_load
+from loadtest.stubs import DEFAULT_LATENCIES_MS, LatencyModel, create_stub_app, parse_latency
+
+
+def _add_stub_args(parser: argparse.ArgumentParser):
+    for kind, (median, p95) in DEFAULT_LATENCIES_MS.items():
+        parser.add_argument(
+            f"--{kind}-latency", default=f"{median:g}:{p95:g}",
+            help=f"{kind} 지연시간 '중앙값:p95' (ms)"
+        )
+    parser.add_argument("--stub-port", type=int, default=9100)
+
+
+def _add_run_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--children", type=int, default=10, help="동시 가상 아동 수")
+    parser.add_argument("--duration", type=float, default=60.0, help="측정 시간 (초)")
+    parser.add_argument("--mode", choices=["test_turn", "turn"], default="test_turn",
+                        help="test_turn: 텍스트 입력 / turn: 오디오 입력 + TTS")
+    parser.add_argument("--retry-ratio", type=float, default=0.1, help="회피성 답변 비율")
+    parser.add_argument("--think-time", type=float, default=0.0, help="턴 사이 평균 대기 (초)")
+    parser.add_argument("--tts-format", default=None, help="wav | opus | aac")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="가상 아동 투입 시간 (초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None, help="결과 JSON 저장 경로")
+
+
+def _run_stub(args):
+    import uvicorn
+    latency = LatencyModel({
+        kind: parse_latency(getattr(args, f"{kind}_latency")) for kind in DEFAULT_LATENCIES_MS
+    }, seed=args.seed)
+    app = create_stub_app(latency, seed=args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.stub_port, log_level="warning")
+
+
+def _run_serve(args):
+    from loadtest.serve import serve
+    serve(
+        host="127.0.0.1",
+        port=args.port,
+        stub_url=args.stub_url,
+        fake_redis=args.fake_redis,
+        redis_host=args.redis_host,
+        redis_port=args.redis_port,
+        workers=args.workers
+    )
+
+
+def _report(args, report):
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.json_path}")
+
+
+def _run_load(args, base_url: str, stub_url: str = None):
+    return asyncio.run(run_load(
+        base_url=base_url,
+        children=args.children,
+        duration=args.duration,
+        mode=args.mode,
+        retry_ratio=args.retry_ratio,
+        think_time=args.think_time,
+        tts_format=args.tts_format,
+        stub_url=stub_url,
+        seed=args.seed,
+        ramp_up=args.ramp_up
+    ))
+
+
+def _wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"준비 시간 초과: {url}")
+
+
+def _run_all(args):
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    base_url = f"http://127.0.0.1:{args.port}"
+    python = sys.executable
+
+    stub_cmd = [python, "-m", "loadtest", "stub", "--stub-port", str(args.stub_port), "--seed", str(args.seed)]
+    for kind in DEFAULT_LATENCIES_MS:
+        stub_cmd += [f"--{kind}-latency", getattr(args, f"{kind}_latency")]
+    serve_cmd = [
+        python, "-m", "loadtest", "serve", "--port", str(args.port),
+        "--stub-url", stub_url, "--workers", str(args.workers)
+    ]
+    if args.workers == 1:
+        serve_cmd.append("--fake-redis")
+    else:
+        serve_cmd += ["--redis-host", args.redis_host, "--redis-port", str(args.redis_port)]
+
+    processes = []
+    try:
+        processes.append(subprocess.Popen(stub_cmd, cwd=os.getcwd()))
+        _wait_ready(f"{stub_url}/stats")
+        processes.append(subprocess.Popen(serve_cmd, cwd=os.getcwd()))
+        _wait_ready(f"{base_url}/health")
+        _report(args, _run_load(args, base_url, stub_url))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="AI 서버 부하 테스트")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stub = subparsers.add_parser("stub", help="OpenAI / Supertone 스텁 서버 실행")
+    _add_stub_args(stub)
+    stub.add_argument("--seed", type=int, default=0)
+
+    serve = subparsers.add_parser("serve", help="스텁을 바라보는 AI 서버 실행")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--stub-url", default="http://127.0.0.1:9100")
+    serve.add_argument("--fake-redis", action="store_true", help="프로세스 내 fakeredis 사용")
+    serve.add_argument("--redis-host", default="localhost")
+    serve.add_argument("--redis-port", type=int, default=6379)
+    serve.add_argument("--workers", type=int, default=1)
+
+    run = subparsers.add_parser("run", help="실행 중인 서버에 부하 생성")
+    run.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run.add_argument("--stub-url", default=None, help="스텁 주소 (외부 호출 수 집계)")
+    _add_run_args(run)
+
+    run_all = subparsers.add_parser("all", help="스텁 + 서버 실행 후 부하 생성")
+    _add_stub_args(run_all)
+    _add_run_args(run_all)
+    run_all.add_argument("--port", type=int, default=8000)
+    run_all.add_argument("--workers", type=int, default=1, help="2 이상이면 로컬 Redis 필요")
+    run_all.add_argument("--redis-host", default="localhost")
+    run_all.add_argument("--redis-port", type=int, default=6379)
+
+    args = parser.parse_args(argv)
+    if args.command == "stub":
+        _run_stub(args)
+    elif args.command == "serve":
+        _run_serve(args)
+    elif args.command == "run":
+        _report(args, _run_load(args, args.base_url, args.stub_url))
+    else:
+        _run_all(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Stage별 아동 발화 코퍼스
+실제 대화처럼 대부분은 Stage 목표를 충족하는 답변, 일부는 재시도를 유발하는 답변
+"""
+import random
+from typing import Optional
+
+STAGE_UTTERANCES = {
+    "S1": [
+        "콩쥐가 슬펐을 것 같아",
+        "속상했을 거야",
+        "화났을 것 같아",
+        "무서웠을 것 같아요",
+        "슬퍼",
+        "2번 슬픔이야",
+    ],
+    "S2": [
+        "팥쥐가 괴롭혀서 슬펐어",
+        "혼자 일을 다 해야 해서",
+        "새엄마가 잔치에 못 가게 해서",
+        "친구가 없으니까",
+        "구멍 난 독에 물을 채워야 해서 힘들어서",
+    ],
+    "S3": [
+        "응 나도 그런 적 있어",
+        "유치원에서 친구가 장난감 뺏어서 속상했어",
+        "동생이 내 그림 찢었을 때",
+        "엄마한테 혼났을 때 슬펐어",
+        "아니 없어",
+    ],
+    "S4": [
+        "그때 진짜 화났어",
+        "너무 슬펐어",
+        "무서웠어",
+        "속상하고 화났어",
+    ],
+    "S5": [
+        "친구가 놀려서 그랬어",
+        "동생이 내 거 망가뜨려서",
+        "내 말을 안 들어줘서",
+        "혼자 놀아서 심심하고 슬펐어",
+    ],
+    "S6": [
+        "좋아 해볼게",
+        "심호흡 해볼래",
+        "응 알겠어",
+    ],
+}
+
+# 회피성 / 무의미 답변 (재시도 + fallback 경로)
+RETRY_UTTERANCES = ["몰라", "음", "에베베베", "글쎄"]
+
+# STT 스텁이 반환하는 일반 발화 (오디오 모드에서는 Stage를 알 수 없음)
+GENERAL_UTTERANCES = [u for utterances in STAGE_UTTERANCES.values() for u in utterances]
+
+STORIES = ["콩쥐팥쥐", "가난한 유산", "삼년 고개", "해님 달님", "금도끼 은도끼"]
+CHILD_NAMES = ["김민수", "이서연", "박지호", "최하은", "정우진", "강지유"]
+INTRO = "오늘 같이 읽은 동화 재미있었지? 이야기 나눠볼까?"
+
+
+def pick_utterance(stage: Optional[str], retry_ratio: float, rng: random.Random) -> str:
+    """Stage에 맞는 발화 선택 (retry_ratio 확률로 회피성 답변)"""
+    if rng.random() < retry_ratio:
+        return rng.choice(RETRY_UTTERANCES)
+    return rng.choice(STAGE_UTTERANCES.get(stage or "", GENERAL_UTTERANCES))
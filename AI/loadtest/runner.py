@@ -0,0 +1,310 @@
+"""
+부하 테스트 실행기
+
+가상 아동 N명이 동시에 세션을 시작하고 S1→S6 대화를 끝까지 진행한다.
+대화가 끝나면 새 세션으로 다시 시작하며, duration 동안 반복한다.
+
+측정 항목:
+- 처리량 (턴/초, 세션/분)
+- Stage별 턴 지연시간 p50 / p95 / p99, 오류 수
+- 서버 이벤트 루프 지연 (/metrics의 event_loop_lag_seconds 구간 차이)
+- 스텁 호출 수 (턴당 외부 API 호출 수)
+"""
+import asyncio
+import io
+import json
+import random
+import time
+import wave
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+from prometheus_client.parser import text_string_to_metric_families
+
+from loadtest.corpus import CHILD_NAMES, INTRO, STORIES, pick_utterance
+
+API_PREFIX = "/api/v1/dialogue"
+MAX_TURNS_PER_SESSION = 30
+
+
+def make_speech_wav(rng: random.Random, duration_ms: int = 1200, sample_rate: int = 16000) -> bytes:
+    """발화 대용 오디오 (턴마다 달라서 STT 캐시에 걸리지 않음)"""
+    samples = int(sample_rate * duration_ms / 1000)
+    t = np.arange(samples) / sample_rate
+    freq = rng.uniform(180, 320)
+    envelope = np.clip(np.sin(np.pi * t / t[-1]) * 1.5, 0, 1)
+    noise = np.random.default_rng(rng.getrandbits(32)).normal(0, 0.01, samples)
+    pcm = ((0.3 * envelope * np.sin(2 * np.pi * freq * t) + noise) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+class LoadStats:
+    """Stage별 지연시간 / 오류 집계"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.sessions_started = 0
+        self.sessions_completed = 0
+
+    def record(self, stage: str, seconds: float, ok: bool = True):
+        if ok:
+            self.latencies[stage].append(seconds)
+        else:
+            self.errors[stage] += 1
+
+    def summary(self, elapsed: float) -> Dict:
+        stages = {}
+        for stage in sorted(set(self.latencies) | set(self.errors)):
+            values = np.array(self.latencies.get(stage, []))
+            stages[stage] = {
+                "count": int(values.size),
+                "errors": self.errors.get(stage, 0),
+                "p50_ms": round(float(np.percentile(values, 50)) * 1000, 1) if values.size else None,
+                "p95_ms": round(float(np.percentile(values, 95)) * 1000, 1) if values.size else None,
+                "p99_ms": round(float(np.percentile(values, 99)) * 1000, 1) if values.size else None,
+            }
+        turns = sum(s["count"] for k, s in stages.items() if k.startswith("S"))
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "turns": turns,
+            "turns_per_s": round(turns / elapsed, 3) if elapsed else 0.0,
+            "sessions_started": self.sessions_started,
+            "sessions_completed": self.sessions_completed,
+            "sessions_per_min": round(self.sessions_completed * 60 / elapsed, 2) if elapsed else 0.0,
+            "stages": stages,
+        }
+
+
+async def run_child(
+    client: httpx.AsyncClient,
+    child_id: int,
+    stats: LoadStats,
+    stop_at: float,
+    mode: str,
+    retry_ratio: float,
+    think_time: float,
+    tts_format: Optional[str],
+    seed: int
+):
+    """가상 아동 1명: 세션 시작 → 대화 종료까지 반복"""
+    rng = random.Random(seed * 100003 + child_id)
+    start_path = "/session/start" if mode == "turn" else "/session/test_start"
+    turn_path = "/turn" if mode == "turn" else "/test_turn"
+
+    while time.monotonic() < stop_at:
+        form = {
+            "story_name": rng.choice(STORIES),
+            "child_name": rng.choice(CHILD_NAMES),
+            "intro": INTRO,
+        }
+        if mode == "turn" and tts_format:
+            form["tts_format"] = tts_format
+
+        started = time.monotonic()
+        try:
+            response = await client.post(API_PREFIX + start_path, data=form)
+            response.raise_for_status()
+            session_id = response.json()["session_id"]
+            stats.record("start", time.monotonic() - started)
+        except Exception:
+            stats.record("start", time.monotonic() - started, ok=False)
+            await asyncio.sleep(1.0)
+            continue
+        stats.sessions_started += 1
+
+        stage = "S1"
+        for _ in range(MAX_TURNS_PER_SESSION):
+            if time.monotonic() >= stop_at:
+                return
+            if think_time:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * think_time)
+
+            data = {"session_id": session_id, "stage": stage}
+            files = None
+            if mode == "turn":
+                files = {"audio_file": ("speech.wav", make_speech_wav(rng), "audio/wav")}
+                if tts_format:
+                    data["tts_format"] = tts_format
+            else:
+                data["child_text"] = pick_utterance(stage, retry_ratio, rng)
+
+            started = time.monotonic()
+            try:
+                response = await client.post(API_PREFIX + turn_path, data=data, files=files)
+                response.raise_for_status()
+                body = response.json()
+                stats.record(stage, time.monotonic() - started)
+            except Exception:
+                stats.record(stage, time.monotonic() - started, ok=False)
+                break
+
+            next_stage = body.get("next_stage")
+            if next_stage is None:
+                stats.sessions_completed += 1
+                break
+            stage = next_stage
+
+
+def _lag_histogram(metrics_text: str) -> Dict[float, float]:
+    """event_loop_lag_seconds 누적 버킷 {le: count}"""
+    buckets = {}
+    for family in text_string_to_metric_families(metrics_text):
+        if family.name != "event_loop_lag_seconds":
+            continue
+        for sample in family.samples:
+            if sample.name.endswith("_bucket"):
+                le = float(sample.labels["le"])
+                buckets[le] = buckets.get(le, 0.0) + sample.value
+    return buckets
+
+
+def _lag_summary(before: Dict[float, float], after: Dict[float, float]) -> Dict:
+    """측정 구간 동안의 이벤트 루프 지연 분포 (버킷 상한 기준)"""
+    diff = {le: after.get(le, 0.0) - before.get(le, 0.0) for le in after}
+    total = diff.get(float("inf"), 0.0)
+    if not total:
+        return {"samples": 0}
+
+    def quantile(q: float) -> float:
+        for le in sorted(diff):
+            if diff[le] >= q * total:
+                return le
+        return float("inf")
+
+    over_100ms = total - diff.get(0.1, total)
+    return {
+        "samples": int(total),
+        "p50_le_s": quantile(0.5),
+        "p99_le_s": quantile(0.99),
+        "saturated_ratio": round(over_100ms / total, 4),  # 100ms 이상 늦은 비율
+    }
+
+
+async def _monitor_client_loop(stop: asyncio.Event, interval: float = 0.1) -> float:
+    """부하 생성기 자신의 루프 지연 (크면 측정값을 믿을 수 없음)"""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - start - interval)
+    return worst
+
+
+async def run_load(
+    base_url: str,
+    children: int,
+    duration: float,
+    mode: str = "test_turn",
+    retry_ratio: float = 0.1,
+    think_time: float = 0.0,
+    tts_format: Optional[str] = None,
+    stub_url: Optional[str] = None,
+    seed: int = 0,
+    ramp_up: float = 5.0
+) -> Dict:
+    """
+    부하 테스트 실행
+
+    Args:
+        base_url: AI 서버 주소
+        children: 동시 가상 아동 수
+        duration: 측정 시간 (초)
+        mode: test_turn (텍스트) | turn (오디오 + TTS)
+        retry_ratio: 회피성 답변 비율 (재시도 / fallback 경로)
+        think_time: 턴 사이 평균 대기 시간 (초)
+        tts_format: /turn TTS 출력 포맷
+        stub_url: 스텁 서버 주소 (호출 수 집계용)
+        seed: 난수 시드
+        ramp_up: 가상 아동 투입 시간 (초)
+
+    Returns:
+        결과 dict
+    """
+    stats = LoadStats()
+    limits = httpx.Limits(max_connections=children * 2, max_keepalive_connections=children * 2)
+    timeout = httpx.Timeout(180.0)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        lag_before = _lag_histogram((await client.get("/metrics")).text)
+        if stub_url:
+            await client.post(f"{stub_url}/stats/reset")
+
+        stop = asyncio.Event()
+        client_lag = asyncio.create_task(_monitor_client_loop(stop))
+
+        started = time.monotonic()
+        stop_at = started + duration
+        tasks = []
+        for child_id in range(children):
+            if ramp_up and children > 1:
+                await asyncio.sleep(ramp_up / children)
+            tasks.append(asyncio.create_task(run_child(
+                client, child_id, stats, stop_at, mode,
+                retry_ratio, think_time, tts_format, seed
+            )))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+
+        stop.set()
+        client_lag_max = await client_lag
+        lag_after = _lag_histogram((await client.get("/metrics")).text)
+
+        stub_calls = None
+        if stub_url:
+            stub_calls = (await client.get(f"{stub_url}/stats")).json()
+
+    report = stats.summary(elapsed)
+    report.update({
+        "config": {
+            "children": children, "duration_s": duration, "mode": mode,
+            "retry_ratio": retry_ratio, "think_time_s": think_time, "tts_format": tts_format,
+        },
+        "server_event_loop_lag": _lag_summary(lag_before, lag_after),
+        "client_loop_lag_max_s": round(client_lag_max, 4),
+        "stub_calls": stub_calls,
+    })
+    if stub_calls and report["turns"]:
+        report["stub_calls_per_turn"] = {
+            k: round(v / report["turns"], 2) for k, v in stub_calls.items()
+        }
+    return report
+
+
+def format_report(report: Dict) -> str:
+    """사람이 읽기 위한 요약 표"""
+    config = report["config"]
+    lines = [
+        f"가상 아동 {config['children']}명, {report['elapsed_s']}초, 모드={config['mode']}",
+        f"처리량: {report['turns_per_s']} 턴/초, 완료 세션 {report['sessions_completed']}개 "
+        f"({report['sessions_per_min']}/분)",
+        "",
+        f"{'stage':<6}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for stage, s in report["stages"].items():
+        lines.append(
+            f"{stage:<6}{s['count']:>7}{s['errors']:>8}"
+            f"{str(s['p50_ms']):>10}{str(s['p95_ms']):>10}{str(s['p99_ms']):>10}"
+        )
+    lag = report["server_event_loop_lag"]
+    lines.append("")
+    if lag.get("samples"):
+        lines.append(
+            f"서버 이벤트 루프 지연: p50 ≤ {lag['p50_le_s']}s, p99 ≤ {lag['p99_le_s']}s, "
+            f"100ms 초과 {lag['saturated_ratio'] * 100:.1f}% ({lag['samples']} samples)"
+        )
+    else:
+        lines.append("서버 이벤트 루프 지연: 측정값 없음")
+    lines.append(f"부하 생성기 루프 지연 최대: {report['client_loop_lag_max_s']}s")
+    if report.get("stub_calls_per_turn"):
+        lines.append(f"턴당 외부 호출: {json.dumps(report['stub_calls_per_turn'], ensure_ascii=False)}")
+    return "\n".join(lines)
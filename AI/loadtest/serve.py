@@ -0,0 +1,79 @@
+"""
+스텁을 바라보는 AI 서버 실행
+
+외부 API 주소와 Redis 설정을 환경변수로 바꾼 뒤 app.main을 띄운다.
+--fake-redis 사용 시 프로세스 내 fakeredis를 사용하므로 워커는 1개만 가능하다.
+(멀티 워커 측정은 로컬 Redis + --redis-host 사용)
+"""
+import os
+import tempfile
+from typing import Dict
+
+
+def build_env(
+    stub_url: str,
+    redis_host: str = "localhost",
+    redis_port: int = 6379
+) -> Dict[str, str]:
+    """스텁/로컬 Redis용 환경변수"""
+    stub_url = stub_url.rstrip("/")
+    return {
+        "OPENAI_API_KEY": "sk-loadtest",
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "OPENAI_API_BASE": f"{stub_url}/v1",
+        "SUPERTONE_API_KEY": "loadtest",
+        "SUPERTONE_BASE_URL": f"{stub_url}/v1",
+        "REDIS_HOST": redis_host,
+        "REDIS_PORT": str(redis_port),
+        "REDIS_PASSWORD": "",
+        "REDIS_USERNAME": "",
+        "REDIS_SSL": "false",
+        "TRACING_EXPORTER": "none",
+    }
+
+
+def use_fake_redis():
+    """redis.Redis를 프로세스 공용 fakeredis 서버로 교체"""
+    import fakeredis
+    import redis
+
+    server = fakeredis.FakeServer()
+
+    class SharedFakeRedis(fakeredis.FakeRedis):
+        def __init__(self, *args, **kwargs):
+            for key in ("host", "port", "ssl", "ssl_cert_reqs", "username", "password"):
+                kwargs.pop(key, None)
+            kwargs["server"] = server
+            super().__init__(*args, **kwargs)
+
+    redis.Redis = SharedFakeRedis
+
+
+def serve(
+    host: str,
+    port: int,
+    stub_url: str,
+    fake_redis: bool = True,
+    redis_host: str = "localhost",
+    redis_port: int = 6379,
+    workers: int = 1
+):
+    """AI 서버 실행 (블로킹)"""
+    import uvicorn
+
+    if fake_redis and workers > 1:
+        raise ValueError("--fake-redis는 워커 1개에서만 사용할 수 있습니다 (로컬 Redis 사용)")
+
+    os.environ.update(build_env(stub_url, redis_host, redis_port))
+    # 턴마다 저장되는 TTS 파일이 작업 트리(generated_audio/)에 쌓이지 않도록 임시 디렉토리 사용
+    os.environ.setdefault("TTS_AUDIO_DIR", tempfile.mkdtemp(prefix="loadtest_audio_"))
+    if fake_redis:
+        use_fake_redis()
+
+    if workers > 1:
+        # 워커별 메트릭 합산 (이벤트 루프 지연 등)
+        os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="loadtest_prom_"))
+        uvicorn.run("app.main:app", host=host, port=port, workers=workers, log_level="warning")
+    else:
+        from app.main import app
+        uvicorn.run(app, host=host, port=port, log_level="warning")
@@ -0,0 +1,257 @@
+"""
+외부 의존성 스텁 서버 (OpenAI 호환 API + Supertone)
+
+- POST /v1/chat/completions      : 프롬프트 유형별 응답 (감정 JSON, 평가 성공/실패, 행동 카드 JSON, 부모 피드백, 일반 발화)
+                                   stream=true면 SSE 청크 (지연시간은 첫 토큰까지, 이후 토큰 간격 stream_token_ms)
+                                   usage.prompt_tokens_details.cached_tokens: 마지막 메시지 앞까지가 전에 본 것과 같고
+                                   1024토큰 이상이면 128토큰 단위로 캐시 적중 (제공자 프롬프트 캐시 흉내)
+- POST /v1/moderations           : 항상 안전
+- POST /v1/audio/transcriptions  : 코퍼스 발화 중 하나
+- GET  /v1/voices/search         : Anna 보이스
+- POST /v1/text-to-speech/{id}   : 텍스트 길이에 비례하는 WAV
+- GET  /stats                    : 엔드포인트별 호출 수
+
+각 엔드포인트 지연시간은 로그정규분포 (중앙값 / p95 지정)
+"""
+import asyncio
+import io
+import json
+import math
+import random
+import threading
+import time
+import uuid
+import wave
+from collections import Counter
+from typing import Dict, Tuple
+
+import numpy as np
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+from loadtest.corpus import GENERAL_UTTERANCES, RETRY_UTTERANCES
+
+# p95 = median * exp(1.645 * sigma)
+_Z95 = 1.6448536269514722
+
+DEFAULT_LATENCIES_MS = {
+    "chat": (900.0, 2500.0),
+    "moderation": (150.0, 400.0),
+    "transcription": (700.0, 1800.0),
+    "tts": (600.0, 1500.0),
+}
+
+MODERATION_CATEGORIES = [
+    "harassment", "harassment/threatening", "hate", "hate/threatening",
+    "illicit", "illicit/violent", "self-harm", "self-harm/instructions",
+    "self-harm/intent", "sexual", "sexual/minors", "violence", "violence/graphic",
+]
+
+
+class LatencyModel:
+    """엔드포인트별 로그정규 지연시간"""
+
+    def __init__(self, latencies_ms: Dict[str, Tuple[float, float]], seed: int = 0):
+        self.latencies_ms = dict(latencies_ms)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, kind: str) -> float:
+        """지연시간 샘플 (초)"""
+        median, p95 = self.latencies_ms[kind]
+        if median <= 0:
+            return 0.0
+        sigma = math.log(max(p95, median) / median) / _Z95
+        with self._lock:
+            value = self._rng.lognormvariate(math.log(median), sigma)
+        return value / 1000.0
+
+
+def parse_latency(value: str) -> Tuple[float, float]:
+    """'중앙값:p95' (ms) 문자열 파싱"""
+    median, _, p95 = value.partition(":")
+    median = float(median)
+    return median, float(p95) if p95 else median
+
+
+def make_wav(duration_ms: int, sample_rate: int = 24000) -> bytes:
+    """TTS 응답용 WAV (정현파)"""
+    samples = int(sample_rate * duration_ms / 1000)
+    t = np.arange(samples) / sample_rate
+    pcm = (0.2 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def _chat_reply(prompt: str, rng: random.Random) -> str:
+    """프롬프트 유형에 맞는 응답 내용"""
+    if "'성공' 또는 '실패'" in prompt:
+        # 답변 평가: 회피성 답변만 실패
+        answer = prompt.split("아이의 답변:", 1)[-1].split("\n", 1)[0]
+        return "실패" if any(u in answer for u in RETRY_UTTERANCES) else "성공"
+    if "JSON 배열" in prompt:
+        return json.dumps(["심호흡 3번 하기", "10까지 세기", "물 한 컵 마시기"], ensure_ascii=False)
+    if '"parent_guide"' in prompt:
+        return json.dumps({
+            "title": "마음 진정 카드",
+            "description": "화가 날 때 천천히 숨을 쉬어봐요",
+            "icon": "🌟",
+            "parent_guide": ["함께 숨쉬기", "감정 이름 말하기", "칭찬해주기"],
+        }, ensure_ascii=False)
+    if '"primary"' in prompt:
+        primary = rng.choice(["행복", "슬픔", "분노", "두려움", "중립"])
+        return json.dumps({"primary": primary, "secondary": [], "confidence": 0.9}, ensure_ascii=False)
+    if "부모 행동 지침:" in prompt:
+        return (
+            "아동 대화 분석 피드백:\n"
+            "우리 아이가 캐릭터의 마음을 자기 말로 표현했어요. 정서 인식 능력이 잘 자라고 있다는 신호거든요.\n\n"
+            "부모 행동 지침:\n"
+            "아이가 감정을 말하면 '그랬구나' 하고 먼저 받아 주세요. 이게 감정 코칭의 첫 단계거든요."
+        )
+    return rng.choice([
+        "그랬구나, 정말 속상했겠다. 그때 어떤 마음이 들었어?",
+        "이야기해줘서 고마워. 왜 그런 기분이 들었는지 말해줄래?",
+        "맞아, 그럴 수 있어. 너도 그런 적이 있었니?",
+    ])
+
+
+def _usage(messages, content: str, prompt_cache: set) -> Dict:
+    """토큰 사용량 (토큰 ≈ 글자 2개, 마지막 메시지 앞까지를 캐시 가능한 접두부로 취급)"""
+    prompt_tokens = len("\n".join(str(m.get("content", "")) for m in messages)) // 2
+    completion_tokens = len(content) // 2
+    prefix = json.dumps(messages[:-1], ensure_ascii=False, sort_keys=True)
+    prefix_tokens = len("\n".join(str(m.get("content", "")) for m in messages[:-1])) // 2
+    cached_tokens = 0
+    if prefix_tokens >= 1024:
+        if prefix in prompt_cache:
+            cached_tokens = prefix_tokens // 128 * 128
+        else:
+            prompt_cache.add(prefix)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": cached_tokens},
+    }
+
+
+async def _stream_chunks(content: str, model: str, token_ms: float, usage: Dict = None):
+    """chat.completion.chunk SSE (토큰 ≈ 글자 3개, usage가 있으면 stream_options.include_usage처럼 마지막 청크로 전달)"""
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+
+    def chunk(delta: Dict, finish_reason=None) -> str:
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for i in range(0, len(content), 3):
+        yield chunk({"content": content[i:i + 3]})
+        await asyncio.sleep(token_ms / 1000)
+    yield chunk({}, "stop")
+    if usage is not None:
+        data = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                "model": model, "choices": [], "usage": usage}
+        yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def create_stub_app(
+    latency: LatencyModel, tts_ms_per_char: int = 120, seed: int = 0, stream_token_ms: float = 20
+) -> FastAPI:
+    """스텁 FastAPI 앱 생성"""
+    app = FastAPI(title="Load test stubs")
+    calls: Counter = Counter()
+    rng = random.Random(seed)
+    wav_cache: Dict[int, bytes] = {}
+    prompt_cache: set = set()
+
+    async def delay(kind: str):
+        calls[kind] += 1
+        await asyncio.sleep(latency.sample(kind))
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await delay("chat")
+        messages = body.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        content = _chat_reply(prompt, rng)
+        usage = _usage(messages, content, prompt_cache)
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage")
+            return StreamingResponse(
+                _stream_chunks(content, body.get("model", "stub"), stream_token_ms, usage if include_usage else None),
+                media_type="text/event-stream"
+            )
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    @app.post("/v1/moderations")
+    async def moderations(request: Request):
+        body = await request.json()
+        await delay("moderation")
+        return {
+            "id": f"modr-{uuid.uuid4().hex[:12]}",
+            "model": body.get("model", "stub"),
+            "results": [{
+                "flagged": False,
+                "categories": {c: False for c in MODERATION_CATEGORIES},
+                "category_scores": {c: 0.0 for c in MODERATION_CATEGORIES},
+                "category_applied_input_types": {c: ["text"] for c in MODERATION_CATEGORIES},
+            }],
+        }
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        await request.body()
+        await delay("transcription")
+        return {"text": rng.choice(GENERAL_UTTERANCES)}
+
+    @app.get("/v1/voices/search")
+    async def voices_search():
+        calls["voices"] += 1
+        return {"items": [{"name": "Anna", "voice_id": "stub-anna"}]}
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    async def text_to_speech(voice_id: str, request: Request):
+        body = await request.json()
+        await delay("tts")
+        duration_ms = max(500, len(body.get("text", "")) * tts_ms_per_char)
+        # 길이별 WAV 재사용 (100ms 단위)
+        key = duration_ms // 100
+        if key not in wav_cache:
+            wav_cache[key] = make_wav(key * 100)
+        return Response(content=wav_cache[key], media_type="audio/wav")
+
+    @app.get("/stats")
+    async def stats():
+        return dict(calls)
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        calls.clear()
+        return {"ok": True}
+
+    return app